@@ -21,7 +21,7 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 from config import settings
 from database import Base
-from models import Camera, WorkZone, CollectionRun, CameraDirection
+from models import Camera, WorkZone, CollectionRun, CameraDirection, Job, SyncState, SyncTombstone
 
 # Alembic Config object
 config = context.config
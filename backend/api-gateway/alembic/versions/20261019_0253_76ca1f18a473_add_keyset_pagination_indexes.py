@@ -0,0 +1,31 @@
+"""Add keyset pagination indexes
+
+Revision ID: 76ca1f18a473
+Revises: c7495cd14e3f
+Create Date: 2026-10-19 02:53:53.259690+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '76ca1f18a473'
+down_revision: Union[str, None] = 'c7495cd14e3f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Composite (timestamp, id) indexes backing newest-first keyset pagination
+    op.create_index('ix_work_zones_detected_at_id', 'work_zones', ['detected_at', 'id'], unique=False)
+    op.create_index('ix_collection_runs_started_at_id', 'collection_runs', ['started_at', 'id'], unique=False)
+    op.create_index('ix_camera_directions_analyzed_at_id', 'camera_directions', ['analyzed_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_camera_directions_analyzed_at_id', table_name='camera_directions')
+    op.drop_index('ix_collection_runs_started_at_id', table_name='collection_runs')
+    op.drop_index('ix_work_zones_detected_at_id', table_name='work_zones')
@@ -0,0 +1,51 @@
+"""Add geohash spatial index
+
+Revision ID: 1c8ae7a75a84
+Revises: 76ca1f18a473
+Create Date: 2026-10-19 03:03:02.161721+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from spatial import encode_geohash
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1c8ae7a75a84'
+down_revision: Union[str, None] = '76ca1f18a473'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SPATIAL_TABLES = ('cameras', 'work_zones')
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+
+    for table in SPATIAL_TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column('geohash', sa.String(length=12), nullable=True))
+            batch_op.create_index(f'ix_{table}_geohash', ['geohash'], unique=False)
+
+        # Backfill existing rows
+        rows = bind.execute(sa.text(f'SELECT id, latitude, longitude FROM {table}')).fetchall()
+        if rows:
+            bind.execute(
+                sa.text(f'UPDATE {table} SET geohash = :geohash WHERE id = :id'),
+                [
+                    {"id": row.id, "geohash": encode_geohash(row.latitude, row.longitude)}
+                    for row in rows
+                    if row.latitude is not None and row.longitude is not None
+                ]
+            )
+
+
+def downgrade() -> None:
+    for table in reversed(SPATIAL_TABLES):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_index(f'ix_{table}_geohash')
+            batch_op.drop_column('geohash')
@@ -0,0 +1,43 @@
+"""Add composite and partial query indexes
+
+Revision ID: 0c255602db6a
+Revises: 1c8ae7a75a84
+Create Date: 2026-10-19 03:04:34.995832+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0c255602db6a'
+down_revision: Union[str, None] = '1c8ae7a75a84'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Dashboard /active: status = 'active' AND risk_score >= N ORDER BY risk_score
+    op.create_index('ix_work_zones_status_risk_score', 'work_zones', ['status', 'risk_score'], unique=False)
+
+    # Analysis history/stats: real detections only, newest first
+    op.create_index(
+        'ix_work_zones_real_detected_at_id', 'work_zones', ['detected_at', 'id'], unique=False,
+        sqlite_where=sa.text('synthetic = 0'),
+        postgresql_where=sa.text('synthetic = false')
+    )
+
+    # Re-analysis by collection run
+    op.create_index(
+        'ix_work_zones_collection_id', 'work_zones', ['collection_id'], unique=False,
+        sqlite_where=sa.text('collection_id IS NOT NULL'),
+        postgresql_where=sa.text('collection_id IS NOT NULL')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_work_zones_collection_id', table_name='work_zones')
+    op.drop_index('ix_work_zones_real_detected_at_id', table_name='work_zones')
+    op.drop_index('ix_work_zones_status_risk_score', table_name='work_zones')
@@ -0,0 +1,38 @@
+"""Add camera level direction unique index
+
+Revision ID: 4a8770610829
+Revises: 0c255602db6a
+Create Date: 2026-10-19 03:07:08.906242+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a8770610829'
+down_revision: Union[str, None] = '0c255602db6a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Earlier CSV imports inserted duplicate camera-level rows; keep the newest
+    op.execute(
+        "DELETE FROM camera_directions WHERE view_id IS NULL AND id NOT IN ("
+        "SELECT MAX(id) FROM camera_directions WHERE view_id IS NULL GROUP BY camera_id)"
+    )
+
+    # NULL view_id never conflicts on unique_camera_view_direction, so
+    # camera-level upserts use this partial index as their conflict target
+    op.create_index(
+        'uq_camera_directions_camera_level', 'camera_directions', ['camera_id'], unique=True,
+        sqlite_where=sa.text('view_id IS NULL'),
+        postgresql_where=sa.text('view_id IS NULL')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_camera_directions_camera_level', table_name='camera_directions')
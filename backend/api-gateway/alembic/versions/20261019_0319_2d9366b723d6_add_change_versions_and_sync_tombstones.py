@@ -0,0 +1,58 @@
+"""Add change versions and sync tombstones
+
+Revision ID: 2d9366b723d6
+Revises: a79b16115af3
+Create Date: 2026-10-19 03:19:44.091771+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2d9366b723d6'
+down_revision: Union[str, None] = 'a79b16115af3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TRACKED_TABLES = ('cameras', 'work_zones')
+
+
+def upgrade() -> None:
+    op.create_table('sync_state',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.Column('pruned_through', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('sync_tombstones',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('entity', sa.String(length=20), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('change_version', sa.BigInteger(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_sync_tombstones_entity_version', 'sync_tombstones', ['entity', 'change_version'], unique=False)
+
+    for table in TRACKED_TABLES:
+        op.add_column(table, sa.Column('change_version', sa.BigInteger(), server_default='0', nullable=False))
+        op.create_index(f'ix_{table}_change_version', table, ['change_version'], unique=False)
+        # Existing rows are version 1, so `?since=0` returns everything
+        op.execute(f'UPDATE {table} SET change_version = 1')
+
+    op.execute('INSERT INTO sync_state (id, version, pruned_through) VALUES (1, 1, 0)')
+
+
+def downgrade() -> None:
+    for table in reversed(TRACKED_TABLES):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_index(f'ix_{table}_change_version')
+            batch_op.drop_column('change_version')
+
+    op.drop_index('ix_sync_tombstones_entity_version', table_name='sync_tombstones')
+    op.drop_table('sync_tombstones')
+    op.drop_table('sync_state')
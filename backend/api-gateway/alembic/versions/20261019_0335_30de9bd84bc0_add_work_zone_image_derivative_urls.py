@@ -0,0 +1,29 @@
+"""Add work zone image derivative URLs
+
+Revision ID: 30de9bd84bc0
+Revises: 2d9366b723d6
+Create Date: 2026-10-19 03:35:26.241139+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '30de9bd84bc0'
+down_revision: Union[str, None] = '2d9366b723d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('work_zones', sa.Column('thumbnail_url', sa.String(length=500), nullable=True))
+    op.add_column('work_zones', sa.Column('preview_url', sa.String(length=500), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('work_zones') as batch_op:
+        batch_op.drop_column('preview_url')
+        batch_op.drop_column('thumbnail_url')
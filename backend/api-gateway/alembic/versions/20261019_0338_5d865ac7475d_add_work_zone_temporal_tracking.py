@@ -0,0 +1,42 @@
+"""Add work zone temporal tracking
+
+Revision ID: 5d865ac7475d
+Revises: 30de9bd84bc0
+Create Date: 2026-10-19 03:38:08.128595+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d865ac7475d'
+down_revision: Union[str, None] = '30de9bd84bc0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # SQLite cannot ADD COLUMN with a CURRENT_TIMESTAMP default: add, backfill, then set it
+    op.add_column('work_zones', sa.Column('last_seen_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('work_zones', sa.Column('detection_count', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('work_zones', sa.Column('missed_cycles', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('work_zones', sa.Column('peak_risk_score', sa.Integer(), nullable=True))
+    op.add_column('work_zones', sa.Column('risk_trend', sa.String(length=10), nullable=True))
+
+    # Existing rows: each was one detection, last seen when detected
+    op.execute('UPDATE work_zones SET last_seen_at = detected_at, peak_risk_score = risk_score')
+
+    with op.batch_alter_table('work_zones') as batch_op:
+        batch_op.alter_column('last_seen_at', server_default=sa.text('(CURRENT_TIMESTAMP)'))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('work_zones') as batch_op:
+        batch_op.drop_column('risk_trend')
+        batch_op.drop_column('peak_risk_score')
+        batch_op.drop_column('missed_cycles')
+        batch_op.drop_column('detection_count')
+        batch_op.drop_column('last_seen_at')
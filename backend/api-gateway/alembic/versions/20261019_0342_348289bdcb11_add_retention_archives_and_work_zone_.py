@@ -0,0 +1,104 @@
+"""Add retention archives and work zone rollups
+
+Revision ID: 348289bdcb11
+Revises: 5d865ac7475d
+Create Date: 2026-10-19 03:42:44.378155+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '348289bdcb11'
+down_revision: Union[str, None] = '5d865ac7475d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # On PostgreSQL the archives are partitioned by month; services/retention.py
+    # creates each month's partition before moving rows into it
+    op.create_table('collection_runs_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('collection_id', sa.String(length=100), autoincrement=False, nullable=False),
+    sa.Column('status', sa.String(length=20), autoincrement=False, nullable=True),
+    sa.Column('total_cameras', sa.Integer(), autoincrement=False, nullable=True),
+    sa.Column('images_collected', sa.Integer(), autoincrement=False, nullable=True),
+    sa.Column('images_analyzed', sa.Integer(), autoincrement=False, nullable=True),
+    sa.Column('images_failed', sa.Integer(), autoincrement=False, nullable=True),
+    sa.Column('work_zones_detected', sa.Integer(), autoincrement=False, nullable=True),
+    sa.Column('high_risk_zones', sa.Integer(), autoincrement=False, nullable=True),
+    sa.Column('errors', sa.Integer(), autoincrement=False, nullable=True),
+    sa.Column('results', sa.JSON(), autoincrement=False, nullable=True),
+    sa.Column('error_log', sa.JSON(), autoincrement=False, nullable=True),
+    sa.Column('error_message', sa.String(length=500), autoincrement=False, nullable=True),
+    sa.Column('started_at', sa.DateTime(timezone=True), autoincrement=False, nullable=False),
+    sa.Column('completed_at', sa.DateTime(timezone=True), autoincrement=False, nullable=True),
+    sa.Column('duration_seconds', sa.Integer(), autoincrement=False, nullable=True),
+    sa.PrimaryKeyConstraint('id', 'started_at'),
+    postgresql_partition_by='RANGE (started_at)'
+    )
+    op.create_index('ix_collection_runs_archive_started_at', 'collection_runs_archive', ['started_at'], unique=False)
+    op.create_table('work_zone_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('camera_id', sa.Integer(), nullable=False),
+    sa.Column('granularity', sa.String(length=10), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('work_zones', sa.Integer(), nullable=False),
+    sa.Column('detections', sa.BigInteger(), nullable=False),
+    sa.Column('high_risk', sa.Integer(), nullable=False),
+    sa.Column('risk_score_sum', sa.BigInteger(), nullable=False),
+    sa.Column('max_risk_score', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('camera_id', 'granularity', 'bucket_start', name='uq_work_zone_rollups_bucket')
+    )
+    op.create_index('ix_work_zone_rollups_granularity_bucket', 'work_zone_rollups', ['granularity', 'bucket_start'], unique=False)
+    op.create_table('work_zones_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('camera_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('view_id', sa.Integer(), autoincrement=False, nullable=True),
+    sa.Column('latitude', sa.Float(), autoincrement=False, nullable=False),
+    sa.Column('longitude', sa.Float(), autoincrement=False, nullable=False),
+    sa.Column('geohash', sa.String(length=12), autoincrement=False, nullable=True),
+    sa.Column('risk_score', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('confidence', sa.Float(), autoincrement=False, nullable=False),
+    sa.Column('workers', sa.Integer(), autoincrement=False, nullable=True),
+    sa.Column('vehicles', sa.Integer(), autoincrement=False, nullable=True),
+    sa.Column('equipment', sa.Integer(), autoincrement=False, nullable=True),
+    sa.Column('barriers', sa.Boolean(), autoincrement=False, nullable=True),
+    sa.Column('hazards', sa.JSON(), autoincrement=False, nullable=True),
+    sa.Column('violations', sa.JSON(), autoincrement=False, nullable=True),
+    sa.Column('recommendations', sa.JSON(), autoincrement=False, nullable=True),
+    sa.Column('mto_book_compliance', sa.Boolean(), autoincrement=False, nullable=True),
+    sa.Column('gcp_image_url', sa.String(length=500), autoincrement=False, nullable=True),
+    sa.Column('thumbnail_url', sa.String(length=500), autoincrement=False, nullable=True),
+    sa.Column('preview_url', sa.String(length=500), autoincrement=False, nullable=True),
+    sa.Column('collection_id', sa.String(length=100), autoincrement=False, nullable=True),
+    sa.Column('model', sa.String(length=50), autoincrement=False, nullable=True),
+    sa.Column('synthetic', sa.Boolean(), autoincrement=False, nullable=True),
+    sa.Column('status', sa.String(length=20), autoincrement=False, nullable=True),
+    sa.Column('resolved_at', sa.DateTime(timezone=True), autoincrement=False, nullable=True),
+    sa.Column('last_seen_at', sa.DateTime(timezone=True), autoincrement=False, nullable=True),
+    sa.Column('detection_count', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('missed_cycles', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('peak_risk_score', sa.Integer(), autoincrement=False, nullable=True),
+    sa.Column('risk_trend', sa.String(length=10), autoincrement=False, nullable=True),
+    sa.Column('detected_at', sa.DateTime(timezone=True), autoincrement=False, nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), autoincrement=False, nullable=True),
+    sa.Column('change_version', sa.BigInteger(), autoincrement=False, nullable=False),
+    sa.PrimaryKeyConstraint('id', 'detected_at'),
+    postgresql_partition_by='RANGE (detected_at)'
+    )
+    op.create_index('ix_work_zones_archive_detected_at', 'work_zones_archive', ['detected_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_work_zones_archive_detected_at', table_name='work_zones_archive')
+    op.drop_table('work_zones_archive')
+    op.drop_index('ix_work_zone_rollups_granularity_bucket', table_name='work_zone_rollups')
+    op.drop_table('work_zone_rollups')
+    op.drop_index('ix_collection_runs_archive_started_at', table_name='collection_runs_archive')
+    op.drop_table('collection_runs_archive')
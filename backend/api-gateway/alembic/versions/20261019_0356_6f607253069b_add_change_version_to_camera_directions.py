@@ -0,0 +1,27 @@
+"""Add change_version to camera_directions
+
+Revision ID: 6f607253069b
+Revises: 348289bdcb11
+Create Date: 2026-10-19 03:56:23.654170+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6f607253069b'
+down_revision: Union[str, None] = '348289bdcb11'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('camera_directions', sa.Column('change_version', sa.BigInteger(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('camera_directions') as batch_op:
+        batch_op.drop_column('change_version')
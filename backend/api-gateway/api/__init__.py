@@ -5,6 +5,6 @@ API Routes Module
 FastAPI router modules for different API endpoints.
 """
 
-from . import cameras, work_zones, collection, directions, analysis
+from . import cameras, work_zones, collection, directions, analysis, stats, jobs, images, export
 
-__all__ = ["cameras", "work_zones", "collection", "directions", "analysis"]
+__all__ = ["cameras", "work_zones", "collection", "directions", "analysis", "stats", "jobs", "images", "export"]
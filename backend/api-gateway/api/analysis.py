@@ -5,17 +5,20 @@ AI Image Analysis API Endpoints
 Gemini Vision API integration for work zone detection and risk assessment.
 """
 
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Mapping
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Form, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, func, and_, Select
+from sqlalchemy.orm import joinedload
 from pydantic import BaseModel, Field
 import base64
 
-from database import get_db
+from database import get_db, count_if
 from models import Camera, WorkZone
-from services import gemini_service, analysis_orchestration_service
+from services import gemini_service, analysis_orchestration_service, invalidate_cache, publish_event
+from services.gemini_service import is_allowed_image_url
+from .pagination import paginate, set_next_cursor
 
 router = APIRouter()
 
@@ -23,7 +26,7 @@ router = APIRouter()
 # Pydantic schemas
 class ImageAnalysisRequest(BaseModel):
     """Schema for single image analysis request"""
-    image_url: Optional[str] = Field(None, description="GCP Storage URL of image")
+    image_url: Optional[str] = Field(None, description="Image storage or COMPASS camera URL of image")
     image_base64: Optional[str] = Field(None, description="Base64-encoded image data")
     camera_id: Optional[int] = Field(None, description="Camera that captured the image")
     model: str = Field(default="gemini-2.0-flash-exp", description="Gemini model to use")
@@ -32,7 +35,7 @@ class ImageAnalysisRequest(BaseModel):
 
 class BatchAnalysisRequest(BaseModel):
     """Schema for batch image analysis"""
-    image_urls: List[str] = Field(..., description="List of GCP Storage URLs")
+    image_urls: List[str] = Field(..., description="List of image storage or COMPASS camera URLs")
     camera_ids: Optional[List[int]] = Field(None, description="Corresponding camera IDs")
     model: str = Field(default="gemini-2.0-flash-exp")
     min_risk_threshold: int = Field(default=5, ge=1, le=10)
@@ -41,7 +44,7 @@ class BatchAnalysisRequest(BaseModel):
 class WorkZoneDetection(BaseModel):
     """Schema for detected work zone"""
     has_work_zone: bool
-    risk_score: int = Field(..., ge=1, le=10)
+    risk_score: int = Field(..., ge=0, le=10)  # 0: not assessed (analysis failed)
     confidence: float = Field(..., ge=0.0, le=1.0)
     workers: int = Field(default=0, ge=0)
     vehicles: int = Field(default=0, ge=0)
@@ -78,6 +81,15 @@ class BatchAnalysisResponse(BaseModel):
     completed_at: str
 
 
+def require_allowed_image_url(image_url: Optional[str]) -> None:
+    """Reject image URLs outside the image store and COMPASS (400)"""
+    if image_url and not is_allowed_image_url(image_url):
+        raise HTTPException(
+            status_code=400,
+            detail="image_url must be an image storage or COMPASS camera URL"
+        )
+
+
 # POST /api/analysis/image - Analyze single image
 @router.post("/image", response_model=ImageAnalysisResponse)
 async def analyze_image(
@@ -98,6 +110,8 @@ async def analyze_image(
     """
     if not request.image_url and not request.image_base64:
         raise HTTPException(status_code=400, detail="Either image_url or image_base64 required")
+    if not request.image_base64:
+        require_allowed_image_url(request.image_url)
 
     # Get camera info if provided
     camera = None
@@ -156,6 +170,8 @@ async def analyze_image(
         db.add(work_zone)
         await db.commit()
         await db.refresh(work_zone)
+        invalidate_cache("work_zones")
+        publish_event("work_zone.created", work_zone.to_dict())
         work_zone_id = work_zone.id
 
     return ImageAnalysisResponse(
@@ -237,6 +253,9 @@ async def analyze_batch(
             detail="camera_ids length must match image_urls length"
         )
 
+    for image_url in request.image_urls:
+        require_allowed_image_url(image_url)
+
     started_at = datetime.utcnow()
     results = []
     images_failed = 0
@@ -296,12 +315,28 @@ async def analyze_batch(
 
 
 # GET /api/analysis/history - Analysis history
+def analysis_history_query(camera_id: Optional[int] = None, min_risk: int = 0) -> Select:
+    """Filtered query behind /history (served by ix_work_zones_real_detected_at_id)"""
+    # Camera is loaded in the same statement (no per-row camera lookup)
+    query = select(WorkZone).options(joinedload(WorkZone.camera)).where(WorkZone.synthetic == False)
+
+    if camera_id:
+        query = query.where(WorkZone.camera_id == camera_id)
+
+    if min_risk > 0:
+        query = query.where(WorkZone.risk_score >= min_risk)
+
+    return query
+
+
 @router.get("/history")
 async def get_analysis_history(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=500),
     camera_id: Optional[int] = Query(None),
     min_risk: int = Query(0, ge=0, le=10),
+    cursor: Optional[str] = Query(None, description="Cursor from X-Next-Cursor header (overrides skip)"),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -310,33 +345,28 @@ async def get_analysis_history(
     This returns work zones that were created from AI analysis.
 
     Args:
-        skip: Pagination offset
+        skip: Pagination offset (prefer cursor for deep pages)
         limit: Max results
         camera_id: Filter by camera
         min_risk: Minimum risk score
+        cursor: Keyset cursor from the previous page's X-Next-Cursor header
 
     Returns:
         List of analyzed work zones
     """
-    query = select(WorkZone).where(WorkZone.synthetic == False)
-
-    if camera_id:
-        query = query.where(WorkZone.camera_id == camera_id)
-
-    if min_risk > 0:
-        query = query.where(WorkZone.risk_score >= min_risk)
-
-    query = query.order_by(WorkZone.detected_at.desc()).offset(skip).limit(limit)
+    query = paginate(
+        analysis_history_query(camera_id, min_risk),
+        WorkZone.detected_at, WorkZone.id, limit, cursor, skip
+    )
 
     result = await db.execute(query)
     work_zones = result.scalars().all()
+    set_next_cursor(response, work_zones, limit, "detected_at")
 
     # Build response with camera info
     history = []
     for wz in work_zones:
-        camera_query = select(Camera).where(Camera.id == wz.camera_id)
-        camera_result = await db.execute(camera_query)
-        camera = camera_result.scalar_one_or_none()
+        camera = wz.camera
 
         history.append({
             "work_zone_id": wz.id,
@@ -351,6 +381,8 @@ async def get_analysis_history(
             "violations": wz.violations,
             "mto_book_compliance": wz.mto_book_compliance,
             "image_url": wz.gcp_image_url,
+            "thumbnail_url": wz.thumbnail_url,
+            "preview_url": wz.preview_url,
             "model": wz.model,
             "detected_at": wz.detected_at.isoformat(),
             "status": wz.status
@@ -382,6 +414,8 @@ async def test_analysis_prompt(
     """
     if not image_url and not image_base64:
         raise HTTPException(status_code=400, detail="Image required")
+    if not image_base64:
+        require_allowed_image_url(image_url)
 
     # Call Gemini with custom prompt
     image_type = "base64" if image_base64 else "url"
@@ -401,6 +435,32 @@ async def test_analysis_prompt(
 
 
 # GET /api/analysis/stats - Analysis statistics
+def analysis_stats_query() -> Select:
+    """Single aggregate query behind the analysis statistics summary"""
+    return select(
+        func.count(WorkZone.id).label("total"),
+        count_if(WorkZone.confidence >= 0.8).label("high_confidence"),
+        func.avg(WorkZone.confidence).label("avg_confidence"),
+        func.avg(WorkZone.risk_score).label("avg_risk"),
+        count_if(WorkZone.mto_book_compliance == True).label("compliant")
+    ).where(WorkZone.synthetic == False)
+
+
+def analysis_stats_from_row(row: Mapping[str, Any]) -> Dict[str, Any]:
+    """Format analysis_stats_query() result"""
+    total = row["total"] or 0
+    compliant = row["compliant"] or 0
+
+    return {
+        "total_ai_detections": total,
+        "high_confidence_detections": row["high_confidence"] or 0,
+        "average_confidence": round(float(row["avg_confidence"] or 0), 3),
+        "average_risk_score": round(float(row["avg_risk"] or 0), 2),
+        "mto_compliant_zones": compliant,
+        "mto_non_compliant_zones": total - compliant
+    }
+
+
 @router.get("/stats/summary")
 async def get_analysis_stats(
     db: AsyncSession = Depends(get_db)
@@ -411,40 +471,5 @@ async def get_analysis_stats(
     Returns:
         Analysis performance metrics
     """
-    # Total AI-detected work zones (non-synthetic)
-    total_query = select(func.count(WorkZone.id)).where(WorkZone.synthetic == False)
-    total_result = await db.execute(total_query)
-    total = total_result.scalar()
-
-    # High confidence detections (>= 0.8)
-    high_conf_query = select(func.count(WorkZone.id)).where(
-        and_(WorkZone.synthetic == False, WorkZone.confidence >= 0.8)
-    )
-    high_conf_result = await db.execute(high_conf_query)
-    high_confidence = high_conf_result.scalar()
-
-    # Average confidence
-    avg_conf_query = select(func.avg(WorkZone.confidence)).where(WorkZone.synthetic == False)
-    avg_conf_result = await db.execute(avg_conf_query)
-    avg_confidence = avg_conf_result.scalar() or 0
-
-    # Average risk score
-    avg_risk_query = select(func.avg(WorkZone.risk_score)).where(WorkZone.synthetic == False)
-    avg_risk_result = await db.execute(avg_risk_query)
-    avg_risk = avg_risk_result.scalar() or 0
-
-    # MTO BOOK 7 compliant work zones
-    compliant_query = select(func.count(WorkZone.id)).where(
-        and_(WorkZone.synthetic == False, WorkZone.mto_book_compliance == True)
-    )
-    compliant_result = await db.execute(compliant_query)
-    compliant = compliant_result.scalar()
-
-    return {
-        "total_ai_detections": total,
-        "high_confidence_detections": high_confidence,
-        "average_confidence": round(float(avg_confidence), 3),
-        "average_risk_score": round(float(avg_risk), 2),
-        "mto_compliant_zones": compliant,
-        "mto_non_compliant_zones": total - compliant
-    }
+    result = await db.execute(analysis_stats_query())
+    return analysis_stats_from_row(result.mappings().one())
@@ -5,14 +5,22 @@ Cameras API Endpoints
 CRUD operations for QEW COMPASS traffic cameras.
 """
 
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Mapping, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, Select
 from pydantic import BaseModel, Field
 
-from database import get_db
+from database import get_db, count_if
 from models import Camera
+from spatial import nearest, within_bbox, MAX_SEARCH_RADIUS_M
+from change_tracking import changes_since, current_change_version, CHANGE_VERSION_HEADER
+from services import invalidate_cache
+from services.image_storage import as_utc, list_camera_frames
+from services.camera_health import camera_health_monitor
+from .pagination import NEXT_CURSOR_HEADER
+from .serialization import rows_response, with_response_columns
 
 router = APIRouter()
 
@@ -59,27 +67,55 @@ class CameraResponse(BaseModel):
     direction: Optional[str]
     direction_confidence: Optional[str]
     active: bool
-    views: Optional[dict]
-    created_at: str
+    views: Optional[Union[List[Dict[str, Any]], Dict[str, Any]]]  # Seeded cameras store a list
+    created_at: Optional[str]
     updated_at: Optional[str]
+    change_version: Optional[int] = None
 
     class Config:
         from_attributes = True
 
 
+class NearbyCameraResponse(CameraResponse):
+    """Camera with its distance from the query point"""
+    distance_m: float
+
+
+class CameraFrameResponse(BaseModel):
+    """Schema for a stored camera frame"""
+    camera_id: str
+    captured_at: str
+    key: str
+    url: str
+
+
+class CameraChangesResponse(BaseModel):
+    """Delta since a change version (?since=)"""
+    version: int  # Pass as ?since= next time
+    reset: bool = False  # Too far behind: refetch without ?since
+    changed: List[CameraResponse] = []  # Added or updated, and still matching
+    removed: List[int] = []  # Deleted or no longer matching the filters
+
+
 # GET /api/cameras - List all cameras
-@router.get("/", response_model=List[CameraResponse])
+@router.get("/", response_model=Union[List[CameraResponse], CameraChangesResponse])
 async def get_cameras(
+    response: Response,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Max records to return"),
     active_only: bool = Query(False, description="Filter active cameras only"),
     has_direction: bool = Query(False, description="Filter cameras with direction data"),
+    since: Optional[int] = Query(None, ge=0, description="Delta sync: only changes after this version"),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Get list of all cameras
 
     Returns list of camera objects with pagination support.
+
+    The full list carries an X-Change-Version header. Pass it back as
+    ?since= (with the same filters) to receive only what changed since
+    then; skip/limit do not apply to deltas.
     """
     query = select(Camera)
 
@@ -90,13 +126,98 @@ async def get_cameras(
     if has_direction:
         query = query.where(Camera.heading.isnot(None))
 
+    if since is not None:
+        delta = await changes_since(db, Camera, since, query)
+        if delta is None:
+            version, _ = await current_change_version(db)
+            return CameraChangesResponse(version=version, reset=True)
+        return CameraChangesResponse(
+            version=delta["version"],
+            changed=[CameraResponse(**camera.to_dict()) for camera in delta["changed"]],
+            removed=delta["removed"]
+        )
+
+    version, _ = await current_change_version(db)
+
     # Add ordering and pagination
     query = query.order_by(Camera.camera_id).offset(skip).limit(limit)
 
-    result = await db.execute(query)
-    cameras = result.scalars().all()
+    result = await db.execute(with_response_columns(query, CameraResponse, Camera))
+
+    response.headers[CHANGE_VERSION_HEADER] = str(version)
+    return rows_response(result.all(), response)
+
+
+# GET /api/cameras/nearby - K-nearest cameras to a point
+@router.get("/nearby", response_model=List[NearbyCameraResponse])
+async def get_nearby_cameras(
+    lat: float = Query(..., ge=-90, le=90, description="Latitude of the query point"),
+    lon: float = Query(..., ge=-180, le=180, description="Longitude of the query point"),
+    k: int = Query(10, ge=1, le=100, description="Max cameras to return"),
+    radius_m: Optional[float] = Query(None, gt=0, le=MAX_SEARCH_RADIUS_M, description="Search radius in meters"),
+    active_only: bool = Query(True, description="Filter active cameras only"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get the cameras nearest to a point
+
+    Args:
+        lat: Latitude
+        lon: Longitude
+        k: Max results
+        radius_m: Only cameras within this distance (default: widen until k found)
+        active_only: Filter active cameras only
+
+    Returns:
+        Cameras sorted by distance, each with distance_m
+    """
+    query = select(Camera)
+    if active_only:
+        query = query.where(Camera.active == True)
+
+    hits = await nearest(db, query, Camera, lat, lon, k, radius_m)
+
+    return [
+        NearbyCameraResponse(**camera.to_dict(), distance_m=round(distance, 1))
+        for camera, distance in hits
+    ]
+
+
+# GET /api/cameras/bbox - Cameras inside a map viewport
+@router.get("/bbox", response_model=List[CameraResponse])
+async def get_cameras_in_bbox(
+    min_lat: float = Query(..., ge=-90, le=90),
+    min_lon: float = Query(..., ge=-180, le=180),
+    max_lat: float = Query(..., ge=-90, le=90),
+    max_lon: float = Query(..., ge=-180, le=180),
+    limit: int = Query(500, ge=1, le=5000),
+    active_only: bool = Query(True, description="Filter active cameras only"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get cameras inside a bounding box
+
+    Args:
+        min_lat, min_lon, max_lat, max_lon: Viewport corners
+        limit: Max results
+        active_only: Filter active cameras only
+
+    Returns:
+        Cameras inside the box
+
+    Raises:
+        400: min corner greater than max corner
+    """
+    if min_lat > max_lat or min_lon > max_lon:
+        raise HTTPException(status_code=400, detail="Bounding box min must not exceed max")
+
+    query = select(Camera).where(within_bbox(Camera, min_lat, min_lon, max_lat, max_lon))
+    if active_only:
+        query = query.where(Camera.active == True)
+
+    result = await db.execute(query.order_by(Camera.camera_id).limit(limit))
 
-    return [CameraResponse.model_validate(camera) for camera in cameras]
+    return [CameraResponse(**camera.to_dict()) for camera in result.scalars().all()]
 
 
 # GET /api/cameras/{camera_id} - Get specific camera
@@ -124,7 +245,57 @@ async def get_camera(
     if not camera:
         raise HTTPException(status_code=404, detail=f"Camera {camera_id} not found")
 
-    return CameraResponse.model_validate(camera)
+    return CameraResponse(**camera.to_dict())
+
+
+# GET /api/cameras/{camera_id}/images - Stored frames in a time range
+@router.get("/{camera_id}/images", response_model=List[CameraFrameResponse])
+async def get_camera_images(
+    camera_id: str,
+    response: Response,
+    start: Optional[datetime] = Query(None, description="Range start, inclusive (default: 24 hours before end)"),
+    end: Optional[datetime] = Query(None, description="Range end, exclusive (default: now)"),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Cursor from X-Next-Cursor header"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get a camera's stored frames captured between start and end
+
+    Reads only the time-partitioned index entries inside the range, oldest
+    first. The next page's cursor is returned in the X-Next-Cursor header.
+
+    Args:
+        camera_id: Camera identifier (e.g., 'C210')
+        start: Range start (inclusive)
+        end: Range end (exclusive)
+        limit: Page size
+        cursor: Cursor from the previous page
+
+    Returns:
+        List of frames with capture time and image URL
+
+    Raises:
+        404: Camera not found
+        400: Invalid range or cursor
+    """
+    exists = await db.scalar(select(Camera.id).where(Camera.camera_id == camera_id))
+    if not exists:
+        raise HTTPException(status_code=404, detail=f"Camera {camera_id} not found")
+
+    end = as_utc(end) if end else datetime.utcnow()
+    start = as_utc(start) if start else end - timedelta(hours=24)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+
+    try:
+        page = await list_camera_frames(camera_id, start, end, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if page.next_page_token:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_page_token
+    return [CameraFrameResponse(**frame.to_dict()) for frame in page.frames]
 
 
 # POST /api/cameras - Create new camera
@@ -160,8 +331,9 @@ async def create_camera(
     db.add(camera)
     await db.commit()
     await db.refresh(camera)
+    invalidate_cache("cameras")
 
-    return CameraResponse.model_validate(camera)
+    return CameraResponse(**camera.to_dict())
 
 
 # PUT /api/cameras/{camera_id} - Update camera
@@ -198,8 +370,9 @@ async def update_camera(
 
     await db.commit()
     await db.refresh(camera)
+    invalidate_cache("cameras")
 
-    return CameraResponse.model_validate(camera)
+    return CameraResponse(**camera.to_dict())
 
 
 # DELETE /api/cameras/{camera_id} - Delete camera
@@ -227,9 +400,34 @@ async def delete_camera(
     # Soft delete
     camera.active = False
     await db.commit()
+    invalidate_cache("cameras")
 
 
 # GET /api/cameras/stats - Get camera statistics
+def camera_stats_query() -> Select:
+    """Single aggregate query behind the camera statistics summary"""
+    return select(
+        func.count(Camera.id).label("total"),
+        count_if(Camera.active == True).label("active"),
+        count_if(Camera.heading.isnot(None)).label("with_direction")
+    )
+
+
+def camera_stats_from_row(row: Mapping[str, Any]) -> Dict[str, Any]:
+    """Format camera_stats_query() result"""
+    total = row["total"] or 0
+    active = row["active"] or 0
+    with_direction = row["with_direction"] or 0
+
+    return {
+        "total_cameras": total,
+        "active_cameras": active,
+        "inactive_cameras": total - active,
+        "cameras_with_direction": with_direction,
+        "cameras_without_direction": total - with_direction
+    }
+
+
 @router.get("/stats/summary")
 async def get_camera_stats(
     db: AsyncSession = Depends(get_db)
@@ -240,25 +438,28 @@ async def get_camera_stats(
     Returns:
         Statistics about cameras in the system
     """
-    # Total cameras
-    total_query = select(func.count(Camera.id))
-    total_result = await db.execute(total_query)
-    total = total_result.scalar()
+    result = await db.execute(camera_stats_query())
+    return camera_stats_from_row(result.mappings().one())
 
-    # Active cameras
-    active_query = select(func.count(Camera.id)).where(Camera.active == True)
-    active_result = await db.execute(active_query)
-    active = active_result.scalar()
 
-    # Cameras with direction data
-    direction_query = select(func.count(Camera.id)).where(Camera.heading.isnot(None))
-    direction_result = await db.execute(direction_query)
-    with_direction = direction_result.scalar()
+@router.get("/stats/connectivity")
+async def get_camera_connectivity(
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get camera connectivity and circuit breaker state
+
+    Served from the health monitor's cached probe and fetch results; no
+    camera is contacted. monitor_running is false when background probes
+    are off (CAMERA_HEALTH_ENABLED), in which case only collection fetches
+    update the state.
 
+    Returns:
+        Connectivity statistics for active cameras, and the cameras whose
+        circuits are open or half-open
+    """
+    result = await db.execute(select(Camera.camera_id).where(Camera.active == True))
     return {
-        "total_cameras": total,
-        "active_cameras": active,
-        "inactive_cameras": total - active,
-        "cameras_with_direction": with_direction,
-        "cameras_without_direction": total - with_direction
+        **camera_health_monitor.connectivity_stats(result.scalars().all()),
+        "open_circuits": camera_health_monitor.open_circuits()
     }
@@ -5,16 +5,17 @@ Camera Image Collection API Endpoints
 Manage camera image collection runs and analysis orchestration.
 """
 
-from typing import List, Optional
+from typing import Any, List, Mapping, Optional
 from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, func, and_, Select
 from pydantic import BaseModel, Field
 
-from database import get_db
+from database import get_db, count_if
 from models import CollectionRun, Camera, WorkZone
-from services import analysis_orchestration_service
+from services import invalidate_cache, enqueue_job, job_worker_pool, collection_scheduler
+from .pagination import paginate, set_next_cursor
 
 router = APIRouter()
 
@@ -37,9 +38,10 @@ class CollectionResponse(BaseModel):
     images_failed: int
     work_zones_detected: int
     high_risk_zones: int
-    started_at: str
-    completed_at: Optional[str]
+    started_at: datetime
+    completed_at: Optional[datetime]
     error_message: Optional[str]
+    job_id: Optional[int] = None  # Background job running this collection
 
     class Config:
         from_attributes = True
@@ -59,24 +61,23 @@ class CollectionStatsResponse(BaseModel):
 @router.post("/start", response_model=CollectionResponse, status_code=201)
 async def start_collection(
     request: CollectionStartRequest,
-    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db)
 ):
     """
     Start a new camera image collection run
 
     This initiates collection from all active cameras (or specified subset).
-    If auto_analyze=True, triggers AI analysis after collection completes.
+    If auto_analyze=True, a background job runs collection and AI analysis;
+    follow it with GET /api/jobs/{job_id}.
 
     Args:
         request: Collection configuration
-        background_tasks: FastAPI background tasks for async processing
 
     Returns:
-        Collection run object with unique collection_id for tracking
+        Collection run object with unique collection_id and job_id for tracking
     """
-    # Generate unique collection ID
-    collection_id = f"COLLECT_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
+    # Generate unique collection ID (microseconds keep parallel runs apart)
+    collection_id = f"COLLECT_{datetime.utcnow().strftime('%Y%m%d_%H%M%S_%f')}"
 
     # Count cameras to collect from
     if request.camera_ids:
@@ -97,10 +98,10 @@ async def start_collection(
         high_risk_zones=0
     )
     db.add(collection_run)
-    await db.commit()
-    await db.refresh(collection_run)
 
-    # Queue background task for actual collection and analysis
+    # Queue a durable job for actual collection and analysis (committed
+    # together with the collection run)
+    job = None
     if request.auto_analyze:
         # Get camera IDs to analyze
         if request.camera_ids:
@@ -111,16 +112,25 @@ async def start_collection(
             cameras_result = await db.execute(cameras_query)
             camera_ids_to_process = [row[0] for row in cameras_result.all()]
 
-        # Queue the analysis workflow
-        background_tasks.add_task(
-            analysis_orchestration_service.run_full_analysis,
-            camera_ids_to_process,
-            collection_id,
-            request.min_risk_threshold,
-            db
+        job = await enqueue_job(
+            db,
+            "collection.run",
+            {
+                "collection_id": collection_id,
+                "camera_ids": camera_ids_to_process,
+                "min_risk_threshold": request.min_risk_threshold
+            },
+            dedupe_key=f"collection.run:{collection_id}"
         )
 
-    return CollectionResponse.model_validate(collection_run)
+    await db.commit()
+    await db.refresh(collection_run)
+    invalidate_cache("collection")
+    job_worker_pool.notify()
+
+    response = CollectionResponse.model_validate(collection_run)
+    response.job_id = job.id if job else None
+    return response
 
 
 # GET /api/collection/status/{collection_id} - Get collection status
@@ -152,7 +162,6 @@ async def get_collection_status(
 @router.post("/analyze/{collection_id}")
 async def analyze_collection(
     collection_id: str,
-    background_tasks: BackgroundTasks,
     min_risk_threshold: int = Query(5, ge=1, le=10),
     db: AsyncSession = Depends(get_db)
 ):
@@ -182,16 +191,18 @@ async def analyze_collection(
             detail=f"Cannot analyze collection with status '{collection.status}'"
         )
 
-    # Queue background task for re-analysis
-    background_tasks.add_task(
-        analysis_orchestration_service.reanalyze_existing_images,
-        collection_id,
-        min_risk_threshold,
-        db
+    # Queue a durable re-analysis job
+    job = await enqueue_job(
+        db,
+        "collection.reanalyze",
+        {"collection_id": collection_id, "min_risk_threshold": min_risk_threshold}
     )
+    await db.commit()
+    job_worker_pool.notify()
 
     return {
         "message": "Re-analysis queued",
+        "job_id": job.id,
         "collection_id": collection_id,
         "images_to_analyze": collection.images_collected,
         "min_risk_threshold": min_risk_threshold
@@ -201,20 +212,23 @@ async def analyze_collection(
 # GET /api/collection/history - Get collection history
 @router.get("/history", response_model=List[CollectionResponse])
 async def get_collection_history(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=500),
     status: Optional[str] = Query(None, pattern="^(in_progress|completed|failed)$"),
     days: int = Query(7, ge=1, le=90),
+    cursor: Optional[str] = Query(None, description="Cursor from X-Next-Cursor header (overrides skip)"),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Get collection run history
 
     Args:
-        skip: Pagination offset
+        skip: Pagination offset (prefer cursor for deep pages)
         limit: Max results
         status: Filter by status
         days: Last N days
+        cursor: Keyset cursor from the previous page's X-Next-Cursor header
 
     Returns:
         List of collection runs
@@ -225,10 +239,11 @@ async def get_collection_history(
     if status:
         query = query.where(CollectionRun.status == status)
 
-    query = query.order_by(CollectionRun.started_at.desc()).offset(skip).limit(limit)
+    query = paginate(query, CollectionRun.started_at, CollectionRun.id, limit, cursor, skip)
 
     result = await db.execute(query)
     collections = result.scalars().all()
+    set_next_cursor(response, collections, limit, "started_at")
 
     return [CollectionResponse.model_validate(c) for c in collections]
 
@@ -254,6 +269,26 @@ async def get_latest_collection(
     return CollectionResponse.model_validate(collection)
 
 
+# GET /api/collection/schedule - Periodic collection scheduler state
+@router.get("/schedule")
+async def get_collection_schedule(
+    limit: int = Query(20, ge=1, le=500, description="Upcoming polls to list")
+):
+    """
+    Get the staggered collection scheduler's state for this shard
+
+    Args:
+        limit: Number of upcoming polls to list
+
+    Returns:
+        Scheduler metrics (schedule lag percentiles) and upcoming polls
+    """
+    return {
+        **collection_scheduler.stats(),
+        "upcoming": collection_scheduler.upcoming(limit)
+    }
+
+
 # DELETE /api/collection/{collection_id} - Delete collection run
 @router.delete("/{collection_id}", status_code=204)
 async def delete_collection(
@@ -275,9 +310,45 @@ async def delete_collection(
 
     await db.delete(collection)
     await db.commit()
+    invalidate_cache("collection")
 
 
 # GET /api/collection/stats - Collection statistics
+def collection_stats_query(days: int) -> Select:
+    """Single aggregate query behind the collection statistics summary"""
+    cutoff = datetime.utcnow() - timedelta(days=days)
+
+    # Last run is independent of the time window
+    last_run = select(func.max(CollectionRun.started_at)).scalar_subquery()
+
+    return select(
+        func.count(CollectionRun.id).label("total"),
+        count_if(CollectionRun.status == "completed").label("successful"),
+        count_if(CollectionRun.status == "failed").label("failed"),
+        func.sum(CollectionRun.images_collected).label("total_images"),
+        func.sum(CollectionRun.work_zones_detected).label("total_work_zones"),
+        last_run.label("last_run_at")
+    ).where(CollectionRun.started_at >= cutoff)
+
+
+def collection_stats_from_row(row: Mapping[str, Any]) -> CollectionStatsResponse:
+    """Format collection_stats_query() result"""
+    last_run = row["last_run_at"]
+
+    # SQLite returns MAX() over a DateTime column as a plain string
+    if isinstance(last_run, str):
+        last_run = datetime.fromisoformat(last_run)
+
+    return CollectionStatsResponse(
+        total_runs=row["total"] or 0,
+        successful_runs=row["successful"] or 0,
+        failed_runs=row["failed"] or 0,
+        total_images_collected=int(row["total_images"] or 0),
+        total_work_zones_detected=int(row["total_work_zones"] or 0),
+        last_run_at=last_run.isoformat() if last_run else None
+    )
+
+
 @router.get("/stats/summary", response_model=CollectionStatsResponse)
 async def get_collection_stats(
     days: int = Query(30, ge=1, le=365),
@@ -292,53 +363,5 @@ async def get_collection_stats(
     Returns:
         Collection statistics
     """
-    cutoff = datetime.utcnow() - timedelta(days=days)
-
-    # Total runs
-    total_query = select(func.count(CollectionRun.id)).where(CollectionRun.started_at >= cutoff)
-    total_result = await db.execute(total_query)
-    total = total_result.scalar()
-
-    # Successful runs
-    success_query = select(func.count(CollectionRun.id)).where(
-        and_(CollectionRun.started_at >= cutoff, CollectionRun.status == "completed")
-    )
-    success_result = await db.execute(success_query)
-    successful = success_result.scalar()
-
-    # Failed runs
-    failed_query = select(func.count(CollectionRun.id)).where(
-        and_(CollectionRun.started_at >= cutoff, CollectionRun.status == "failed")
-    )
-    failed_result = await db.execute(failed_query)
-    failed = failed_result.scalar()
-
-    # Total images collected
-    images_query = select(func.sum(CollectionRun.images_collected)).where(
-        CollectionRun.started_at >= cutoff
-    )
-    images_result = await db.execute(images_query)
-    total_images = images_result.scalar() or 0
-
-    # Total work zones detected
-    wz_query = select(func.sum(CollectionRun.work_zones_detected)).where(
-        CollectionRun.started_at >= cutoff
-    )
-    wz_result = await db.execute(wz_query)
-    total_wz = wz_result.scalar() or 0
-
-    # Last run timestamp
-    last_query = select(CollectionRun.started_at).order_by(
-        CollectionRun.started_at.desc()
-    ).limit(1)
-    last_result = await db.execute(last_query)
-    last_run = last_result.scalar_one_or_none()
-
-    return CollectionStatsResponse(
-        total_runs=total,
-        successful_runs=successful,
-        failed_runs=failed,
-        total_images_collected=int(total_images),
-        total_work_zones_detected=int(total_wz),
-        last_run_at=last_run.isoformat() if last_run else None
-    )
+    result = await db.execute(collection_stats_query(days))
+    return collection_stats_from_row(result.mappings().one())
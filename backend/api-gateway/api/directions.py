@@ -6,17 +6,18 @@ Integration of Corey's AI camera direction analysis work.
 Manage camera heading/direction data for QEW COMPASS cameras.
 """
 
-from typing import List, Optional
+from typing import Any, Dict, List, Mapping, Optional
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, func, and_, Select
+from sqlalchemy.orm import selectinload
 from pydantic import BaseModel, Field
-import csv
-import io
 
-from database import get_db
+from database import get_db, count_if, cross_join
 from models import Camera, CameraDirection
+from services import invalidate_cache, direction_import
+from .pagination import paginate, set_next_cursor
 
 router = APIRouter()
 
@@ -139,20 +140,23 @@ async def analyze_camera_directions(
 # GET /api/directions - Get all camera directions
 @router.get("/", response_model=List[CameraDirectionResponse])
 async def get_camera_directions(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     camera_id: Optional[int] = Query(None, description="Filter by camera"),
     confidence: Optional[str] = Query(None, pattern="^(high|medium|low)$"),
+    cursor: Optional[str] = Query(None, description="Cursor from X-Next-Cursor header (overrides skip)"),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Get camera direction data
 
     Args:
-        skip: Pagination offset
+        skip: Pagination offset (prefer cursor for deep pages)
         limit: Max results
         camera_id: Filter by specific camera
         confidence: Filter by confidence level
+        cursor: Keyset cursor from the previous page's X-Next-Cursor header
 
     Returns:
         List of camera direction records
@@ -165,10 +169,11 @@ async def get_camera_directions(
     if confidence:
         query = query.where(CameraDirection.confidence == confidence)
 
-    query = query.order_by(CameraDirection.analyzed_at.desc()).offset(skip).limit(limit)
+    query = paginate(query, CameraDirection.analyzed_at, CameraDirection.id, limit, cursor, skip)
 
     result = await db.execute(query)
     directions = result.scalars().all()
+    set_next_cursor(response, directions, limit, "analyzed_at")
 
     return [CameraDirectionResponse.model_validate(d) for d in directions]
 
@@ -192,8 +197,8 @@ async def get_cameras_with_directions(
     Returns:
         List of cameras with direction information
     """
-    # Query cameras
-    camera_query = select(Camera)
+    # Query cameras (direction records bulk-loaded with one extra IN query)
+    camera_query = select(Camera).options(selectinload(Camera.directions))
 
     if has_direction:
         camera_query = camera_query.where(Camera.heading.isnot(None))
@@ -205,10 +210,7 @@ async def get_cameras_with_directions(
     # Build response with direction data
     response = []
     for camera in cameras:
-        # Get direction analysis records for this camera
-        dir_query = select(CameraDirection).where(CameraDirection.camera_id == camera.id)
-        dir_result = await db.execute(dir_query)
-        direction_records = dir_result.scalars().all()
+        direction_records = camera.directions
 
         response.append(CameraWithDirectionResponse(
             camera_id=camera.camera_id,
@@ -235,13 +237,15 @@ async def create_camera_direction(
     Create new camera direction record
 
     This can be used to manually add direction data or import from
-    Corey's analysis system.
+    Corey's analysis system. A camera has one record per view (and one
+    camera-level record, view_id null); posting an existing one replaces
+    it, as the CSV import does.
 
     Args:
         direction_data: Direction data to create
 
     Returns:
-        Created direction record
+        Created (or replaced) direction record
     """
     # Verify camera exists
     camera_query = select(Camera).where(Camera.id == direction_data.camera_id)
@@ -251,9 +255,8 @@ async def create_camera_direction(
     if not camera:
         raise HTTPException(status_code=404, detail=f"Camera {direction_data.camera_id} not found")
 
-    # Create direction record
-    direction = CameraDirection(**direction_data.model_dump())
-    db.add(direction)
+    # Create direction record, or replace the one for this camera/view
+    await direction_import.upsert_directions(db, [direction_data.model_dump()])
 
     # Update camera with direction data (use primary direction)
     if not camera.heading or direction_data.confidence == "high":
@@ -262,8 +265,17 @@ async def create_camera_direction(
         camera.direction_confidence = direction_data.confidence
 
     await db.commit()
-    await db.refresh(direction)
+    invalidate_cache("directions", "cameras")
 
+    view_filter = (
+        CameraDirection.view_id.is_(None) if direction_data.view_id is None
+        else CameraDirection.view_id == direction_data.view_id
+    )
+    direction = await db.scalar(
+        select(CameraDirection)
+        .where(CameraDirection.camera_id == direction_data.camera_id, view_filter)
+        .execution_options(populate_existing=True)
+    )
     return CameraDirectionResponse.model_validate(direction)
 
 
@@ -322,6 +334,7 @@ async def update_camera_direction(
 
     await db.commit()
     await db.refresh(direction)
+    invalidate_cache("directions", "cameras")
 
     return CameraDirectionResponse.model_validate(direction)
 
@@ -336,69 +349,25 @@ async def import_directions_csv(
     Import camera direction data from CSV file
 
     Expected CSV format:
-    camera_id,heading,direction,confidence,eastbound_heading,westbound_heading,notes
+    camera_id,view_id,heading,direction,confidence,eastbound_heading,westbound_heading
+
+    view_id and direction are optional, and Corey's suggested_heading column is
+    accepted for heading. Rows upsert on (camera_id, view_id), so re-importing
+    a survey updates existing records.
 
     Args:
         file: CSV file upload
 
     Returns:
-        Import statistics
+        Import statistics, per-row errors and rows/second
     """
     if not file.filename.endswith('.csv'):
         raise HTTPException(status_code=400, detail="File must be CSV format")
 
-    # Read CSV
-    contents = await file.read()
-    csv_data = io.StringIO(contents.decode('utf-8'))
-    reader = csv.DictReader(csv_data)
-
-    imported = 0
-    errors = []
-
-    for row_num, row in enumerate(reader, start=2):
-        try:
-            # Find camera by camera_id
-            camera_query = select(Camera).where(Camera.camera_id == row['camera_id'])
-            camera_result = await db.execute(camera_query)
-            camera = camera_result.scalar_one_or_none()
-
-            if not camera:
-                errors.append(f"Row {row_num}: Camera {row['camera_id']} not found")
-                continue
-
-            # Create direction record
-            direction_data = CameraDirectionCreate(
-                camera_id=camera.id,
-                heading=float(row['heading']),
-                direction=row['direction'],
-                confidence=row.get('confidence', 'medium'),
-                eastbound_heading=float(row['eastbound_heading']) if row.get('eastbound_heading') else None,
-                westbound_heading=float(row['westbound_heading']) if row.get('westbound_heading') else None,
-                model='csv_import',
-                analysis_method='manual_import'
-            )
-
-            direction = CameraDirection(**direction_data.model_dump())
-            db.add(direction)
-
-            # Update camera
-            camera.heading = direction_data.heading
-            camera.direction = direction_data.direction
-            camera.direction_confidence = direction_data.confidence
+    stats = await direction_import.import_directions_csv(file.file, db)
+    invalidate_cache("directions", "cameras")
 
-            imported += 1
-
-        except Exception as e:
-            errors.append(f"Row {row_num}: {str(e)}")
-
-    await db.commit()
-
-    return {
-        "message": "Import completed",
-        "imported": imported,
-        "errors": errors,
-        "error_count": len(errors)
-    }
+    return {"message": "Import completed", **stats}
 
 
 # DELETE /api/directions/{camera_id} - Delete direction record
@@ -430,9 +399,46 @@ async def delete_camera_direction(
 
     await db.delete(direction)
     await db.commit()
+    invalidate_cache("directions", "cameras")
 
 
 # GET /api/directions/stats - Direction statistics
+def direction_stats_query() -> Select:
+    """
+    Single query behind the direction statistics summary
+
+    Camera and direction-record aggregates are computed as one-row derived
+    tables and cross joined, so both tables are covered in one round-trip.
+    """
+    camera_counts = select(
+        count_if(Camera.heading.isnot(None)).label("cameras_with_direction"),
+        count_if(Camera.heading.is_(None)).label("cameras_without_direction")
+    ).subquery("camera_counts")
+
+    record_counts = select(
+        func.count(CameraDirection.id).label("total_records"),
+        count_if(CameraDirection.confidence == "high").label("high_confidence"),
+        count_if(CameraDirection.confidence == "medium").label("medium_confidence"),
+        count_if(CameraDirection.confidence == "low").label("low_confidence")
+    ).subquery("record_counts")
+
+    return select(camera_counts, record_counts).select_from(
+        cross_join(camera_counts, record_counts)
+    )
+
+
+def direction_stats_from_row(row: Mapping[str, Any]) -> Dict[str, Any]:
+    """Format direction_stats_query() result"""
+    return {
+        "cameras_with_direction": row["cameras_with_direction"] or 0,
+        "cameras_without_direction": row["cameras_without_direction"] or 0,
+        "total_direction_records": row["total_records"] or 0,
+        "high_confidence_records": row["high_confidence"] or 0,
+        "medium_confidence_records": row["medium_confidence"] or 0,
+        "low_confidence_records": row["low_confidence"] or 0
+    }
+
+
 @router.get("/stats/summary")
 async def get_direction_stats(
     db: AsyncSession = Depends(get_db)
@@ -443,47 +449,5 @@ async def get_direction_stats(
     Returns:
         Statistics about camera direction analysis
     """
-    # Total cameras with direction data
-    cameras_with_direction_query = select(func.count(Camera.id)).where(Camera.heading.isnot(None))
-    cameras_result = await db.execute(cameras_with_direction_query)
-    cameras_with_direction = cameras_result.scalar()
-
-    # Total cameras without direction
-    cameras_without_direction_query = select(func.count(Camera.id)).where(Camera.heading.is_(None))
-    no_dir_result = await db.execute(cameras_without_direction_query)
-    cameras_without_direction = no_dir_result.scalar()
-
-    # High confidence directions
-    high_conf_query = select(func.count(CameraDirection.id)).where(
-        CameraDirection.confidence == "high"
-    )
-    high_conf_result = await db.execute(high_conf_query)
-    high_confidence = high_conf_result.scalar()
-
-    # Medium confidence
-    med_conf_query = select(func.count(CameraDirection.id)).where(
-        CameraDirection.confidence == "medium"
-    )
-    med_conf_result = await db.execute(med_conf_query)
-    medium_confidence = med_conf_result.scalar()
-
-    # Low confidence
-    low_conf_query = select(func.count(CameraDirection.id)).where(
-        CameraDirection.confidence == "low"
-    )
-    low_conf_result = await db.execute(low_conf_query)
-    low_confidence = low_conf_result.scalar()
-
-    # Total direction records
-    total_records_query = select(func.count(CameraDirection.id))
-    total_result = await db.execute(total_records_query)
-    total_records = total_result.scalar()
-
-    return {
-        "cameras_with_direction": cameras_with_direction,
-        "cameras_without_direction": cameras_without_direction,
-        "total_direction_records": total_records,
-        "high_confidence_records": high_confidence,
-        "medium_confidence_records": medium_confidence,
-        "low_confidence_records": low_confidence
-    }
+    result = await db.execute(direction_stats_query())
+    return direction_stats_from_row(result.mappings().one())
@@ -0,0 +1,67 @@
+"""
+Export API Endpoints
+====================
+
+Streams detection history as Parquet or Arrow IPC files for analysis in
+pandas, DuckDB or Polars (see services/history_export.py).
+"""
+
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from services.history_export import EXPORT_DATASETS, EXPORT_FORMATS, ExportUnavailable, history_exporter
+
+router = APIRouter()
+
+
+# GET /api/export/{dataset} - Columnar history export
+@router.get("/{dataset}")
+async def export_dataset(
+    dataset: str,
+    format: str = Query("parquet", pattern="^(parquet|arrow)$", description="parquet or arrow (Arrow IPC file)"),
+    start: Optional[datetime] = Query(None, description="Only rows at or after this time (ISO 8601)"),
+    end: Optional[datetime] = Query(None, description="Only rows before this time (ISO 8601)"),
+    camera_id: Optional[List[int]] = Query(None, description="Only these cameras (repeatable)"),
+    include_archived: bool = Query(False, description="Also export rows moved to the archive"),
+):
+    """
+    Export a history dataset as one Parquet or Arrow IPC file
+
+    The file is written and sent one record batch (Parquet row group) at a
+    time, so any number of rows is exported in bounded memory.
+
+    Args:
+        dataset: work_zones, collection_runs or directions
+        format: parquet (default) or arrow
+        start: Time range start (inclusive)
+        end: Time range end (exclusive)
+        camera_id: Camera filter (work_zones and directions)
+        include_archived: Include archived rows (work_zones and collection_runs)
+
+    Returns:
+        File download, rows in time order
+
+    Raises:
+        HTTPException 404: Unknown dataset
+        HTTPException 400: Invalid range or filter
+        HTTPException 503: pyarrow is not installed
+    """
+    try:
+        history_exporter.validate(dataset, format, start, end, camera_id)
+    except ValueError as e:
+        status_code = 404 if dataset not in EXPORT_DATASETS else 400
+        raise HTTPException(status_code=status_code, detail=str(e))
+    except ExportUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    media_type, extension = EXPORT_FORMATS[format]
+    filename = f"{dataset}_{datetime.utcnow():%Y%m%dT%H%M%SZ}.{extension}"
+    # The database session is opened inside the stream: it must outlive this handler
+    return StreamingResponse(
+        history_exporter.stream(dataset, format, start, end, camera_id, include_archived),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -0,0 +1,47 @@
+"""
+Image API Endpoints
+===================
+
+Serves camera images from the local content-addressed store
+(IMAGE_STORAGE_BACKEND=local). With GCS, image URLs point at the bucket
+directly and these routes return 404.
+"""
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+
+from services.image_storage import (
+    IMMUTABLE_CACHE_CONTROL,
+    KEY_PATTERN,
+    LocalImageStorage,
+    content_type_for_key,
+    image_storage
+)
+
+router = APIRouter()
+
+
+# GET /api/images/{key} - Stored image bytes
+@router.get("/{key:path}")
+async def get_image(key: str):
+    """
+    Get a locally stored image by content key
+
+    Args:
+        key: Content key, e.g. ab/cd/abcd...ef.jpg
+
+    Returns:
+        Image file, cacheable forever (the key is a hash of its bytes)
+    """
+    if not isinstance(image_storage, LocalImageStorage) or not KEY_PATTERN.match(key):
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    path = image_storage.path_for(key)
+    if not path.is_file():
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    return FileResponse(
+        path,
+        media_type=content_type_for_key(key),
+        headers={"Cache-Control": IMMUTABLE_CACHE_CONTROL}
+    )
@@ -0,0 +1,114 @@
+"""
+Background Jobs API Endpoints
+=============================
+
+Inspect and retry durable background jobs (collection runs, re-analysis).
+"""
+
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from pydantic import BaseModel
+
+from database import get_db
+from models import Job
+from services import job_queue, job_worker_pool
+
+router = APIRouter()
+
+
+class JobResponse(BaseModel):
+    """Schema for job response"""
+    id: int
+    job_type: str
+    payload: Optional[Dict[str, Any]]
+    priority: int
+    status: str
+    attempts: int
+    max_attempts: int
+    run_after: Optional[str]
+    locked_by: Optional[str]
+    heartbeat_at: Optional[str]
+    progress: float
+    progress_message: Optional[str]
+    result: Optional[Dict[str, Any]]
+    last_error: Optional[str]
+    created_at: Optional[str]
+    started_at: Optional[str]
+    finished_at: Optional[str]
+
+
+# GET /api/jobs - List jobs
+@router.get("/", response_model=List[JobResponse])
+async def get_jobs(
+    status: Optional[str] = Query(None, pattern="^(queued|running|succeeded|failed)$"),
+    job_type: Optional[str] = Query(None, description="e.g. collection.run"),
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get recent jobs, newest first
+
+    Args:
+        status: Filter by status
+        job_type: Filter by job type
+        limit: Max results
+
+    Returns:
+        List of jobs with progress and last error
+    """
+    query = select(Job)
+    if status:
+        query = query.where(Job.status == status)
+    if job_type:
+        query = query.where(Job.job_type == job_type)
+
+    result = await db.execute(query.order_by(Job.id.desc()).limit(limit))
+    return [JobResponse(**job.to_dict()) for job in result.scalars().all()]
+
+
+# GET /api/jobs/{job_id} - Get job status and progress
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get a job's status, progress and result
+
+    Raises:
+        404: Job not found
+    """
+    job = await db.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+
+    return JobResponse(**job.to_dict())
+
+
+# POST /api/jobs/{job_id}/retry - Requeue a failed job
+@router.post("/{job_id}/retry", response_model=JobResponse)
+async def retry_job(
+    job_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Requeue a failed job with a fresh attempt budget
+
+    Raises:
+        404: Job not found
+        400: Job is not in failed state
+    """
+    job = await db.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+
+    if not await job_queue.retry(db, job_id):
+        raise HTTPException(status_code=400, detail=f"Cannot retry job with status '{job.status}'")
+
+    await db.commit()
+    await db.refresh(job)
+    job_worker_pool.notify()
+
+    return JobResponse(**job.to_dict())
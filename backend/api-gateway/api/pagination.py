@@ -0,0 +1,162 @@
+"""
+Keyset (Cursor) Pagination
+==========================
+
+Opaque cursor pagination for time-ordered listings.
+
+Listings are ordered newest-first on (timestamp, id). The cursor encodes the
+last row's key, and the next page is fetched with a row-value comparison
+`(timestamp, id) < (cursor_timestamp, cursor_id)`. That predicate is served
+directly by a composite (timestamp, id) index, so page N costs the same as
+page 1. Pages also stay stable while new detections are inserted.
+
+SQLite stores timestamps as text in two shapes (CURRENT_TIMESTAMP defaults
+without fractional seconds, ORM writes with six digits), and text order is
+what the index uses. The cursor row's own stored value is therefore used as
+the key there, looked up by primary key in the same statement, rather than
+re-rendering the decoded datetime in a guessed format.
+
+Listing bodies stay plain JSON arrays (the frontend expects arrays). The next
+cursor is returned in the X-Next-Cursor response header, and is omitted on
+the last page.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response
+from sqlalchemy import DateTime, Select, String, func, literal, select, tuple_
+from sqlalchemy.types import TypeDecorator
+
+from database import is_sqlite
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class CursorTimestamp(TypeDecorator):
+    """
+    Bind type for the cursor's timestamp
+
+    SQLite stores timestamps as text, so the value is rendered as text
+    there. It is only a fallback for cursors whose row has since been
+    deleted (see paginate). Other databases compare native timestamps.
+    """
+    impl = DateTime(timezone=True)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "sqlite":
+            return dialect.type_descriptor(String())
+        return dialect.type_descriptor(DateTime(timezone=True))
+
+    def process_bind_param(self, value, dialect):
+        if value is None or dialect.name != "sqlite":
+            return value
+        if value.microsecond:
+            return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def encode_cursor(sort_value: datetime, row_id: int) -> str:
+    """
+    Encode a row's sort key as an opaque URL-safe cursor
+
+    Args:
+        sort_value: Timestamp the listing is ordered by
+        row_id: Primary key tie-breaker
+
+    Returns:
+        Cursor string
+    """
+    payload = json.dumps([sort_value.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor produced by encode_cursor
+
+    Raises:
+        HTTPException 400: Cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(sort_value), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+def paginate(
+    query: Select,
+    sort_column: Any,
+    id_column: Any,
+    limit: int,
+    cursor: Optional[str] = None,
+    skip: int = 0
+) -> Select:
+    """
+    Apply newest-first keyset ordering and paging to a query
+
+    Args:
+        query: Base SELECT with filters applied
+        sort_column: Timestamp column (e.g. WorkZone.detected_at)
+        id_column: Primary key column used as tie-breaker
+        limit: Page size
+        cursor: Cursor from the previous page (takes precedence over skip)
+        skip: Legacy offset, only used when no cursor is given
+
+    Returns:
+        Paged query
+    """
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        cursor_sort = literal(sort_value, CursorTimestamp())
+        if is_sqlite:
+            # Compare against the exact stored text of the cursor row
+            stored = (
+                select(sort_column).where(id_column == row_id)
+                .correlate(None).scalar_subquery()
+            )
+            cursor_sort = func.coalesce(stored, cursor_sort)
+        cursor_key = tuple_(cursor_sort, row_id)
+        query = query.where(tuple_(sort_column, id_column) < cursor_key)
+    elif skip:
+        query = query.offset(skip)
+
+    return query.order_by(sort_column.desc(), id_column.desc()).limit(limit)
+
+
+def set_next_cursor(
+    response: Response,
+    rows: Sequence[Any],
+    limit: int,
+    sort_attr: str,
+    id_attr: str = "id"
+) -> Optional[str]:
+    """
+    Set X-Next-Cursor when a full page was returned
+
+    Args:
+        response: Outgoing response
+        rows: ORM rows of the current page
+        limit: Requested page size
+        sort_attr: Name of the timestamp attribute on each row
+        id_attr: Name of the primary key attribute
+
+    Returns:
+        Next cursor, or None on the last page
+    """
+    if len(rows) < limit or not rows:
+        return None
+
+    last = rows[-1]
+    sort_value = getattr(last, sort_attr)
+    if sort_value is None:
+        return None
+
+    next_cursor = encode_cursor(sort_value, getattr(last, id_attr))
+    response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return next_cursor
@@ -0,0 +1,101 @@
+"""
+Fast List Serialization
+=======================
+
+Response path for large list endpoints.
+
+By default, each ORM row of a listing is loaded as an object, converted
+with to_dict(), and built into a pydantic response model. FastAPI then
+validates the list against response_model again, and serializes it with
+the stdlib JSON encoder. For 1000-row pages, that dominates request CPU.
+
+Here, only the columns the response model declares are selected, as plain
+row tuples. They are encoded straight to JSON bytes with orjson (stdlib
+json if it is not installed), and returned as a ready-made response. The
+route keeps its response_model, so the OpenAPI schema is unchanged.
+
+Datetimes are encoded in isoformat(), the same as the models' to_dict().
+The shape of each row is the response model's, so the output matches the
+pydantic path field for field (benchmark_serialization.py checks this).
+"""
+
+import json
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence, Type
+
+from fastapi import Response
+from pydantic import BaseModel
+from sqlalchemy import Select
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode content as compact JSON bytes (orjson if available)"""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    """JSON response rendered with dumps()"""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def response_columns(response_model: Type[BaseModel], entity: Any) -> List[Any]:
+    """
+    Columns of a model for each field of a response model, in field order
+
+    Args:
+        response_model: Pydantic response schema
+        entity: ORM model class whose columns back the fields
+
+    Raises:
+        ValueError: A field has no column of the same name
+    """
+    table = entity.__table__
+    missing = [name for name in response_model.model_fields if name not in table.c]
+    if missing:
+        raise ValueError(f"{response_model.__name__} fields without a {table.name} column: {', '.join(missing)}")
+    return [getattr(entity, name) for name in response_model.model_fields]
+
+
+def with_response_columns(query: Select, response_model: Type[BaseModel], entity: Any) -> Select:
+    """
+    Narrow a select(entity) query to the columns a response model needs
+
+    Filters, ordering and paging are kept, so the query builders shared
+    with delta sync and tests/test_query_plans.py stay as they are.
+    """
+    return query.with_only_columns(*response_columns(response_model, entity))
+
+
+def rows_response(rows: Sequence[Any], response: Optional[Response] = None) -> Response:
+    """
+    JSON array response of rows from a with_response_columns() query
+
+    Args:
+        rows: Row tuples (from result.all())
+        response: The endpoint's Response parameter; headers set on it
+            (X-Next-Cursor, X-Change-Version) are carried over, since
+            FastAPI does not merge them into a returned response
+
+    Returns:
+        Response with the encoded JSON array
+    """
+    # dict(zip()) with the shared field names is ~3x faster than Row._asdict()
+    fields = rows[0]._fields if rows else ()
+    content = [dict(zip(fields, row)) for row in rows]
+    return FastJSONResponse(content, headers=dict(response.headers) if response is not None else None)
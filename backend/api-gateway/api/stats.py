@@ -0,0 +1,136 @@
+"""
+Combined Statistics API Endpoint
+================================
+
+Every subsystem's summary statistics in a single database round-trip, and
+long-range work zone roll-ups.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from database import get_db, cross_join, naive_utc
+from models import WorkZoneRollup
+from .cameras import camera_stats_query, camera_stats_from_row
+from .work_zones import work_zone_stats_query, work_zone_stats_from_row
+from .collection import collection_stats_query, collection_stats_from_row
+from .directions import direction_stats_query, direction_stats_from_row
+from .analysis import analysis_stats_query, analysis_stats_from_row
+
+router = APIRouter()
+
+
+class WorkZoneRollupResponse(BaseModel):
+    """Per-camera work zone aggregates for one hour or day"""
+    camera_id: int
+    granularity: str
+    bucket_start: str
+    work_zones: int
+    detections: int
+    high_risk: int
+    avg_risk_score: Optional[float]
+    max_risk_score: int
+
+
+# GET /api/stats - Combined dashboard statistics
+@router.get("")
+async def get_all_stats(
+    hours: int = Query(24, ge=1, description="Work zone statistics window"),
+    days: int = Query(30, ge=1, le=365, description="Collection statistics window"),
+    db: AsyncSession = Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    Get statistics for all subsystems
+
+    Each subsystem's aggregate query is a single-row derived table; cross
+    joining them yields one row holding every summary.
+
+    Args:
+        hours: Time window for work zone statistics
+        days: Time window for collection statistics
+
+    Returns:
+        Camera, work zone, collection, direction and analysis statistics
+    """
+    subqueries = {
+        "cameras": camera_stats_query().subquery("camera_stats"),
+        "work_zones": work_zone_stats_query(hours).subquery("work_zone_stats"),
+        "collection": collection_stats_query(days).subquery("collection_stats"),
+        "directions": direction_stats_query().subquery("direction_stats"),
+        "analysis": analysis_stats_query().subquery("analysis_stats")
+    }
+
+    # Prefix column labels so subsystems can't collide (e.g. "total")
+    columns = [
+        column.label(f"{name}__{column.key}")
+        for name, subquery in subqueries.items()
+        for column in subquery.c
+    ]
+
+    query = select(*columns).select_from(cross_join(*subqueries.values()))
+    result = await db.execute(query)
+    row = result.mappings().one()
+
+    def section(name: str) -> Dict[str, Any]:
+        prefix = f"{name}__"
+        return {key[len(prefix):]: value for key, value in row.items() if key.startswith(prefix)}
+
+    return {
+        "cameras": camera_stats_from_row(section("cameras")),
+        "work_zones": work_zone_stats_from_row(section("work_zones"), hours),
+        "collection": collection_stats_from_row(section("collection")).model_dump(),
+        "directions": direction_stats_from_row(section("directions")),
+        "analysis": analysis_stats_from_row(section("analysis"))
+    }
+
+
+# GET /api/stats/rollups - Hourly/daily work zone aggregates of archived data
+@router.get("/rollups", response_model=List[WorkZoneRollupResponse])
+async def get_work_zone_rollups(
+    granularity: str = Query("day", pattern="^(hour|day)$"),
+    camera_id: Optional[int] = Query(None, description="Camera database ID (default: all)"),
+    start: Optional[datetime] = Query(None, description="First bucket (inclusive)"),
+    end: Optional[datetime] = Query(None, description="Last bucket (exclusive)"),
+    limit: int = Query(1000, ge=1, le=10000),
+    db: AsyncSession = Depends(get_db)
+) -> List[WorkZoneRollupResponse]:
+    """
+    Get per-camera work zone roll-ups
+
+    Work zones older than RETENTION_WORK_ZONE_DAYS are moved out of the
+    work_zones table by the retention job and summarized here, so long-range
+    trends do not need the raw rows. Recent detections are still in
+    /api/work-zones/history.
+
+    Args:
+        granularity: "hour" or "day"
+        camera_id: Filter by camera
+        start: Range start
+        end: Range end
+        limit: Max buckets
+
+    Returns:
+        Roll-ups ordered by bucket_start, then camera
+
+    Raises:
+        HTTPException: 400 if start is not before end
+    """
+    start, end = (naive_utc(value) if value else None for value in (start, end))
+    if start and end and start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+
+    query = select(WorkZoneRollup).where(WorkZoneRollup.granularity == granularity)
+    if camera_id is not None:
+        query = query.where(WorkZoneRollup.camera_id == camera_id)
+    if start:
+        query = query.where(WorkZoneRollup.bucket_start >= start)
+    if end:
+        query = query.where(WorkZoneRollup.bucket_start < end)
+    query = query.order_by(WorkZoneRollup.bucket_start, WorkZoneRollup.camera_id).limit(limit)
+
+    result = await db.execute(query)
+    return [WorkZoneRollupResponse(**rollup.to_dict()) for rollup in result.scalars().all()]
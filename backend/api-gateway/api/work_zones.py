@@ -5,15 +5,24 @@ Work Zones API Endpoints
 Manage AI-detected work zones with risk assessments.
 """
 
-from typing import List, Optional
+import json
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional, Union
 from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_
+from sqlalchemy import select, func, and_, or_, Select
 from pydantic import BaseModel, Field
 
-from database import get_db
+from database import get_db, count_if
 from models import WorkZone, Camera
+from config import settings
+from services import invalidate_cache, event_bus, publish_event
+from services.event_bus import Subscription
+from spatial import nearest, within_bbox, MAX_SEARCH_RADIUS_M
+from change_tracking import changes_since, current_change_version, CHANGE_VERSION_HEADER
+from .pagination import paginate, set_next_cursor
+from .serialization import rows_response, with_response_columns
 
 router = APIRouter()
 
@@ -59,36 +68,60 @@ class WorkZoneResponse(BaseModel):
     recommendations: Optional[List[str]]
     mto_book_compliance: bool
     gcp_image_url: Optional[str]
+    thumbnail_url: Optional[str] = None
+    preview_url: Optional[str] = None
     collection_id: Optional[str]
     model: str
     synthetic: bool
     status: str
     detected_at: str
     resolved_at: Optional[str]
+    last_seen_at: Optional[str] = None
+    detection_count: int = 1
+    missed_cycles: int = 0
+    peak_risk_score: Optional[int] = None
+    risk_trend: Optional[str] = None
+    change_version: Optional[int] = None
 
     class Config:
         from_attributes = True
 
 
+class NearbyWorkZoneResponse(WorkZoneResponse):
+    """Work zone with its distance from the query point"""
+    distance_m: float
+
+
+class WorkZoneChangesResponse(BaseModel):
+    """Delta since a change version (?since=)"""
+    version: int  # Pass as ?since= next time
+    reset: bool = False  # Too far behind: refetch without ?since
+    changed: List[WorkZoneResponse] = []  # Added or updated, and still matching
+    removed: List[int] = []  # Deleted, resolved or no longer matching
+
+
 # GET /api/work-zones - List work zones
 @router.get("/", response_model=List[WorkZoneResponse])
 async def get_work_zones(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     status: Optional[str] = Query(None, pattern="^(active|resolved|archived)$"),
     min_risk: int = Query(0, ge=0, le=10, description="Minimum risk score"),
     hours: Optional[int] = Query(None, ge=1, description="Last N hours"),
+    cursor: Optional[str] = Query(None, description="Cursor from X-Next-Cursor header (overrides skip)"),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Get list of work zones with filtering
 
     Args:
-        skip: Pagination offset
+        skip: Pagination offset (prefer cursor for deep pages)
         limit: Max results
         status: Filter by status (active/resolved/archived)
         min_risk: Minimum risk score
         hours: Only show detections from last N hours
+        cursor: Keyset cursor from the previous page's X-Next-Cursor header
 
     Returns:
         List of work zone objects
@@ -107,18 +140,31 @@ async def get_work_zones(
         query = query.where(WorkZone.detected_at >= cutoff)
 
     # Ordering and pagination
-    query = query.order_by(WorkZone.detected_at.desc()).offset(skip).limit(limit)
+    query = paginate(query, WorkZone.detected_at, WorkZone.id, limit, cursor, skip)
 
-    result = await db.execute(query)
-    work_zones = result.scalars().all()
+    result = await db.execute(with_response_columns(query, WorkZoneResponse, WorkZone))
+    rows = result.all()
 
-    return [WorkZoneResponse.model_validate(wz) for wz in work_zones]
+    set_next_cursor(response, rows, limit, "detected_at")
+    return rows_response(rows, response)
 
 
 # GET /api/work-zones/active - Get currently active work zones
-@router.get("/active", response_model=List[WorkZoneResponse])
+def active_work_zones_query(min_risk: int) -> Select:
+    """Query behind /active (served by ix_work_zones_status_risk_score)"""
+    return select(WorkZone).where(
+        and_(
+            WorkZone.status == "active",
+            WorkZone.risk_score >= min_risk
+        )
+    ).order_by(WorkZone.risk_score.desc())
+
+
+@router.get("/active", response_model=Union[List[WorkZoneResponse], WorkZoneChangesResponse])
 async def get_active_work_zones(
+    response: Response,
     min_risk: int = Query(5, ge=1, le=10),
+    since: Optional[int] = Query(None, ge=0, description="Delta sync: only changes after this version"),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -126,27 +172,44 @@ async def get_active_work_zones(
 
     Only returns work zones with status='active' and risk >= min_risk.
     This is the primary endpoint for the dashboard map.
+
+    The full list carries an X-Change-Version header. Pass it back as
+    ?since= to receive only what changed since then.
+
+    Args:
+        min_risk: Minimum risk score
+        since: Change version from the previous sync
+
+    Returns:
+        Active work zones, or {version, reset, changed, removed} with ?since=
     """
-    query = select(WorkZone).where(
-        and_(
-            WorkZone.status == "active",
-            WorkZone.risk_score >= min_risk
+    if since is not None:
+        delta = await changes_since(db, WorkZone, since, active_work_zones_query(min_risk))
+        if delta is None:
+            version, _ = await current_change_version(db)
+            return WorkZoneChangesResponse(version=version, reset=True)
+        return WorkZoneChangesResponse(
+            version=delta["version"],
+            changed=[WorkZoneResponse(**wz.to_dict()) for wz in delta["changed"]],
+            removed=delta["removed"]
         )
-    ).order_by(WorkZone.risk_score.desc())
 
-    result = await db.execute(query)
-    work_zones = result.scalars().all()
+    version, _ = await current_change_version(db)
+    result = await db.execute(with_response_columns(active_work_zones_query(min_risk), WorkZoneResponse, WorkZone))
 
-    return [WorkZoneResponse.model_validate(wz) for wz in work_zones]
+    response.headers[CHANGE_VERSION_HEADER] = str(version)
+    return rows_response(result.all(), response)
 
 
 # GET /api/work-zones/history - Get historical work zones
 @router.get("/history", response_model=List[WorkZoneResponse])
 async def get_work_zone_history(
+    response: Response,
     camera_id: Optional[int] = Query(None),
     days: int = Query(7, ge=1, le=90),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Cursor from X-Next-Cursor header (overrides skip)"),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -155,8 +218,9 @@ async def get_work_zone_history(
     Args:
         camera_id: Filter by specific camera
         days: Last N days
-        skip: Pagination offset
+        skip: Pagination offset (prefer cursor for deep pages)
         limit: Max results
+        cursor: Keyset cursor from the previous page's X-Next-Cursor header
 
     Returns:
         Historical work zone detections
@@ -167,12 +231,173 @@ async def get_work_zone_history(
     if camera_id:
         query = query.where(WorkZone.camera_id == camera_id)
 
-    query = query.order_by(WorkZone.detected_at.desc()).offset(skip).limit(limit)
+    query = paginate(query, WorkZone.detected_at, WorkZone.id, limit, cursor, skip)
 
-    result = await db.execute(query)
-    work_zones = result.scalars().all()
+    result = await db.execute(with_response_columns(query, WorkZoneResponse, WorkZone))
+    rows = result.all()
+
+    set_next_cursor(response, rows, limit, "detected_at")
+    return rows_response(rows, response)
+
+
+# GET /api/work-zones/nearby - K-nearest work zones to a point
+@router.get("/nearby", response_model=List[NearbyWorkZoneResponse])
+async def get_nearby_work_zones(
+    lat: float = Query(..., ge=-90, le=90, description="Latitude of the query point"),
+    lon: float = Query(..., ge=-180, le=180, description="Longitude of the query point"),
+    k: int = Query(10, ge=1, le=100, description="Max work zones to return"),
+    radius_m: Optional[float] = Query(None, gt=0, le=MAX_SEARCH_RADIUS_M, description="Search radius in meters"),
+    status: Optional[str] = Query("active", pattern="^(active|resolved|archived)$"),
+    min_risk: int = Query(0, ge=0, le=10, description="Minimum risk score"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get the work zones nearest to a point (vehicle clients)
+
+    Args:
+        lat: Latitude
+        lon: Longitude
+        k: Max results
+        radius_m: Only work zones within this distance (default: widen until k found)
+        status: Filter by status (default active)
+        min_risk: Minimum risk score
+
+    Returns:
+        Work zones sorted by distance, each with distance_m
+    """
+    query = select(WorkZone)
+    if status:
+        query = query.where(WorkZone.status == status)
+    if min_risk > 0:
+        query = query.where(WorkZone.risk_score >= min_risk)
+
+    hits = await nearest(db, query, WorkZone, lat, lon, k, radius_m)
+
+    return [
+        NearbyWorkZoneResponse(**wz.to_dict(), distance_m=round(distance, 1))
+        for wz, distance in hits
+    ]
+
+
+# GET /api/work-zones/bbox - Work zones inside a map viewport
+@router.get("/bbox", response_model=List[WorkZoneResponse])
+async def get_work_zones_in_bbox(
+    min_lat: float = Query(..., ge=-90, le=90),
+    min_lon: float = Query(..., ge=-180, le=180),
+    max_lat: float = Query(..., ge=-90, le=90),
+    max_lon: float = Query(..., ge=-180, le=180),
+    limit: int = Query(500, ge=1, le=5000),
+    status: Optional[str] = Query("active", pattern="^(active|resolved|archived)$"),
+    min_risk: int = Query(0, ge=0, le=10, description="Minimum risk score"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get work zones inside a bounding box (dashboard map viewport)
+
+    Args:
+        min_lat, min_lon, max_lat, max_lon: Viewport corners
+        limit: Max results
+        status: Filter by status (default active)
+        min_risk: Minimum risk score
+
+    Returns:
+        Work zones inside the box, highest risk first
+
+    Raises:
+        400: min corner greater than max corner
+    """
+    if min_lat > max_lat or min_lon > max_lon:
+        raise HTTPException(status_code=400, detail="Bounding box min must not exceed max")
+
+    query = select(WorkZone).where(within_bbox(WorkZone, min_lat, min_lon, max_lat, max_lon))
+    if status:
+        query = query.where(WorkZone.status == status)
+    if min_risk > 0:
+        query = query.where(WorkZone.risk_score >= min_risk)
+
+    query = query.order_by(WorkZone.risk_score.desc()).limit(limit)
+    result = await db.execute(with_response_columns(query, WorkZoneResponse, WorkZone))
+
+    return rows_response(result.all())
+
+
+def _ready_payload() -> str:
+    return json.dumps({"last_event_id": event_bus.last_event_id})
 
-    return [WorkZoneResponse.model_validate(wz) for wz in work_zones]
+
+async def _sse_frames(subscription: Subscription) -> AsyncIterator[str]:
+    try:
+        # No id on "ready": the client's Last-Event-ID stays at the last real event
+        yield f"retry: 3000\nevent: ready\ndata: {_ready_payload()}\n\n"
+        while not subscription.closed:
+            event = await subscription.next_event(settings.STREAM_HEARTBEAT_SECONDS)
+            yield event.sse() if event else ": heartbeat\n\n"
+    finally:
+        subscription.close()
+
+
+# GET /api/work-zones/stream - Live work zone changes (Server-Sent Events)
+@router.get("/stream")
+async def stream_work_zone_changes(
+    request: Request,
+    last_event_id: Optional[int] = Query(None, description="Resume after this event (default: Last-Event-ID header)")
+):
+    """
+    Push work zone changes to a dashboard as they are committed
+
+    Events: work_zone.created and work_zone.updated (full row),
+    work_zone.resolved, work_zone.deleted, collection.completed /
+    collection.failed, and reset (refetch; missed events are no longer
+    buffered). A comment heartbeat is sent every
+    STREAM_HEARTBEAT_SECONDS. Load /api/work-zones/active once, then apply
+    events; EventSource reconnects with Last-Event-ID automatically.
+
+    Args:
+        last_event_id: Resume after this event ID
+
+    Returns:
+        text/event-stream
+    """
+    header = request.headers.get("last-event-id", "")
+    if last_event_id is None and header.isdigit():
+        last_event_id = int(header)
+
+    subscription = event_bus.subscribe(last_event_id)
+    if subscription is None:
+        raise HTTPException(status_code=503, detail="Too many live stream subscribers")
+
+    return StreamingResponse(
+        _sse_frames(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+# WS /api/work-zones/stream - Live work zone changes (WebSocket)
+@router.websocket("/stream")
+async def stream_work_zone_changes_ws(
+    websocket: WebSocket,
+    last_event_id: Optional[int] = None
+):
+    """
+    Same events as the SSE stream, as JSON messages {"id", "type", "data"}.
+    Reconnect with ?last_event_id= to resume.
+    """
+    subscription = event_bus.subscribe(last_event_id)
+    if subscription is None:
+        await websocket.close(code=1013)  # Try again later
+        return
+
+    await websocket.accept()
+    try:
+        await websocket.send_text(f'{{"type": "ready", "data": {_ready_payload()}}}')
+        while not subscription.closed:
+            event = await subscription.next_event(settings.STREAM_HEARTBEAT_SECONDS)
+            await websocket.send_text(event.message() if event else '{"type": "heartbeat"}')
+    except WebSocketDisconnect:
+        pass
+    finally:
+        subscription.close()
 
 
 # GET /api/work-zones/{id} - Get specific work zone
@@ -189,7 +414,7 @@ async def get_work_zone(
     if not work_zone:
         raise HTTPException(status_code=404, detail=f"Work zone {work_zone_id} not found")
 
-    return WorkZoneResponse.model_validate(work_zone)
+    return WorkZoneResponse(**work_zone.to_dict())
 
 
 # POST /api/work-zones - Create new work zone
@@ -216,8 +441,11 @@ async def create_work_zone(
     db.add(work_zone)
     await db.commit()
     await db.refresh(work_zone)
+    invalidate_cache("work_zones")
+    work_zone_data = work_zone.to_dict()
+    publish_event("work_zone.created", work_zone_data)
 
-    return WorkZoneResponse.model_validate(work_zone)
+    return WorkZoneResponse(**work_zone_data)
 
 
 # PUT /api/work-zones/{id}/resolve - Mark work zone as resolved
@@ -237,6 +465,12 @@ async def resolve_work_zone(
     work_zone.status = "resolved"
     work_zone.resolved_at = datetime.utcnow()
     await db.commit()
+    invalidate_cache("work_zones")
+    publish_event("work_zone.resolved", {
+        "id": work_zone_id,
+        "status": work_zone.status,
+        "resolved_at": work_zone.resolved_at.isoformat()
+    })
 
     return {"message": "Work zone resolved", "id": work_zone_id}
 
@@ -257,9 +491,34 @@ async def delete_work_zone(
 
     await db.delete(work_zone)
     await db.commit()
+    invalidate_cache("work_zones")
+    publish_event("work_zone.deleted", {"id": work_zone_id})
 
 
 # GET /api/work-zones/stats - Get statistics
+def work_zone_stats_query(hours: int) -> Select:
+    """Single aggregate query behind the work zone statistics summary"""
+    cutoff = datetime.utcnow() - timedelta(hours=hours)
+
+    return select(
+        func.count(WorkZone.id).label("total"),
+        count_if(WorkZone.status == "active").label("active"),
+        count_if(WorkZone.risk_score >= 7).label("high_risk"),
+        func.avg(WorkZone.risk_score).label("avg_risk")
+    ).where(WorkZone.detected_at >= cutoff)
+
+
+def work_zone_stats_from_row(row: Mapping[str, Any], hours: int) -> Dict[str, Any]:
+    """Format work_zone_stats_query() result"""
+    return {
+        "time_window_hours": hours,
+        "total_detections": row["total"] or 0,
+        "active_work_zones": row["active"] or 0,
+        "high_risk_zones": row["high_risk"] or 0,
+        "average_risk_score": round(float(row["avg_risk"] or 0), 2)
+    }
+
+
 @router.get("/stats/summary")
 async def get_work_zone_stats(
     hours: int = Query(24, ge=1),
@@ -274,39 +533,5 @@ async def get_work_zone_stats(
     Returns:
         Statistics about work zone detections
     """
-    cutoff = datetime.utcnow() - timedelta(hours=hours)
-
-    # Total detections
-    total_query = select(func.count(WorkZone.id)).where(WorkZone.detected_at >= cutoff)
-    total_result = await db.execute(total_query)
-    total = total_result.scalar()
-
-    # Active work zones
-    active_query = select(func.count(WorkZone.id)).where(
-        and_(WorkZone.status == "active", WorkZone.detected_at >= cutoff)
-    )
-    active_result = await db.execute(active_query)
-    active = active_result.scalar()
-
-    # High risk (>= 7)
-    high_risk_query = select(func.count(WorkZone.id)).where(
-        and_(
-            WorkZone.detected_at >= cutoff,
-            WorkZone.risk_score >= 7
-        )
-    )
-    high_risk_result = await db.execute(high_risk_query)
-    high_risk = high_risk_result.scalar()
-
-    # Average risk score
-    avg_risk_query = select(func.avg(WorkZone.risk_score)).where(WorkZone.detected_at >= cutoff)
-    avg_risk_result = await db.execute(avg_risk_query)
-    avg_risk = avg_risk_result.scalar() or 0
-
-    return {
-        "time_window_hours": hours,
-        "total_detections": total,
-        "active_work_zones": active,
-        "high_risk_zones": high_risk,
-        "average_risk_score": round(float(avg_risk), 2)
-    }
+    result = await db.execute(work_zone_stats_query(hours))
+    return work_zone_stats_from_row(result.mappings().one(), hours)
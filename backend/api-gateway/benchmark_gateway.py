@@ -0,0 +1,498 @@
+"""
+Gateway Benchmark Suite
+=======================
+
+Offline end-to-end benchmarks of the API gateway. COMPASS, Gemini and GCS
+are replaced by local stand-ins (benchmark_stubs.py, in a separate process)
+with configurable latency and error rates. The database is a scratch SQLite
+file seeded with a QEW corridor of cameras and months of synthetic work
+zones and collection runs.
+
+Benchmark groups (--only):
+- endpoints: list endpoints (cameras, work zones, directions, histories)
+- stats: stats endpoints, and camera connectivity stats (get_camera_stats)
+- analysis: run_full_analysis (one collection run) for --analysis-cameras
+- batch: POST /api/analysis/batch with --batch-images image URLs
+
+Endpoints are called in-process through the ASGI app, so the numbers are
+the gateway's own cost, including compression. Collection runs and batches
+reach the stand-ins over HTTP through the real client libraries. The stage
+breakdown of each run (db, compass, storage, gemini) comes from tracing.py.
+
+Results are written as JSON, tagged with the git commit. --compare reports
+the change in median time against an earlier result file, and exits 1 if
+any benchmark got slower by more than --tolerance:
+
+    python benchmark_gateway.py --output before.json
+    git checkout my-branch
+    python benchmark_gateway.py --compare before.json
+    python benchmark_gateway.py --compare before.json after.json  # files only
+
+Usage:
+    python benchmark_gateway.py [--cameras 1000] [--days 180]
+        [--work-zones-per-day 500] [--analysis-cameras 10 100 1000]
+        [--batch-images 25] [--repeat 20] [--storage local|gcs]
+        [--only endpoints stats analysis batch] [--output FILE]
+        [--compare BASELINE [CURRENT]] [--tolerance 0.25]
+        [--gemini-latency-ms 50] [--gemini-error-rate 0.02]
+        [--compass-dead-rate 0] ... (every StubConfig field)
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Add current directory to path
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+# Gateway modules read their settings on import, so they are imported in
+# run() once the environment points at the scratch database and stand-ins
+from benchmark_stubs import StubConfig, add_stub_arguments, run_in_process, stub_config
+
+RESULTS_VERSION = 1
+GROUPS = ("endpoints", "stats", "analysis", "batch")
+
+# QEW from the Humber to Fort Erie: (latitude, longitude)
+QEW_WAYPOINTS = [
+    (43.6300, -79.4760), (43.5935, -79.5510), (43.5040, -79.6670), (43.3880, -79.7770),
+    (43.2980, -79.7960), (43.1900, -79.5600), (43.1600, -79.2500), (43.1090, -79.1000),
+    (42.9000, -78.9300)
+]
+COMPASS_POINTS = ["N", "NE", "E", "SE", "S", "SW", "W", "NW"]
+HAZARDS = ["Workers near live lane", "Missing taper", "Equipment in shoulder", "Night work without lighting"]
+VIOLATIONS = ["No advance warning sign at 500m", "Buffer space below minimum"]
+RECOMMENDATIONS = ["Extend taper", "Add flagger", "Install advance warning signage"]
+
+# Box around the Oakville section, for the bbox endpoints
+OAKVILLE_BBOX = "min_lat=43.40&min_lon=-79.80&max_lat=43.55&max_lon=-79.60"
+
+
+def corridor_point(fraction: float) -> Tuple[float, float, float]:
+    """(lat, lon, bearing) at a fraction of the corridor's length"""
+    segments = list(zip(QEW_WAYPOINTS, QEW_WAYPOINTS[1:]))
+    lengths = [math.dist(a, b) for a, b in segments]
+    target = fraction * sum(lengths)
+    for (a, b), length in zip(segments, lengths):
+        if target <= length or (a, b) == segments[-1]:
+            t = min(target / length, 1.0)
+            bearing = math.degrees(math.atan2(b[1] - a[1], b[0] - a[0])) % 360
+            return a[0] + (b[0] - a[0]) * t, a[1] + (b[1] - a[1]) * t, bearing
+        target -= length
+    raise AssertionError("unreachable")
+
+
+def seed(path: str, n_cameras: int, days: int, per_day: int) -> Dict[str, int]:
+    """Cameras along the corridor, their directions, and `days` of work zones and hourly runs"""
+    from sqlalchemy import create_engine, insert, text
+
+    from database import Base
+    from models import Camera, CameraDirection, CollectionRun, WorkZone
+    from spatial import encode_geohash
+
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+
+    cameras = []
+    for i in range(n_cameras):
+        lat, lon, bearing = corridor_point(i / max(n_cameras - 1, 1))
+        lat, lon = lat + rng.gauss(0, 0.002), lon + rng.gauss(0, 0.002)
+        heading = (bearing + rng.choice([0, 180])) % 360
+        cameras.append({
+            "id": i + 1, "camera_id": f"CAM_{i + 1}", "source": "COMPASS",
+            "location": f"QEW at km {i * 140 / max(n_cameras, 1):.1f}",
+            "latitude": lat, "longitude": lon, "geohash": encode_geohash(lat, lon),
+            "heading": heading, "direction": COMPASS_POINTS[round(heading / 45) % 8],
+            "direction_confidence": rng.choice(["high", "medium", "low"]),
+            "active": rng.random() > 0.05,
+            "views": [{"id": 1, "description": "Looking toward Toronto"}, {"id": 2, "description": "Looking toward Niagara"}],
+            "created_at": now - timedelta(days=days), "updated_at": now
+        })
+
+    runs = [
+        {
+            "collection_id": f"COLLECT_{hour:06d}", "status": "failed" if rng.random() < 0.03 else "completed",
+            "total_cameras": n_cameras, "images_collected": n_cameras - rng.randint(0, n_cameras // 20),
+            "work_zones_detected": rng.randint(0, 12), "high_risk_zones": rng.randint(0, 3),
+            "started_at": now - timedelta(hours=hour), "completed_at": now - timedelta(hours=hour) + timedelta(minutes=8)
+        }
+        for hour in range(days * 24)
+    ]
+
+    n_work_zones = days * per_day
+    with engine.begin() as conn:
+        conn.execute(insert(Camera.__table__), cameras)
+        conn.execute(insert(CameraDirection.__table__), [
+            {
+                "camera_id": camera["id"], "view_id": 1, "heading": camera["heading"], "direction": camera["direction"],
+                "confidence": camera["direction_confidence"], "analyzed_at": now
+            }
+            for camera in cameras
+        ])
+        conn.execute(insert(CollectionRun.__table__), runs)
+
+        batch = []
+        for j in range(n_work_zones):
+            camera = cameras[rng.randrange(n_cameras)]
+            detected_at = now - timedelta(seconds=j * 86400 / per_day)
+            risk = rng.randint(1, 10)
+            # Live work zones are recent; older ones were resolved
+            active = detected_at > now - timedelta(days=14) and rng.random() < 0.1
+            batch.append({
+                "camera_id": camera["id"], "view_id": 1,
+                "latitude": camera["latitude"], "longitude": camera["longitude"], "geohash": camera["geohash"],
+                "risk_score": risk, "confidence": rng.uniform(0.5, 0.99),
+                "workers": rng.randint(0, 8), "vehicles": rng.randint(0, 4), "equipment": rng.randint(0, 3),
+                "barriers": rng.random() < 0.6, "hazards": rng.sample(HAZARDS, 2),
+                "violations": rng.sample(VIOLATIONS, 1) if risk >= 6 else [],
+                "recommendations": rng.sample(RECOMMENDATIONS, 2), "mto_book_compliance": risk < 6,
+                "gcp_image_url": f"/api/images/ab/cd/{rng.getrandbits(256):064x}.jpg",
+                "collection_id": runs[min(int((now - detected_at).total_seconds() // 3600), len(runs) - 1)]["collection_id"],
+                "synthetic": rng.random() < 0.1,
+                "status": "active" if active else "resolved",
+                "resolved_at": None if active else detected_at + timedelta(hours=rng.randint(2, 72)),
+                "detected_at": detected_at, "last_seen_at": detected_at + timedelta(hours=rng.randint(0, 48)),
+                "detection_count": rng.randint(1, 30), "peak_risk_score": risk, "risk_trend": "steady"
+            })
+            if len(batch) == 5000:
+                conn.execute(insert(WorkZone.__table__), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(WorkZone.__table__), batch)
+        conn.execute(text("ANALYZE"))
+    engine.dispose()
+
+    return {"cameras": n_cameras, "work_zones": n_work_zones, "collection_runs": len(runs), "days": days}
+
+
+def summarize(timings_ms: List[float]) -> Dict[str, Any]:
+    """median / p95 / mean / min / max of a list of timings"""
+    ordered = sorted(timings_ms)
+    p95 = ordered[min(math.ceil(0.95 * len(ordered)) - 1, len(ordered) - 1)]
+    return {
+        "runs": len(ordered),
+        "median_ms": round(statistics.median(ordered), 2),
+        "p95_ms": round(p95, 2),
+        "mean_ms": round(statistics.fmean(ordered), 2),
+        "min_ms": round(ordered[0], 2),
+        "max_ms": round(ordered[-1], 2)
+    }
+
+
+def endpoint_cases(args) -> Dict[str, List[str]]:
+    """Group -> endpoint paths"""
+    lat, lon, _ = corridor_point(0.25)
+    return {
+        "endpoints": [
+            "/api/cameras/",
+            f"/api/cameras/bbox?{OAKVILLE_BBOX}",
+            "/api/work-zones/?limit=100",
+            "/api/work-zones/?limit=1000",
+            "/api/work-zones/active",
+            "/api/work-zones/history?days=30&limit=1000",
+            f"/api/work-zones/bbox?{OAKVILLE_BBOX}&status=resolved&limit=1000",
+            f"/api/work-zones/nearby?lat={lat:.4f}&lon={lon:.4f}&k=20&status=resolved",
+            "/api/directions/cameras",
+            "/api/collection/history?days=30&limit=200",
+            "/api/analysis/history?limit=200"
+        ],
+        "stats": [
+            "/api/stats",
+            "/api/stats?hours=168&days=90",
+            "/api/work-zones/stats/summary?hours=720",
+            "/api/cameras/stats/summary",
+            "/api/collection/stats/summary?days=90",
+            "/api/analysis/stats/summary",
+            "/api/stats/rollups?granularity=day"
+        ]
+    }
+
+
+async def bench_endpoints(client, paths: List[str], group: str, repeat: int) -> Dict[str, Dict[str, Any]]:
+    results = {}
+    for path in paths:
+        timings, response = [], None
+        for attempt in range(repeat + 2):
+            start = time.perf_counter()
+            response = await client.get(path)
+            elapsed = (time.perf_counter() - start) * 1000
+            if attempt >= 2:  # two warm-up calls
+                timings.append(elapsed)
+        result = {
+            "group": group, **summarize(timings), "status": response.status_code,
+            "bytes": response.num_bytes_downloaded, "encoding": response.headers.get("content-encoding", "identity"),
+            "queries": int(response.headers.get("x-db-query-count", 0))
+        }
+        results[f"GET {path}"] = result
+        print(f"  {'GET ' + path:<78} {result['median_ms']:>9.2f} {result['p95_ms']:>9.2f}   {result['status']}")
+    return results
+
+
+async def bench_camera_stats(n_cameras: int) -> Dict[str, Dict[str, Any]]:
+    """get_camera_stats for n cameras: first call probes (monitor off), then cached"""
+    from services.camera_service import get_camera_connectivity_stats
+
+    camera_ids = [f"CAM_{i + 1}" for i in range(n_cameras)]
+    results = {}
+    for label in ("probed", "cached"):
+        start = time.perf_counter()
+        stats = await get_camera_connectivity_stats(camera_ids)
+        elapsed = (time.perf_counter() - start) * 1000
+        name = f"get_camera_stats[{n_cameras}, {label}]"
+        print(f"  {name:<78} {elapsed:>9.2f} {'':>9}   {stats['online']}/{n_cameras} online")
+        results[name] = {"group": "stats", **summarize([elapsed]), "online": stats["online"]}
+    return results
+
+
+async def analyze(camera_ids: List[int], label: str):
+    """One collection run: (milliseconds, summary, trace)"""
+    from database import AsyncSessionLocal
+    from models import CollectionRun
+    from services.analysis_service import analysis_orchestration_service
+    from tracing import tracer
+
+    collection_id = f"BENCH_{label}_{time.time_ns()}"
+    async with AsyncSessionLocal() as db:
+        db.add(CollectionRun(collection_id=collection_id, status="in_progress", total_cameras=len(camera_ids)))
+        await db.commit()
+
+        with tracer.trace_job("collection.run") as trace:
+            start = time.perf_counter()
+            summary = await analysis_orchestration_service.run_full_analysis(camera_ids, collection_id, 5, db)
+            elapsed = (time.perf_counter() - start) * 1000
+    return elapsed, summary, trace
+
+
+async def bench_analysis(sizes: List[int], n_cameras: int) -> Dict[str, Dict[str, Any]]:
+    # Untimed: loads the Gemini SDK, aiohttp, storage client and thumbnail workers
+    await analyze([1, 2], "warmup")
+
+    results = {}
+    for size in sizes:
+        camera_ids = random.Random(size).sample(range(1, n_cameras + 1), min(size, n_cameras))
+        elapsed, summary, trace = await analyze(camera_ids, str(size))
+        name = f"run_full_analysis[{size}]"
+        results[name] = {
+            "group": "analysis", **summarize([elapsed]),
+            "per_camera_ms": round(elapsed / len(camera_ids), 2),
+            "stages_ms": {stage: round(seconds * 1000, 1) for stage, (seconds, _) in trace.stages.items()} if trace else {},
+            **{key: summary[key] for key in ("images_collected", "images_failed", "work_zones_detected")}
+        }
+        print(
+            f"  {name:<78} {elapsed:>9.2f} {'':>9}   "
+            f"{summary['images_collected']} images, {summary['work_zones_detected']} work zones"
+        )
+    return results
+
+
+async def bench_batch(client, stub_url: str, n_images: int, repeat: int) -> Dict[str, Dict[str, Any]]:
+    body = {
+        "image_urls": [f"{stub_url}/compass/camera/loc{i + 1}.jpg" for i in range(n_images)],
+        "camera_ids": [i + 1 for i in range(n_images)],
+        "min_risk_threshold": 5
+    }
+    await client.post("/api/analysis/batch", json={**body, "image_urls": body["image_urls"][:1], "camera_ids": [1]})
+    timings, response = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = await client.post("/api/analysis/batch", json=body)
+        timings.append((time.perf_counter() - start) * 1000)
+    name = f"POST /api/analysis/batch[{n_images}]"
+    result = {"group": "batch", **summarize(timings), "status": response.status_code}
+    if response.status_code == 200:
+        result["images_failed"] = response.json()["images_failed"]
+    print(f"  {name:<78} {result['median_ms']:>9.2f} {result['p95_ms']:>9.2f}   {result['status']}")
+    return {name: result}
+
+
+def git_commit() -> Tuple[Optional[str], bool]:
+    """(HEAD commit, whether the tree has uncommitted changes)"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--", "."], capture_output=True, text=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, False
+
+
+def configure_environment(scratch: str, stub_url: str, args) -> None:
+    """Point the gateway's settings at the scratch database and the stand-ins"""
+    os.environ.update({
+        "DATABASE_URL": f"sqlite+aiosqlite:///{scratch}/gateway.db",
+        "LOG_LEVEL": args.log_level,
+        "IMAGE_STORAGE_BACKEND": args.storage,
+        "LOCAL_IMAGE_STORAGE_PATH": f"{scratch}/images",
+        "GCP_STORAGE_BUCKET": "benchmark-bucket",
+        "STORAGE_EMULATOR_HOST": stub_url,
+        "GEMINI_API_KEY": "benchmark",
+        "GEMINI_API_ENDPOINT": stub_url,
+        "COMPASS_IMAGE_URL_PATTERN": f"{stub_url}/compass/camera/loc{{camera_num}}.jpg",
+        # Measure the gateway as deployed, minus background work and rate limits
+        "ENABLE_CACHING": "false",
+        "ENABLE_RATE_LIMITING": "false",
+        "JOB_WORKER_CONCURRENCY": "0",
+        "SCHEDULER_ENABLED": "false",
+        "RETENTION_ENABLED": "false",
+        "SLOW_REQUEST_PROFILE_MS": "0"
+    })
+
+
+async def run(args, stub_url: str, scratch: str) -> Dict[str, Any]:
+    configure_environment(scratch, stub_url, args)
+    print(f"🌱 Seeding {args.cameras} cameras and {args.days} days of work zones...")
+    started = time.perf_counter()
+    dataset = seed(f"{scratch}/gateway.db", args.cameras, args.days, args.work_zones_per_day)
+    print(f"   {dataset['work_zones']} work zones, {dataset['collection_runs']} collection runs in {time.perf_counter() - started:.1f}s")
+
+    import httpx
+
+    from database import close_db
+    from main import app
+    from services.image_derivatives import image_derivative_service
+
+    results: Dict[str, Dict[str, Any]] = {}
+    cases = endpoint_cases(args)
+    print(f"\n  {'benchmark':<78} {'median ms':>9} {'p95 ms':>9}")
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://gateway", timeout=None) as client:
+            for group in ("endpoints", "stats"):
+                if group in args.only:
+                    results.update(await bench_endpoints(client, cases[group], group, args.repeat))
+            if "stats" in args.only:
+                results.update(await bench_camera_stats(min(args.camera_stats_cameras, args.cameras)))
+            if "analysis" in args.only:
+                results.update(await bench_analysis(args.analysis_cameras, args.cameras))
+            if "batch" in args.only:
+                results.update(await bench_batch(client, stub_url, min(args.batch_images, args.cameras), args.batch_repeat))
+    finally:
+        await image_derivative_service.shutdown()
+        await close_db()
+
+    return {"dataset": dataset, "results": results}
+
+
+def stub_stats(stub_url: str) -> Dict[str, Any]:
+    import urllib.request
+    with urllib.request.urlopen(f"{stub_url}/_stats", timeout=5) as response:
+        return json.loads(response.read())["services"]
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float, min_delta_ms: float) -> int:
+    """Print median changes; the number of regressions"""
+    def label(report: Dict[str, Any], default: str) -> str:
+        return (report.get("commit") or default) + (" (uncommitted changes)" if report.get("dirty") else "")
+
+    print(
+        f"\n📊 {label(current, 'current')} vs {label(baseline, 'baseline')} "
+        f"(regression: > {tolerance:.0%} and > {min_delta_ms} ms slower)"
+    )
+    print(f"  {'benchmark':<78} {'before':>9} {'after':>9} {'change':>8}")
+    regressions = 0
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            print(f"  {name:<78} {'-':>9} {result['median_ms']:>9.2f}      new")
+            continue
+        old, new = before["median_ms"], result["median_ms"]
+        change = (new - old) / old if old else 0.0
+        regressed = new > old * (1 + tolerance) and new - old > min_delta_ms
+        regressions += regressed
+        print(f"  {name:<78} {old:>9.2f} {new:>9.2f} {change:>+7.0%}{'  ❌' if regressed else ''}")
+    missing = sorted(set(baseline["results"]) - set(current["results"]))
+    for name in missing:
+        print(f"  {name:<78} {baseline['results'][name]['median_ms']:>9.2f} {'-':>9}  removed")
+    return regressions
+
+
+def main(args) -> int:
+    if args.compare and len(args.compare) == 2:
+        baseline, current = (json.loads(Path(path).read_text()) for path in args.compare)
+        return 1 if compare(baseline, current, args.tolerance, args.min_delta_ms) else 0
+
+    config = stub_config(args)
+    # spawn: the stand-ins get a clean interpreter (no inherited event loop or gateway state)
+    context = multiprocessing.get_context("spawn")
+    ports = context.Queue()
+    stubs = context.Process(target=run_in_process, args=(config, ports), daemon=True)
+    stubs.start()
+    try:
+        stub_url = f"http://127.0.0.1:{ports.get(timeout=30)}"
+        with tempfile.TemporaryDirectory(prefix="gateway-bench-") as scratch:
+            outcome = asyncio.run(run(args, stub_url, scratch))
+        outcome["stub_requests"] = stub_stats(stub_url)
+    finally:
+        stubs.terminate()
+        stubs.join()
+
+    commit, dirty = git_commit()
+    report = {
+        "suite": "gateway",
+        "version": RESULTS_VERSION,
+        "commit": commit,
+        "dirty": dirty,
+        "created_at": datetime.utcnow().isoformat() + "Z",
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "sqlite": sqlite3.sqlite_version
+        },
+        "config": {
+            key: value for key, value in vars(args).items()
+            if key not in asdict(StubConfig()) and key not in ("output", "compare")
+        },
+        "stubs": asdict(config),
+        **outcome
+    }
+
+    output = Path(args.output or f"data/benchmarks/gateway-{datetime.utcnow():%Y%m%d-%H%M%S}-{commit or 'nogit'}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\n✅ Results written to {output}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare[0]).read_text())
+        if compare(baseline, report, args.tolerance, args.min_delta_ms):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline benchmark suite for the API gateway")
+    parser.add_argument("--cameras", type=int, default=1000, help="Cameras seeded along the corridor")
+    parser.add_argument("--days", type=int, default=180, help="Days of work zone and collection history")
+    parser.add_argument("--work-zones-per-day", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20, help="Calls per endpoint (median/p95 are reported)")
+    parser.add_argument("--analysis-cameras", type=int, nargs="+", default=[10, 100, 1000], help="run_full_analysis sizes")
+    parser.add_argument("--camera-stats-cameras", type=int, default=100, help="Cameras re-tested by get_camera_stats")
+    parser.add_argument("--batch-images", type=int, default=25)
+    parser.add_argument("--batch-repeat", type=int, default=3)
+    parser.add_argument("--storage", choices=["local", "gcs"], default="local", help="Image storage backend (gcs = the GCS stand-in)")
+    parser.add_argument("--only", nargs="+", choices=GROUPS, default=list(GROUPS))
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--output", help="Result file (default data/benchmarks/gateway-{time}-{commit}.json)")
+    parser.add_argument("--compare", nargs="+", metavar="RESULTS", help="Baseline results (and optionally current results: no run)")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed median slowdown before failing --compare")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0, help="Ignore slowdowns smaller than this")
+    add_stub_arguments(parser)
+    parsed = parser.parse_args()
+    if parsed.compare and len(parsed.compare) > 2:
+        parser.error("--compare takes a baseline, and optionally a current results file")
+    sys.exit(main(parsed))
@@ -0,0 +1,117 @@
+"""
+Image Storage Benchmark
+=======================
+
+Measures batch upload and download throughput of an image storage backend
+with synthetic camera frames, a share of which repeat (as a frozen camera
+feed does) to exercise deduplication.
+
+The same workload runs against every backend through the shared
+ImageStorageBackend interface, so numbers are directly comparable.
+
+Usage:
+    python benchmark_image_storage.py [--backend local] [--images 500]
+        [--size-kb 80] [--duplicates 0.3] [--concurrency 1 4 16]
+
+--backend local writes to a scratch directory unless --path is given.
+--backend gcs uses GCP_STORAGE_BUCKET and needs credentials; objects are
+left in place (content-addressed, so reruns are deduplicated).
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+# Add current directory to path
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from services.image_storage import (
+    GCSImageStorage,
+    ImageStorageBackend,
+    LocalImageStorage
+)
+from services.gcp_storage_service import gcp_storage_service
+
+
+def make_frames(count: int, size: int, duplicate_fraction: float, seed: int) -> List[bytes]:
+    """Random JPEG-sized payloads; duplicate_fraction of them repeat earlier frames"""
+    rng = random.Random(seed)
+    frames: List[bytes] = []
+    for _ in range(count):
+        if frames and rng.random() < duplicate_fraction:
+            frames.append(rng.choice(frames))
+        else:
+            frames.append(b"\xff\xd8\xff\xe0" + os.urandom(size - 4))
+    return frames
+
+
+async def run_round(backend: ImageStorageBackend, frames: List[bytes], concurrency: int) -> None:
+    images = [{"data": frame, "camera_id": f"CAM_{i % 40}"} for i, frame in enumerate(frames)]
+    total_mb = sum(len(frame) for frame in frames) / 1e6
+
+    start = time.perf_counter()
+    stored = await backend.put_many(images, concurrency=concurrency)
+    put_seconds = time.perf_counter() - start
+
+    failed = sum(1 for result in stored if result is None)
+    deduplicated = sum(1 for result in stored if result and result.deduplicated)
+
+    keys = [result.key for result in stored if result]
+    start = time.perf_counter()
+    downloaded = await backend.get_many(keys, concurrency=concurrency)
+    get_seconds = time.perf_counter() - start
+    missing = sum(1 for data in downloaded if data is None)
+
+    print(
+        f"{backend.name:<6} {concurrency:>5} "
+        f"{len(frames) / put_seconds:>10.0f} {total_mb / put_seconds:>9.1f} "
+        f"{len(keys) / get_seconds:>10.0f} {total_mb / get_seconds:>9.1f} "
+        f"{deduplicated:>7} {failed + missing:>6}"
+    )
+
+
+async def main(args) -> int:
+    if args.backend == "local":
+        root = args.path or tempfile.mkdtemp(prefix="qew-image-bench-")
+        backend: ImageStorageBackend = LocalImageStorage(root)
+        print(f"📁 Local store: {root}")
+    else:
+        backend = GCSImageStorage(gcp_storage_service)
+        if not await gcp_storage_service.ensure_client():
+            print("❌ GCS is not available (library or credentials missing)")
+            return 1
+        print(f"☁️  GCS bucket: gs://{gcp_storage_service.bucket_name}/{backend.prefix}")
+
+    print(
+        f"🖼️  {args.images} frames of {args.size_kb} KB, "
+        f"{args.duplicates:.0%} repeats\n"
+    )
+    print(f"{'store':<6} {'conc':>5} {'put img/s':>10} {'put MB/s':>9} {'get img/s':>10} {'get MB/s':>9} {'deduped':>7} {'errors':>6}")
+
+    for round_index, concurrency in enumerate(args.concurrency):
+        # os.urandom frames: rounds never dedupe against each other
+        frames = make_frames(args.images, args.size_kb * 1024, args.duplicates, seed=round_index)
+        await run_round(backend, frames, concurrency)
+
+    if args.backend == "local" and not args.path and not args.keep:
+        shutil.rmtree(root)
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark image storage backends")
+    parser.add_argument("--backend", choices=["local", "gcs"], default="local")
+    parser.add_argument("--path", help="Local store root (default: scratch directory)")
+    parser.add_argument("--images", type=int, default=500)
+    parser.add_argument("--size-kb", type=int, default=80, help="Frame size (COMPASS JPEGs are ~40-120 KB)")
+    parser.add_argument("--duplicates", type=float, default=0.3, help="Fraction of repeated frames")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch directory")
+    sys.exit(asyncio.run(main(parser.parse_args())))
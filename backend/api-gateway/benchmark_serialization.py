@@ -0,0 +1,155 @@
+"""
+List Serialization Benchmark
+============================
+
+Compares the two response paths of list endpoints on a scratch SQLite
+database, at several page sizes:
+
+- pydantic: load ORM objects, to_dict(), build response models, validate
+  against response_model and encode with the stdlib (FastAPI's default)
+- fast: select the response model's columns as tuples and encode them
+  straight to bytes (api/serialization.py)
+
+Each timing covers the query and the encoded body. The bodies of both paths
+are decoded and compared, so a benchmark run also checks that the fast
+path returns the same JSON.
+
+Usage:
+    python benchmark_serialization.py [--rows 100 1000 10000] [--repeat 20]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Awaitable, Callable, List
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+# Add current directory to path
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from database import Base, engine_kwargs
+from models import Camera, WorkZone
+from api.cameras import CameraResponse
+from api.work_zones import WorkZoneResponse
+from api.serialization import rows_response, with_response_columns
+
+HAZARDS = ["Workers near live lane", "Missing taper", "Equipment in shoulder", "Night work without lighting"]
+
+
+def seed(path: str, n_rows: int) -> None:
+    """Insert cameras and work zones shaped like production rows"""
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Camera.__table__), [
+            {
+                "id": i + 1, "camera_id": f"CAM_{i:05d}", "location": f"QEW at exit {i}",
+                "latitude": 43.2 + rng.random() / 2, "longitude": -79.9 + rng.random() / 2,
+                "heading": rng.uniform(0, 360), "direction": "E", "active": True,
+                "views": [{"id": 1, "description": "Looking east"}, {"id": 2, "description": "Looking west"}],
+                "created_at": now, "updated_at": now
+            }
+            for i in range(n_rows)
+        ])
+        conn.execute(insert(WorkZone.__table__), [
+            {
+                "camera_id": rng.randint(1, n_rows), "latitude": 43.2 + rng.random() / 2,
+                "longitude": -79.9 + rng.random() / 2, "risk_score": rng.randint(1, 10),
+                "confidence": rng.random(), "workers": rng.randint(0, 8), "vehicles": rng.randint(0, 4),
+                "equipment": rng.randint(0, 3), "barriers": rng.random() < 0.5,
+                "hazards": rng.sample(HAZARDS, 2), "violations": rng.sample(HAZARDS, 1),
+                "recommendations": ["Extend taper", "Add flagger"],
+                "gcp_image_url": f"/api/images/ab/cd/{rng.getrandbits(256):064x}.jpg",
+                "collection_id": f"COLLECT_{j // 50:06d}", "status": "active",
+                "detected_at": now - timedelta(seconds=j * 30), "last_seen_at": now
+            }
+            for j in range(n_rows)
+        ])
+    engine.dispose()
+
+
+def pydantic_body(objects: List[Any], response_model: Any) -> bytes:
+    """What FastAPI does with a list of response models and response_model=List[...]"""
+    adapter = TypeAdapter(List[response_model])
+    content = [response_model(**obj.to_dict()) for obj in objects]
+    validated = adapter.validate_python(content, from_attributes=True)
+    data = adapter.dump_python(validated, mode="json")
+    return json.dumps(data, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+async def timed(run: Callable[[], Awaitable[bytes]], repeat: int):
+    """Median milliseconds of run(), and its last body"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = await run()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), body
+
+
+async def bench(sessions: async_sessionmaker, entity: Any, response_model: Any, order: Any, rows: int, repeat: int):
+    query = select(entity).order_by(order).limit(rows)
+
+    async def pydantic_path() -> bytes:
+        async with sessions() as db:
+            objects = (await db.execute(query)).scalars().all()
+            return pydantic_body(objects, response_model)
+
+    async def fast_path() -> bytes:
+        async with sessions() as db:
+            result = await db.execute(with_response_columns(query, response_model, entity))
+            return rows_response(result.all()).body
+
+    slow_ms, slow_body = await timed(pydantic_path, repeat)
+    fast_ms, fast_body = await timed(fast_path, repeat)
+    same = json.loads(slow_body) == json.loads(fast_body)
+    print(
+        f"{entity.__tablename__:<11} {rows:>6} {slow_ms:>11.2f} {fast_ms:>9.2f} "
+        f"{slow_ms / fast_ms:>7.1f}x {len(fast_body) / 1024:>8.0f} {'yes' if same else 'NO':>5}"
+    )
+    return same
+
+
+async def main(args) -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = f"{tmp}/serialization.db"
+        print(f"🌱 Seeding {max(args.rows)} cameras and work zones...")
+        seed(path, max(args.rows))
+
+        # Same engine options as the gateway (orjson JSON column decoding)
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{path}",
+            **{key: value for key, value in engine_kwargs.items() if key == "json_deserializer"}
+        )
+        sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        print(f"\n{'table':<11} {'rows':>6} {'pydantic ms':>11} {'fast ms':>9} {'speedup':>8} {'KB':>8} {'same':>5}")
+        all_same = True
+        for rows in args.rows:
+            all_same &= await bench(sessions, WorkZone, WorkZoneResponse, WorkZone.detected_at.desc(), rows, args.repeat)
+            all_same &= await bench(sessions, Camera, CameraResponse, Camera.camera_id, rows, args.repeat)
+        await engine.dispose()
+
+    if not all_same:
+        print("❌ Fast path output differs from the pydantic path")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark list endpoint serialization paths")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per measurement (median is reported)")
+    sys.exit(asyncio.run(main(parser.parse_args())))
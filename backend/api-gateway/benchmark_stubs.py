@@ -0,0 +1,347 @@
+"""
+Benchmark Stand-ins
+===================
+
+One local HTTP server standing in for the gateway's external services, so
+benchmark_gateway.py runs offline and gives repeatable numbers:
+
+- COMPASS: GET /compass/camera/loc{n}.jpg returns a JPEG frame (a new
+  frame on every poll, as a live camera does)
+- Gemini: POST /v1beta/models/{model}:generateContent answers in the
+  REST API's shape, with a work zone analysis as the model's text
+- GCS: the part of the Cloud Storage JSON API that google-cloud-storage
+  uses for uploads, downloads, listings and deletes (STORAGE_EMULATOR_HOST)
+
+Each service has a latency (mean plus uniform jitter) and an error rate.
+Errors are HTTP 503 for COMPASS, and HTTP 500 for Gemini and GCS, which
+the client libraries do not retry. A share of COMPASS cameras can also be
+"dead": they never answer, so fetches run into the client timeout.
+Request and error counts are served at GET /_stats.
+
+Usage (standalone, e.g. to run a dev gateway against it):
+    python benchmark_stubs.py [--port 8900] [--gemini-latency-ms 800]
+
+    COMPASS_IMAGE_URL_PATTERN=http://127.0.0.1:8900/compass/camera/loc{camera_num}.jpg \\
+    GEMINI_API_ENDPOINT=http://127.0.0.1:8900 GEMINI_API_KEY=stub \\
+    STORAGE_EMULATOR_HOST=http://127.0.0.1:8900 IMAGE_STORAGE_BACKEND=gcs \\
+    python main.py
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import io
+import json
+import random
+import zlib
+from dataclasses import asdict, dataclass
+from email.parser import BytesParser
+from email.policy import HTTP
+from typing import Any, Dict, List, Optional
+from urllib.parse import unquote
+
+from aiohttp import web
+
+HAZARDS = [
+    "Workers near live traffic", "Inadequate barriers", "Poor visibility",
+    "Equipment blocking lanes", "Missing signage"
+]
+VIOLATIONS = ["No advance warning sign at 500m", "Buffer space below minimum", "Missing speed reduction signage"]
+RECOMMENDATIONS = ["Extend taper", "Add flagger", "Install advance warning signage", "Close adjacent lane"]
+
+# Distinct frames; each response adds a JPEG comment so every poll has new bytes
+FRAME_VARIANTS = 16
+
+
+@dataclass
+class StubConfig:
+    """Latency (ms) and error rates of each stand-in"""
+    compass_latency_ms: float = 30.0
+    compass_jitter_ms: float = 20.0
+    compass_error_rate: float = 0.02
+    compass_dead_rate: float = 0.0
+    gemini_latency_ms: float = 50.0
+    gemini_jitter_ms: float = 25.0
+    gemini_error_rate: float = 0.02
+    gemini_work_zone_rate: float = 0.2
+    gcs_latency_ms: float = 10.0
+    gcs_jitter_ms: float = 5.0
+    gcs_error_rate: float = 0.0
+    frame_width: int = 640
+    frame_height: int = 360
+    seed: int = 42
+
+
+def make_frames(config: StubConfig) -> List[bytes]:
+    """JPEG frames with some structure (gradient plus boxes), like a road scene"""
+    from PIL import Image, ImageDraw
+
+    rng = random.Random(config.seed)
+    frames = []
+    for variant in range(FRAME_VARIANTS):
+        image = Image.linear_gradient("L").resize((config.frame_width, config.frame_height)).convert("RGB")
+        draw = ImageDraw.Draw(image)
+        for _ in range(12):
+            x, y = rng.randrange(config.frame_width - 60), rng.randrange(config.frame_height - 40)
+            color = (rng.randrange(256), rng.randrange(256), rng.randrange(256))
+            draw.rectangle([x, y, x + rng.randint(10, 60), y + rng.randint(10, 40)], fill=color)
+        buffer = io.BytesIO()
+        image.save(buffer, "JPEG", quality=80)
+        frames.append(buffer.getvalue())
+    return frames
+
+
+def with_comment(jpeg: bytes, comment: str) -> bytes:
+    """Insert a COM segment after SOI: new bytes, same pixels"""
+    payload = comment.encode("ascii")
+    return jpeg[:2] + b"\xff\xfe" + (len(payload) + 2).to_bytes(2, "big") + payload + jpeg[2:]
+
+
+class StubServices:
+    """Request handlers and state of the stand-ins"""
+
+    def __init__(self, config: StubConfig):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.frames = make_frames(config)
+        self.polls = 0
+        self.objects: Dict[str, Dict[str, Any]] = {}  # GCS name -> {"data", "metadata"}
+        self.generation = 0
+        self.stats: Dict[str, Dict[str, int]] = {
+            service: {"requests": 0, "errors": 0} for service in ("compass", "gemini", "gcs")
+        }
+
+    async def _delay(self, latency_ms: float, jitter_ms: float) -> None:
+        await asyncio.sleep(max(latency_ms + self.rng.uniform(-jitter_ms, jitter_ms), 0) / 1000)
+
+    def _fails(self, service: str, rate: float) -> bool:
+        self.stats[service]["requests"] += 1
+        if self.rng.random() < rate:
+            self.stats[service]["errors"] += 1
+            return True
+        return False
+
+    def is_dead(self, camera_num: int) -> bool:
+        """Dead cameras are fixed per camera number, so the same ones stay dead"""
+        digest = hashlib.blake2b(f"{self.config.seed}:{camera_num}".encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "big") / 2 ** 64 < self.config.compass_dead_rate
+
+    # COMPASS
+
+    async def camera_image(self, request: web.Request) -> web.StreamResponse:
+        camera_num = int(request.match_info["num"])
+        if self.is_dead(camera_num):
+            self.stats["compass"]["requests"] += 1
+            self.stats["compass"]["errors"] += 1
+            await asyncio.sleep(3600)  # the client's timeout ends it
+        await self._delay(self.config.compass_latency_ms, self.config.compass_jitter_ms)
+        if self._fails("compass", self.config.compass_error_rate):
+            return web.Response(status=503, text="Camera unavailable")
+        self.polls += 1
+        frame = self.frames[(camera_num + self.polls) % FRAME_VARIANTS]
+        return web.Response(body=with_comment(frame, f"camera {camera_num} poll {self.polls}"), content_type="image/jpeg")
+
+    # Gemini
+
+    def analysis(self) -> Dict[str, Any]:
+        """A plausible model answer; a gemini_work_zone_rate share finds a work zone"""
+        rng = self.rng
+        if rng.random() >= self.config.gemini_work_zone_rate:
+            return {
+                "has_work_zone": False, "risk_score": 1, "confidence": round(rng.uniform(0.7, 0.99), 2),
+                "workers": 0, "vehicles": 0, "equipment": 0, "barriers": False, "lane_closures": 0,
+                "hazards": [], "violations": [], "recommendations": [], "mto_book_compliance": True,
+                "analysis_text": "No work zone visible; traffic flowing normally."
+            }
+        risk = rng.randint(3, 10)
+        return {
+            "has_work_zone": True, "risk_score": risk, "confidence": round(rng.uniform(0.6, 0.98), 2),
+            "workers": rng.randint(1, 8), "vehicles": rng.randint(0, 4), "equipment": rng.randint(0, 3),
+            "barriers": rng.random() < 0.7, "lane_closures": rng.randint(0, 2),
+            "hazards": rng.sample(HAZARDS, rng.randint(0, 3)),
+            "violations": rng.sample(VIOLATIONS, rng.randint(0, 2)) if risk >= 6 else [],
+            "recommendations": rng.sample(RECOMMENDATIONS, rng.randint(1, 2)),
+            "mto_book_compliance": risk < 6,
+            "analysis_text": f"Active work zone, risk {risk}/10."
+        }
+
+    async def generate_content(self, request: web.Request) -> web.Response:
+        if not request.match_info["method"].endswith(":generateContent"):
+            raise web.HTTPNotFound()
+        await request.read()
+        await self._delay(self.config.gemini_latency_ms, self.config.gemini_jitter_ms)
+        if self._fails("gemini", self.config.gemini_error_rate):
+            return web.json_response(
+                {"error": {"code": 500, "message": "Internal error encountered.", "status": "INTERNAL"}},
+                status=500
+            )
+        text = f"```json\n{json.dumps(self.analysis(), indent=2)}\n```"
+        return web.json_response({
+            "candidates": [{
+                "content": {"parts": [{"text": text}], "role": "model"},
+                "finishReason": "STOP",
+                "index": 0
+            }],
+            "usageMetadata": {"promptTokenCount": 1290, "candidatesTokenCount": 160, "totalTokenCount": 1450}
+        })
+
+    # GCS (JSON API subset)
+
+    def _resource(self, bucket: str, name: str) -> Dict[str, Any]:
+        stored = self.objects[name]
+        return {
+            "kind": "storage#object", "bucket": bucket, "name": name, "id": f"{bucket}/{name}/{stored['generation']}",
+            "generation": str(stored["generation"]), "size": str(len(stored["data"])),
+            "contentType": stored["contentType"], "metadata": stored.get("metadata") or {},
+            "cacheControl": stored.get("cacheControl"),
+            "md5Hash": stored["md5Hash"], "crc32c": stored["crc32c"]
+        }
+
+    @staticmethod
+    def _object_name(request: web.Request) -> str:
+        # Object names arrive percent-encoded (frames/CAM_1/... as frames%2FCAM_1%2F...)
+        return unquote(request.rel_url.raw_path.split("/o/", 1)[1])
+
+    async def _gcs_call(self) -> Optional[web.Response]:
+        await self._delay(self.config.gcs_latency_ms, self.config.gcs_jitter_ms)
+        if self._fails("gcs", self.config.gcs_error_rate):
+            return web.json_response({"error": {"code": 500, "message": "Backend Error"}}, status=500)
+        return None
+
+    async def gcs_upload(self, request: web.Request) -> web.Response:
+        body = await request.read()
+        failure = await self._gcs_call()
+        if failure:
+            return failure
+
+        bucket = request.match_info["bucket"]
+        if request.query.get("uploadType") == "multipart":
+            message = BytesParser(policy=HTTP).parsebytes(
+                f"Content-Type: {request.headers['Content-Type']}\r\n\r\n".encode() + body
+            )
+            metadata_part, data_part = list(message.iter_parts())
+            resource = json.loads(metadata_part.get_payload(decode=True))
+            data = data_part.get_payload(decode=True)
+            content_type = data_part.get_content_type()
+        else:
+            resource = {"name": request.query["name"]}
+            data = body
+            content_type = request.headers.get("Content-Type", "application/octet-stream")
+
+        name = resource["name"]
+        if request.query.get("ifGenerationMatch") == "0" and name in self.objects:
+            return web.json_response({"error": {"code": 412, "message": "Precondition Failed"}}, status=412)
+
+        self.generation += 1
+        self.objects[name] = {
+            "data": data, "generation": self.generation, "contentType": resource.get("contentType", content_type),
+            "metadata": resource.get("metadata"), "cacheControl": resource.get("cacheControl"),
+            "md5Hash": base64.b64encode(hashlib.md5(data).digest()).decode(),
+            "crc32c": base64.b64encode(zlib.crc32(data).to_bytes(4, "big")).decode()
+        }
+        return web.json_response(self._resource(bucket, name))
+
+    async def gcs_object(self, request: web.Request) -> web.Response:
+        failure = await self._gcs_call()
+        if failure:
+            return failure
+        name = self._object_name(request)
+        if name not in self.objects:
+            return web.json_response({"error": {"code": 404, "message": "No such object"}}, status=404)
+        if request.method == "DELETE":
+            del self.objects[name]
+            return web.Response(status=204)
+        if request.query.get("alt") == "media":
+            stored = self.objects[name]
+            return web.Response(body=stored["data"], content_type=stored["contentType"].split(";")[0])
+        return web.json_response(self._resource(request.match_info["bucket"], name))
+
+    async def gcs_list(self, request: web.Request) -> web.Response:
+        failure = await self._gcs_call()
+        if failure:
+            return failure
+        query = request.query
+        prefix, start, end = query.get("prefix", ""), query.get("startOffset"), query.get("endOffset")
+        names = sorted(
+            name for name in self.objects
+            if name.startswith(prefix) and (start is None or name >= start) and (end is None or name < end)
+        )
+        after = query.get("pageToken")
+        if after:
+            names = [name for name in names if name > after]
+        limit = int(query.get("maxResults", 1000))
+        page, more = names[:limit], len(names) > limit
+        body: Dict[str, Any] = {
+            "kind": "storage#objects",
+            "items": [self._resource(request.match_info["bucket"], name) for name in page]
+        }
+        if more:
+            body["nextPageToken"] = page[-1]
+        return web.json_response(body)
+
+    async def stats_handler(self, request: web.Request) -> web.Response:
+        return web.json_response({"config": asdict(self.config), "services": self.stats, "gcs_objects": len(self.objects)})
+
+    def app(self) -> web.Application:
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_get(r"/compass/camera/loc{num:\d+}.jpg", self.camera_image)
+        app.router.add_post("/v1beta/models/{method}", self.generate_content)
+        app.router.add_post("/upload/storage/v1/b/{bucket}/o", self.gcs_upload)
+        app.router.add_get("/storage/v1/b/{bucket}/o", self.gcs_list)
+        app.router.add_route("*", "/storage/v1/b/{bucket}/o/{name:.+}", self.gcs_object)
+        app.router.add_get("/download/storage/v1/b/{bucket}/o/{name:.+}", self.gcs_object)
+        app.router.add_get("/_stats", self.stats_handler)
+        return app
+
+
+async def serve(config: StubConfig, host: str = "127.0.0.1", port: int = 0, ready=None) -> None:
+    """
+    Run the stand-ins until cancelled
+
+    Args:
+        ready: Optional callable given the bound port once listening
+    """
+    runner = web.AppRunner(StubServices(config).app(), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound_port = site._server.sockets[0].getsockname()[1]
+    if ready is not None:
+        ready(bound_port)
+    else:
+        print(f"🧪 Stand-ins listening on http://{host}:{bound_port}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+def run_in_process(config: StubConfig, port_queue) -> None:
+    """multiprocessing target: serve and report the port on port_queue"""
+    try:
+        asyncio.run(serve(config, ready=port_queue.put))
+    except KeyboardInterrupt:
+        pass
+
+
+def add_stub_arguments(parser: argparse.ArgumentParser) -> None:
+    """--{service}-{setting} options for every StubConfig field"""
+    for name, default in asdict(StubConfig()).items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(default), default=default)
+
+
+def stub_config(args: argparse.Namespace) -> StubConfig:
+    return StubConfig(**{name: getattr(args, name) for name in asdict(StubConfig())})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-ins for COMPASS, Gemini and GCS")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(stub_config(args), args.host, args.port))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,97 @@
+"""
+Change Tracking
+===============
+
+Queries behind `?since=<version>` delta sync.
+
+Versions are allocated by the flush hook in models/sync.py. Core-level
+bulk writes (seed sync, CSV import) bypass that hook: they call
+allocate_change_version(), set `change_version` on the rows they touch
+and record_tombstones() for rows they delete. Retention (services/
+retention.py) advances sync_state.pruned_through instead when it prunes
+tombstones or archives rows, so older clients are told to refetch.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from models.sync import SyncState, SyncTombstone, TRACKED_MODELS, next_change_version
+
+# Full-list responses carry the version they reflect, for the next ?since=
+CHANGE_VERSION_HEADER = "X-Change-Version"
+
+# Above this many changed rows a delta client is told to refetch
+MAX_DELTA_CHANGES = 1000
+
+
+async def allocate_change_version(db: AsyncSession) -> int:
+    """Next change version, in the caller's transaction"""
+    return await db.run_sync(lambda session: next_change_version(session.connection()))
+
+
+async def current_change_version(db: AsyncSession) -> Tuple[int, int]:
+    """(latest committed version, tombstones pruned through)"""
+    row = (await db.execute(select(SyncState.version, SyncState.pruned_through))).first()
+    return (row.version, row.pruned_through) if row else (0, 0)
+
+
+async def record_tombstones(db: AsyncSession, model, ids: Sequence[int], version: int) -> None:
+    """Tombstones for rows removed with a Core-level bulk DELETE"""
+    if ids:
+        await db.execute(
+            insert(SyncTombstone),
+            [{"entity": TRACKED_MODELS[model], "entity_id": entity_id, "change_version": version} for entity_id in ids]
+        )
+
+
+async def changes_since(
+    db: AsyncSession,
+    model: Type,
+    since: int,
+    query: Select,
+    limit: int = MAX_DELTA_CHANGES
+) -> Optional[Dict[str, Any]]:
+    """
+    Rows of `model` changed after version `since`
+
+    Args:
+        since: Version the client last synced through
+        query: The endpoint's unpaginated list query (its filters decide
+            which changed rows are "changed" and which are "removed")
+        limit: Max changed rows; above it the client should refetch
+
+    Returns:
+        {"version", "changed": rows still matching query, "removed": ids
+        that were deleted or no longer match}, or None if the client must
+        refetch the full list (too many changes, or tombstones pruned)
+    """
+    # Read the version first: rows committed after this read are sent
+    # again next time, never skipped
+    version, pruned_through = await current_change_version(db)
+    if since > version or since < pruned_through:
+        return None
+
+    changed_ids = (await db.execute(
+        select(model.id).where(model.change_version > since).limit(limit + 1)
+    )).scalars().all()
+    if len(changed_ids) > limit:
+        return None
+
+    matching: List[Any] = []
+    if changed_ids:
+        result = await db.execute(query.where(model.id.in_(changed_ids)))
+        matching = list(result.scalars().all())
+    matching_ids = {row.id for row in matching}
+
+    tombstones = await db.execute(
+        select(SyncTombstone.entity_id).where(
+            SyncTombstone.entity == TRACKED_MODELS[model],
+            SyncTombstone.change_version > since
+        )
+    )
+    removed = set(tombstones.scalars().all()) | (set(changed_ids) - matching_ids)
+
+    return {"version": version, "changed": matching, "removed": sorted(removed)}
@@ -27,9 +27,28 @@ class Settings(BaseSettings):
     GCP_STORAGE_BUCKET: str = Field(default="qew-camera-images-public")
     GCP_STORAGE_API_KEY: str = Field(default="")
 
+    # Image Storage ("auto" = GCS if google-cloud-storage is installed, else local disk)
+    IMAGE_STORAGE_BACKEND: str = Field(default="auto", pattern="^(auto|gcs|local)$")
+    LOCAL_IMAGE_STORAGE_PATH: str = Field(default="./data/images")
+    IMAGE_PUBLIC_BASE_URL: str = Field(default="/api/images")
+    IMAGE_STORAGE_CONCURRENCY: int = Field(default=16, ge=1, le=128)
+
+    # Image Derivatives (WebP thumbnails/previews; 0 workers = render in a thread)
+    IMAGE_DERIVATIVES_ENABLED: bool = Field(default=True)
+    IMAGE_DERIVATIVE_WORKERS: int = Field(default=2, ge=0, le=32)
+    IMAGE_THUMBNAIL_SIZE: int = Field(default=320, ge=32, le=1024)
+    IMAGE_PREVIEW_SIZE: int = Field(default=960, ge=128, le=4096)
+    IMAGE_WEBP_QUALITY: int = Field(default=75, ge=1, le=100)
+
+    # Work Zone Tracking (match repeat detections to one row, auto-resolve)
+    WORK_ZONE_TRACKING_ENABLED: bool = Field(default=True)
+    WORK_ZONE_MATCH_WINDOW_MINUTES: int = Field(default=180, ge=1)
+    WORK_ZONE_RESOLVE_AFTER_MISSES: int = Field(default=3, ge=1)
+
     # Gemini AI
     GEMINI_API_KEY: str = Field(default="")
     GEMINI_MODEL: str = Field(default="gemini-2.0-flash-exp")
+    GEMINI_API_ENDPOINT: str = Field(default="")  # Alternate REST endpoint (e.g. benchmark_stubs.py)
 
     # vRSU Service
     VRSU_SERVICE_URL: str = Field(default="http://localhost:8081")
@@ -50,6 +69,84 @@ class Settings(BaseSettings):
     ENABLE_RATE_LIMITING: bool = Field(default=False)
     ENABLE_CACHING: bool = Field(default=False)
     ENABLE_ANALYTICS: bool = Field(default=False)
+    ENABLE_ETAGS: bool = Field(default=True)
+    ENABLE_COMPRESSION: bool = Field(default=True)
+    ENABLE_TRACING: bool = Field(default=True)
+
+    # Response Compression (used when ENABLE_COMPRESSION is on)
+    COMPRESSION_MIN_BYTES: int = Field(default=1024, ge=0)
+    COMPRESSION_GZIP_LEVEL: int = Field(default=6, ge=1, le=9)
+    COMPRESSION_BROTLI_QUALITY: int = Field(default=4, ge=0, le=11)
+
+    # Tracing (used when ENABLE_TRACING is on; SLOW_REQUEST_PROFILE_MS=0 disables profiling)
+    SLOW_REQUEST_PROFILE_MS: int = Field(default=2000, ge=0)
+    PROFILE_INTERVAL_MS: float = Field(default=5.0, ge=1, le=1000)
+    PROFILE_DIR: str = Field(default="./data/profiles")
+    PROFILE_MAX_FILES: int = Field(default=100, ge=1)
+
+    # Admission Control (used when ENABLE_RATE_LIMITING is on)
+    RATE_LIMIT_REQUESTS_PER_SECOND: float = Field(default=10.0, gt=0)
+    RATE_LIMIT_BURST: int = Field(default=40, ge=1)
+    RATE_LIMIT_EXPENSIVE_PER_MINUTE: float = Field(default=6.0, gt=0)
+    RATE_LIMIT_EXPENSIVE_BURST: int = Field(default=3, ge=1)
+    MAX_CONCURRENT_EXPENSIVE_REQUESTS: int = Field(default=4, ge=1)
+    LOAD_SHED_SOFT_LIMIT: int = Field(default=100, ge=1)
+    LOAD_SHED_HARD_LIMIT: int = Field(default=200, ge=1)
+    # Proxies that append to X-Forwarded-For (Cloud Run: 1; 0 = use the peer address)
+    TRUSTED_PROXY_HOPS: int = Field(default=1, ge=0)
+
+    # Response Cache (used when ENABLE_CACHING is on)
+    CACHE_MAX_ENTRIES: int = Field(default=1000, ge=10)
+
+    # Background Jobs (0 in-process workers = run `python worker.py` separately)
+    JOB_WORKER_CONCURRENCY: int = Field(default=2, ge=0, le=32)
+    JOB_POLL_INTERVAL_SECONDS: float = Field(default=2.0, gt=0)
+    JOB_HEARTBEAT_SECONDS: float = Field(default=15.0, gt=0)
+    JOB_LEASE_SECONDS: float = Field(default=120.0, gt=0)
+    JOB_MAX_ATTEMPTS: int = Field(default=3, ge=1)
+    JOB_RETRY_BACKOFF_SECONDS: float = Field(default=30.0, ge=0)
+
+    # Live Streams (/api/work-zones/stream)
+    STREAM_HEARTBEAT_SECONDS: float = Field(default=15.0, gt=0)
+    STREAM_BUFFER_SIZE: int = Field(default=1000, ge=10)
+    STREAM_QUEUE_SIZE: int = Field(default=100, ge=10)
+    STREAM_MAX_SUBSCRIBERS: int = Field(default=500, ge=1)
+
+    # Collection Scheduler (polls are staggered across the interval)
+    SCHEDULER_ENABLED: bool = Field(default=False)
+    SCHEDULER_INTERVAL_SECONDS: float = Field(default=3600.0, ge=60)
+    SCHEDULER_JITTER_FRACTION: float = Field(default=0.25, ge=0, le=0.5)
+    SCHEDULER_SHARD_INDEX: int = Field(default=0, ge=0)
+    SCHEDULER_SHARD_COUNT: int = Field(default=1, ge=1)
+    SCHEDULER_MIN_RISK_THRESHOLD: int = Field(default=5, ge=1, le=10)
+
+    # Camera Health (background probes; circuit breakers also track collection fetches)
+    CAMERA_HEALTH_ENABLED: bool = Field(default=False)
+    CAMERA_HEALTH_INTERVAL_SECONDS: float = Field(default=300.0, ge=10)
+    CAMERA_HEALTH_PROBE_TIMEOUT_SECONDS: float = Field(default=5.0, gt=0, le=60)
+    CAMERA_HEALTH_CONCURRENCY: int = Field(default=10, ge=1, le=100)
+    CAMERA_HEALTH_EWMA_ALPHA: float = Field(default=0.3, gt=0, le=1)
+    CAMERA_CIRCUIT_FAILURE_THRESHOLD: int = Field(default=3, ge=1)  # Consecutive failures before skipping a camera
+    CAMERA_CIRCUIT_OPEN_SECONDS: float = Field(default=300.0, ge=1)  # First cool-down; doubles on each failed trial
+    CAMERA_CIRCUIT_MAX_OPEN_SECONDS: float = Field(default=21600.0, ge=1)
+
+    # Retention (archive, roll up and purge old rows; see services/retention.py)
+    RETENTION_ENABLED: bool = Field(default=False)
+    RETENTION_INTERVAL_HOURS: float = Field(default=24.0, ge=1)
+    RETENTION_WORK_ZONE_DAYS: int = Field(default=90, ge=1)
+    RETENTION_COLLECTION_RUN_DAYS: int = Field(default=365, ge=1)
+    RETENTION_ARCHIVE_DAYS: int = Field(default=730, ge=1)
+    RETENTION_HOURLY_ROLLUP_DAYS: int = Field(default=180, ge=1)
+    RETENTION_JOB_DAYS: int = Field(default=14, ge=1)
+    RETENTION_TOMBSTONE_DAYS: int = Field(default=7, ge=1)
+    RETENTION_BATCH_SIZE: int = Field(default=1000, ge=10, le=50000)
+
+    # History Export (Parquet/Arrow; rows per record batch / Parquet row group)
+    EXPORT_CHUNK_ROWS: int = Field(default=20000, ge=1000, le=1000000)
+    EXPORT_PARQUET_COMPRESSION: str = Field(default="zstd", pattern="^(zstd|snappy|gzip|lz4|none)$")
+
+    # MTO COMPASS camera images ({camera_num} is the number in CAM_253)
+    COMPASS_IMAGE_URL_PATTERN: str = Field(default="http://www.mto.gov.on.ca/compass/camera/loc{camera_num}.jpg")
 
     # MTO COMPASS (Future)
     MTO_COMPASS_API_URL: str = Field(default="")
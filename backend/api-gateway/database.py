@@ -6,11 +6,17 @@ PostgreSQL database connection using SQLAlchemy 2.0 async engine.
 Provides session factory and dependency injection for FastAPI.
 """
 
+from sqlalchemy import case, func, inspect, text, true
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.pool import NullPool
 from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
 import logging
+import re
 
 from config import settings
 
@@ -30,6 +36,13 @@ engine_kwargs = {
     "future": True
 }
 
+# Decode JSON columns (hazards, analysis results, ...) with orjson when available
+try:
+    import orjson
+    engine_kwargs["json_deserializer"] = orjson.loads
+except ImportError:
+    pass
+
 # PostgreSQL-specific connection pooling (not supported by SQLite)
 if not is_sqlite:
     engine_kwargs.update({
@@ -56,16 +69,63 @@ AsyncSessionLocal = async_sessionmaker(
 Base = declarative_base()
 
 
-async def init_db():
+MIGRATIONS_DIR = Path(__file__).resolve().parent / "alembic" / "versions"
+
+_REVISION_RE = re.compile(r"^revision(?::[^=]+)?=\s*['\"]([0-9a-f]+)['\"]", re.MULTILINE)
+_DOWN_REVISION_RE = re.compile(r"^down_revision(?::[^=]+)?=(.*)$", re.MULTILINE)
+
+
+def migration_head() -> Optional[str]:
+    """
+    Head revision of the Alembic migrations shipped with the gateway
+
+    Reads the revision identifiers straight from the version files instead of
+    loading Alembic's ScriptDirectory, which costs a few hundred milliseconds
+    of imports at startup. Returns None if there is not exactly one head.
+    """
+    revisions, parents = set(), set()
+    for path in MIGRATIONS_DIR.glob("*.py"):
+        source = path.read_text()
+        revision = _REVISION_RE.search(source)
+        if not revision:
+            continue
+        revisions.add(revision.group(1))
+        down_revision = _DOWN_REVISION_RE.search(source)
+        if down_revision:
+            parents.update(re.findall(r"['\"]([0-9a-f]+)['\"]", down_revision.group(1)))
+    heads = revisions - parents
+    return heads.pop() if len(heads) == 1 else None
+
+
+def _database_revision(sync_conn) -> Optional[str]:
+    """Revision recorded in alembic_version, or None if never migrated"""
+    if not inspect(sync_conn).has_table("alembic_version"):
+        return None
+    return sync_conn.execute(text("SELECT version_num FROM alembic_version")).scalar()
+
+
+async def init_db() -> bool:
     """
     Initialize database (create tables if they don't exist)
 
-    In production, use Alembic migrations instead.
-    This is useful for development/testing.
+    Skipped when the database is already migrated to the Alembic head, since
+    create_all would only re-check every table on each boot. Databases that
+    were never migrated (development/testing) still get create_all.
+
+    Returns:
+        True if create_all ran
     """
+    head = migration_head()
     async with engine.begin() as conn:
+        revision = await conn.run_sync(_database_revision)
+        if head and revision == head:
+            logger.info(f"Database at migration head {head}; skipping create_all")
+            return False
+        if revision:
+            logger.warning(f"⚠️  Database at revision {revision}, head is {head}: run `alembic upgrade head`")
         await conn.run_sync(Base.metadata.create_all)
     logger.info("Database initialized")
+    return True
 
 
 async def close_db():
@@ -113,3 +173,51 @@ async def get_db():
             raise
         finally:
             await session.close()
+
+
+def count_if(condition):
+    """
+    Conditional COUNT usable inside a single aggregate query
+
+    Renders as SUM(CASE WHEN condition THEN 1 ELSE 0 END), which behaves the
+    same on PostgreSQL and SQLite. Returns NULL on empty tables, so callers
+    should coalesce with `or 0`.
+    """
+    return func.sum(case((condition, 1), else_=0))
+
+
+def cross_join(*selectables):
+    """
+    Explicitly cross join single-row aggregate subqueries
+
+    Joining ON TRUE states the cartesian product is intended, which keeps
+    SQLAlchemy's cartesian-product linter quiet.
+    """
+    joined = selectables[0]
+    for selectable in selectables[1:]:
+        joined = joined.join(selectable, true())
+    return joined
+
+
+def upsert_insert(table):
+    """
+    INSERT for the configured database supporting ON CONFLICT clauses
+
+    Returns the SQLite or PostgreSQL insert() construct, both of which provide
+    on_conflict_do_update() / on_conflict_do_nothing() and .excluded.
+    """
+    if is_sqlite:
+        return sqlite.insert(table)
+    return postgresql.insert(table)
+
+
+def naive_utc(value: datetime) -> datetime:
+    """
+    Naive UTC datetime, as stored and compared throughout the gateway
+
+    SQLite returns naive timestamps and PostgreSQL aware ones; aware values
+    (including query parameters with an offset) are converted to UTC.
+    """
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
@@ -0,0 +1,78 @@
+"""
+Export Detection History
+========================
+
+Writes work zones, collection runs or camera directions to a Parquet or
+Arrow IPC file in bounded memory (see services/history_export.py), for
+loading into pandas, DuckDB or Polars:
+
+    pandas.read_parquet("work_zones.parquet")
+    duckdb.sql("SELECT camera_id, avg(risk_score) FROM 'work_zones.parquet' GROUP BY 1")
+
+Same export as GET /api/export/{dataset}, straight from the database.
+
+Usage:
+    python export_history.py work_zones [--format parquet] [--output FILE]
+        [--start 2026-01-01] [--end 2026-02-01] [--camera 12 --camera 40]
+        [--include-archived] [--chunk-rows 20000]
+
+--output - writes to stdout. The default output is {dataset}.{format}.
+"""
+
+import argparse
+import asyncio
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Add current directory to path
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from database import close_db
+from services.history_export import EXPORT_DATASETS, EXPORT_FORMATS, history_exporter
+
+
+async def run(args) -> int:
+    try:
+        history_exporter.validate(args.dataset, args.format, args.start, args.end, args.camera)
+    except (ValueError, RuntimeError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+
+    output = args.output or f"{args.dataset}.{EXPORT_FORMATS[args.format][1]}"
+    try:
+        if output == "-":
+            result = await history_exporter.export(
+                sys.stdout.buffer, args.dataset, args.format, args.start, args.end, args.camera, args.include_archived
+            )
+        else:
+            with open(output, "wb") as sink:
+                result = await history_exporter.export(
+                    sink, args.dataset, args.format, args.start, args.end, args.camera, args.include_archived
+                )
+    finally:
+        await close_db()
+
+    print(
+        f"✅ {result.rows} rows in {result.batches} batches, {result.bytes / 1e6:.1f} MB "
+        f"in {result.seconds:.1f}s -> {output}",
+        file=sys.stderr
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export detection history to Parquet or Arrow IPC")
+    parser.add_argument("dataset", choices=sorted(EXPORT_DATASETS))
+    parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="parquet")
+    parser.add_argument("--output", help="Output file, or - for stdout (default {dataset}.{format})")
+    parser.add_argument("--start", type=datetime.fromisoformat, help="Only rows at or after this time (UTC if no offset)")
+    parser.add_argument("--end", type=datetime.fromisoformat, help="Only rows before this time")
+    parser.add_argument("--camera", type=int, action="append", help="Only this camera id (repeatable)")
+    parser.add_argument("--include-archived", action="store_true", help="Also export rows moved to the archive tables")
+    parser.add_argument("--chunk-rows", type=int, help="Rows per batch/row group (default EXPORT_CHUNK_ROWS)")
+    args = parser.parse_args()
+
+    if args.chunk_rows:
+        history_exporter.chunk_rows = args.chunk_rows
+    sys.exit(asyncio.run(run(args)))
@@ -0,0 +1,43 @@
+"""
+Image Derivative Rendering
+==========================
+
+Pure functions that turn a camera JPEG into small WebP renditions for the
+dashboard (map marker thumbnails, list/detail previews).
+
+Kept free of application imports: services/image_derivatives.py runs
+render_derivatives() in worker processes, which then only need Pillow.
+"""
+
+import io
+from typing import Dict, Sequence, Tuple
+
+
+def render_derivatives(data: bytes, sizes: Sequence[Tuple[str, int]], quality: int = 75) -> Dict[str, bytes]:
+    """
+    Render WebP renditions of an image
+
+    Args:
+        data: Source image bytes (JPEG, PNG, ...)
+        sizes: (name, max edge in pixels) pairs; images are never upscaled
+        quality: WebP quality (1-100)
+
+    Returns:
+        {name: WebP bytes}
+    """
+    from PIL import Image, ImageOps
+
+    ordered = sorted(sizes, key=lambda size: size[1], reverse=True)
+    renditions = {}
+    with Image.open(io.BytesIO(data)) as source:
+        # JPEG: decode at a reduced DCT scale, still at least the largest size
+        source.draft("RGB", (ordered[0][1], ordered[0][1]))
+        image = ImageOps.exif_transpose(source).convert("RGB")
+
+    # Largest first, shrinking the same image in place for each smaller one
+    for name, max_edge in ordered:
+        image.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS, reducing_gap=2.0)
+        buffer = io.BytesIO()
+        image.save(buffer, "WEBP", quality=quality, method=4)
+        renditions[name] = buffer.getvalue()
+    return renditions
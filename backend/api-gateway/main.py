@@ -14,18 +14,44 @@ import logging
 from contextlib import asynccontextmanager
 from typing import Dict
 
+# Imported first so the startup breakdown covers the imports below
+from startup_timing import startup_timer
+
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 import uvicorn
+startup_timer.mark("import_framework")
 
 from config import settings
-from database import init_db, close_db
+from database import init_db, close_db, engine
+from middleware import (
+    QueryStatsMiddleware,
+    ResponseCacheMiddleware,
+    AdmissionControlMiddleware,
+    ConditionalRequestMiddleware,
+    CompressionMiddleware,
+    TracingMiddleware,
+    install_query_listeners
+)
+from services.response_cache import response_cache
+from services.admission_control import admission_controller
+from services.job_queue import job_worker_pool
+from services.event_bus import event_bus
+from services.collection_scheduler import collection_scheduler
+from services.retention import retention_service
+from services.camera_health import camera_health_monitor
+from services.image_storage import image_storage
+from services.image_derivatives import image_derivative_service
+from services.history_export import history_exporter
+from tracing import tracer
+startup_timer.mark("import_services")
 
 # Import API routers
-from api import cameras, work_zones, collection, directions, analysis
+from api import cameras, work_zones, collection, directions, analysis, stats, jobs, images, export
+startup_timer.mark("import_routers")
 
 # Configure logging
 logging.basicConfig(
@@ -44,6 +70,7 @@ async def lifespan(app: FastAPI):
     Runs on startup and shutdown to manage resources.
     """
     # Startup
+    startup_timer.mark("server_start")
     logger.info("🚀 Starting QEW Innovation Corridor API Gateway...")
     logger.info(f"Environment: {settings.LOG_LEVEL}")
     logger.info(f"Database: {settings.DATABASE_URL.split('@')[1] if '@' in settings.DATABASE_URL else 'Not configured'}")
@@ -56,11 +83,37 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"❌ Database initialization failed: {e}")
         # Continue anyway for health checks
+    startup_timer.mark("database")
+
+    # In-process background job workers (JOB_WORKER_CONCURRENCY=0 to use worker.py only)
+    if settings.JOB_WORKER_CONCURRENCY > 0:
+        await job_worker_pool.start()
+
+    # Staggered periodic collection (SCHEDULER_ENABLED)
+    if settings.SCHEDULER_ENABLED:
+        await collection_scheduler.start()
+
+    # Daily archive/roll-up/purge job (RETENTION_ENABLED)
+    if settings.RETENTION_ENABLED:
+        await retention_service.start()
+
+    # Camera probes for the circuit breakers (CAMERA_HEALTH_ENABLED)
+    if settings.CAMERA_HEALTH_ENABLED:
+        await camera_health_monitor.start()
+    startup_timer.mark("background_services")
+
+    # Gemini, GCS and aiohttp clients are created on first use, not here
+    startup_timer.ready()
 
     yield
 
     # Shutdown
     logger.info("🛑 Shutting down QEW Innovation Corridor API Gateway...")
+    await collection_scheduler.stop()
+    await retention_service.stop()
+    await camera_health_monitor.stop()
+    await job_worker_pool.stop()
+    await image_derivative_service.shutdown()
     await close_db()
     logger.info("✅ Cleanup complete")
 
@@ -76,6 +129,32 @@ app = FastAPI(
     openapi_url="/api/openapi.json"
 )
 
+# Middleware (last added runs outermost)
+# Stage timing, Server-Timing and slow-request profiles; innermost, in the route's task (ENABLE_TRACING)
+app.add_middleware(TracingMiddleware)
+
+# In-process response cache for hot read endpoints (ENABLE_CACHING)
+app.add_middleware(ResponseCacheMiddleware)
+
+# ETag / If-None-Match -> 304 from change versions, before the cache and the route
+app.add_middleware(ConditionalRequestMiddleware, enabled=settings.ENABLE_ETAGS)
+
+# Per-request SQL statement counting (X-DB-Query-Count / X-DB-Query-Time-Ms)
+install_query_listeners(engine)
+app.add_middleware(QueryStatsMiddleware)
+
+# Rate limiting and load shedding (ENABLE_RATE_LIMITING)
+app.add_middleware(AdmissionControlMiddleware)
+
+# gzip/brotli for large JSON bodies (streamed responses pass through)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_BYTES,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    enabled=settings.ENABLE_COMPRESSION
+)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -83,6 +162,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-DB-Query-Count", "X-DB-Query-Time-Ms", "X-Next-Cursor", "X-Cache", "Retry-After", "X-Change-Version", "ETag", "Server-Timing"],
 )
 
 
@@ -141,7 +221,11 @@ async def root():
             "work_zones": "/api/work-zones",
             "collection": "/api/collection",
             "directions": "/api/directions",
-            "analysis": "/api/analysis"
+            "analysis": "/api/analysis",
+            "stats": "/api/stats",
+            "jobs": "/api/jobs",
+            "images": "/api/images",
+            "export": "/api/export/{dataset}"
         }
     }
 
@@ -170,16 +254,44 @@ async def health_check() -> Dict:
             "rate_limiting": settings.ENABLE_RATE_LIMITING,
             "caching": settings.ENABLE_CACHING,
             "analytics": settings.ENABLE_ANALYTICS
-        }
+        },
+        "cache": response_cache.stats(),
+        "admission": admission_controller.stats(),
+        "jobs": job_worker_pool.stats(),
+        "streams": event_bus.stats(),
+        "scheduler": collection_scheduler.stats(),
+        "retention": retention_service.stats(),
+        "camera_health": camera_health_monitor.stats(),
+        "image_storage": image_storage.stats(),
+        "image_derivatives": image_derivative_service.stats(),
+        "export": history_exporter.stats(),
+        "tracing": tracer.stats(),
+        "startup": startup_timer.summary()
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> PlainTextResponse:
+    """
+    Per-route, per-stage timing histograms for Prometheus
+
+    Returns:
+        Prometheus text exposition of this process's traces
+    """
+    return PlainTextResponse(tracer.render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 # Include API routers
 app.include_router(cameras.router, prefix="/api/cameras", tags=["Cameras"])
 app.include_router(work_zones.router, prefix="/api/work-zones", tags=["Work Zones"])
 app.include_router(collection.router, prefix="/api/collection", tags=["Collection"])
 app.include_router(directions.router, prefix="/api/directions", tags=["Directions"])
 app.include_router(analysis.router, prefix="/api/analysis", tags=["Analysis"])
+app.include_router(stats.router, prefix="/api/stats", tags=["Statistics"])
+app.include_router(jobs.router, prefix="/api/jobs", tags=["Jobs"])
+app.include_router(images.router, prefix="/api/images", tags=["Images"])
+app.include_router(export.router, prefix="/api/export", tags=["Export"])
+startup_timer.mark("app_setup")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,32 @@
+"""
+Middleware Module
+=================
+
+Cross-cutting request instrumentation for the API gateway.
+"""
+
+from .query_stats import (
+    QueryStats,
+    QueryStatsMiddleware,
+    track_queries,
+    assert_max_queries,
+    install_query_listeners
+)
+from .response_cache import ResponseCacheMiddleware
+from .admission import AdmissionControlMiddleware
+from .conditional import ConditionalRequestMiddleware
+from .compression import CompressionMiddleware
+from .tracing import TracingMiddleware
+
+__all__ = [
+    "QueryStats",
+    "QueryStatsMiddleware",
+    "track_queries",
+    "assert_max_queries",
+    "install_query_listeners",
+    "ResponseCacheMiddleware",
+    "AdmissionControlMiddleware",
+    "ConditionalRequestMiddleware",
+    "CompressionMiddleware",
+    "TracingMiddleware"
+]
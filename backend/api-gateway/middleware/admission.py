@@ -0,0 +1,101 @@
+"""
+Admission Control Middleware
+============================
+
+Applies services/admission_control.py when settings.ENABLE_RATE_LIMITING
+is on. Refused requests get 429 with a Retry-After header, in the same
+error body shape as the global exception handlers.
+
+A plain ASGI middleware: an admitted request holds its in-flight slot
+until the last body chunk is sent or the client disconnects, so streamed
+responses (Parquet/Arrow exports) are counted for as long as they stream.
+Event streams (/api/work-zones/stream) are rate limited when they connect,
+then release their slot: they are long-lived and capped separately by
+STREAM_MAX_SUBSCRIBERS.
+"""
+
+from starlette.requests import Request
+from fastapi.responses import JSONResponse
+
+from config import settings
+from services.admission_control import admission_controller, EXEMPT_PATHS
+
+
+def client_identifier(request: Request, trusted_proxy_hops: int = 1) -> str:
+    """
+    Client key for rate limiting
+
+    Each proxy appends the address it received the request from to
+    X-Forwarded-For, so the entry trusted_proxy_hops from the right is the
+    one our outermost trusted proxy (Cloud Run's front end) saw. Entries to
+    its left come from the client and can be anything. Without such an
+    entry the peer address is used.
+    """
+    forwarded = request.headers.get("x-forwarded-for")
+    if forwarded and trusted_proxy_hops:
+        hops = [hop.strip() for hop in forwarded.split(",")]
+        if len(hops) >= trusted_proxy_hops and hops[-trusted_proxy_hops]:
+            return hops[-trusted_proxy_hops]
+    return request.client.host if request.client else "unknown"
+
+
+class AdmissionControlMiddleware:
+    """Token bucket rate limiting, concurrency caps and load shedding"""
+
+    def __init__(self, app, controller=admission_controller, trusted_proxy_hops: int = settings.TRUSTED_PROXY_HOPS):
+        self.app = app
+        self.controller = controller
+        self.trusted_proxy_hops = trusted_proxy_hops
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.controller.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        path = request.url.path
+        if request.method == "OPTIONS" or path in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        decision = self.controller.admit(
+            client_identifier(request, self.trusted_proxy_hops), request.method, path
+        )
+        if not decision.admitted:
+            response = JSONResponse(
+                status_code=429,
+                headers={"Retry-After": str(decision.retry_after)},
+                content={
+                    "error": True,
+                    "message": decision.reason,
+                    "status_code": 429,
+                    "retry_after": decision.retry_after
+                }
+            )
+            await response(scope, receive, send)
+            return
+
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                self.controller.release(decision)
+
+        async def send_and_release(message):
+            if message["type"] == "http.response.start":
+                content_type = dict(message.get("headers", [])).get(b"content-type", b"")
+                if content_type.startswith(b"text/event-stream"):
+                    release()
+            try:
+                await send(message)
+            finally:
+                if message["type"] == "http.response.body" and not message.get("more_body", False):
+                    release()
+
+        try:
+            await self.app(scope, receive, send_and_release)
+        finally:
+            # Errors and client disconnects end the stream early
+            release()
@@ -0,0 +1,129 @@
+"""
+Compression Middleware
+======================
+
+gzip / brotli response compression negotiated from Accept-Encoding
+(settings.ENABLE_COMPRESSION).
+
+Only complete bodies (with a Content-Length) of at least
+COMPRESSION_MIN_BYTES and a text-like content type are compressed.
+Streamed responses (SSE, Parquet/Arrow exports) pass through untouched
+and are never buffered. Brotli is offered when the `brotli` package is
+installed, and preferred over gzip when the client accepts both.
+Large bodies are compressed in a worker thread to keep the event loop
+free.
+"""
+
+import asyncio
+import gzip
+from typing import Dict, Optional
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Content types worth compressing (JSON listings, docs pages)
+COMPRESSIBLE_TYPES = ("application/json", "text/html", "text/plain", "text/css", "application/javascript")
+
+# Bodies above this are compressed off the event loop
+THREAD_THRESHOLD_BYTES = 256 * 1024
+
+
+def parse_accept_encoding(header: Optional[str]) -> Dict[str, float]:
+    """{coding: q} from an Accept-Encoding header"""
+    accepted: Dict[str, float] = {}
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    return accepted
+
+
+def negotiate_encoding(header: Optional[str], brotli_available: bool = brotli is not None) -> Optional[str]:
+    """
+    Best content coding the client accepts
+
+    Returns:
+        "br", "gzip", or None (send identity)
+    """
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get("*", 0.0)
+    offered = ["br", "gzip"] if brotli_available else ["gzip"]
+    # Highest q wins; on a tie, the order above (brotli compresses JSON better)
+    best = max(offered, key=lambda coding: (accepted.get(coding, wildcard), -offered.index(coding)))
+    return best if accepted.get(best, wildcard) > 0 else None
+
+
+class CompressionMiddleware(BaseHTTPMiddleware):
+    """Compress large text responses with brotli or gzip"""
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        enabled: bool = True
+    ):
+        super().__init__(app)
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.enabled = enabled
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality, mode=brotli.MODE_TEXT)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    def _compressible(self, request: Request, response: Response) -> bool:
+        content_type = response.headers.get("content-type", "")
+        length = response.headers.get("content-length")
+        return (
+            request.method != "HEAD"
+            and "content-encoding" not in response.headers
+            and content_type.split(";")[0].strip() in COMPRESSIBLE_TYPES
+            # No Content-Length: a streamed body, never buffered
+            and length is not None
+            and int(length) >= self.minimum_size
+        )
+
+    async def dispatch(self, request: Request, call_next):
+        if not self.enabled:
+            return await call_next(request)
+
+        encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+        response = await call_next(request)
+        content_type = response.headers.get("content-type", "").split(";")[0].strip()
+        if content_type in COMPRESSIBLE_TYPES:
+            # Caches must key on Accept-Encoding whether or not this one was compressed
+            response.headers.add_vary_header("Accept-Encoding")
+        if encoding is None or not self._compressible(request, response):
+            return response
+
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        if len(body) >= THREAD_THRESHOLD_BYTES:
+            compressed = await asyncio.to_thread(self.compress, body, encoding)
+        else:
+            compressed = self.compress(body, encoding)
+
+        compressed_response = Response(compressed, status_code=response.status_code, background=response.background)
+        # Raw headers keep repeated ones (Set-Cookie, Vary); only the length is recomputed
+        compressed_response.raw_headers = [
+            (name, value) for name, value in response.raw_headers if name.lower() != b"content-length"
+        ] + compressed_response.raw_headers
+        compressed_response.headers["Content-Encoding"] = encoding
+        return compressed_response
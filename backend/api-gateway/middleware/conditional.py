@@ -0,0 +1,96 @@
+"""
+Conditional Request Middleware
+==============================
+
+ETag / If-None-Match for large listings that dashboards poll
+(settings.ENABLE_ETAGS).
+
+The ETag is computed before the route runs, from the request (path and
+sorted query string) and the change-version state in `sync_state`. Every
+write to a tracked table (cameras, work zones, directions) bumps the
+version, and retention advances pruned_through (see models/sync.py). If
+neither has moved, the listing cannot have changed. A matching
+If-None-Match is therefore answered 304 after one single-row read; the
+listing query never runs and no body is rendered.
+
+Routes with relative time windows (?days=, ?hours=) also change as rows
+age out, so their ETag also includes the current minute.
+
+ETags are weak (W/"..."): the same body may be sent gzip/brotli encoded.
+
+The ETag is also left in request.state.etag. The response cache (inside
+this middleware) adds it to its key, so a body cached at an older version
+is never sent under a newer version's ETag. This holds even when the
+write came from another process that could not invalidate this cache.
+"""
+
+import hashlib
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+
+from change_tracking import current_change_version
+from database import AsyncSessionLocal
+
+# Conditional GET routes: path -> includes a relative time window
+CONDITIONAL_ROUTES: Dict[str, bool] = {
+    "/api/cameras/": False,
+    "/api/directions/": False,
+    "/api/directions/cameras": False,
+    "/api/work-zones/": True,
+    "/api/work-zones/active": False,
+    "/api/work-zones/bbox": False,
+    "/api/work-zones/history": True,
+}
+
+# Sent with every ETag: caches may store the body but must revalidate
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+
+def make_etag(path: str, params: Iterable[Tuple[str, str]], version: int, pruned_through: int, window: Optional[int] = None) -> str:
+    """Weak ETag of a request against a change-version state"""
+    key = f"{path}?{sorted(params)}|{version}|{pruned_through}|{window}"
+    return f'W/"{hashlib.blake2b(key.encode("utf-8"), digest_size=12).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match comparison (weak, as for GET)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+class ConditionalRequestMiddleware(BaseHTTPMiddleware):
+    """Answer unchanged polls with 304 Not Modified"""
+
+    def __init__(self, app, routes: Dict[str, bool] = CONDITIONAL_ROUTES, enabled: bool = True):
+        super().__init__(app)
+        self.routes = routes
+        self.enabled = enabled
+
+    async def dispatch(self, request: Request, call_next):
+        relative = self.routes.get(request.url.path)
+        if not self.enabled or relative is None or request.method not in ("GET", "HEAD"):
+            return await call_next(request)
+
+        async with AsyncSessionLocal() as db:
+            version, pruned_through = await current_change_version(db)
+        window = int(time.time() // 60) if relative else None
+        etag = make_etag(request.url.path, request.query_params.multi_items(), version, pruned_through, window)
+        # Keys the response cache to the same version state
+        request.state.etag = etag
+
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": REVALIDATE_CACHE_CONTROL})
+
+        response = await call_next(request)
+        if response.status_code == 200:
+            response.headers["ETag"] = etag
+            response.headers["Cache-Control"] = REVALIDATE_CACHE_CONTROL
+        return response
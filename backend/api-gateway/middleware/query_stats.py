@@ -0,0 +1,156 @@
+"""
+SQL Query Statistics
+====================
+
+Per-request SQL statement counter and timer.
+
+Hooks SQLAlchemy cursor events on the shared engine and accumulates
+statement counts and execution time into whichever QueryStats object is
+bound to the current context. The HTTP middleware binds one per request and
+reports it back via response headers; tests and scripts can bind their own
+with track_queries() / assert_max_queries().
+"""
+
+import logging
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from sqlalchemy import event
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+
+from tracing import DB_STAGE, record_stage
+
+logger = logging.getLogger(__name__)
+
+# Response headers reporting per-request database work
+QUERY_COUNT_HEADER = "X-DB-Query-Count"
+QUERY_TIME_HEADER = "X-DB-Query-Time-Ms"
+
+
+@dataclass
+class QueryStats:
+    """Accumulated SQL statements for one request / tracked block"""
+    count: int = 0
+    total_seconds: float = 0.0
+    statements: List[str] = field(default_factory=list)
+    parent: Optional["QueryStats"] = field(default=None, repr=False)
+
+    def record(self, statement: str, elapsed: float) -> None:
+        """Record one statement here and in every enclosing tracker"""
+        stats = self
+        while stats is not None:
+            stats.count += 1
+            stats.total_seconds += elapsed
+            stats.statements.append(statement)
+            stats = stats.parent
+
+    @property
+    def total_ms(self) -> float:
+        return round(self.total_seconds * 1000, 3)
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+_installed_engines = set()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get("query_start_time")
+    elapsed = time.perf_counter() - start_times.pop() if start_times else 0.0
+
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+    # Also the "db" stage of the request/job trace (Server-Timing, /metrics)
+    record_stage(DB_STAGE, elapsed)
+
+
+def install_query_listeners(engine) -> None:
+    """
+    Attach statement counting listeners to an engine
+
+    Args:
+        engine: AsyncEngine or sync Engine (installed once per engine)
+    """
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if id(sync_engine) in _installed_engines:
+        return
+
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    _installed_engines.add(id(sync_engine))
+
+
+@asynccontextmanager
+async def track_queries():
+    """
+    Count SQL statements executed inside the block
+
+    Usage:
+        async with track_queries() as stats:
+            await client.get("/api/cameras/")
+        print(stats.count, stats.total_ms)
+    """
+    stats = QueryStats(parent=_current_stats.get())
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+@asynccontextmanager
+async def assert_max_queries(max_queries: int):
+    """
+    Fail if the block executes more than max_queries SQL statements
+
+    Intended for tests guarding endpoints against N+1 regressions:
+
+        async with assert_max_queries(2):
+            response = await client.get("/api/analysis/history?limit=500")
+
+    Raises:
+        AssertionError: Statement count exceeded max_queries
+    """
+    async with track_queries() as stats:
+        yield stats
+
+    if stats.count > max_queries:
+        executed = "\n".join(f"  {i + 1}. {sql}" for i, sql in enumerate(stats.statements))
+        raise AssertionError(
+            f"Expected at most {max_queries} queries, {stats.count} executed:\n{executed}"
+        )
+
+
+class QueryStatsMiddleware(BaseHTTPMiddleware):
+    """Report per-request SQL statement count and time in response headers"""
+
+    def __init__(self, app, slow_query_count: int = 20):
+        super().__init__(app)
+        self.slow_query_count = slow_query_count
+
+    async def dispatch(self, request: Request, call_next):
+        stats = QueryStats(parent=_current_stats.get())
+        token = _current_stats.set(stats)
+        try:
+            response = await call_next(request)
+        finally:
+            _current_stats.reset(token)
+
+        response.headers[QUERY_COUNT_HEADER] = str(stats.count)
+        response.headers[QUERY_TIME_HEADER] = str(stats.total_ms)
+
+        if stats.count > self.slow_query_count:
+            logger.warning(
+                f"⚠️  {request.method} {request.url.path} executed {stats.count} queries "
+                f"({stats.total_ms}ms)"
+            )
+
+        return response
@@ -0,0 +1,77 @@
+"""
+Response Cache Middleware
+=========================
+
+Serves configured GET routes from the in-process response cache
+(services/response_cache.py) when settings.ENABLE_CACHING is on.
+Adds an X-Cache header: HIT, MISS, STALE (expired entry refreshed) or
+COALESCED (waited on a concurrent identical request).
+
+On conditional routes the key includes the ETag set by
+ConditionalRequestMiddleware. An entry then only serves the change version
+it was filled at, even if the write that moved the version did not
+invalidate this process's cache (worker.py, another instance, seed scripts).
+
+Server-Timing belongs to the request that rendered the entry. Only that
+request keeps it; responses served from the entry report a single
+`cache;desc=HIT` (or STALE/COALESCED) timing instead.
+"""
+
+from typing import Tuple
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+
+from middleware.tracing import SERVER_TIMING_HEADER
+from services.response_cache import response_cache, CACHE_POLICIES
+
+CACHE_STATUS_HEADER = "X-Cache"
+
+# Per-request headers that must not be replayed from a cached entry
+_UNCACHED_HEADERS = {
+    "content-length", "date", "server", "server-timing", "x-db-query-count", "x-db-query-time-ms"
+}
+
+
+class ResponseCacheMiddleware(BaseHTTPMiddleware):
+    """Serve hot read endpoints from memory"""
+
+    def __init__(self, app, cache=response_cache, policies=CACHE_POLICIES):
+        super().__init__(app)
+        self.cache = cache
+        self.policies = policies
+
+    async def dispatch(self, request: Request, call_next):
+        policy = self.policies.get(request.url.path)
+        if not self.cache.enabled or policy is None or request.method != "GET":
+            return await call_next(request)
+
+        key = self.cache.make_key(request.url.path, request.query_params.multi_items())
+        etag = getattr(request.state, "etag", None)
+        if etag:
+            key = f"{key}|{etag}"
+
+        rendered, fill_timing = False, None
+
+        async def render() -> Tuple[Tuple, bool]:
+            nonlocal rendered, fill_timing
+            response = await call_next(request)
+            rendered = True
+            fill_timing = response.headers.get(SERVER_TIMING_HEADER)
+            body = b"".join([chunk async for chunk in response.body_iterator])
+            headers = {
+                name: value for name, value in response.headers.items()
+                if name.lower() not in _UNCACHED_HEADERS
+            }
+            return (response.status_code, headers, body), response.status_code == 200
+
+        (status_code, headers, body), state = await self.cache.get_or_compute(key, policy, render)
+
+        response = Response(content=body, status_code=status_code, headers=headers)
+        response.headers[CACHE_STATUS_HEADER] = state.upper()
+        if not rendered:
+            response.headers[SERVER_TIMING_HEADER] = f'cache;desc="{state.upper()}"'
+        elif fill_timing:
+            response.headers[SERVER_TIMING_HEADER] = fill_timing
+        return response
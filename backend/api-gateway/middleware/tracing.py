@@ -0,0 +1,83 @@
+"""
+Tracing Middleware
+==================
+
+Binds a trace (tracing.py) to each HTTP request, adds its stage breakdown
+as a Server-Timing header, and records it in the /metrics histograms
+(settings.ENABLE_TRACING).
+
+A plain ASGI middleware, added innermost: it runs in the same task as the
+route, so the slow-request profiler samples the route's own stack.
+Requests answered by the outer middleware (304s, cached responses, 429s)
+are not traced.
+
+Routes are labelled by their path template (/api/cameras/{camera_id}), so
+the histograms stay bounded; unmatched paths share one label. Event
+streams are timed to their first byte only and never profiled.
+"""
+
+from typing import Dict, Optional
+
+from starlette.datastructures import MutableHeaders
+
+from tracing import Tracer, tracer as default_tracer
+
+SERVER_TIMING_HEADER = "Server-Timing"
+
+# Route label for requests that matched no route (404s, scanners)
+UNMATCHED_ROUTE = "unmatched"
+
+
+class TracingMiddleware:
+    """Per-request stage timing, Server-Timing and slow-request profiling"""
+
+    def __init__(self, app, tracer: Tracer = default_tracer):
+        self.app = app
+        self.tracer = tracer
+        self._route_paths: Optional[Dict[object, str]] = None
+
+    def route_label(self, scope) -> str:
+        """Path template of the route a request matched"""
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return UNMATCHED_ROUTE
+        if self._route_paths is None or endpoint not in self._route_paths:
+            self._route_paths = {
+                route.endpoint: route.path
+                for route in scope["app"].routes
+                if getattr(route, "endpoint", None) is not None
+            }
+        return self._route_paths.get(endpoint, UNMATCHED_ROUTE)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        trace, token = self.tracer.start(scope["method"], UNMATCHED_ROUTE, profile=True)
+        status = None
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                # The router has matched by now
+                trace.route = self.route_label(scope)
+                headers = MutableHeaders(scope=message)
+                headers.append(SERVER_TIMING_HEADER, trace.server_timing())
+                if headers.get("content-type", "").startswith("text/event-stream"):
+                    # Long-lived: timed to the first byte, and never profiled
+                    if self.tracer.profiler is not None:
+                        self.tracer.profiler.cancel(trace)
+                    self.tracer.observe(trace, status)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        except Exception:
+            status = status or 500
+            raise
+        finally:
+            if trace.route == UNMATCHED_ROUTE:
+                trace.route = self.route_label(scope)
+            await self.tracer.finish(trace, token, status)
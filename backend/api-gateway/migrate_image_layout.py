@@ -0,0 +1,159 @@
+"""
+Image Layout Migration
+======================
+
+Moves camera images from the legacy flat GCS layout
+(`camera_images/{camera_id}/{YYYYmmdd_HHMMSS}_{filename}`) into the
+content-addressed store with its time-partitioned frame index
+(`frames/{camera_id}/YYYY/MM/DD/HH/...`, see services/image_storage.py).
+
+For each legacy blob, a page at a time:
+1. download it and store it in the configured image backend (identical
+   frames are stored once), indexed at the capture time from its name
+2. point work zones whose gcp_image_url is the legacy URL at the new one
+   (in one transaction per page, with a change version for delta sync)
+3. with --delete-legacy, delete the legacy blob
+
+Re-running is safe: stored images deduplicate and already-rewritten URLs no
+longer match. Each page prints a resume token for --page-token.
+
+Usage:
+    python migrate_image_layout.py [--dry-run] [--delete-legacy]
+        [--page-size 500] [--concurrency 16] [--page-token TOKEN]
+"""
+
+import argparse
+import asyncio
+import re
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, update
+
+# Add current directory to path
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from change_tracking import allocate_change_version
+from database import AsyncSessionLocal
+from models import WorkZone
+from services.gcp_storage_service import gcp_storage_service
+from services.image_storage import CAMERA_ID_PATTERN, image_storage
+
+LEGACY_PREFIX = "camera_images/"
+LEGACY_NAME_PATTERN = re.compile(
+    r"^camera_images/(?P<camera_id>[^/]+)/(?P<timestamp>\d{8}_\d{6})_[^/]+$"
+)
+
+
+def parse_legacy_name(name: str) -> Optional[Tuple[str, datetime]]:
+    """(camera_id, captured_at) of a legacy blob name, or None"""
+    match = LEGACY_NAME_PATTERN.match(name)
+    if not match or not CAMERA_ID_PATTERN.match(match["camera_id"]):
+        return None
+    return match["camera_id"], datetime.strptime(match["timestamp"], "%Y%m%d_%H%M%S")
+
+
+def list_legacy_page(page_size: int, page_token: Optional[str]) -> Tuple[List[Any], Optional[str]]:
+    """One page of legacy blobs and the token for the next page (blocking)"""
+    blobs = gcp_storage_service.client.list_blobs(
+        gcp_storage_service.bucket_name,
+        prefix=LEGACY_PREFIX,
+        max_results=page_size,
+        page_token=page_token,
+        fields="items(name,contentType),nextPageToken"
+    )
+    page = next(blobs.pages, None)
+    return (list(page) if page else []), blobs.next_page_token
+
+
+async def migrate_blob(blob: Any, semaphore: asyncio.Semaphore, dry_run: bool) -> Optional[Tuple[str, str]]:
+    """Copy one legacy blob into the new layout; (legacy URL, new URL) or None if skipped"""
+    parsed = parse_legacy_name(blob.name)
+    if not parsed:
+        return None
+    camera_id, captured_at = parsed
+    legacy_url = gcp_storage_service.get_public_url(blob.name)
+    if dry_run:
+        return legacy_url, ""
+
+    async with semaphore:
+        data = await gcp_storage_service.download_image(blob.name)
+        if data is None:
+            return None
+        stored = await image_storage.put(data, camera_id, blob.content_type or "image/jpeg", captured_at)
+    return (legacy_url, stored.url) if stored else None
+
+
+async def rewrite_work_zone_urls(url_map: List[Tuple[str, str]]) -> int:
+    """Point work zones at migrated image URLs; returns rows updated"""
+    if not url_map:
+        return 0
+    async with AsyncSessionLocal() as session:
+        version = await allocate_change_version(session)
+        result = await session.execute(
+            update(WorkZone.__table__)
+            .where(WorkZone.__table__.c.gcp_image_url == bindparam("legacy_url"))
+            .values(gcp_image_url=bindparam("new_url"), change_version=version),
+            [{"legacy_url": legacy, "new_url": new} for legacy, new in url_map]
+        )
+        await session.commit()
+        return result.rowcount
+
+
+async def migrate(
+    dry_run: bool = False,
+    delete_legacy: bool = False,
+    page_size: int = 500,
+    concurrency: int = 16,
+    page_token: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Migrate every legacy blob, a page at a time
+
+    Returns:
+        Totals: blobs seen, migrated, skipped, failed, work zones rewritten,
+        legacy blobs deleted
+    """
+    if not await gcp_storage_service.ensure_client():
+        raise RuntimeError("GCP Storage is not available (library or credentials missing)")
+
+    totals = {"seen": 0, "migrated": 0, "skipped": 0, "failed": 0, "work_zones_rewritten": 0, "deleted": 0}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    while True:
+        blobs, next_token = await asyncio.to_thread(list_legacy_page, page_size, page_token)
+        results = await asyncio.gather(*(migrate_blob(blob, semaphore, dry_run) for blob in blobs))
+
+        migrated = [(blob, result) for blob, result in zip(blobs, results) if result]
+        totals["seen"] += len(blobs)
+        totals["migrated"] += len(migrated)
+        totals["skipped"] += sum(1 for blob in blobs if not parse_legacy_name(blob.name))
+        totals["failed"] = totals["seen"] - totals["migrated"] - totals["skipped"]
+
+        if not dry_run:
+            totals["work_zones_rewritten"] += await rewrite_work_zone_urls([result for _, result in migrated])
+            if delete_legacy:
+                # Only after the work zones no longer reference them
+                deleted = await asyncio.gather(*(gcp_storage_service.delete_image(blob.name) for blob, _ in migrated))
+                totals["deleted"] += sum(deleted)
+
+        print(f"📄 {totals['seen']} blobs, {totals['migrated']} migrated, next page token: {next_token or '-'}")
+        if not next_token:
+            return totals
+        page_token = next_token
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate legacy camera_images/ blobs to the time-partitioned layout")
+    parser.add_argument("--dry-run", action="store_true", help="List and parse legacy blobs without writing")
+    parser.add_argument("--delete-legacy", action="store_true", help="Delete legacy blobs once migrated")
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--page-token", help="Resume from a token printed by a previous run")
+    args = parser.parse_args()
+
+    print(f"🚀 Migrating gs://{gcp_storage_service.bucket_name}/{LEGACY_PREFIX} to the {image_storage.name} image store")
+    totals = asyncio.run(migrate(args.dry_run, args.delete_legacy, args.page_size, args.concurrency, args.page_token))
+    print(f"✅ Done: {totals}")
@@ -9,5 +9,9 @@ from .camera import Camera
 from .work_zone import WorkZone
 from .collection import CollectionRun
 from .camera_direction import CameraDirection
+from .job import Job
+from .sync import SyncState, SyncTombstone
+from .retention import WorkZoneRollup, work_zones_archive, collection_runs_archive
 
-__all__ = ["Camera", "WorkZone", "CollectionRun", "CameraDirection"]
+__all__ = ["Camera", "WorkZone", "CollectionRun", "CameraDirection", "Job", "SyncState", "SyncTombstone",
+           "WorkZoneRollup", "work_zones_archive", "collection_runs_archive"]
@@ -5,12 +5,14 @@ Camera Model
 Represents a QEW COMPASS traffic camera.
 """
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, JSON
+from sqlalchemy import Column, Integer, BigInteger, String, Float, DateTime, Boolean, JSON
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import datetime
 
 from database import Base
+from spatial import track_geohash
+from .sync import track_changes
 
 
 class Camera(Base):
@@ -29,6 +31,7 @@ class Camera(Base):
     latitude = Column(Float, nullable=False)
     longitude = Column(Float, nullable=False)
     elevation = Column(Float, nullable=True)
+    geohash = Column(String(12), nullable=True, index=True)  # Spatial index (see spatial.py)
 
     # Camera direction (from Corey's AI analysis)
     heading = Column(Float, nullable=True)  # 0-360 degrees
@@ -43,6 +46,9 @@ class Camera(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # Delta sync (see models/sync.py)
+    change_version = Column(BigInteger, nullable=False, default=0, server_default="0", index=True)
+
     # Relationships
     work_zones = relationship("WorkZone", back_populates="camera")
     directions = relationship("CameraDirection", back_populates="camera")
@@ -66,5 +72,10 @@ class Camera(Base):
             "active": self.active,
             "views": self.views,
             "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "change_version": self.change_version
         }
+
+
+track_geohash(Camera)
+track_changes(Camera, "camera")
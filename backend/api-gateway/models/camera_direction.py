@@ -5,12 +5,13 @@ Camera Direction Model
 Stores AI-analyzed camera heading/direction data (Corey's work).
 """
 
-from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, BigInteger, Float, String, DateTime, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from datetime import datetime
 
 from database import Base
+from .sync import track_changes
 
 
 class CameraDirection(Base):
@@ -41,12 +42,24 @@ class CameraDirection(Base):
     analyzed_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # Delta sync / ETags (see models/sync.py)
+    change_version = Column(BigInteger, nullable=False, default=0, server_default="0")
+
     # Relationships
     camera = relationship("Camera", back_populates="directions")
 
     # Constraints
     __table_args__ = (
         UniqueConstraint('camera_id', 'view_id', name='unique_camera_view_direction'),
+        # One camera-level record (view_id NULL) per camera; NULLs never
+        # conflict on the constraint above, so upserts need this index
+        Index(
+            'uq_camera_directions_camera_level', 'camera_id', unique=True,
+            sqlite_where=text('view_id IS NULL'),
+            postgresql_where=text('view_id IS NULL')
+        ),
+        # Keyset pagination: ORDER BY analyzed_at DESC, id DESC
+        Index('ix_camera_directions_analyzed_at_id', 'analyzed_at', 'id'),
     )
 
     def __repr__(self):
@@ -68,3 +81,6 @@ class CameraDirection(Base):
             "analyzed_at": self.analyzed_at.isoformat() if self.analyzed_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None
         }
+
+
+track_changes(CameraDirection, "direction")
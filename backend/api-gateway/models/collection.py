@@ -5,7 +5,7 @@ Collection Run Model
 Represents a camera image collection session.
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, JSON
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Index
 from sqlalchemy.sql import func
 from datetime import datetime
 
@@ -29,18 +29,27 @@ class CollectionRun(Base):
     total_cameras = Column(Integer, default=0)
     images_collected = Column(Integer, default=0)
     images_analyzed = Column(Integer, default=0)
+    images_failed = Column(Integer, default=0)
     work_zones_detected = Column(Integer, default=0)
+    high_risk_zones = Column(Integer, default=0)
     errors = Column(Integer, default=0)
 
     # Detailed results
     results = Column(JSON, nullable=True)  # Detailed collection results
     error_log = Column(JSON, nullable=True)  # Array of error messages
+    error_message = Column(String(500), nullable=True)  # Reason a run failed
 
     # Timestamps
     started_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     completed_at = Column(DateTime(timezone=True), nullable=True)
     duration_seconds = Column(Integer, nullable=True)
 
+    # Indexes
+    __table_args__ = (
+        # Keyset pagination: ORDER BY started_at DESC, id DESC
+        Index('ix_collection_runs_started_at_id', 'started_at', 'id'),
+    )
+
     def __repr__(self):
         return f"<CollectionRun {self.collection_id} - {self.status}>"
 
@@ -53,10 +62,13 @@ class CollectionRun(Base):
             "total_cameras": self.total_cameras,
             "images_collected": self.images_collected,
             "images_analyzed": self.images_analyzed,
+            "images_failed": self.images_failed,
             "work_zones_detected": self.work_zones_detected,
+            "high_risk_zones": self.high_risk_zones,
             "errors": self.errors,
             "results": self.results,
             "error_log": self.error_log,
+            "error_message": self.error_message,
             "started_at": self.started_at.isoformat() if self.started_at else None,
             "completed_at": self.completed_at.isoformat() if self.completed_at else None,
             "duration_seconds": self.duration_seconds
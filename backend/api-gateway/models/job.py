@@ -0,0 +1,78 @@
+"""
+Job Model
+=========
+
+Durable background job (collection runs, re-analysis) claimed by workers.
+"""
+
+from sqlalchemy import Column, Integer, String, Float, DateTime, JSON, Text, Index
+from sqlalchemy.sql import func
+
+from database import Base
+
+
+class Job(Base):
+    """Background job queue database model"""
+    __tablename__ = "jobs"
+
+    # Primary key
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Job definition
+    job_type = Column(String(50), nullable=False)  # collection.run, collection.reanalyze
+    payload = Column(JSON, nullable=True)
+    priority = Column(Integer, default=0)  # Higher runs first
+    dedupe_key = Column(String(200), unique=True, nullable=True)  # Prevents double enqueue
+
+    # Status tracking
+    status = Column(String(20), default="queued")  # queued, running, succeeded, failed
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=3)
+    run_after = Column(DateTime(timezone=True), nullable=False)  # Earliest start (retry backoff)
+
+    # Lease held by the claiming worker
+    locked_by = Column(String(100), nullable=True)
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Progress and outcome
+    progress = Column(Float, default=0.0)  # 0.0-1.0
+    progress_message = Column(String(200), nullable=True)
+    result = Column(JSON, nullable=True)
+    last_error = Column(Text, nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Indexes
+    __table_args__ = (
+        # Claim: status = 'queued' AND run_after <= now
+        Index('ix_jobs_status_run_after', 'status', 'run_after'),
+    )
+
+    def __repr__(self):
+        return f"<Job {self.id} {self.job_type} - {self.status}>"
+
+    def to_dict(self):
+        """Convert model to dictionary"""
+        return {
+            "id": self.id,
+            "job_type": self.job_type,
+            "payload": self.payload,
+            "priority": self.priority,
+            "status": self.status,
+            "attempts": self.attempts,
+            "max_attempts": self.max_attempts,
+            "run_after": self.run_after.isoformat() if self.run_after else None,
+            "locked_by": self.locked_by,
+            "heartbeat_at": self.heartbeat_at.isoformat() if self.heartbeat_at else None,
+            "progress": self.progress,
+            "progress_message": self.progress_message,
+            "result": self.result,
+            "last_error": self.last_error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None
+        }
@@ -0,0 +1,101 @@
+"""
+Retention Models
+================
+
+Cold storage behind services/retention.py.
+
+- `work_zones_archive` / `collection_runs_archive`: rows moved out of the
+  hot tables once they are old enough. Same columns as the source table,
+  keyed by (id, time) so that on PostgreSQL they can be partitioned by
+  month on that time column (see the migration); on SQLite they are plain
+  tables.
+  A column added to a source table must be added to its archive in the
+  same migration.
+- `work_zone_rollups`: per-camera hourly and daily aggregates of archived
+  real (non-synthetic) work zones, kept after the raw rows are purged.
+"""
+
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Table, Index, UniqueConstraint
+
+from database import Base
+from .work_zone import WorkZone
+from .collection import CollectionRun
+
+
+def archive_table(source: Table, name: str, time_column: str) -> Table:
+    """
+    Archive copy of a table's columns, without defaults, foreign keys or indexes
+
+    The primary key is (id, time_column): a partitioned PostgreSQL table's
+    primary key must include its partition key.
+    """
+    columns = [
+        Column(
+            column.name,
+            column.type,
+            primary_key=column.name in ("id", time_column),
+            nullable=column.nullable and column.name not in ("id", time_column),
+            autoincrement=False
+        )
+        for column in source.columns
+    ]
+    return Table(
+        name,
+        Base.metadata,
+        *columns,
+        # Purge: time_column < cutoff
+        Index(f"ix_{name}_{time_column}", time_column),
+        # Monthly partitions are created on demand by services/retention.py
+        postgresql_partition_by=f"RANGE ({time_column})"
+    )
+
+
+work_zones_archive = archive_table(WorkZone.__table__, "work_zones_archive", "detected_at")
+collection_runs_archive = archive_table(CollectionRun.__table__, "collection_runs_archive", "started_at")
+
+# archive table -> its partition / purge column
+ARCHIVE_TIME_COLUMNS = {
+    "work_zones_archive": "detected_at",
+    "collection_runs_archive": "started_at",
+}
+
+
+class WorkZoneRollup(Base):
+    """Per-camera work zone aggregates for one hour or day"""
+    __tablename__ = "work_zone_rollups"
+
+    id = Column(Integer, primary_key=True)
+    camera_id = Column(Integer, nullable=False)  # No foreign key: outlives deleted cameras
+    granularity = Column(String(10), nullable=False)  # hour, day
+    bucket_start = Column(DateTime(timezone=True), nullable=False)
+
+    # Aggregates (additive, so batches can be merged with an upsert)
+    work_zones = Column(Integer, nullable=False, default=0)  # Tracked work zones detected in the bucket
+    detections = Column(BigInteger, nullable=False, default=0)  # Sum of detection_count
+    high_risk = Column(Integer, nullable=False, default=0)  # risk_score >= 7
+    risk_score_sum = Column(BigInteger, nullable=False, default=0)
+    max_risk_score = Column(Integer, nullable=False, default=0)
+
+    # Indexes
+    __table_args__ = (
+        # Upsert target, and range queries per camera
+        UniqueConstraint('camera_id', 'granularity', 'bucket_start', name='uq_work_zone_rollups_bucket'),
+        # Corridor-wide range queries and hourly purge
+        Index('ix_work_zone_rollups_granularity_bucket', 'granularity', 'bucket_start'),
+    )
+
+    def __repr__(self):
+        return f"<WorkZoneRollup camera {self.camera_id} {self.granularity} {self.bucket_start}>"
+
+    def to_dict(self):
+        """Convert model to dictionary"""
+        return {
+            "camera_id": self.camera_id,
+            "granularity": self.granularity,
+            "bucket_start": self.bucket_start.isoformat() if self.bucket_start else None,
+            "work_zones": self.work_zones,
+            "detections": self.detections,
+            "high_risk": self.high_risk,
+            "avg_risk_score": round(self.risk_score_sum / self.work_zones, 2) if self.work_zones else None,
+            "max_risk_score": self.max_risk_score
+        }
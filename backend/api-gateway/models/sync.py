@@ -0,0 +1,104 @@
+"""
+Change Sync Models
+==================
+
+Global change-version counter and delete tombstones behind `?since=`
+delta sync.
+
+Tracked models (Camera, WorkZone, CameraDirection) carry a
+`change_version` column. Every ORM flush that inserts, updates or deletes
+tracked rows takes the next version from the single `sync_state` row and
+stamps it on those rows; deletes leave a `sync_tombstones` row instead.
+The version therefore changes on every write to a tracked table, which
+also makes it the validator behind ETags (middleware/conditional.py). The UPDATE on `sync_state`
+holds its row lock until commit, so versions become visible in the order
+they were allocated. Core-level bulk writes bypass the flush hook and use
+change_tracking.allocate_change_version().
+"""
+
+from typing import Dict
+
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Index, event, insert, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+
+from database import Base
+
+
+class SyncState(Base):
+    """Single-row change-version counter"""
+    __tablename__ = "sync_state"
+
+    id = Column(Integer, primary_key=True)  # Always 1
+    version = Column(BigInteger, nullable=False, default=0)  # Last allocated change version
+    pruned_through = Column(BigInteger, nullable=False, default=0)  # Deltas from before this are incomplete (retention)
+
+    def __repr__(self):
+        return f"<SyncState version={self.version}>"
+
+
+class SyncTombstone(Base):
+    """Record of a deleted row, so delta clients can drop it"""
+    __tablename__ = "sync_tombstones"
+
+    id = Column(Integer, primary_key=True)
+    entity = Column(String(20), nullable=False)  # camera, work_zone, direction
+    entity_id = Column(Integer, nullable=False)
+    change_version = Column(BigInteger, nullable=False)
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Indexes
+    __table_args__ = (
+        # Delta sync: entity = ? AND change_version > ?
+        Index('ix_sync_tombstones_entity_version', 'entity', 'change_version'),
+    )
+
+    def __repr__(self):
+        return f"<SyncTombstone {self.entity} {self.entity_id} v{self.change_version}>"
+
+
+# model class -> tombstone entity name
+TRACKED_MODELS: Dict[type, str] = {}
+
+
+def next_change_version(connection: Connection) -> int:
+    """Allocate the next change version in the caller's transaction"""
+    version = connection.execute(
+        update(SyncState)
+        .where(SyncState.id == 1)
+        .values(version=SyncState.version + 1)
+        .returning(SyncState.version)
+    ).scalar()
+    if version is None:
+        # Database created by create_all rather than migrations
+        connection.execute(insert(SyncState).values(id=1, version=1, pruned_through=0))
+        version = 1
+    return version
+
+
+def track_changes(model, entity: str) -> None:
+    """Stamp model.change_version on ORM writes and tombstone deletes"""
+    TRACKED_MODELS[model] = entity
+
+
+@event.listens_for(Session, "before_flush")
+def _stamp_change_versions(session: Session, flush_context, instances) -> None:
+    changed = [obj for obj in session.new if type(obj) in TRACKED_MODELS]
+    changed += [
+        obj for obj in session.dirty
+        if type(obj) in TRACKED_MODELS and session.is_modified(obj, include_collections=False)
+    ]
+    deleted = [obj for obj in session.deleted if type(obj) in TRACKED_MODELS]
+    if not changed and not deleted:
+        return
+
+    version = next_change_version(session.connection())
+    for obj in changed:
+        obj.change_version = version
+    for obj in deleted:
+        session.add(SyncTombstone(
+            entity=TRACKED_MODELS[type(obj)],
+            entity_id=obj.id,
+            change_version=version
+        ))
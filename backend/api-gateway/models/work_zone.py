@@ -5,12 +5,14 @@ Work Zone Model
 Represents a detected work zone from AI analysis.
 """
 
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, BigInteger, String, Float, Boolean, DateTime, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from datetime import datetime
 
 from database import Base
+from spatial import track_geohash
+from .sync import track_changes
 
 
 class WorkZone(Base):
@@ -27,6 +29,7 @@ class WorkZone(Base):
     # Location (copied from camera for faster queries)
     latitude = Column(Float, nullable=False)
     longitude = Column(Float, nullable=False)
+    geohash = Column(String(12), nullable=True, index=True)  # Spatial index (see spatial.py)
 
     # Detection details
     risk_score = Column(Integer, nullable=False)  # 1-10
@@ -48,6 +51,8 @@ class WorkZone(Base):
 
     # Image reference
     gcp_image_url = Column(String(500), nullable=True)
+    thumbnail_url = Column(String(500), nullable=True)  # WebP renditions (services/image_derivatives.py)
+    preview_url = Column(String(500), nullable=True)
     collection_id = Column(String(100), nullable=True)
 
     # AI model metadata
@@ -58,13 +63,43 @@ class WorkZone(Base):
     status = Column(String(20), default="active")  # active, resolved, archived
     resolved_at = Column(DateTime(timezone=True), nullable=True)
 
+    # Temporal tracking: one row per physical work zone (services/work_zone_tracker.py)
+    last_seen_at = Column(DateTime(timezone=True), server_default=func.now())
+    detection_count = Column(Integer, nullable=False, default=1, server_default="1")
+    missed_cycles = Column(Integer, nullable=False, default=0, server_default="0")
+    peak_risk_score = Column(Integer, nullable=True)
+    risk_trend = Column(String(10), nullable=True)  # new, rising, falling, steady
+
     # Timestamps
     detected_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # Delta sync (see models/sync.py)
+    change_version = Column(BigInteger, nullable=False, default=0, server_default="0", index=True)
+
     # Relationships
     camera = relationship("Camera", back_populates="work_zones")
 
+    # Indexes
+    __table_args__ = (
+        # Keyset pagination: ORDER BY detected_at DESC, id DESC
+        Index('ix_work_zones_detected_at_id', 'detected_at', 'id'),
+        # Dashboard /active: status = 'active' AND risk_score >= N ORDER BY risk_score
+        Index('ix_work_zones_status_risk_score', 'status', 'risk_score'),
+        # Analysis history/stats only look at real (non-synthetic) detections
+        Index(
+            'ix_work_zones_real_detected_at_id', 'detected_at', 'id',
+            sqlite_where=text('synthetic = 0'),
+            postgresql_where=text('synthetic = false')
+        ),
+        # Re-analysis by collection run (most manual detections have no collection)
+        Index(
+            'ix_work_zones_collection_id', 'collection_id',
+            sqlite_where=text('collection_id IS NOT NULL'),
+            postgresql_where=text('collection_id IS NOT NULL')
+        ),
+    )
+
     def __repr__(self):
         return f"<WorkZone {self.id} - Risk {self.risk_score}/10 at Camera {self.camera_id}>"
 
@@ -87,11 +122,23 @@ class WorkZone(Base):
             "recommendations": self.recommendations,
             "mto_book_compliance": self.mto_book_compliance,
             "gcp_image_url": self.gcp_image_url,
+            "thumbnail_url": self.thumbnail_url,
+            "preview_url": self.preview_url,
             "collection_id": self.collection_id,
             "model": self.model,
             "synthetic": self.synthetic,
             "status": self.status,
             "resolved_at": self.resolved_at.isoformat() if self.resolved_at else None,
+            "last_seen_at": self.last_seen_at.isoformat() if self.last_seen_at else None,
+            "detection_count": self.detection_count,
+            "missed_cycles": self.missed_cycles,
+            "peak_risk_score": self.peak_risk_score,
+            "risk_trend": self.risk_trend,
             "detected_at": self.detected_at.isoformat() if self.detected_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "change_version": self.change_version
         }
+
+
+track_geohash(WorkZone)
+track_changes(WorkZone, "work_zone")
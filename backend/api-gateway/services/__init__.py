@@ -7,24 +7,57 @@ Business logic and external service integrations.
 
 from .gemini_service import gemini_service, analyze_work_zone_image, batch_analyze_images
 from .gcp_storage_service import gcp_storage_service, upload_camera_image, list_camera_images
+from .image_storage import image_storage, store_camera_image
+from .image_derivatives import image_derivative_service, create_image_derivatives
 from .camera_service import camera_service, fetch_camera_image, fetch_multiple_camera_images
+from .camera_health import camera_health_monitor, get_camera_health_stats
+from .response_cache import response_cache, invalidate_cache
+from .direction_import import import_directions_csv, upsert_directions
+from .event_bus import event_bus, publish_event
+from .job_queue import job_queue, job_worker_pool, enqueue_job
+from .work_zone_tracker import work_zone_tracker, track_work_zones
 from .analysis_service import (
     analysis_orchestration_service,
     run_camera_analysis,
     analyze_single_camera_image
 )
+from .collection_scheduler import collection_scheduler, get_scheduler_stats
+from .retention import retention_service
+from .history_export import history_exporter, export_history
 
 __all__ = [
     "gemini_service",
     "gcp_storage_service",
+    "image_storage",
+    "image_derivative_service",
     "camera_service",
+    "camera_health_monitor",
     "analysis_orchestration_service",
+    "response_cache",
+    "invalidate_cache",
+    "import_directions_csv",
+    "upsert_directions",
+    "event_bus",
+    "publish_event",
+    "job_queue",
+    "job_worker_pool",
+    "enqueue_job",
+    "work_zone_tracker",
+    "track_work_zones",
+    "collection_scheduler",
+    "get_scheduler_stats",
+    "retention_service",
+    "history_exporter",
     "analyze_work_zone_image",
     "batch_analyze_images",
     "upload_camera_image",
     "list_camera_images",
+    "store_camera_image",
+    "export_history",
+    "create_image_derivatives",
     "fetch_camera_image",
     "fetch_multiple_camera_images",
+    "get_camera_health_stats",
     "run_camera_analysis",
     "analyze_single_camera_image"
 ]
@@ -0,0 +1,235 @@
+"""
+Admission Control Service
+=========================
+
+Per-client token buckets, per-route concurrency caps and load shedding.
+
+Requests are split into two classes:
+- expensive: Gemini analysis, collection runs, bulk imports
+- standard: everything else (dashboard reads, CRUD)
+
+Expensive routes are shed first. Each has a concurrency cap, and they are
+refused once the gateway's total in-flight count passes the soft limit.
+Standard requests are only shed at the hard limit, so dashboard reads keep
+working while batch jobs are throttled.
+"""
+
+import logging
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+EXPENSIVE = "expensive"
+STANDARD = "standard"
+
+# (method, path) of expensive routes; a trailing "/" matches by prefix
+EXPENSIVE_ROUTES = [
+    ("POST", "/api/analysis/image"),
+    ("POST", "/api/analysis/upload"),
+    ("POST", "/api/analysis/batch"),
+    ("POST", "/api/analysis/prompt"),
+    ("POST", "/api/collection/start"),
+    ("POST", "/api/collection/analyze/"),
+    ("POST", "/api/directions/analyze"),
+    ("POST", "/api/directions/import-csv"),
+    ("GET", "/api/export/"),
+]
+
+# Per-route in-flight caps for expensive routes (others use the class default)
+ROUTE_CONCURRENCY_LIMITS = {
+    "/api/analysis/batch": 2,
+    "/api/collection/start": 2,
+    "/api/collection/analyze/": 2,
+}
+
+# Never limited (health checks, metrics scrapes, docs)
+EXEMPT_PATHS = {"/", "/health", "/metrics", "/api/docs", "/api/redoc", "/api/openapi.json"}
+
+
+@dataclass
+class TokenBucket:
+    """Classic token bucket refilled continuously"""
+    rate: float  # tokens per second
+    capacity: float
+    tokens: float = field(default=-1.0)
+    updated_at: float = field(default_factory=time.monotonic)
+
+    def __post_init__(self):
+        if self.tokens < 0:
+            self.tokens = self.capacity
+
+    def take(self, now: float) -> float:
+        """
+        Take one token
+
+        Returns:
+            0 if admitted, otherwise seconds until a token is available
+        """
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+@dataclass
+class Decision:
+    """Admission decision"""
+    admitted: bool
+    route_class: str
+    route_key: str
+    retry_after: int = 0
+    reason: Optional[str] = None
+
+
+class AdmissionController:
+    """Decides whether a request is admitted, and tracks in-flight work"""
+
+    # Idle buckets are pruned once the table grows past this size
+    MAX_BUCKETS = 10000
+    BUCKET_IDLE_SECONDS = 600
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        standard_rate: float = 10.0,
+        standard_burst: int = 40,
+        expensive_rate: float = 0.1,
+        expensive_burst: int = 3,
+        expensive_concurrency: int = 4,
+        soft_inflight_limit: int = 100,
+        hard_inflight_limit: int = 200
+    ):
+        self.enabled = enabled
+        self.bucket_params = {
+            STANDARD: (standard_rate, standard_burst),
+            EXPENSIVE: (expensive_rate, expensive_burst),
+        }
+        self.expensive_concurrency = expensive_concurrency
+        self.soft_inflight_limit = soft_inflight_limit
+        self.hard_inflight_limit = hard_inflight_limit
+
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self._route_inflight: Dict[str, int] = {}
+        self.inflight = 0
+        self.metrics = {
+            STANDARD: {"admitted": 0, "shed_rate_limit": 0, "shed_concurrency": 0, "shed_overload": 0},
+            EXPENSIVE: {"admitted": 0, "shed_rate_limit": 0, "shed_concurrency": 0, "shed_overload": 0},
+        }
+
+    @staticmethod
+    def classify(method: str, path: str) -> Tuple[str, str]:
+        """
+        Classify a request
+
+        Returns:
+            (route_class, route_key) where route_key groups concurrency caps
+        """
+        for route_method, route_path in EXPENSIVE_ROUTES:
+            if method != route_method:
+                continue
+            if path == route_path or (route_path.endswith("/") and path.startswith(route_path)):
+                return EXPENSIVE, route_path
+        return STANDARD, path
+
+    def admit(self, client_id: str, method: str, path: str) -> Decision:
+        """
+        Decide admission and reserve an in-flight slot if admitted
+
+        Callers must call release(decision) once an admitted request finishes.
+        """
+        route_class, route_key = self.classify(method, path)
+
+        # 1. Load shedding: expensive work goes first, reads only at the hard limit
+        limit = self.soft_inflight_limit if route_class == EXPENSIVE else self.hard_inflight_limit
+        if self.inflight >= limit:
+            return self._shed(route_class, route_key, "shed_overload", 1, "Server overloaded")
+
+        # 2. Per-route concurrency cap for expensive routes
+        if route_class == EXPENSIVE:
+            cap = ROUTE_CONCURRENCY_LIMITS.get(route_key, self.expensive_concurrency)
+            if self._route_inflight.get(route_key, 0) >= cap:
+                return self._shed(route_class, route_key, "shed_concurrency", 5, "Too many concurrent requests")
+
+        # 3. Per-client token bucket
+        now = time.monotonic()
+        wait = self._bucket(client_id, route_class, now).take(now)
+        if wait > 0:
+            return self._shed(route_class, route_key, "shed_rate_limit", math.ceil(wait), "Rate limit exceeded")
+
+        self.inflight += 1
+        self._route_inflight[route_key] = self._route_inflight.get(route_key, 0) + 1
+        self.metrics[route_class]["admitted"] += 1
+        return Decision(admitted=True, route_class=route_class, route_key=route_key)
+
+    def release(self, decision: Decision) -> None:
+        """Free the in-flight slot of an admitted request"""
+        if not decision.admitted:
+            return
+
+        self.inflight -= 1
+        remaining = self._route_inflight.get(decision.route_key, 1) - 1
+        if remaining > 0:
+            self._route_inflight[decision.route_key] = remaining
+        else:
+            self._route_inflight.pop(decision.route_key, None)
+
+    def stats(self):
+        """Admission metrics for /health"""
+        return {
+            "enabled": self.enabled,
+            "inflight": self.inflight,
+            "tracked_clients": len({client for client, _ in self._buckets}),
+            "standard": dict(self.metrics[STANDARD]),
+            "expensive": dict(self.metrics[EXPENSIVE])
+        }
+
+    def _shed(self, route_class: str, route_key: str, metric: str, retry_after: int, reason: str) -> Decision:
+        self.metrics[route_class][metric] += 1
+        logger.warning(f"⚠️  Shed {route_class} request to {route_key}: {reason}")
+        return Decision(
+            admitted=False,
+            route_class=route_class,
+            route_key=route_key,
+            retry_after=max(1, retry_after),
+            reason=reason
+        )
+
+    def _bucket(self, client_id: str, route_class: str, now: float) -> TokenBucket:
+        key = (client_id, route_class)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.MAX_BUCKETS:
+                self._prune(now)
+            rate, burst = self.bucket_params[route_class]
+            bucket = TokenBucket(rate=rate, capacity=burst, updated_at=now)
+            self._buckets[key] = bucket
+        return bucket
+
+    def _prune(self, now: float) -> None:
+        idle = [
+            key for key, bucket in self._buckets.items()
+            if now - bucket.updated_at > self.BUCKET_IDLE_SECONDS
+        ]
+        for key in idle:
+            del self._buckets[key]
+
+
+# Global service instance
+admission_controller = AdmissionController(
+    enabled=settings.ENABLE_RATE_LIMITING,
+    standard_rate=settings.RATE_LIMIT_REQUESTS_PER_SECOND,
+    standard_burst=settings.RATE_LIMIT_BURST,
+    expensive_rate=settings.RATE_LIMIT_EXPENSIVE_PER_MINUTE / 60,
+    expensive_burst=settings.RATE_LIMIT_EXPENSIVE_BURST,
+    expensive_concurrency=settings.MAX_CONCURRENT_EXPENSIVE_REQUESTS,
+    soft_inflight_limit=settings.LOAD_SHED_SOFT_LIMIT,
+    hard_inflight_limit=settings.LOAD_SHED_HARD_LIMIT
+)
@@ -3,34 +3,51 @@ Analysis Orchestration Service
 ===============================
 
 Orchestrates the complete workflow:
-Camera Image Collection → GCP Upload → Gemini Analysis → Work Zone Storage
+Camera Image Collection → Image Storage (+ WebP derivatives) → Gemini Analysis → Work Zone Storage
 """
 
+import base64
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, Awaitable
 from datetime import datetime
 import asyncio
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update
 
+from database import AsyncSessionLocal
 from models import Camera, WorkZone, CollectionRun
 from .camera_service import camera_service
-from .gcp_storage_service import gcp_storage_service
+from .camera_health import camera_health_monitor
+from .image_storage import image_storage
+from .image_derivatives import create_image_derivatives
+from .work_zone_tracker import Observation, track_work_zones
 from .gemini_service import gemini_service
+from .response_cache import invalidate_cache
+from .event_bus import publish_event
+from .job_queue import job_handler, JobContext, PermanentJobError
+
+# progress(fraction 0.0-1.0, message) callback used by job handlers
+ProgressCallback = Callable[[float, Optional[str]], Awaitable[None]]
 
 logger = logging.getLogger(__name__)
 
 
+def _encode_image(image_data: bytes) -> str:
+    """Base64 payload for gemini_service.analyze_work_zone"""
+    return base64.b64encode(image_data).decode("ascii")
+
+
 class AnalysisOrchestrationService:
     """
     Service for orchestrating end-to-end work zone detection
 
     Workflow:
     1. Fetch images from COMPASS cameras
-    2. Upload to GCP Cloud Storage
+    2. Store images (GCS or local disk, deduplicated by content) and render
+       their WebP thumbnails/previews in the background
     3. Analyze with Gemini Vision API
-    4. Store detected work zones in database
+    4. Match detections to open work zones (update, create or auto-resolve)
     5. Update collection run statistics
     """
 
@@ -39,7 +56,8 @@ class AnalysisOrchestrationService:
         camera_ids: List[int],
         collection_id: str,
         min_risk_threshold: int,
-        db: AsyncSession
+        db: AsyncSession,
+        progress: Optional[ProgressCallback] = None
     ) -> Dict[str, Any]:
         """
         Run complete analysis workflow for specified cameras
@@ -48,7 +66,8 @@ class AnalysisOrchestrationService:
             camera_ids: List of camera database IDs
             collection_id: Collection run identifier
             min_risk_threshold: Minimum risk score to store work zones
-            db: Database session
+            db: Database session (owned by the caller, not request-scoped)
+            progress: Optional callback invoked after each camera
 
         Returns:
             Analysis summary
@@ -66,74 +85,87 @@ class AnalysisOrchestrationService:
         if not collection_run:
             raise ValueError(f"Collection {collection_id} not found")
 
+        # A retried job starts the run over
+        collection_run.status = "in_progress"
+        collection_run.error_message = None
+        await db.commit()
+
         try:
             # Step 1: Fetch cameras from database
             cameras_query = select(Camera).where(Camera.id.in_(camera_ids))
             cameras_result = await db.execute(cameras_query)
-            cameras = list(cameras_result.scalars().all())
+            cameras_by_id = {cam.camera_id: cam for cam in cameras_result.scalars().all()}
+
+            # Open circuits are skipped; half-open cameras (on trial) go last
+            camera_id_strings, skipped = camera_health_monitor.plan(list(cameras_by_id))
+            cameras = [cameras_by_id[camera_id_str] for camera_id_str in camera_id_strings]
+            if skipped:
+                logger.info(f"⏭️  Skipping {len(skipped)} cameras with open circuits")
 
             logger.info(f"📷 Fetching images from {len(cameras)} cameras...")
 
             # Step 2: Fetch camera images
-            camera_id_strings = [cam.camera_id for cam in cameras]
             fetch_results = await camera_service.fetch_multiple_cameras(camera_id_strings)
+            for camera_id_str, image_data in fetch_results:
+                if camera_id_str is not None:
+                    camera_health_monitor.record_fetch(camera_id_str, image_data)
+
+            # Store fetched frames in parallel (identical frames are written once)
+            fetched = [(camera_id_str, image_data) for camera_id_str, image_data in fetch_results if image_data is not None]
+            stored_frames = await image_storage.put_many([
+                {"data": image_data, "camera_id": camera_id_str} for camera_id_str, image_data in fetched
+            ])
+            stored_images = iter(stored_frames)
+
+            # Render thumbnails/previews in the worker pool while Gemini runs
+            derivative_tasks: Dict[str, asyncio.Task] = {}
+            for (_, image_data), stored in zip(fetched, stored_frames):
+                if stored and stored.key not in derivative_tasks:
+                    derivative_tasks[stored.key] = asyncio.create_task(create_image_derivatives(stored.key, image_data))
 
             # Track statistics
             images_collected = 0
             images_failed = 0
             work_zones_detected = 0
             high_risk_zones = 0
+            observations: List[Observation] = []
 
             # Step 3: Process each camera image
-            for (camera_id_str, image_data), camera in zip(fetch_results, cameras):
+            for index, ((camera_id_str, image_data), camera) in enumerate(zip(fetch_results, cameras), start=1):
+                if progress:
+                    await progress((index - 1) / max(len(cameras), 1), f"Analyzing {camera_id_str} ({index}/{len(cameras)})")
+
                 if image_data is None:
                     images_failed += 1
                     logger.warning(f"⚠️  Failed to fetch image from {camera_id_str}")
                     continue
 
                 images_collected += 1
+                stored = next(stored_images)
+                image_url = stored.url if stored else None
+                if not stored:
+                    # Still analyzed; the work zone just has no stored image
+                    logger.warning(f"⚠️  Failed to store image from {camera_id_str}")
 
                 try:
-                    # Upload to GCP
-                    filename = f"{camera_id_str}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.jpg"
-                    gcp_url = await gcp_storage_service.upload_image(
-                        image_data,
-                        filename,
-                        camera_id_str
-                    )
-
-                    if not gcp_url:
-                        logger.warning(f"⚠️  Failed to upload {camera_id_str} to GCP")
-                        continue
-
-                    # Analyze with Gemini
+                    # Analyze with Gemini (the bytes we already have, not a URL)
                     logger.info(f"🔍 Analyzing {camera_id_str}...")
-                    analysis = await gemini_service.analyze_work_zone(gcp_url, "url")
-
-                    # Store work zone if detected and risk >= threshold
-                    if analysis["has_work_zone"] and analysis["risk_score"] >= min_risk_threshold:
-                        work_zone = WorkZone(
-                            camera_id=camera.id,
-                            latitude=camera.latitude,
-                            longitude=camera.longitude,
-                            risk_score=analysis["risk_score"],
-                            confidence=analysis["confidence"],
-                            workers=analysis.get("workers", 0),
-                            vehicles=analysis.get("vehicles", 0),
-                            equipment=analysis.get("equipment", 0),
-                            barriers=analysis.get("barriers", False),
-                            hazards=analysis.get("hazards"),
-                            violations=analysis.get("violations"),
-                            recommendations=analysis.get("recommendations"),
-                            mto_book_compliance=analysis.get("mto_book_compliance", False),
-                            gcp_image_url=gcp_url,
-                            collection_id=collection_id,
-                            model="gemini-2.0-flash-exp",
-                            synthetic=False,
-                            status="active"
-                        )
-
-                        db.add(work_zone)
+                    analysis = await gemini_service.analyze_work_zone(_encode_image(image_data), "base64")
+
+                    # Work zone if detected and risk >= threshold (an absence counts too)
+                    detected = analysis["has_work_zone"] and analysis["risk_score"] >= min_risk_threshold
+                    image_urls = {"gcp_image_url": image_url}
+                    if detected and stored:
+                        image_urls.update(await derivative_tasks[stored.key])
+                    observations.append(Observation(
+                        camera=camera,
+                        analysis=analysis,
+                        detected=detected,
+                        image_urls=image_urls,
+                        collection_id=collection_id
+                    ))
+
+                    if detected:
                         work_zones_detected += 1
 
                         if analysis["risk_score"] >= 7:
@@ -148,7 +180,13 @@ class AnalysisOrchestrationService:
                     logger.error(f"❌ Error processing {camera_id_str}: {e}", exc_info=True)
                     images_failed += 1
 
-            # Step 4: Update collection run
+            # Renditions of frames without a work zone are still stored
+            await asyncio.gather(*derivative_tasks.values())
+
+            # Step 4: Update, create or resolve tracked work zones
+            tracking = await track_work_zones(db, observations)
+
+            # Step 5: Update collection run
             collection_run.images_collected = images_collected
             collection_run.images_failed = images_failed
             collection_run.work_zones_detected = work_zones_detected
@@ -157,6 +195,8 @@ class AnalysisOrchestrationService:
             collection_run.completed_at = datetime.utcnow()
 
             await db.commit()
+            invalidate_cache("work_zones", "collection")
+            tracking.publish_events()
 
             end_time = datetime.utcnow()
             duration = (end_time - start_time).total_seconds()
@@ -165,26 +205,34 @@ class AnalysisOrchestrationService:
                 f"✅ Analysis complete: {work_zones_detected} work zones detected "
                 f"in {duration:.1f}s"
             )
+            publish_event("collection.completed", collection_run.to_dict())
 
             return {
                 "collection_id": collection_id,
                 "status": "completed",
                 "cameras_processed": len(cameras),
+                "cameras_skipped": skipped,
                 "images_collected": images_collected,
                 "images_failed": images_failed,
                 "work_zones_detected": work_zones_detected,
                 "high_risk_zones": high_risk_zones,
+                **tracking.summary(),
                 "duration_seconds": round(duration, 2),
                 "started_at": start_time.isoformat(),
                 "completed_at": end_time.isoformat()
             }
 
         except Exception as e:
-            # Mark collection as failed
-            collection_run.status = "failed"
-            collection_run.error_message = str(e)
-            collection_run.completed_at = datetime.utcnow()
+            # Discard partial work zones, then mark collection as failed
+            await db.rollback()
+            await db.execute(
+                update(CollectionRun)
+                .where(CollectionRun.collection_id == collection_id)
+                .values(status="failed", error_message=str(e)[:500], completed_at=datetime.utcnow())
+            )
             await db.commit()
+            invalidate_cache("work_zones", "collection")
+            publish_event("collection.failed", {"collection_id": collection_id, "error_message": str(e)[:500]})
 
             logger.error(f"❌ Analysis failed: {e}", exc_info=True)
             raise
@@ -215,62 +263,52 @@ class AnalysisOrchestrationService:
             if not camera:
                 raise ValueError(f"Camera {camera_id} not found")
 
+            if not camera_health_monitor.available(camera.camera_id):
+                logger.info(f"⏭️  Skipping {camera.camera_id} (circuit open)")
+                return None
+
             # Fetch image
             logger.info(f"📷 Fetching image from {camera.camera_id}...")
             image_data = await camera_service.fetch_camera_image(camera.camera_id)
+            camera_health_monitor.record_fetch(camera.camera_id, image_data)
 
             if not image_data:
                 return None
 
-            # Upload to GCP
-            filename = f"{camera.camera_id}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.jpg"
-            gcp_url = await gcp_storage_service.upload_image(
-                image_data,
-                filename,
-                camera.camera_id
-            )
+            # Store
+            stored = await image_storage.put(image_data, camera.camera_id)
+            image_url = stored.url if stored else None
+            if not stored:
+                logger.warning(f"⚠️  Failed to store image from {camera.camera_id}")
 
-            if not gcp_url:
-                return None
-
-            # Analyze
+            # Analyze, rendering thumbnail/preview alongside
             logger.info(f"🔍 Analyzing {camera.camera_id}...")
-            analysis = await gemini_service.analyze_work_zone(gcp_url, "url")
-
-            # Store if work zone detected
-            work_zone_id = None
-            if analysis["has_work_zone"] and analysis["risk_score"] >= min_risk_threshold:
-                work_zone = WorkZone(
-                    camera_id=camera.id,
-                    latitude=camera.latitude,
-                    longitude=camera.longitude,
-                    risk_score=analysis["risk_score"],
-                    confidence=analysis["confidence"],
-                    workers=analysis.get("workers", 0),
-                    vehicles=analysis.get("vehicles", 0),
-                    equipment=analysis.get("equipment", 0),
-                    barriers=analysis.get("barriers", False),
-                    hazards=analysis.get("hazards"),
-                    violations=analysis.get("violations"),
-                    recommendations=analysis.get("recommendations"),
-                    mto_book_compliance=analysis.get("mto_book_compliance", False),
-                    gcp_image_url=gcp_url,
-                    model="gemini-2.0-flash-exp",
-                    synthetic=False,
-                    status="active"
-                )
-
-                db.add(work_zone)
-                await db.commit()
-                await db.refresh(work_zone)
-                work_zone_id = work_zone.id
+            analysis, derivative_urls = await asyncio.gather(
+                gemini_service.analyze_work_zone(_encode_image(image_data), "base64"),
+                create_image_derivatives(stored.key, image_data) if stored else asyncio.sleep(0, {})
+            )
+
+            # Match to the camera's open work zone (an absence counts too)
+            tracking = await track_work_zones(db, [Observation(
+                camera=camera,
+                analysis=analysis,
+                detected=analysis["has_work_zone"] and analysis["risk_score"] >= min_risk_threshold,
+                image_urls={"gcp_image_url": image_url, **derivative_urls}
+            )])
+            await db.commit()
+            invalidate_cache("work_zones")
+            tracking.publish_events()
+            work_zone = tracking.work_zone_for(camera.id)
 
             return {
                 "camera_id": camera.camera_id,
                 "camera_location": camera.location,
-                "image_url": gcp_url,
+                "image_url": image_url,
+                "thumbnail_url": derivative_urls.get("thumbnail_url"),
+                "preview_url": derivative_urls.get("preview_url"),
                 "analysis": analysis,
-                "work_zone_id": work_zone_id,
+                "work_zone_id": work_zone.id if work_zone else None,
+                **tracking.summary(),
                 "analyzed_at": datetime.utcnow().isoformat()
             }
 
@@ -320,8 +358,13 @@ class AnalysisOrchestrationService:
                 continue
 
             try:
-                # Re-analyze with new threshold
-                analysis = await gemini_service.analyze_work_zone(wz.gcp_image_url, "url")
+                # Re-analyze with new threshold (from storage when it is ours)
+                image_key = image_storage.key_for_url(wz.gcp_image_url)
+                image_data = await image_storage.get(image_key) if image_key else None
+                if image_data:
+                    analysis = await gemini_service.analyze_work_zone(_encode_image(image_data), "base64")
+                else:
+                    analysis = await gemini_service.analyze_work_zone(wz.gcp_image_url, "url")
 
                 # Update work zone
                 wz.risk_score = analysis["risk_score"]
@@ -348,6 +391,9 @@ class AnalysisOrchestrationService:
                 logger.error(f"❌ Failed to re-analyze work zone {wz.id}: {e}")
 
         await db.commit()
+        invalidate_cache("work_zones")
+        for wz in existing_work_zones:
+            publish_event("work_zone.updated", wz.to_dict())
 
         return {
             "collection_id": collection_id,
@@ -362,6 +408,37 @@ class AnalysisOrchestrationService:
 analysis_orchestration_service = AnalysisOrchestrationService()
 
 
+# Background job handlers (run by services/job_queue.py workers)
+@job_handler("collection.run")
+async def run_collection_job(ctx: JobContext) -> Dict[str, Any]:
+    """Collect, upload and analyze images for a collection run"""
+    payload = ctx.payload
+    async with AsyncSessionLocal() as db:
+        try:
+            return await analysis_orchestration_service.run_full_analysis(
+                payload["camera_ids"],
+                payload["collection_id"],
+                payload.get("min_risk_threshold", 5),
+                db,
+                progress=ctx.report_progress
+            )
+        except ValueError as e:
+            # Collection run was deleted; retrying cannot help
+            raise PermanentJobError(str(e)) from e
+
+
+@job_handler("collection.reanalyze")
+async def reanalyze_collection_job(ctx: JobContext) -> Dict[str, Any]:
+    """Re-analyze stored images of a collection run"""
+    payload = ctx.payload
+    async with AsyncSessionLocal() as db:
+        return await analysis_orchestration_service.reanalyze_existing_images(
+            payload["collection_id"],
+            payload.get("min_risk_threshold", 5),
+            db
+        )
+
+
 # Convenience functions
 async def run_camera_analysis(
     camera_ids: List[int],
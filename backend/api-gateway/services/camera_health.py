@@ -0,0 +1,434 @@
+"""
+Camera Health Monitor
+=====================
+
+Per-camera circuit breakers, fed by lightweight background probes and by
+the outcome of every real image fetch.
+
+A camera whose fetches keep failing costs a collection run the full fetch
+timeout (10s) on every poll, often for days. After
+CAMERA_CIRCUIT_FAILURE_THRESHOLD consecutive failures its circuit opens.
+Collection runs and scheduled polls then skip it without a request. Once the
+cool-down (CAMERA_CIRCUIT_OPEN_SECONDS) has passed, the circuit is half-open:
+the next probe or fetch is a trial. Success closes the circuit; failure
+reopens it for twice as long, up to CAMERA_CIRCUIT_MAX_OPEN_SECONDS.
+Half-open cameras are fetched last in a collection run, after the healthy
+ones.
+
+With CAMERA_HEALTH_ENABLED, active cameras are probed every
+CAMERA_HEALTH_INTERVAL_SECONDS with a HEAD request (a one-byte range GET if
+the server rejects HEAD), CAMERA_HEALTH_CONCURRENCY at a time. Cameras
+fetched by a collection run since their last probe are not probed again
+that interval. Successful probes update a latency EWMA.
+
+Connectivity stats are computed from this cached state, without any
+requests. State is per process: every gateway and worker.py keeps its own.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+
+from config import settings
+from database import AsyncSessionLocal
+from models import Camera
+from .camera_service import camera_service
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Spread of each camera's next probe around the interval (fraction)
+PROBE_JITTER_FRACTION = 0.1
+
+
+def _isoformat(timestamp: Optional[float]) -> Optional[str]:
+    return datetime.utcfromtimestamp(timestamp).isoformat() if timestamp else None
+
+
+@dataclass
+class CameraHealth:
+    """Circuit breaker and probe history of one camera"""
+    camera_id: str
+    state: str = CLOSED
+    consecutive_failures: int = 0
+    open_seconds: float = 0.0  # Current cool-down (doubles on each failed trial)
+    open_until: float = 0.0
+    opened_at: Optional[float] = None
+    latency_ewma: Optional[float] = None  # Seconds, successful probes only
+    status: Optional[str] = None  # online, offline, timeout, error (None = never checked)
+    status_code: Optional[int] = None
+    error: Optional[str] = None
+    checked_at: Optional[float] = None
+    last_online_at: Optional[float] = None
+    next_probe_at: float = 0.0
+    probes: int = 0
+    failures: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "camera_id": self.camera_id,
+            "circuit": self.state,
+            "status": self.status,
+            "status_code": self.status_code,
+            "error": self.error,
+            "consecutive_failures": self.consecutive_failures,
+            "latency_ewma_ms": round(self.latency_ewma * 1000, 1) if self.latency_ewma is not None else None,
+            "opened_at": _isoformat(self.opened_at),
+            "retry_after_seconds": round(max(self.open_until - time.time(), 0.0), 1) if self.state == OPEN else None,
+            "checked_at": _isoformat(self.checked_at),
+            "last_online_at": _isoformat(self.last_online_at),
+            "probes": self.probes,
+            "failures": self.failures
+        }
+
+
+class CameraHealthMonitor:
+    """Background camera probes and per-camera circuit breakers"""
+
+    def __init__(
+        self,
+        interval_seconds: float = 300.0,
+        probe_timeout_seconds: float = 5.0,
+        concurrency: int = 10,
+        failure_threshold: int = 3,
+        open_seconds: float = 300.0,
+        max_open_seconds: float = 21600.0,
+        ewma_alpha: float = 0.3
+    ):
+        self.interval_seconds = interval_seconds
+        self.probe_timeout_seconds = probe_timeout_seconds
+        self.concurrency = concurrency
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.ewma_alpha = ewma_alpha
+
+        self.cameras: Dict[str, CameraHealth] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._stopped = asyncio.Event()
+        self.metrics = {
+            "probes": 0, "probe_failures": 0, "fetches_recorded": 0,
+            "circuits_opened": 0, "circuits_closed": 0, "cameras_skipped": 0
+        }
+
+    # Circuit breakers
+
+    def health(self, camera_id: str) -> CameraHealth:
+        health = self.cameras.get(camera_id)
+        if health is None:
+            health = self.cameras[camera_id] = CameraHealth(camera_id)
+        return health
+
+    def state(self, camera_id: str) -> str:
+        """Circuit state; an open circuit past its cool-down is half-open"""
+        health = self.cameras.get(camera_id)
+        if health is None:
+            return CLOSED
+        if health.state == OPEN and time.time() >= health.open_until:
+            health.state = HALF_OPEN
+        return health.state
+
+    def available(self, camera_id: str) -> bool:
+        """False while the camera's circuit is open"""
+        return self.state(camera_id) != OPEN
+
+    def plan(self, camera_ids: Sequence[str]) -> Tuple[List[str], List[str]]:
+        """
+        Order cameras for a collection run
+
+        Args:
+            camera_ids: Camera identifiers, in their original order
+
+        Returns:
+            (cameras to fetch, healthy first and half-open last; open-circuit cameras skipped)
+        """
+        healthy, trials, skipped = [], [], []
+        for camera_id in camera_ids:
+            state = self.state(camera_id)
+            if state == OPEN:
+                skipped.append(camera_id)
+            elif state == HALF_OPEN:
+                trials.append(camera_id)
+            else:
+                healthy.append(camera_id)
+        self.metrics["cameras_skipped"] += len(skipped)
+        return healthy + trials, skipped
+
+    def record_success(self, camera_id: str, latency_seconds: Optional[float] = None, status_code: int = 200) -> None:
+        """A probe or fetch got an image (latency: probe round trip)"""
+        health = self.health(camera_id)
+        now = time.time()
+        if health.state != CLOSED:
+            self.metrics["circuits_closed"] += 1
+            logger.info(f"🟢 {camera_id} circuit closed (back online after {health.consecutive_failures} failures)")
+        health.state = CLOSED
+        health.consecutive_failures = 0
+        health.open_seconds = 0.0
+        health.opened_at = None
+        health.status, health.status_code, health.error = "online", status_code, None
+        health.checked_at = health.last_online_at = now
+        if latency_seconds is not None:
+            health.latency_ewma = latency_seconds if health.latency_ewma is None else (
+                self.ewma_alpha * latency_seconds + (1 - self.ewma_alpha) * health.latency_ewma
+            )
+
+    def record_failure(
+        self,
+        camera_id: str,
+        status: str = "error",
+        status_code: Optional[int] = None,
+        error: Optional[str] = None
+    ) -> None:
+        """A probe or fetch failed (status: offline, timeout or error)"""
+        health = self.health(camera_id)
+        now = time.time()
+        health.consecutive_failures += 1
+        health.failures += 1
+        health.status, health.status_code, health.error = status, status_code, error
+        health.checked_at = now
+
+        state = self.state(camera_id)
+        if state == HALF_OPEN:
+            # Trial failed: back off further
+            self._open(health, min(health.open_seconds * 2, self.max_open_seconds), now)
+        elif state == CLOSED and health.consecutive_failures >= self.failure_threshold:
+            self.metrics["circuits_opened"] += 1
+            self._open(health, self.open_seconds, now)
+            logger.warning(
+                f"🔴 {camera_id} circuit opened after {health.consecutive_failures} failures "
+                f"({status}); skipped for {health.open_seconds:.0f}s"
+            )
+
+    def _open(self, health: CameraHealth, seconds: float, now: float) -> None:
+        health.state = OPEN
+        health.open_seconds = seconds
+        health.open_until = now + seconds
+        health.opened_at = health.opened_at or now
+        # Probe again when the cool-down ends
+        health.next_probe_at = health.open_until
+
+    def record_fetch(self, camera_id: str, image_data: Optional[bytes]) -> None:
+        """Outcome of a real image fetch (collection runs, scheduled polls)"""
+        self.metrics["fetches_recorded"] += 1
+        if image_data is not None:
+            self.record_success(camera_id)
+            # Just seen: no probe needed this interval
+            self.health(camera_id).next_probe_at = time.time() + self._probe_delay()
+        else:
+            self.record_failure(camera_id, error="Image fetch failed")
+
+    # Probes
+
+    def _probe_delay(self) -> float:
+        return self.interval_seconds * random.uniform(1 - PROBE_JITTER_FRACTION, 1 + PROBE_JITTER_FRACTION)
+
+    async def probe(self, camera_id: str) -> Dict[str, Any]:
+        """HEAD/range-probe one camera and record the result"""
+        result = await camera_service.test_camera_connection(camera_id, timeout=self.probe_timeout_seconds)
+        self.metrics["probes"] += 1
+        health = self.health(camera_id)
+        health.probes += 1
+
+        if result["status"] == "online":
+            self.record_success(camera_id, result["response_time_seconds"], result["status_code"])
+        else:
+            self.metrics["probe_failures"] += 1
+            self.record_failure(camera_id, result["status"], result.get("status_code"), result.get("error"))
+
+        if health.state != OPEN:
+            health.next_probe_at = time.time() + self._probe_delay()
+        return result
+
+    async def refresh(self, camera_ids: Sequence[str]) -> int:
+        """
+        Probe cameras not checked within the last interval
+
+        Used instead of the background loop when the monitor is not
+        running. Open circuits are left alone.
+
+        Args:
+            camera_ids: Cameras to bring up to date
+
+        Returns:
+            Number of cameras probed
+        """
+        now = time.time()
+        due = [
+            camera_id for camera_id in camera_ids
+            if self.available(camera_id) and (
+                camera_id not in self.cameras
+                or self.cameras[camera_id].checked_at is None
+                or now - self.cameras[camera_id].checked_at >= self.interval_seconds
+            )
+        ]
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def probe_with_limit(camera_id: str) -> None:
+            async with semaphore:
+                await self.probe(camera_id)
+
+        results = await asyncio.gather(*(probe_with_limit(camera_id) for camera_id in due), return_exceptions=True)
+        for camera_id, result in zip(due, results):
+            if isinstance(result, Exception):
+                logger.error(f"❌ Probe of {camera_id} failed: {result}")
+        return len(due)
+
+    @property
+    def running(self) -> bool:
+        """Whether the background probe loop is active"""
+        return self._task is not None
+
+    async def start(self) -> None:
+        """Start probing active cameras"""
+        if self._task:
+            return
+        self._stopped = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            f"✅ Camera health monitor started (every {self.interval_seconds:.0f}s, "
+            f"{self.concurrency} concurrent probes)"
+        )
+
+    async def stop(self) -> None:
+        """Stop probing"""
+        if not self._task:
+            return
+        self._stopped.set()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        logger.info("✅ Camera health monitor stopped")
+
+    async def _load_cameras(self) -> List[str]:
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(select(Camera.camera_id).where(Camera.active == True))
+            return list(result.scalars().all())
+
+    async def _run(self) -> None:
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def probe_with_limit(camera_id: str) -> None:
+            async with semaphore:
+                if not self._stopped.is_set():
+                    await self.probe(camera_id)
+
+        reload_at = 0.0
+        active: List[str] = []
+        while not self._stopped.is_set():
+            now = time.time()
+            if now >= reload_at:
+                try:
+                    active = await self._load_cameras()
+                    # Deactivated or deleted cameras are forgotten
+                    for camera_id in set(self.cameras) - set(active):
+                        del self.cameras[camera_id]
+                except Exception as e:
+                    logger.error(f"❌ Health monitor could not load cameras: {e}")
+                reload_at = now + self.interval_seconds
+
+            due = [camera_id for camera_id in active if self.health(camera_id).next_probe_at <= now]
+            if due:
+                results = await asyncio.gather(*(probe_with_limit(camera_id) for camera_id in due), return_exceptions=True)
+                for camera_id, result in zip(due, results):
+                    if isinstance(result, Exception):
+                        logger.error(f"❌ Probe of {camera_id} failed: {result}")
+                        self.health(camera_id).next_probe_at = time.time() + self._probe_delay()
+                continue
+
+            next_due = min((self.cameras[camera_id].next_probe_at for camera_id in active), default=reload_at)
+            try:
+                await asyncio.wait_for(self._stopped.wait(), timeout=max(min(next_due, reload_at) - time.time(), 0.0))
+            except asyncio.TimeoutError:
+                pass
+
+    # Cached stats
+
+    def connectivity_stats(self, camera_ids: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """
+        Connectivity statistics from cached state (no requests)
+
+        Rates and latencies cover tested cameras only, and are None until
+        at least one camera has been checked. monitor_running is False when
+        nothing probes in the background, so only fetches and refresh()
+        update the state.
+
+        Args:
+            camera_ids: Cameras to include (default: every camera seen)
+
+        Returns:
+            Same fields as a live re-test, plus circuit states and untested cameras
+        """
+        camera_ids = list(self.cameras) if camera_ids is None else list(camera_ids)
+        statuses = {"online": 0, "offline": 0, "timeout": 0, "error": 0, "untested": 0}
+        circuits = {CLOSED: 0, HALF_OPEN: 0, OPEN: 0}
+        latencies = []
+        checked = []
+        for camera_id in camera_ids:
+            health = self.cameras.get(camera_id)
+            circuits[self.state(camera_id)] += 1
+            if health is None or health.status is None:
+                statuses["untested"] += 1
+                continue
+            statuses[health.status] += 1
+            checked.append(health.checked_at)
+            if health.latency_ewma is not None:
+                latencies.append(health.latency_ewma)
+
+        return {
+            "total_cameras": len(camera_ids),
+            "tested_cameras": len(checked),
+            **statuses,
+            "success_rate": round(statuses["online"] / len(checked) * 100, 2) if checked else None,
+            "average_response_time_seconds": round(sum(latencies) / len(latencies), 3) if latencies else None,
+            "circuits": circuits,
+            "monitor_running": self.running,
+            "oldest_check_at": _isoformat(min(checked)) if checked else None,
+            "tested_at": _isoformat(max(checked)) if checked else None
+        }
+
+    def open_circuits(self) -> List[Dict[str, Any]]:
+        """Cameras currently skipped, longest-open first"""
+        return [
+            health.to_dict()
+            for health in sorted(self.cameras.values(), key=lambda h: h.opened_at or 0.0)
+            if self.state(health.camera_id) != CLOSED
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        """Health monitor metrics for /health"""
+        circuits = {CLOSED: 0, HALF_OPEN: 0, OPEN: 0}
+        for camera_id in self.cameras:
+            circuits[self.state(camera_id)] += 1
+        return {
+            "running": self.running,
+            "interval_seconds": self.interval_seconds,
+            "cameras": len(self.cameras),
+            "circuits": circuits,
+            **self.metrics
+        }
+
+
+# Global service instance
+camera_health_monitor = CameraHealthMonitor(
+    interval_seconds=settings.CAMERA_HEALTH_INTERVAL_SECONDS,
+    probe_timeout_seconds=settings.CAMERA_HEALTH_PROBE_TIMEOUT_SECONDS,
+    concurrency=settings.CAMERA_HEALTH_CONCURRENCY,
+    failure_threshold=settings.CAMERA_CIRCUIT_FAILURE_THRESHOLD,
+    open_seconds=settings.CAMERA_CIRCUIT_OPEN_SECONDS,
+    max_open_seconds=settings.CAMERA_CIRCUIT_MAX_OPEN_SECONDS,
+    ewma_alpha=settings.CAMERA_HEALTH_EWMA_ALPHA
+)
+
+
+# Convenience functions
+def get_camera_health_stats(camera_ids: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """Get camera connectivity statistics from the cached health state"""
+    return camera_health_monitor.connectivity_stats(camera_ids)
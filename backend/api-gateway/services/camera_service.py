@@ -9,18 +9,17 @@ import logging
 from typing import Optional, List, Dict, Any, Tuple
 import asyncio
 from datetime import datetime
-import aiohttp
-from aiohttp import ClientTimeout
 
 from config import settings
+from tracing import traced
 
 logger = logging.getLogger(__name__)
 
 
-# COMPASS camera image URL pattern
+# COMPASS camera image URL pattern (settings.COMPASS_IMAGE_URL_PATTERN)
 # Real URLs are in format: http://www.mto.gov.on.ca/compass/camera/loc{camera_num}.jpg
 # Example: http://www.mto.gov.on.ca/compass/camera/loc253.jpg
-COMPASS_URL_PATTERN = "http://www.mto.gov.on.ca/compass/camera/loc{camera_num}.jpg"
+COMPASS_URL_PATTERN = settings.COMPASS_IMAGE_URL_PATTERN
 
 # Timeout for camera image requests (seconds)
 REQUEST_TIMEOUT = 10
@@ -31,8 +30,17 @@ class CameraImageService:
 
     def __init__(self):
         """Initialize camera image service"""
-        self.timeout = ClientTimeout(total=REQUEST_TIMEOUT)
+        self._timeout = None
 
+    @property
+    def timeout(self):
+        """aiohttp timeout (aiohttp is imported on first fetch, not at startup)"""
+        if self._timeout is None:
+            from aiohttp import ClientTimeout
+            self._timeout = ClientTimeout(total=REQUEST_TIMEOUT)
+        return self._timeout
+
+    @traced("compass")
     async def fetch_camera_image(
         self,
         camera_id: str,
@@ -64,6 +72,7 @@ class CameraImageService:
                 url = f"{url}?view={view_id}"
 
             # Fetch image
+            import aiohttp
             async with aiohttp.ClientSession(timeout=self.timeout) as session:
                 async with session.get(url) as response:
                     if response.status == 200:
@@ -117,12 +126,17 @@ class CameraImageService:
 
         return processed_results
 
-    async def test_camera_connection(self, camera_id: str) -> Dict[str, Any]:
+    @traced("compass")
+    async def test_camera_connection(self, camera_id: str, timeout: Optional[float] = None) -> Dict[str, Any]:
         """
         Test connection to a camera
 
+        A HEAD request, or a one-byte range GET if the server rejects HEAD,
+        so the image itself is not downloaded.
+
         Args:
             camera_id: Camera identifier
+            timeout: Seconds before giving up (default REQUEST_TIMEOUT)
 
         Returns:
             Connection test results
@@ -138,21 +152,28 @@ class CameraImageService:
 
             url = COMPASS_URL_PATTERN.format(camera_num=camera_num)
 
-            async with aiohttp.ClientSession(timeout=self.timeout) as session:
-                async with session.get(url) as response:
-                    end_time = datetime.utcnow()
-                    response_time = (end_time - start_time).total_seconds()
-
-                    return {
-                        "camera_id": camera_id,
-                        "url": url,
-                        "status": "online" if response.status == 200 else "offline",
-                        "status_code": response.status,
-                        "response_time_seconds": round(response_time, 3),
-                        "content_type": response.headers.get("Content-Type"),
-                        "content_length": int(response.headers.get("Content-Length", 0)),
-                        "tested_at": datetime.utcnow().isoformat()
-                    }
+            import aiohttp
+            client_timeout = aiohttp.ClientTimeout(total=timeout) if timeout else self.timeout
+            async with aiohttp.ClientSession(timeout=client_timeout) as session:
+                async with session.head(url) as response:
+                    status, headers = response.status, response.headers
+                if status in (405, 501):
+                    async with session.get(url, headers={"Range": "bytes=0-0"}) as response:
+                        status, headers = response.status, response.headers
+
+                end_time = datetime.utcnow()
+                response_time = (end_time - start_time).total_seconds()
+
+                return {
+                    "camera_id": camera_id,
+                    "url": url,
+                    "status": "online" if status in (200, 206) else "offline",
+                    "status_code": status,
+                    "response_time_seconds": round(response_time, 3),
+                    "content_type": headers.get("Content-Type"),
+                    "content_length": int(headers.get("Content-Length", 0)),
+                    "tested_at": datetime.utcnow().isoformat()
+                }
 
         except asyncio.TimeoutError:
             return {
@@ -160,7 +181,7 @@ class CameraImageService:
                 "url": url,
                 "status": "timeout",
                 "status_code": None,
-                "response_time_seconds": REQUEST_TIMEOUT,
+                "response_time_seconds": timeout or REQUEST_TIMEOUT,
                 "error": "Request timeout",
                 "tested_at": datetime.utcnow().isoformat()
             }
@@ -222,38 +243,23 @@ class CameraImageService:
         """
         Get aggregated statistics for camera connectivity
 
+        Served from the health monitor's cached probe and fetch results
+        (services/camera_health.py). When the monitor is not running
+        (CAMERA_HEALTH_ENABLED off), cameras not checked within the last
+        interval are HEAD-probed first. Use test_multiple_cameras for a
+        full live re-test.
+
         Args:
             camera_ids: List of camera identifiers
 
         Returns:
             Connectivity statistics
         """
-        test_results = await self.test_multiple_cameras(camera_ids)
-
-        online = sum(1 for r in test_results if r.get("status") == "online")
-        offline = sum(1 for r in test_results if r.get("status") == "offline")
-        timeout = sum(1 for r in test_results if r.get("status") == "timeout")
-        error = sum(1 for r in test_results if r.get("status") == "error")
-
-        response_times = [
-            r["response_time_seconds"]
-            for r in test_results
-            if r.get("response_time_seconds") is not None
-        ]
-        avg_response_time = (
-            sum(response_times) / len(response_times) if response_times else 0
-        )
-
-        return {
-            "total_cameras": len(camera_ids),
-            "online": online,
-            "offline": offline,
-            "timeout": timeout,
-            "error": error,
-            "success_rate": round(online / len(camera_ids) * 100, 2) if camera_ids else 0,
-            "average_response_time_seconds": round(avg_response_time, 3),
-            "tested_at": datetime.utcnow().isoformat()
-        }
+        # camera_health imports this module
+        from .camera_health import camera_health_monitor
+        if not camera_health_monitor.running:
+            await camera_health_monitor.refresh(camera_ids)
+        return camera_health_monitor.connectivity_stats(camera_ids)
 
 
 # Global service instance
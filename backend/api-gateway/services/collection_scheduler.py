@@ -0,0 +1,300 @@
+"""
+Collection Scheduler Service
+============================
+
+Headless periodic collection, replacing the desktop GUI timer that fired a
+whole-corridor burst every tick.
+
+Each interval (SCHEDULER_INTERVAL_SECONDS) is split into evenly spaced
+slots, one per camera, ordered by a stable hash of the camera ID. Every
+poll gets a small random jitter within its slot, so COMPASS requests, Gemini
+calls and database writes arrive at a steady rate instead of in spikes.
+
+Cameras are sharded across gateway instances with rendezvous hashing
+(SCHEDULER_SHARD_INDEX of SCHEDULER_SHARD_COUNT). Adding a shard only moves
+the cameras that land on it. Each poll is enqueued as a `camera.poll` job
+whose dedupe key names the camera and cycle, so an overlapping scheduler
+cannot poll a camera twice in one cycle.
+
+Cycles are aligned to the wall clock, so every instance agrees on cycle
+boundaries. A scheduler started mid-cycle skips the slots that have already
+passed instead of catching up in a burst.
+"""
+
+import asyncio
+import bisect
+import hashlib
+import logging
+import random
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+
+from config import settings
+from database import AsyncSessionLocal
+from models import Camera
+from .analysis_service import analysis_orchestration_service
+from .job_queue import JobContext, enqueue_job, job_handler, job_worker_pool
+
+logger = logging.getLogger(__name__)
+
+POLL_JOB_TYPE = "camera.poll"
+
+# Recent lag samples kept for percentiles
+LAG_SAMPLE_SIZE = 1000
+
+
+def stable_hash(key: str) -> int:
+    """64-bit hash that is identical across processes (unlike hash())"""
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+def shard_for(key: str, shard_count: int) -> int:
+    """Rendezvous (highest random weight) shard assignment for a key"""
+    if shard_count <= 1:
+        return 0
+    return max(range(shard_count), key=lambda shard: stable_hash(f"{key}:{shard}"))
+
+
+def _percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    index = min(int(len(sorted_values) * fraction), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+class LagTracker:
+    """Rolling lag samples (seconds) summarized as percentiles"""
+
+    def __init__(self, size: int = LAG_SAMPLE_SIZE):
+        self.samples: Deque[float] = deque(maxlen=size)
+        self.count = 0
+
+    def record(self, lag_seconds: float) -> None:
+        self.samples.append(max(lag_seconds, 0.0))
+        self.count += 1
+
+    def summary(self) -> Dict[str, Any]:
+        if not self.samples:
+            return {"count": self.count}
+        ordered = sorted(self.samples)
+        return {
+            "count": self.count,
+            "p50_ms": round(_percentile(ordered, 0.50) * 1000, 1),
+            "p95_ms": round(_percentile(ordered, 0.95) * 1000, 1),
+            "max_ms": round(ordered[-1] * 1000, 1)
+        }
+
+
+class CollectionScheduler:
+    """Spreads this shard's camera polls evenly across each interval"""
+
+    def __init__(
+        self,
+        interval_seconds: float = 3600.0,
+        jitter_fraction: float = 0.25,
+        shard_index: int = 0,
+        shard_count: int = 1,
+        min_risk_threshold: int = 5
+    ):
+        self.interval_seconds = interval_seconds
+        self.jitter_fraction = jitter_fraction
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+        self.min_risk_threshold = min_risk_threshold
+
+        self._task: Optional[asyncio.Task] = None
+        self._stopped = asyncio.Event()
+        self._plan: List[Tuple[float, str, int]] = []
+        self._next_index = 0
+        self.cycle: Optional[int] = None
+        self.cameras_owned = 0
+        self.metrics = {"polls_enqueued": 0, "polls_skipped": 0, "enqueue_errors": 0}
+        # Scheduler wake-up delay vs. slot, and job start delay vs. slot
+        self.enqueue_lag = LagTracker()
+        self.start_lag = LagTracker()
+
+    def plan_cycle(self, camera_ids: Sequence[Tuple[int, str]], cycle: int) -> List[Tuple[float, str, int]]:
+        """
+        Due times for one cycle
+
+        Args:
+            camera_ids: (database id, camera_id) pairs owned by this shard
+            cycle: Cycle number (wall clock time // interval)
+
+        Returns:
+            Sorted (due_timestamp, camera_id, database id) tuples
+        """
+        if not camera_ids:
+            return []
+
+        slot = self.interval_seconds / len(camera_ids)
+        # Interleave shards so their slots do not coincide
+        shard_offset = slot * self.shard_index / max(self.shard_count, 1)
+        cycle_start = cycle * self.interval_seconds
+        rng = random.Random(cycle)
+
+        ordered = sorted(camera_ids, key=lambda cam: stable_hash(cam[1]))
+        plan = []
+        for position, (db_id, camera_id) in enumerate(ordered):
+            jitter = rng.uniform(-self.jitter_fraction, self.jitter_fraction) * slot
+            offset = min(max(position * slot + shard_offset + jitter, 0.0), self.interval_seconds - 1e-3)
+            plan.append((cycle_start + offset, camera_id, db_id))
+        plan.sort()
+        return plan
+
+    async def start(self) -> None:
+        """Start the scheduling loop"""
+        if self._task:
+            return
+        self._stopped = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            f"✅ Collection scheduler started (every {self.interval_seconds:.0f}s, "
+            f"shard {self.shard_index + 1}/{self.shard_count})"
+        )
+
+    async def stop(self) -> None:
+        """Stop the scheduling loop"""
+        if not self._task:
+            return
+        self._stopped.set()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        logger.info("✅ Collection scheduler stopped")
+
+    def record_start_lag(self, due_at: float) -> None:
+        """Called by the poll job handler when the poll actually starts"""
+        self.start_lag.record(time.time() - due_at)
+
+    def upcoming(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Next polls of the current cycle"""
+        return [
+            {"camera_id": camera_id, "due_at": datetime.utcfromtimestamp(due).isoformat()}
+            for due, camera_id, _ in self._plan[self._next_index:self._next_index + limit]
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        """Scheduler metrics for /health"""
+        next_due = self._plan[self._next_index][0] if self._next_index < len(self._plan) else None
+        return {
+            "running": self._task is not None,
+            "interval_seconds": self.interval_seconds,
+            "shard": f"{self.shard_index + 1}/{self.shard_count}",
+            "cycle": self.cycle,
+            "cameras": self.cameras_owned,
+            "next_due_in_seconds": round(next_due - time.time(), 1) if next_due else None,
+            **self.metrics,
+            "enqueue_lag": self.enqueue_lag.summary(),
+            "start_lag": self.start_lag.summary()
+        }
+
+    async def _load_shard(self) -> List[Tuple[int, str]]:
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(Camera.id, Camera.camera_id).where(Camera.active == True)
+            )
+            return [
+                (db_id, camera_id) for db_id, camera_id in result.all()
+                if shard_for(camera_id, self.shard_count) == self.shard_index
+            ]
+
+    async def _sleep_until(self, timestamp: float) -> bool:
+        """Sleep until timestamp; False if stopped first"""
+        delay = timestamp - time.time()
+        if delay > 0:
+            try:
+                await asyncio.wait_for(self._stopped.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+        return not self._stopped.is_set()
+
+    async def _run(self) -> None:
+        while not self._stopped.is_set():
+            cycle = int(time.time() // self.interval_seconds)
+            try:
+                cameras = await self._load_shard()
+            except Exception as e:
+                logger.error(f"❌ Scheduler could not load cameras: {e}")
+                cameras = []
+
+            self.cycle = cycle
+            self.cameras_owned = len(cameras)
+            self._plan = self.plan_cycle(cameras, cycle)
+
+            # Slots already passed (started mid-cycle) wait for the next cycle
+            self._next_index = bisect.bisect_left(self._plan, (time.time(),))
+            self.metrics["polls_skipped"] += self._next_index
+
+            while self._next_index < len(self._plan):
+                due, camera_id, db_id = self._plan[self._next_index]
+                if not await self._sleep_until(due):
+                    return
+                await self._enqueue_poll(cycle, due, camera_id, db_id)
+                self._next_index += 1
+
+            if not await self._sleep_until((cycle + 1) * self.interval_seconds):
+                return
+
+    async def _enqueue_poll(self, cycle: int, due: float, camera_id: str, db_id: int) -> None:
+        self.enqueue_lag.record(time.time() - due)
+        try:
+            async with AsyncSessionLocal() as session:
+                await enqueue_job(
+                    session,
+                    POLL_JOB_TYPE,
+                    {"camera_id": db_id, "due_at": due, "min_risk_threshold": self.min_risk_threshold},
+                    # A missed poll is superseded by the next cycle
+                    max_attempts=1,
+                    dedupe_key=f"poll:{camera_id}:{cycle}"
+                )
+                await session.commit()
+            job_worker_pool.notify()
+            self.metrics["polls_enqueued"] += 1
+        except Exception as e:
+            self.metrics["enqueue_errors"] += 1
+            logger.error(f"❌ Failed to schedule poll for {camera_id}: {e}")
+
+
+# Global service instance
+collection_scheduler = CollectionScheduler(
+    interval_seconds=settings.SCHEDULER_INTERVAL_SECONDS,
+    jitter_fraction=settings.SCHEDULER_JITTER_FRACTION,
+    shard_index=settings.SCHEDULER_SHARD_INDEX,
+    shard_count=settings.SCHEDULER_SHARD_COUNT,
+    min_risk_threshold=settings.SCHEDULER_MIN_RISK_THRESHOLD
+)
+
+
+@job_handler(POLL_JOB_TYPE)
+async def poll_camera_job(ctx: JobContext) -> Dict[str, Any]:
+    """Fetch and analyze one scheduled camera poll"""
+    payload = ctx.payload
+    due_at = payload.get("due_at", time.time())
+    collection_scheduler.record_start_lag(due_at)
+
+    # Picked up after its next poll was due: let that one run instead
+    if time.time() - due_at > collection_scheduler.interval_seconds:
+        return {"skipped": "stale"}
+
+    async with AsyncSessionLocal() as db:
+        result = await analysis_orchestration_service.analyze_single_camera(
+            payload["camera_id"],
+            payload.get("min_risk_threshold", 5),
+            db
+        )
+
+    if result is None:
+        return {"camera_id": payload["camera_id"], "image_collected": False}
+    return {
+        "camera_id": result["camera_id"],
+        "image_collected": True,
+        "work_zone_id": result["work_zone_id"]
+    }
+
+
+# Convenience functions
+def get_scheduler_stats() -> Dict[str, Any]:
+    """Get collection scheduler metrics"""
+    return collection_scheduler.stats()
@@ -0,0 +1,293 @@
+"""
+Camera Direction Import Service
+===============================
+
+Streaming bulk import of camera direction CSVs.
+
+The upload is parsed incrementally in a worker thread, chunk by chunk.
+Camera IDs are resolved from one preloaded map. Each chunk is written with
+a single multi-row INSERT ... ON CONFLICT (camera_id, view_id) DO UPDATE,
+so re-importing a survey updates records in place instead of duplicating
+them.
+
+Chunks are written with a pending change version. The import's one change
+version is allocated just before the commit, and the pending rows are
+stamped with it in a single UPDATE. The sync_state row lock that allocation
+takes is therefore not held while the rest of the upload is parsed.
+
+Accepted columns (header names):
+    camera_id            Camera identifier ("CAM_253", "C210" or Corey's numeric "210")
+    view_id              Optional view; blank means the camera-level record
+    heading              0-360 degrees (or suggested_heading)
+    direction            Optional N/NE/E/SE/S/SW/W/NW (derived from heading if blank)
+    confidence           high/medium/low (default medium)
+    eastbound_heading    Optional 0-360
+    westbound_heading    Optional 0-360
+"""
+
+import codecs
+import csv
+import logging
+import time
+from itertools import islice
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from database import upsert_insert
+from change_tracking import allocate_change_version
+from models import Camera, CameraDirection
+
+logger = logging.getLogger(__name__)
+
+IMPORT_CHUNK_SIZE = 1000
+
+# change_version of rows upserted by an import that has not committed yet
+PENDING_CHANGE_VERSION = -1
+
+# Per-row error messages kept in the response (the count is always exact)
+MAX_REPORTED_ERRORS = 500
+
+DIRECTIONS = ("N", "NE", "E", "SE", "S", "SW", "W", "NW")
+CONFIDENCE_LEVELS = ("high", "medium", "low")
+
+# Columns overwritten when a (camera_id, view_id) record already exists
+UPSERT_COLUMNS = (
+    "heading", "direction", "confidence",
+    "eastbound_heading", "westbound_heading",
+    "model", "analysis_method"
+)
+
+
+def heading_to_direction(heading: float) -> str:
+    """Convert heading (0-360 degrees, 0 = North) to an 8-point compass direction"""
+    return DIRECTIONS[int(((heading % 360) + 22.5) // 45) % 8]
+
+
+def _optional_heading(row: Dict[str, str], column: str) -> Optional[float]:
+    value = (row.get(column) or "").strip()
+    if not value:
+        return None
+    heading = float(value)
+    if not 0 <= heading <= 360:
+        raise ValueError(f"{column} {heading} outside 0-360")
+    return heading
+
+
+def parse_direction_row(
+    row: Dict[str, str],
+    camera_map: Dict[str, int],
+    model: str = "csv_import",
+    analysis_method: str = "manual_import"
+) -> Dict[str, Any]:
+    """
+    Validate one CSV row into camera_directions column values
+
+    Raises:
+        ValueError: Row is invalid or references an unknown camera
+    """
+    camera_key = (row.get("camera_id") or "").strip()
+    if not camera_key:
+        raise ValueError("camera_id is required")
+
+    camera_id = camera_map.get(camera_key) or camera_map.get(f"C{camera_key}")
+    if camera_id is None:
+        raise ValueError(f"Camera {camera_key} not found")
+
+    heading = _optional_heading(row, "heading") if row.get("heading") else _optional_heading(row, "suggested_heading")
+    if heading is None:
+        raise ValueError("heading is required")
+
+    direction = (row.get("direction") or "").strip().upper() or heading_to_direction(heading)
+    if direction not in DIRECTIONS:
+        raise ValueError(f"Invalid direction {direction}")
+
+    confidence = (row.get("confidence") or "").strip().lower() or "medium"
+    if confidence not in CONFIDENCE_LEVELS:
+        raise ValueError(f"Invalid confidence {confidence}")
+
+    view_id = (row.get("view_id") or "").strip()
+
+    return {
+        "camera_id": camera_id,
+        "view_id": int(view_id) if view_id else None,
+        "heading": heading,
+        "direction": direction,
+        "confidence": confidence,
+        "eastbound_heading": _optional_heading(row, "eastbound_heading"),
+        "westbound_heading": _optional_heading(row, "westbound_heading"),
+        "model": model,
+        "analysis_method": analysis_method
+    }
+
+
+async def upsert_directions(
+    db: AsyncSession,
+    records: Iterable[Dict[str, Any]],
+    version: Optional[int] = None
+) -> int:
+    """
+    Insert or update direction records, keyed by (camera_id, view_id)
+
+    Later duplicates of a key win. Camera-level records (view_id NULL) use
+    the uq_camera_directions_camera_level partial index as conflict target,
+    since NULLs never conflict on the composite constraint.
+
+    Args:
+        version: Change version to stamp (allocated here if None)
+
+    Returns:
+        Number of distinct records written
+    """
+    by_key = {(record["camera_id"], record["view_id"]): record for record in records}
+    if not by_key:
+        return 0
+
+    if version is None:
+        version = await allocate_change_version(db)
+    by_key = {key: {**record, "change_version": version} for key, record in by_key.items()}
+    view_level = [record for key, record in by_key.items() if key[1] is not None]
+    camera_level = [record for key, record in by_key.items() if key[1] is None]
+
+    for batch, conflict in (
+        (view_level, {"index_elements": ["camera_id", "view_id"]}),
+        (camera_level, {"index_elements": ["camera_id"], "index_where": CameraDirection.view_id.is_(None)}),
+    ):
+        if not batch:
+            continue
+        stmt = upsert_insert(CameraDirection.__table__).values(batch)
+        stmt = stmt.on_conflict_do_update(
+            **conflict,
+            set_={
+                **{column: stmt.excluded[column] for column in UPSERT_COLUMNS},
+                "change_version": stmt.excluded.change_version,
+                "updated_at": func.now()
+            }
+        )
+        await db.execute(stmt)
+
+    return len(by_key)
+
+
+async def update_camera_headings(
+    db: AsyncSession,
+    headings: Dict[int, Dict[str, Any]],
+    version: Optional[int] = None
+) -> int:
+    """
+    Set Camera.heading/direction/direction_confidence in one executemany
+
+    Args:
+        headings: {camera primary key: record with heading, direction, confidence}
+        version: Change version to stamp (allocated here if None)
+    """
+    if not headings:
+        return 0
+
+    if version is None:
+        version = await allocate_change_version(db)
+    await db.execute(
+        update(Camera),
+        [
+            {
+                "id": camera_id,
+                "heading": record["heading"],
+                "direction": record["direction"],
+                "direction_confidence": record["confidence"],
+                "change_version": version
+            }
+            for camera_id, record in headings.items()
+        ]
+    )
+    return len(headings)
+
+
+async def load_camera_map(db: AsyncSession) -> Dict[str, int]:
+    """Map of camera_id string -> primary key for every camera"""
+    result = await db.execute(select(Camera.camera_id, Camera.id))
+    return dict(result.all())
+
+
+def _read_chunk(reader, size: int) -> List[Tuple[int, Dict[str, str]]]:
+    """Parse up to size (line number, row) pairs (runs in a worker thread)"""
+    return [(reader.line_num, row) for row in islice(reader, size)]
+
+
+async def import_directions_csv(
+    stream: BinaryIO,
+    db: AsyncSession,
+    chunk_size: int = IMPORT_CHUNK_SIZE
+) -> Dict[str, Any]:
+    """
+    Stream a direction CSV into camera_directions
+
+    Cameras take the heading of their last imported row. Everything is
+    committed in one transaction at the end.
+
+    Args:
+        stream: Binary file object (e.g. UploadFile.file)
+        db: Database session
+        chunk_size: Rows per parse/upsert chunk
+
+    Returns:
+        Import statistics with per-row errors and throughput
+    """
+    started = time.perf_counter()
+    camera_map = await load_camera_map(db)
+
+    reader = csv.DictReader(codecs.iterdecode(stream, "utf-8-sig"))
+    camera_headings: Dict[int, Dict[str, Any]] = {}
+    rows_processed = 0
+    imported = 0
+    error_count = 0
+    errors: List[str] = []
+
+    while True:
+        rows = await run_in_threadpool(_read_chunk, reader, chunk_size)
+        if not rows:
+            break
+
+        records = []
+        for line_num, row in rows:
+            try:
+                record = parse_direction_row(row, camera_map)
+            except (ValueError, TypeError) as e:
+                error_count += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append(f"Row {line_num}: {e}")
+                continue
+            records.append(record)
+            camera_headings[record["camera_id"]] = record
+
+        rows_processed += len(rows)
+        imported += await upsert_directions(db, records, PENDING_CHANGE_VERSION)
+
+    cameras_updated = 0
+    if imported:
+        version = await allocate_change_version(db)
+        await db.execute(
+            update(CameraDirection.__table__)
+            .where(CameraDirection.change_version == PENDING_CHANGE_VERSION)
+            .values(change_version=version)
+        )
+        cameras_updated = await update_camera_headings(db, camera_headings, version)
+    await db.commit()
+
+    duration = time.perf_counter() - started
+    rows_per_second = round(rows_processed / duration, 1) if duration > 0 else 0.0
+    logger.info(
+        f"✅ Imported {imported} direction records from {rows_processed} rows "
+        f"({error_count} errors, {rows_per_second} rows/s)"
+    )
+
+    return {
+        "rows_processed": rows_processed,
+        "imported": imported,
+        "cameras_updated": cameras_updated,
+        "errors": errors,
+        "error_count": error_count,
+        "duration_seconds": round(duration, 3),
+        "rows_per_second": rows_per_second
+    }
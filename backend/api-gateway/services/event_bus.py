@@ -0,0 +1,175 @@
+"""
+Event Bus Service
+=================
+
+In-process publish/subscribe for live dashboard updates.
+
+Write paths publish a small diff after they commit ("work_zone.created",
+"work_zone.resolved", ...). Each event is serialized once and fanned out
+to every subscriber's queue, so a write costs the same whether one
+dashboard or hundreds are connected, and viewers cause no database reads.
+
+Event IDs increase monotonically and start at the boot time in
+milliseconds, so IDs from before a restart sort below current ones. The
+last STREAM_BUFFER_SIZE events are kept for resume. A subscriber that
+reconnects with Last-Event-ID replays what it missed, or gets a "reset"
+event (refetch the full list) if the gap is no longer buffered. A
+subscriber that falls STREAM_QUEUE_SIZE events behind is disconnected and
+resumes on reconnect instead of buffering without bound.
+
+The bus is per process: events published by a separate `worker.py`
+process do not reach this gateway's streams.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Set
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Event:
+    """A published change, serialized once for all subscribers"""
+    id: int
+    type: str
+    data: str  # JSON
+
+    def sse(self) -> str:
+        """Server-Sent Events frame"""
+        return f"id: {self.id}\nevent: {self.type}\ndata: {self.data}\n\n"
+
+    def message(self) -> str:
+        """WebSocket text message"""
+        return f'{{"id": {self.id}, "type": "{self.type}", "data": {self.data}}}'
+
+
+class Subscription:
+    """One connected dashboard"""
+
+    def __init__(self, bus: "EventBus", queue_size: int):
+        self.bus = bus
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+    @property
+    def closed(self) -> bool:
+        """Dropped for falling behind, and everything queued was sent"""
+        return self.overflowed and self.queue.empty()
+
+    async def next_event(self, timeout: float) -> Optional[Event]:
+        """Next event, or None after `timeout` seconds (time for a heartbeat)"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        self.bus.unsubscribe(self)
+
+
+class EventBus:
+    """Fan-out of change events to connected streams"""
+
+    def __init__(self, buffer_size: int = 1000, queue_size: int = 100, max_subscribers: int = 500):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self._buffer: Deque[Event] = deque(maxlen=buffer_size)
+        self._subscribers: Set[Subscription] = set()
+        self._boot_id = int(time.time() * 1000)
+        self._last_id = self._boot_id
+        self.metrics = {"published": 0, "delivered": 0, "dropped_subscribers": 0, "rejected_subscribers": 0}
+
+    @property
+    def last_event_id(self) -> int:
+        return self._last_id
+
+    def publish(self, event_type: str, data: Dict[str, Any]) -> Event:
+        """Publish an event to all subscribers (call after the commit)"""
+        self._last_id += 1
+        event = Event(self._last_id, event_type, json.dumps(data, default=str))
+        self._buffer.append(event)
+        self.metrics["published"] += 1
+
+        for subscription in list(self._subscribers):
+            try:
+                subscription.queue.put_nowait(event)
+                self.metrics["delivered"] += 1
+            except asyncio.QueueFull:
+                # Slow consumer: drop it; it resumes from Last-Event-ID
+                subscription.overflowed = True
+                self.unsubscribe(subscription)
+                self.metrics["dropped_subscribers"] += 1
+        return event
+
+    def subscribe(self, last_event_id: Optional[int] = None) -> Optional[Subscription]:
+        """
+        Register a subscriber
+
+        Args:
+            last_event_id: Last event the client saw, to replay what it missed
+
+        Returns:
+            Subscription (with any replayed events queued, or a "reset" event
+            if they are no longer buffered), or None if at capacity
+        """
+        if len(self._subscribers) >= self.max_subscribers:
+            self.metrics["rejected_subscribers"] += 1
+            return None
+
+        subscription = Subscription(self, self.queue_size)
+        if last_event_id is not None and last_event_id != self._last_id:
+            missed = self.replay(last_event_id)
+            if missed is None or len(missed) > self.queue_size:
+                subscription.queue.put_nowait(self._reset_event())
+            else:
+                for event in missed:
+                    subscription.queue.put_nowait(event)
+
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    def replay(self, last_event_id: int) -> Optional[List[Event]]:
+        """Buffered events after last_event_id, or None if some were evicted"""
+        oldest = self._buffer[0].id if self._buffer else self._last_id + 1
+        if last_event_id > self._last_id or last_event_id < oldest - 1:
+            return None  # Evicted, from before a restart, or from another process
+        return [event for event in self._buffer if event.id > last_event_id]
+
+    def _reset_event(self) -> Event:
+        return Event(
+            self._last_id, "reset",
+            json.dumps({"reason": "missed events are no longer buffered; refetch"})
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Bus metrics for /health"""
+        return {
+            "subscribers": len(self._subscribers),
+            "last_event_id": self._last_id,
+            "buffered": len(self._buffer),
+            **self.metrics
+        }
+
+
+# Global service instance
+event_bus = EventBus(
+    buffer_size=settings.STREAM_BUFFER_SIZE,
+    queue_size=settings.STREAM_QUEUE_SIZE,
+    max_subscribers=settings.STREAM_MAX_SUBSCRIBERS
+)
+
+
+# Convenience functions
+def publish_event(event_type: str, data: Dict[str, Any]) -> Event:
+    """Publish a change event to connected dashboards"""
+    return event_bus.publish(event_type, data)
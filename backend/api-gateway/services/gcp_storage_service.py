@@ -3,26 +3,34 @@ GCP Cloud Storage Service
 ==========================
 
 Service for managing camera images in Google Cloud Storage.
+
+upload_image/list_camera_images use the legacy flat
+`camera_images/{camera_id}/` layout. The collection pipeline stores frames
+through services/image_storage.py (content-addressed, with a time-partitioned
+frame index); `migrate_image_layout.py` moves legacy blobs across.
 """
 
+import importlib.util
 import logging
+import threading
 from typing import Optional, List, Dict, Any
 from datetime import datetime, timedelta
 import asyncio
 import io
 
-try:
-    from google.cloud import storage
-    from google.cloud.exceptions import GoogleCloudError
-    GCP_AVAILABLE = True
-except ImportError:
-    GCP_AVAILABLE = False
-    logging.warning("google-cloud-storage not installed. GCP features disabled.")
-
 from config import settings
+from tracing import traced
 
 logger = logging.getLogger(__name__)
 
+# The client library is imported when storage is first used, not at startup
+try:
+    GCP_AVAILABLE = importlib.util.find_spec("google.cloud.storage") is not None
+except ModuleNotFoundError:
+    GCP_AVAILABLE = False
+if not GCP_AVAILABLE:
+    logger.warning("google-cloud-storage not installed. GCP features disabled.")
+
 
 class GCPStorageService:
     """Service for GCP Cloud Storage operations"""
@@ -32,16 +40,49 @@ class GCPStorageService:
         self.bucket_name = settings.GCP_STORAGE_BUCKET
         self.project_id = settings.GCP_PROJECT_ID
         self.api_available = GCP_AVAILABLE
+        self._client = None
+        self._bucket = None
+        self._client_lock = threading.Lock()
+
+    def _connect(self) -> None:
+        """Create the client and bucket handle (resolves credentials; blocking)"""
+        with self._client_lock:
+            if self._client is None:
+                from google.cloud import storage
+                client = storage.Client(project=self.project_id)
+                self._bucket = client.bucket(self.bucket_name)
+                self._client = client
+                logger.info(f"✅ GCP Storage initialized: gs://{self.bucket_name}")
 
-        if self.api_available:
+    @property
+    def client(self):
+        """Storage client, created on first use"""
+        if self._client is None:
+            self._connect()
+        return self._client
+
+    @property
+    def bucket(self):
+        """Bucket handle, created on first use"""
+        if self._client is None:
+            self._connect()
+        return self._bucket
+
+    async def ensure_client(self) -> bool:
+        """Connect off the event loop on first use; False if storage is unavailable"""
+        if not self.api_available:
+            logger.warning("GCP Storage not available")
+            return False
+        if self._client is None:
             try:
-                self.client = storage.Client(project=self.project_id)
-                self.bucket = self.client.bucket(self.bucket_name)
-                logger.info(f"✅ GCP Storage initialized: gs://{self.bucket_name}")
+                await asyncio.to_thread(self._connect)
             except Exception as e:
                 logger.error(f"❌ Failed to initialize GCP Storage: {e}")
                 self.api_available = False
+                return False
+        return True
 
+    @traced("storage")
     async def upload_image(
         self,
         image_data: bytes,
@@ -61,8 +102,7 @@ class GCPStorageService:
         Returns:
             Public URL of uploaded image, or None if failed
         """
-        if not self.api_available:
-            logger.warning("GCP Storage not available")
+        if not await self.ensure_client():
             return None
 
         try:
@@ -88,6 +128,7 @@ class GCPStorageService:
             logger.error(f"❌ GCP upload failed: {e}", exc_info=True)
             return None
 
+    @traced("storage")
     async def download_image(self, blob_path: str) -> Optional[bytes]:
         """
         Download image from GCP Storage
@@ -98,8 +139,7 @@ class GCPStorageService:
         Returns:
             Image bytes, or None if failed
         """
-        if not self.api_available:
-            logger.warning("GCP Storage not available")
+        if not await self.ensure_client():
             return None
 
         try:
@@ -112,13 +152,16 @@ class GCPStorageService:
             logger.error(f"❌ GCP download failed: {e}", exc_info=True)
             return None
 
+    @traced("storage")
     async def list_camera_images(
         self,
         camera_id: str,
         max_results: int = 100
     ) -> List[Dict[str, Any]]:
         """
-        List all images for a specific camera
+        List all images for a specific camera (legacy layout)
+
+        Use image_storage.iter_frames() for time-range listing.
 
         Args:
             camera_id: Camera identifier
@@ -127,8 +170,7 @@ class GCPStorageService:
         Returns:
             List of image metadata dicts
         """
-        if not self.api_available:
-            logger.warning("GCP Storage not available")
+        if not await self.ensure_client():
             return []
 
         try:
@@ -158,6 +200,7 @@ class GCPStorageService:
             logger.error(f"❌ GCP list failed: {e}", exc_info=True)
             return []
 
+    @traced("storage")
     async def delete_image(self, blob_path: str) -> bool:
         """
         Delete image from GCP Storage
@@ -168,8 +211,7 @@ class GCPStorageService:
         Returns:
             True if successful, False otherwise
         """
-        if not self.api_available:
-            logger.warning("GCP Storage not available")
+        if not await self.ensure_client():
             return False
 
         try:
@@ -182,6 +224,7 @@ class GCPStorageService:
             logger.error(f"❌ GCP delete failed: {e}", exc_info=True)
             return False
 
+    @traced("storage")
     async def generate_signed_url(
         self,
         blob_path: str,
@@ -197,8 +240,7 @@ class GCPStorageService:
         Returns:
             Signed URL, or None if failed
         """
-        if not self.api_available:
-            logger.warning("GCP Storage not available")
+        if not await self.ensure_client():
             return None
 
         try:
@@ -218,6 +260,7 @@ class GCPStorageService:
             logger.error(f"❌ Signed URL generation failed: {e}", exc_info=True)
             return None
 
+    @traced("storage")
     async def batch_upload(
         self,
         images: List[Dict[str, Any]]
@@ -6,31 +6,64 @@ Integration with Google's Gemini Vision API for work zone detection
 and safety analysis from camera images.
 """
 
+import importlib.util
 import logging
+import threading
 from typing import Dict, Any, Optional, List
 import base64
 import asyncio
 from datetime import datetime
+from urllib.parse import urljoin, urlsplit
 
+from config import settings
+from tracing import traced
+from .image_storage import image_storage
+
+logger = logging.getLogger(__name__)
+
+# The SDK is imported on first analysis, not at startup (it pulls in grpc and
+# protobuf, which adds noticeably to cold start)
 try:
-    import google.generativeai as genai
-    GEMINI_AVAILABLE = True
-except ImportError:
+    GEMINI_AVAILABLE = importlib.util.find_spec("google.generativeai") is not None
+except ModuleNotFoundError:
     GEMINI_AVAILABLE = False
-    logging.warning("google-generativeai not installed. Gemini features disabled.")
+if not GEMINI_AVAILABLE:
+    logger.warning("google-generativeai not installed. Gemini features disabled.")
+elif not settings.GEMINI_API_KEY:
+    logger.warning("⚠️  Gemini API not configured - using mock responses")
 
-from config import settings
 
-logger = logging.getLogger(__name__)
+# Timeout for downloading images analyzed by URL (seconds)
+IMAGE_FETCH_TIMEOUT = 10
 
+# Largest image downloaded for analysis by URL
+MAX_IMAGE_BYTES = 10 * 1024 * 1024
 
-# Configure Gemini API
-if GEMINI_AVAILABLE and settings.GEMINI_API_KEY:
-    genai.configure(api_key=settings.GEMINI_API_KEY)
-    logger.info(f"✅ Gemini API configured with model: {settings.GEMINI_MODEL}")
-else:
-    logger.warning("⚠️  Gemini API not configured - using mock responses")
+# Redirects followed from a COMPASS URL (each target must be allowed too)
+MAX_IMAGE_REDIRECTS = 3
+
+
+class ImageURLNotAllowed(ValueError):
+    """Image URL is neither in the image store nor on the COMPASS host"""
+
+
+def _compass_origin() -> tuple:
+    parts = urlsplit(settings.COMPASS_IMAGE_URL_PATTERN)
+    return parts.scheme, parts.netloc
+
+
+def is_allowed_image_url(url: str) -> bool:
+    """
+    Whether an image URL may be analyzed
 
+    Only images in this gateway's image store and COMPASS camera images are
+    fetched, so callers cannot make the server request arbitrary (internal)
+    addresses.
+    """
+    if image_storage.key_for_url(url):
+        return True
+    parts = urlsplit(url)
+    return parts.scheme in ("http", "https") and (parts.scheme, parts.netloc) == _compass_origin()
 
 # Work zone analysis prompt
 WORK_ZONE_ANALYSIS_PROMPT = """
@@ -95,14 +128,67 @@ class GeminiVisionService:
         """Initialize Gemini Vision service"""
         self.model_name = settings.GEMINI_MODEL
         self.api_available = GEMINI_AVAILABLE and bool(settings.GEMINI_API_KEY)
+        self._model = None
+        self._model_lock = threading.Lock()
+
+    @property
+    def model(self):
+        """Gemini model, configured and built on first use"""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    import google.generativeai as genai
+                    if settings.GEMINI_API_ENDPOINT:
+                        # e.g. benchmark_stubs.py; only the REST transport takes a plain http:// endpoint
+                        genai.configure(
+                            api_key=settings.GEMINI_API_KEY,
+                            transport="rest",
+                            client_options={"api_endpoint": settings.GEMINI_API_ENDPOINT}
+                        )
+                    else:
+                        genai.configure(api_key=settings.GEMINI_API_KEY)
+                    self._model = genai.GenerativeModel(self.model_name)
+                    logger.info(f"✅ Gemini model initialized: {self.model_name}")
+        return self._model
+
+    async def _fetch_image(self, url: str) -> bytes:
+        """
+        Image bytes of an allowed URL, at most MAX_IMAGE_BYTES
 
-        if self.api_available:
-            try:
-                self.model = genai.GenerativeModel(self.model_name)
-                logger.info(f"✅ Gemini model initialized: {self.model_name}")
-            except Exception as e:
-                logger.error(f"❌ Failed to initialize Gemini model: {e}")
-                self.api_available = False
+        Images in the image store are read from the backend directly; COMPASS
+        images are downloaded (aiohttp is imported on first use).
+
+        Raises:
+            ImageURLNotAllowed: URL (or a redirect target) is not allowed
+            ValueError: Image is missing or too large
+        """
+        key = image_storage.key_for_url(url)
+        if key:
+            data = await image_storage.get(key)
+            if data is None:
+                raise ValueError(f"Image not found: {url}")
+            return data
+
+        import aiohttp
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=IMAGE_FETCH_TIMEOUT)) as session:
+            for _ in range(MAX_IMAGE_REDIRECTS + 1):
+                if not is_allowed_image_url(url):
+                    raise ImageURLNotAllowed(f"Image URL not allowed: {url}")
+                async with session.get(url, allow_redirects=False) as response:
+                    if response.status in (301, 302, 303, 307, 308) and "Location" in response.headers:
+                        url = urljoin(url, response.headers["Location"])
+                        continue
+                    response.raise_for_status()
+                    if response.content_length is not None and response.content_length > MAX_IMAGE_BYTES:
+                        raise ValueError(f"Image larger than {MAX_IMAGE_BYTES} bytes: {url}")
+                    chunks, size = [], 0
+                    async for chunk in response.content.iter_chunked(64 * 1024):
+                        size += len(chunk)
+                        if size > MAX_IMAGE_BYTES:
+                            raise ValueError(f"Image larger than {MAX_IMAGE_BYTES} bytes: {url}")
+                        chunks.append(chunk)
+                    return b"".join(chunks)
+        raise ValueError(f"Too many redirects: {url}")
 
     async def analyze_work_zone(
         self,
@@ -114,7 +200,7 @@ class GeminiVisionService:
         Analyze camera image for work zone detection
 
         Args:
-            image_data: Image URL or base64-encoded data
+            image_data: Image URL (image store or COMPASS) or base64-encoded data
             image_type: Either "url" or "base64"
             custom_prompt: Optional custom analysis prompt
 
@@ -126,24 +212,37 @@ class GeminiVisionService:
             return self._mock_analysis()
 
         try:
-            # Prepare prompt
-            prompt = custom_prompt or WORK_ZONE_ANALYSIS_PROMPT
-
-            # Prepare image content
             if image_type == "base64":
-                # Decode base64 image
                 image_bytes = base64.b64decode(image_data)
-                image_parts = [{"mime_type": "image/jpeg", "data": image_bytes}]
             elif image_type == "url":
-                # Use URL directly (Gemini can fetch URLs)
-                image_parts = [{"mime_type": "image/jpeg", "data": image_data}]
+                # Inline data must be the image bytes, not its URL. Fetched
+                # before the gemini span, so download time is not Gemini time.
+                image_bytes = await self._fetch_image(image_data)
             else:
                 raise ValueError(f"Invalid image_type: {image_type}")
+        except Exception as e:
+            logger.error(f"❌ Could not load image for analysis: {e}")
+            return self._error_response(str(e))
+
+        return await self._generate(image_bytes, custom_prompt or WORK_ZONE_ANALYSIS_PROMPT)
+
+    @traced("gemini")
+    async def _generate(self, image_bytes: bytes, prompt: str) -> Dict[str, Any]:
+        """Send one image and prompt to Gemini and parse the analysis"""
+        try:
+            model = await asyncio.to_thread(lambda: self.model)
+        except Exception as e:
+            logger.error(f"❌ Failed to initialize Gemini model: {e}")
+            self.api_available = False
+            return self._mock_analysis()
+
+        try:
+            image_parts = [{"mime_type": "image/jpeg", "data": image_bytes}]
 
             # Generate response
             logger.info(f"Calling Gemini Vision API: {self.model_name}")
             response = await asyncio.to_thread(
-                self.model.generate_content,
+                model.generate_content,
                 [prompt, *image_parts]
             )
 
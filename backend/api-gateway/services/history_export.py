@@ -0,0 +1,354 @@
+"""
+History Export Service
+======================
+
+Streams detection history out of the database as Parquet or Arrow IPC
+files for analysts (pandas, DuckDB, Polars), instead of paging through
+/api/work-zones/history JSON.
+
+Datasets:
+- work_zones: work zones by detected_at (optionally with work_zones_archive)
+- collection_runs: collection runs by started_at (optionally with collection_runs_archive)
+- directions: camera directions by analyzed_at
+
+Rows are read in (time, id) order with a server-side cursor (asyncpg; plain
+fetches on SQLite), EXPORT_CHUNK_ROWS at a time. Each chunk becomes one
+Arrow record batch, and in Parquet one row group, and is written before the
+next chunk is read. Memory stays bounded by the chunk size however many rows
+are exported. Used by export_history.py and GET /api/export/{dataset}.
+
+pyarrow is imported on first export, so the gateway starts without it.
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import aclosing
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, AsyncIterator, BinaryIO, Dict, List, Optional, Sequence
+
+from sqlalchemy import BigInteger, Boolean, DateTime, Float, Integer, JSON, Table, Text, select, type_coerce
+from sqlalchemy.sql import Select
+
+from config import settings
+from database import AsyncSessionLocal, naive_utc
+from models import CameraDirection, CollectionRun, WorkZone, collection_runs_archive, work_zones_archive
+
+logger = logging.getLogger(__name__)
+
+# format -> (media type, file extension)
+EXPORT_FORMATS = {
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.file", "arrow"),
+}
+
+
+class ExportUnavailable(RuntimeError):
+    """pyarrow is not installed"""
+
+
+@dataclass(frozen=True)
+class ExportDataset:
+    """A table (and its archive) exported in time order"""
+    table: Table
+    time_column: str
+    archive: Optional[Table] = None
+    camera_column: Optional[str] = None
+
+
+EXPORT_DATASETS = {
+    "work_zones": ExportDataset(WorkZone.__table__, "detected_at", work_zones_archive, "camera_id"),
+    "collection_runs": ExportDataset(CollectionRun.__table__, "started_at", collection_runs_archive),
+    "directions": ExportDataset(CameraDirection.__table__, "analyzed_at", camera_column="camera_id"),
+}
+
+
+@dataclass
+class ExportResult:
+    """Totals of one finished export"""
+    rows: int = 0
+    batches: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401 (registers pyarrow.parquet)
+    except ImportError:
+        raise ExportUnavailable("History export needs pyarrow (pip install pyarrow)")
+    return pyarrow
+
+
+def arrow_type(pa, column_type: Any):
+    """Arrow type of a SQLAlchemy column type (JSON columns become JSON text)"""
+    if isinstance(column_type, (Integer, BigInteger)):
+        return pa.int64()
+    if isinstance(column_type, Float):
+        return pa.float64()
+    if isinstance(column_type, Boolean):
+        return pa.bool_()
+    if isinstance(column_type, DateTime):
+        # Stored as UTC (naive on SQLite)
+        return pa.timestamp("us", tz="UTC")
+    return pa.string()
+
+
+def arrow_schema(pa, table: Table):
+    """Arrow schema with one field per column of a table"""
+    return pa.schema([
+        pa.field(column.name, arrow_type(pa, column.type), nullable=column.nullable or not column.primary_key)
+        for column in table.columns
+    ])
+
+
+def export_query(
+    dataset: ExportDataset,
+    table: Table,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    camera_ids: Optional[Sequence[int]] = None
+) -> Select:
+    """
+    Rows of a dataset's table or archive in a time range, oldest first
+
+    Columns are selected in the order of dataset.table, so archive rows
+    match its schema. JSON columns are read as their stored text, not
+    decoded. Served by the (time, id) index of each table.
+    """
+    time_column = table.c[dataset.time_column]
+    query = select(*(
+        type_coerce(table.c[column.name], Text) if isinstance(column.type, JSON) else table.c[column.name]
+        for column in dataset.table.columns
+    ))
+    if start:
+        query = query.where(time_column >= naive_utc(start))
+    if end:
+        query = query.where(time_column < naive_utc(end))
+    if camera_ids:
+        query = query.where(table.c[dataset.camera_column].in_(camera_ids))
+    return query.order_by(time_column, table.c.id)
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back to a streaming response"""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self.closed = False
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data, self._parts = b"".join(self._parts), []
+        return data
+
+
+class HistoryExporter:
+    """Writes history tables to Parquet/Arrow IPC in bounded memory"""
+
+    def __init__(self, chunk_rows: int = 20000, compression: str = "zstd"):
+        self.chunk_rows = chunk_rows
+        self.compression = compression
+        self.metrics = {"exports": 0, "failed": 0, "rows": 0, "bytes": 0}
+        self.active = 0
+
+    def validate(
+        self,
+        dataset: str,
+        fmt: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        camera_ids: Optional[Sequence[int]] = None
+    ) -> ExportDataset:
+        """
+        Check export arguments before anything is written
+
+        Raises:
+            ValueError: Unknown dataset/format, empty range, or camera filter on a dataset without cameras
+            ExportUnavailable: pyarrow is not installed
+        """
+        if dataset not in EXPORT_DATASETS:
+            raise ValueError(f"Unknown dataset '{dataset}' (expected one of {', '.join(EXPORT_DATASETS)})")
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown format '{fmt}' (expected one of {', '.join(EXPORT_FORMATS)})")
+        if start and end and naive_utc(start) >= naive_utc(end):
+            raise ValueError("start must be before end")
+        spec = EXPORT_DATASETS[dataset]
+        if camera_ids and not spec.camera_column:
+            raise ValueError(f"Dataset '{dataset}' cannot be filtered by camera")
+        _pyarrow()
+        return spec
+
+    def _open_writer(self, pa, sink: Any, schema: Any, fmt: str):
+        if fmt == "parquet":
+            return pa.parquet.ParquetWriter(sink, schema, compression=self.compression)
+        return pa.ipc.new_file(sink, schema)
+
+    @staticmethod
+    def _to_batch(pa, schema: Any, rows: Sequence[Any]):
+        """Transpose a chunk of rows into a record batch"""
+        columns = list(zip(*rows))
+        arrays = [pa.array(columns[index], type=field.type) for index, field in enumerate(schema)]
+        return pa.record_batch(arrays, schema=schema)
+
+    async def _write(
+        self,
+        sink: Any,
+        dataset: str,
+        fmt: str,
+        start: Optional[datetime],
+        end: Optional[datetime],
+        camera_ids: Optional[Sequence[int]],
+        include_archived: bool,
+        result: ExportResult
+    ) -> AsyncIterator[None]:
+        """Write the export to sink, yielding after each record batch"""
+        spec = self.validate(dataset, fmt, start, end, camera_ids)
+        pa = _pyarrow()
+        schema = arrow_schema(pa, spec.table)
+        tables = [spec.table] + ([spec.archive] if include_archived and spec.archive is not None else [])
+
+        started = time.perf_counter()
+        self.active += 1
+        writer = self._open_writer(pa, sink, schema, fmt)
+        try:
+            async with AsyncSessionLocal() as session:
+                for table in tables:
+                    query = export_query(spec, table, start, end, camera_ids)
+                    stream = await session.stream(query.execution_options(yield_per=self.chunk_rows))
+                    async for rows in stream.partitions(self.chunk_rows):
+                        # Arrow conversion and compression are CPU-bound
+                        batch = await asyncio.to_thread(self._to_batch, pa, schema, rows)
+                        await asyncio.to_thread(writer.write_batch, batch)
+                        result.rows += len(rows)
+                        result.batches += 1
+                        yield
+            await asyncio.to_thread(writer.close)
+            yield
+        except BaseException:
+            self.metrics["failed"] += 1
+            raise
+        finally:
+            self.active -= 1
+            result.seconds = time.perf_counter() - started
+            self.metrics["rows"] += result.rows
+
+        self.metrics["exports"] += 1
+
+    async def export(
+        self,
+        sink: BinaryIO,
+        dataset: str,
+        fmt: str = "parquet",
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        camera_ids: Optional[Sequence[int]] = None,
+        include_archived: bool = False
+    ) -> ExportResult:
+        """
+        Export a dataset to a writable binary file
+
+        Args:
+            sink: Open binary file (written sequentially, never seeked)
+            dataset: work_zones, collection_runs or directions
+            fmt: parquet or arrow (Arrow IPC file, a.k.a. Feather v2)
+            start: Only rows at or after this time
+            end: Only rows before this time
+            camera_ids: Only rows of these cameras
+            include_archived: Also export rows moved to the archive table
+
+        Returns:
+            Row, batch and byte totals
+
+        Raises:
+            ValueError: Invalid arguments
+            ExportUnavailable: pyarrow is not installed
+        """
+        result = ExportResult()
+        position = sink.tell() if sink.seekable() else 0
+        async with aclosing(self._write(sink, dataset, fmt, start, end, camera_ids, include_archived, result)) as steps:
+            async for _ in steps:
+                pass
+        result.bytes = (sink.tell() - position) if sink.seekable() else 0
+        self.metrics["bytes"] += result.bytes
+        logger.info(
+            f"📦 Exported {result.rows} {dataset} rows as {fmt} "
+            f"({result.batches} batches) in {result.seconds:.1f}s"
+        )
+        return result
+
+    async def stream(
+        self,
+        dataset: str,
+        fmt: str = "parquet",
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        camera_ids: Optional[Sequence[int]] = None,
+        include_archived: bool = False
+    ) -> AsyncIterator[bytes]:
+        """
+        Export a dataset as a stream of byte chunks (one per record batch)
+
+        Arguments as export(). Call validate() first: errors raised here
+        arrive after the response has started, and truncate the file.
+        """
+        result = ExportResult()
+        sink = _ChunkSink()
+        steps = self._write(sink, dataset, fmt, start, end, camera_ids, include_archived, result)
+        try:
+            async with aclosing(steps):
+                async for _ in steps:
+                    data = sink.drain()
+                    if data:
+                        result.bytes += len(data)
+                        yield data
+        except Exception as e:
+            logger.error(f"❌ {dataset} export failed after {result.rows} rows: {e}")
+            raise
+        finally:
+            self.metrics["bytes"] += result.bytes
+        logger.info(
+            f"📦 Streamed {result.rows} {dataset} rows as {fmt} "
+            f"({result.bytes / 1e6:.1f} MB) in {result.seconds:.1f}s"
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Export metrics for /health"""
+        return {"active": self.active, **self.metrics}
+
+
+# Global service instance
+history_exporter = HistoryExporter(
+    chunk_rows=settings.EXPORT_CHUNK_ROWS,
+    compression=settings.EXPORT_PARQUET_COMPRESSION
+)
+
+
+# Convenience functions
+async def export_history(
+    sink: BinaryIO,
+    dataset: str,
+    fmt: str = "parquet",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    camera_ids: Optional[Sequence[int]] = None,
+    include_archived: bool = False
+) -> ExportResult:
+    """
+    Export a history dataset to a binary file (see HistoryExporter.export)
+
+    Returns:
+        Row, batch and byte totals
+    """
+    return await history_exporter.export(sink, dataset, fmt, start, end, camera_ids, include_archived)
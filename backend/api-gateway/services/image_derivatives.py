@@ -0,0 +1,154 @@
+"""
+Image Derivative Service
+========================
+
+WebP thumbnails and previews of stored camera images, so map and list views
+do not download full-size JPEGs.
+
+When a frame is stored, its renditions are rendered in a pool of worker
+processes (IMAGE_DERIVATIVE_WORKERS; decoding and resizing are CPU-bound)
+and stored next to the original in the same image backend:
+
+    ab/cd/<sha256>.jpg              original
+    ab/cd/<sha256>.thumbnail.webp   IMAGE_THUMBNAIL_SIZE px max edge
+    ab/cd/<sha256>.preview.webp     IMAGE_PREVIEW_SIZE px max edge
+
+Renditions are content-addressed like the original, so a repeated frame
+reuses the existing ones without rendering. Failures are logged and leave
+the work zone without thumbnail/preview URLs; they never fail analysis.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Dict, Optional
+
+from config import settings
+from imaging import render_derivatives
+from .image_storage import ImageStorageBackend, image_storage
+
+logger = logging.getLogger(__name__)
+
+DERIVATIVE_CONTENT_TYPE = "image/webp"
+
+
+def derivative_key(key: str, name: str) -> str:
+    """Key of a rendition stored next to the original"""
+    stem = key.rsplit(".", 1)[0] if "." in key.rsplit("/", 1)[-1] else key
+    return f"{stem}.{name}.webp"
+
+
+class ImageDerivativeService:
+    """Renders and stores WebP renditions of stored images"""
+
+    def __init__(
+        self,
+        storage: ImageStorageBackend,
+        sizes: Dict[str, int],
+        quality: int = 75,
+        workers: int = 2,
+        enabled: bool = True
+    ):
+        self.storage = storage
+        self.sizes = sizes
+        self.quality = quality
+        self.workers = workers
+        self.enabled = enabled
+        self._executor: Optional[Executor] = None
+        self.metrics = {"rendered": 0, "reused": 0, "failed": 0, "source_bytes": 0, "derivative_bytes": 0}
+        self._render_seconds = 0.0
+
+    def _get_executor(self) -> Optional[Executor]:
+        """Process pool, started on first use (None = default thread pool)"""
+        if self._executor is None and self.workers > 0:
+            # spawn: workers import only imaging.py and Pillow, not the app
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def create_derivatives(self, key: str, data: bytes) -> Dict[str, str]:
+        """
+        Render and store the renditions of one stored image
+
+        Args:
+            key: Content key of the stored original
+            data: Original image bytes
+
+        Returns:
+            {"thumbnail_url": ..., "preview_url": ...} for each rendition
+            stored, or {} if disabled or rendering failed
+        """
+        if not self.enabled:
+            return {}
+
+        keys = {name: derivative_key(key, name) for name in self.sizes}
+        try:
+            present = await asyncio.gather(*(self.storage.exists(k) for k in keys.values()))
+            if all(present):
+                self.metrics["reused"] += 1
+                return {f"{name}_url": self.storage.url_for(k) for name, k in keys.items()}
+
+            start = time.perf_counter()
+            loop = asyncio.get_running_loop()
+            renditions = await loop.run_in_executor(
+                self._get_executor(), render_derivatives, data, tuple(self.sizes.items()), self.quality
+            )
+            self._render_seconds += time.perf_counter() - start
+        except Exception as e:
+            self.metrics["failed"] += 1
+            logger.warning(f"⚠️  Could not render derivatives of {key}: {e}")
+            return {}
+
+        urls = await asyncio.gather(*(
+            self.storage.put_at(keys[name], rendition, DERIVATIVE_CONTENT_TYPE)
+            for name, rendition in renditions.items()
+        ))
+        self.metrics["rendered"] += 1
+        self.metrics["source_bytes"] += len(data)
+        self.metrics["derivative_bytes"] += sum(len(rendition) for rendition in renditions.values())
+        return {f"{name}_url": url for name, url in zip(renditions, urls) if url}
+
+    async def shutdown(self) -> None:
+        """Stop the worker processes"""
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.to_thread(executor.shutdown)
+
+    def stats(self) -> Dict[str, Any]:
+        """Derivative metrics for /health"""
+        rendered = self.metrics["rendered"]
+        return {
+            "enabled": self.enabled,
+            "workers": self.workers,
+            **self.metrics,
+            "avg_render_ms": round(self._render_seconds / rendered * 1000, 1) if rendered else None
+        }
+
+
+# Global service instance
+image_derivative_service = ImageDerivativeService(
+    image_storage,
+    sizes={"thumbnail": settings.IMAGE_THUMBNAIL_SIZE, "preview": settings.IMAGE_PREVIEW_SIZE},
+    quality=settings.IMAGE_WEBP_QUALITY,
+    workers=settings.IMAGE_DERIVATIVE_WORKERS,
+    enabled=settings.IMAGE_DERIVATIVES_ENABLED
+)
+
+
+# Convenience functions
+async def create_image_derivatives(key: str, data: bytes) -> Dict[str, str]:
+    """
+    Render and store thumbnail/preview renditions of a stored image
+
+    Args:
+        key: Content key of the stored original
+        data: Original image bytes
+
+    Returns:
+        {"thumbnail_url", "preview_url"} (missing keys if not stored)
+    """
+    return await image_derivative_service.create_derivatives(key, data)
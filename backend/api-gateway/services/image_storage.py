@@ -0,0 +1,700 @@
+"""
+Image Storage Backends
+======================
+
+Content-addressed storage for camera frames behind a common interface.
+
+Every image is keyed by the SHA-256 of its bytes, sharded two levels deep
+(`ab/cd/abcd...ef.jpg`), so identical frames (a frozen COMPASS feed returns
+the same JPEG poll after poll) are written once and share one URL.
+
+Each stored frame is also recorded in a time-partitioned index of empty
+marker objects, `frames/{camera_id}/YYYY/MM/DD/HH/{HHMMSS}_{sha256}.jpg`.
+Names sort chronologically within a camera, so "frames for camera X between
+T1 and T2" is a single lexicographic range of names: iter_frames() reads
+only that range, a page at a time, and never touches the image bytes.
+
+Backends:
+- GCSImageStorage: Google Cloud Storage under `images/` and `frames/`.
+  Image writes are conditional on the object not existing, so a duplicate
+  costs one rejected request and no upload.
+- LocalImageStorage: a directory on local disk (dev and on-prem). Writes
+  go to a temporary file that is renamed into place, so readers never see
+  a partial image. Files are served from /api/images.
+
+IMAGE_STORAGE_BACKEND selects the backend ("auto" uses GCS when
+google-cloud-storage is installed, otherwise local disk).
+"""
+
+import asyncio
+import base64
+import hashlib
+import logging
+import os
+import re
+import tempfile
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from config import settings
+from tracing import traced
+from .gcp_storage_service import GCP_AVAILABLE, GCPStorageService, gcp_storage_service
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE_EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/webp": ".webp",
+}
+EXTENSION_CONTENT_TYPES = {ext: content_type for content_type, ext in CONTENT_TYPE_EXTENSIONS.items()}
+
+# Content-addressed keys never change, so clients may cache them forever
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Shard dirs + digest + optional suffix; no "/" after the digest, so no traversal
+KEY_PATTERN = re.compile(r"^[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}[a-z0-9._-]*$")
+
+# Camera IDs become a path segment of frame names
+CAMERA_ID_PATTERN = re.compile(r"^[A-Za-z0-9_.-]+$")
+FRAME_NAME_PATTERN = re.compile(
+    r"^(?P<camera_id>[A-Za-z0-9_.-]+)/(?P<year>\d{4})/(?P<month>\d{2})/(?P<day>\d{2})/\d{2}/"
+    r"(?P<hour>\d{2})(?P<minute>\d{2})(?P<second>\d{2})_(?P<digest>[0-9a-f]{64})(?P<ext>\.[a-z]+)?$"
+)
+
+
+def content_key(data: bytes, content_type: str = "image/jpeg") -> str:
+    """Sharded content address for image bytes"""
+    digest = hashlib.sha256(data).hexdigest()
+    return f"{digest[:2]}/{digest[2:4]}/{digest}{CONTENT_TYPE_EXTENSIONS.get(content_type, '')}"
+
+
+def content_type_for_key(key: str) -> str:
+    return EXTENSION_CONTENT_TYPES.get(os.path.splitext(key)[1], "application/octet-stream")
+
+
+def as_utc(moment: datetime) -> datetime:
+    """Naive UTC, as stored everywhere else in the gateway"""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def frame_prefix(camera_id: str, moment: datetime) -> str:
+    """
+    Frame name prefix for a camera at a second
+
+    Every frame captured at or after `moment` sorts at or after this
+    prefix, and every earlier frame sorts before it.
+    """
+    if not CAMERA_ID_PATTERN.match(camera_id):
+        raise ValueError(f"Invalid camera ID: {camera_id!r}")
+    moment = as_utc(moment)
+    return f"{camera_id}/{moment:%Y/%m/%d/%H}/{moment:%H%M%S}"
+
+
+def frame_name(camera_id: str, captured_at: datetime, key: str) -> str:
+    """Time-partitioned index name of a stored frame"""
+    return f"{frame_prefix(camera_id, captured_at)}_{key.rsplit('/', 1)[-1]}"
+
+
+def encode_page_token(name: str) -> str:
+    """Opaque token resuming a listing after frame `name`"""
+    return base64.urlsafe_b64encode(name.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_page_token(token: str) -> str:
+    """Frame name encoded by encode_page_token (ValueError if malformed)"""
+    try:
+        name = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode("utf-8")
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid page token")
+    if not FRAME_NAME_PATTERN.match(name):
+        raise ValueError("Invalid page token")
+    return name
+
+
+@dataclass(frozen=True)
+class StoredImage:
+    """Result of storing one image"""
+    key: str
+    url: str
+    size: int
+    deduplicated: bool  # Identical bytes were already stored
+
+
+@dataclass(frozen=True)
+class Frame:
+    """One indexed camera frame"""
+    camera_id: str
+    captured_at: datetime
+    key: str
+    url: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "camera_id": self.camera_id,
+            "captured_at": self.captured_at.isoformat(),
+            "key": self.key,
+            "url": self.url
+        }
+
+
+@dataclass(frozen=True)
+class FramePage:
+    """A page of frames and the token for the next one (None on the last page)"""
+    frames: List[Frame]
+    next_page_token: Optional[str]
+
+
+class ImageStorageBackend(ABC):
+    """Interface shared by the storage backends"""
+
+    name: str = "base"
+
+    def __init__(self, concurrency: int = 16):
+        self.concurrency = concurrency
+        self.metrics = {
+            "writes": 0, "deduplicated": 0, "bytes_written": 0, "reads": 0,
+            "frames_indexed": 0, "frame_list_pages": 0, "errors": 0
+        }
+
+    # Backend primitives
+
+    @abstractmethod
+    async def _store(self, data: bytes, camera_id: str, content_type: str) -> StoredImage:
+        """Write bytes under their content key (raises on failure)"""
+
+    @abstractmethod
+    async def _write_frame_marker(self, name: str) -> None:
+        """Create the index entry `name` (raises on failure)"""
+
+    @abstractmethod
+    async def _list_frame_names(
+        self, camera_id: str, lower: str, upper: str, after: Optional[str], limit: int
+    ) -> List[str]:
+        """Up to `limit` index names in [lower, upper) and after `after`, in order"""
+
+    @abstractmethod
+    async def _store_at(self, key: str, data: bytes, content_type: str) -> None:
+        """Write bytes under a given key, if not already present (raises on failure)"""
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool:
+        """Whether an object is stored under key"""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        """Image bytes, or None if missing or the read failed"""
+
+    @abstractmethod
+    async def delete(self, key: str) -> bool:
+        """Delete an image; True if it existed"""
+
+    @abstractmethod
+    def url_for(self, key: str) -> str:
+        """URL the dashboard loads the image from"""
+
+    # Shared behaviour
+
+    @traced("storage")
+    async def put(
+        self,
+        data: bytes,
+        camera_id: str,
+        content_type: str = "image/jpeg",
+        captured_at: Optional[datetime] = None
+    ) -> Optional[StoredImage]:
+        """
+        Store image bytes under their content address and index the frame
+
+        Args:
+            data: Raw image bytes
+            camera_id: Camera the frame came from
+            content_type: MIME type
+            captured_at: Capture time for the frame index (default now)
+
+        Returns:
+            StoredImage, or None if the write failed
+        """
+        try:
+            stored = await self._store(data, camera_id, content_type)
+        except Exception as e:
+            self.metrics["errors"] += 1
+            logger.error(f"❌ {self.name} image write failed for {camera_id}: {e}")
+            return None
+
+        self._record_write(stored.size, stored.deduplicated)
+        await self.index_frame(camera_id, captured_at or datetime.utcnow(), stored.key)
+        return stored
+
+    @traced("storage")
+    async def put_at(self, key: str, data: bytes, content_type: str) -> Optional[str]:
+        """
+        Store bytes derived from a stored image (e.g. a thumbnail) under `key`
+
+        Args:
+            key: Content key of the original plus a suffix
+            data: Derived bytes
+            content_type: MIME type
+
+        Returns:
+            URL, or None if the write failed
+        """
+        try:
+            if not KEY_PATTERN.match(key):
+                raise ValueError(f"Invalid image key: {key!r}")
+            await self._store_at(key, data, content_type)
+        except Exception as e:
+            self.metrics["errors"] += 1
+            logger.error(f"❌ {self.name} write failed for {key}: {e}")
+            return None
+        self._record_write(len(data), deduplicated=False)
+        return self.url_for(key)
+
+    @traced("storage")
+    async def index_frame(self, camera_id: str, captured_at: datetime, key: str) -> bool:
+        """Record a stored image in the time-partitioned frame index"""
+        try:
+            await self._write_frame_marker(frame_name(camera_id, captured_at, key))
+        except Exception as e:
+            # The image itself is stored; it is just missing from time listings
+            self.metrics["errors"] += 1
+            logger.warning(f"⚠️  Failed to index {camera_id} frame {key}: {e}")
+            return False
+        self.metrics["frames_indexed"] += 1
+        return True
+
+    def key_for_url(self, url: Optional[str]) -> Optional[str]:
+        """Key of an image URL produced by this backend, or None"""
+        base = self.url_for("")
+        if url and url.startswith(base):
+            key = url[len(base):]
+            if KEY_PATTERN.match(key):
+                return key
+        return None
+
+    async def put_many(
+        self,
+        images: Sequence[Dict[str, Any]],
+        concurrency: Optional[int] = None
+    ) -> List[Optional[StoredImage]]:
+        """
+        Store several images in parallel
+
+        Args:
+            images: Dicts with 'data', 'camera_id' and optional 'content_type'
+                and 'captured_at'
+            concurrency: Max writes in flight (default IMAGE_STORAGE_CONCURRENCY)
+
+        Returns:
+            StoredImage (or None if failed) per input, in order
+        """
+        semaphore = asyncio.Semaphore(concurrency or self.concurrency)
+
+        def identity(image: Dict[str, Any]) -> Tuple[bytes, str]:
+            return image["data"], image.get("content_type", "image/jpeg")
+
+        async def put_with_limit(image: Dict[str, Any]) -> Optional[StoredImage]:
+            async with semaphore:
+                return await self.put(
+                    image["data"], image["camera_id"],
+                    image.get("content_type", "image/jpeg"), image.get("captured_at")
+                )
+
+        # Identical frames in one batch would race past the existence check,
+        # so each distinct frame is written once and shared
+        first_index: Dict[Tuple[bytes, str], int] = {}
+        for index, image in enumerate(images):
+            first_index.setdefault(identity(image), index)
+        unique = sorted(set(first_index.values()))
+        stored = dict(zip(unique, await asyncio.gather(*(put_with_limit(images[i]) for i in unique))))
+
+        async def index_duplicate(image: Dict[str, Any], original: StoredImage) -> StoredImage:
+            async with semaphore:
+                await self.index_frame(image["camera_id"], image.get("captured_at") or datetime.utcnow(), original.key)
+            self._record_write(original.size, deduplicated=True)
+            return replace(original, deduplicated=True)
+
+        duplicates = [
+            (index, image, stored[first_index[identity(image)]])
+            for index, image in enumerate(images)
+            if index not in stored and stored[first_index[identity(image)]] is not None
+        ]
+        indexed = await asyncio.gather(*(index_duplicate(image, original) for _, image, original in duplicates))
+        stored.update({index: result for (index, _, _), result in zip(duplicates, indexed)})
+
+        return [stored.get(index) for index in range(len(images))]
+
+    async def get_many(self, keys: Sequence[str], concurrency: Optional[int] = None) -> List[Optional[bytes]]:
+        """Read several images in parallel (None for missing ones), in order"""
+        semaphore = asyncio.Semaphore(concurrency or self.concurrency)
+
+        async def get_with_limit(key: str) -> Optional[bytes]:
+            async with semaphore:
+                return await self.get(key)
+
+        return await asyncio.gather(*(get_with_limit(key) for key in keys))
+
+    async def iter_frames(
+        self,
+        camera_id: str,
+        start: datetime,
+        end: datetime,
+        page_size: int = 100,
+        page_token: Optional[str] = None
+    ) -> AsyncIterator[FramePage]:
+        """
+        Frames of one camera captured in [start, end), oldest first
+
+        Only the index names inside the range are read, one page per
+        backend request.
+
+        Args:
+            camera_id: Camera identifier
+            start: Range start (inclusive)
+            end: Range end (exclusive)
+            page_size: Frames per page
+            page_token: Token from a previous page, to resume after it
+
+        Yields:
+            FramePage per page; the last one has next_page_token None
+
+        Raises:
+            ValueError: Invalid camera ID or page token
+        """
+        lower, upper = frame_prefix(camera_id, start), frame_prefix(camera_id, end)
+        after = decode_page_token(page_token) if page_token else None
+        if after is not None and not after.startswith(f"{camera_id}/"):
+            raise ValueError("Invalid page token")
+
+        while True:
+            names = await self._list_frame_names(camera_id, lower, upper, after, page_size)
+            self.metrics["frame_list_pages"] += 1
+            frames = [frame for frame in map(self._parse_frame_name, names) if frame]
+            next_page_token = encode_page_token(names[-1]) if len(names) == page_size else None
+            yield FramePage(frames, next_page_token)
+            if next_page_token is None:
+                return
+            after = names[-1]
+
+    def _parse_frame_name(self, name: str) -> Optional[Frame]:
+        match = FRAME_NAME_PATTERN.match(name)
+        if not match:
+            return None
+        digest = match["digest"]
+        key = f"{digest[:2]}/{digest[2:4]}/{digest}{match['ext'] or ''}"
+        captured_at = datetime(
+            int(match["year"]), int(match["month"]), int(match["day"]),
+            int(match["hour"]), int(match["minute"]), int(match["second"])
+        )
+        return Frame(match["camera_id"], captured_at, key, self.url_for(key))
+
+    def _record_write(self, size: int, deduplicated: bool) -> None:
+        if deduplicated:
+            self.metrics["deduplicated"] += 1
+        else:
+            self.metrics["writes"] += 1
+            self.metrics["bytes_written"] += size
+
+    def stats(self) -> Dict[str, Any]:
+        """Backend metrics for /health"""
+        return {"backend": self.name, **self.metrics}
+
+
+class LocalImageStorage(ImageStorageBackend):
+    """Content-addressed store in a local directory"""
+
+    name = "local"
+
+    def __init__(self, root: str, public_base_url: str = "/api/images", concurrency: int = 16):
+        super().__init__(concurrency)
+        self.root = Path(root)
+        self.frames_root = self.root / "frames"
+        self.public_base_url = public_base_url.rstrip("/")
+
+    def path_for(self, key: str) -> Path:
+        """Filesystem path of a key (rejects anything that is not a content key)"""
+        if not KEY_PATTERN.match(key):
+            raise ValueError(f"Invalid image key: {key!r}")
+        return self.root / key
+
+    def url_for(self, key: str) -> str:
+        return f"{self.public_base_url}/{key}"
+
+    def _write(self, data: bytes, content_type: str) -> StoredImage:
+        key = content_key(data, content_type)
+        written = self._write_at(key, data)
+        return StoredImage(key, self.url_for(key), len(data), deduplicated=not written)
+
+    def _write_at(self, key: str, data: bytes) -> bool:
+        """Atomically create the file for key; False if it already exists"""
+        path = self.path_for(key)
+        if path.exists():
+            return False
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.write(data)
+                tmp.flush()
+                os.fsync(tmp.fileno())
+            # Atomic rename; a concurrent writer of the same bytes is harmless
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        return True
+
+    async def _store(self, data: bytes, camera_id: str, content_type: str) -> StoredImage:
+        return await asyncio.to_thread(self._write, data, content_type)
+
+    async def _store_at(self, key: str, data: bytes, content_type: str) -> None:
+        await asyncio.to_thread(self._write_at, key, data)
+
+    async def exists(self, key: str) -> bool:
+        try:
+            return await asyncio.to_thread(self.path_for(key).is_file)
+        except ValueError:
+            return False
+
+    def _touch_marker(self, name: str) -> None:
+        path = self.frames_root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch()
+
+    async def _write_frame_marker(self, name: str) -> None:
+        await asyncio.to_thread(self._touch_marker, name)
+
+    def _scan_frames(self, camera_id: str, lower: str, upper: str, after: Optional[str], limit: int) -> List[str]:
+        names: List[str] = []
+        floor = max(lower, after or "")
+
+        def walk(directory: Path, relative: str, depth: int) -> bool:
+            try:
+                entries = sorted(os.listdir(directory))
+            except FileNotFoundError:
+                return False
+            for entry in entries:
+                name = f"{relative}/{entry}"
+                if depth < 4:
+                    # Year, month, day and hour dirs: skip those wholly outside the range
+                    if name + "/\x7f" < floor or name + "/" >= upper:
+                        continue
+                    if walk(directory / entry, name, depth + 1):
+                        return True
+                elif lower <= name < upper and (after is None or name > after):
+                    names.append(name)
+                    if len(names) >= limit:
+                        return True
+            return False
+
+        walk(self.frames_root / camera_id, camera_id, 0)
+        return names
+
+    async def _list_frame_names(
+        self, camera_id: str, lower: str, upper: str, after: Optional[str], limit: int
+    ) -> List[str]:
+        return await asyncio.to_thread(self._scan_frames, camera_id, lower, upper, after, limit)
+
+    @traced("storage")
+    async def get(self, key: str) -> Optional[bytes]:
+        try:
+            data = await asyncio.to_thread(self.path_for(key).read_bytes)
+        except (FileNotFoundError, ValueError):
+            return None
+        except Exception as e:
+            self.metrics["errors"] += 1
+            logger.error(f"❌ Local image read failed for {key}: {e}")
+            return None
+        self.metrics["reads"] += 1
+        return data
+
+    async def delete(self, key: str) -> bool:
+        try:
+            await asyncio.to_thread(self.path_for(key).unlink)
+            return True
+        except (FileNotFoundError, ValueError):
+            return False
+
+
+class GCSImageStorage(ImageStorageBackend):
+    """Content-addressed store in the Cloud Storage bucket"""
+
+    name = "gcs"
+
+    def __init__(
+        self,
+        service: GCPStorageService,
+        prefix: str = "images/",
+        frames_prefix: str = "frames/",
+        concurrency: int = 16
+    ):
+        super().__init__(concurrency)
+        self.service = service
+        self.prefix = prefix
+        self.frames_prefix = frames_prefix
+
+    def url_for(self, key: str) -> str:
+        return self.service.get_public_url(f"{self.prefix}{key}")
+
+    def _upload(self, key: str, data: bytes, content_type: str, metadata: Optional[Dict[str, str]] = None) -> bool:
+        """Create the object for key; False if it already exists"""
+        from google.api_core.exceptions import PreconditionFailed
+
+        blob = self.service.bucket.blob(f"{self.prefix}{key}")
+        blob.cache_control = IMMUTABLE_CACHE_CONTROL
+        blob.metadata = metadata
+        try:
+            # Only create: an existing object with this name has the same bytes
+            blob.upload_from_string(data, content_type=content_type, if_generation_match=0)
+        except PreconditionFailed:
+            return False
+        return True
+
+    async def _store(self, data: bytes, camera_id: str, content_type: str) -> StoredImage:
+        if not await self.service.ensure_client():
+            raise RuntimeError("GCP Storage not available")
+        key = content_key(data, content_type)
+        written = await asyncio.to_thread(self._upload, key, data, content_type, {"camera_id": camera_id})
+        return StoredImage(key, self.url_for(key), len(data), deduplicated=not written)
+
+    async def _store_at(self, key: str, data: bytes, content_type: str) -> None:
+        if not await self.service.ensure_client():
+            raise RuntimeError("GCP Storage not available")
+        await asyncio.to_thread(self._upload, key, data, content_type)
+
+    async def exists(self, key: str) -> bool:
+        if not KEY_PATTERN.match(key) or not await self.service.ensure_client():
+            return False
+        return await asyncio.to_thread(self.service.bucket.blob(f"{self.prefix}{key}").exists)
+
+    async def _write_frame_marker(self, name: str) -> None:
+        blob = self.service.bucket.blob(f"{self.frames_prefix}{name}")
+        await asyncio.to_thread(blob.upload_from_string, b"", content_type="application/octet-stream")
+
+    def _list_names(self, camera_id: str, lower: str, upper: str, after: Optional[str], limit: int) -> List[str]:
+        # start_offset is inclusive: fetch one extra to drop `after` itself
+        blobs = self.service.client.list_blobs(
+            self.service.bucket_name,
+            prefix=f"{self.frames_prefix}{camera_id}/",
+            start_offset=f"{self.frames_prefix}{max(lower, after or '')}",
+            end_offset=f"{self.frames_prefix}{upper}",
+            max_results=limit + 1,
+            fields="items(name),nextPageToken"
+        )
+        names = [blob.name[len(self.frames_prefix):] for blob in blobs]
+        return [name for name in names if after is None or name > after][:limit]
+
+    async def _list_frame_names(
+        self, camera_id: str, lower: str, upper: str, after: Optional[str], limit: int
+    ) -> List[str]:
+        if not await self.service.ensure_client():
+            return []
+        return await asyncio.to_thread(self._list_names, camera_id, lower, upper, after, limit)
+
+    @traced("storage")
+    async def get(self, key: str) -> Optional[bytes]:
+        if not KEY_PATTERN.match(key) or not await self.service.ensure_client():
+            return None
+        from google.api_core.exceptions import NotFound
+
+        blob = self.service.bucket.blob(f"{self.prefix}{key}")
+        try:
+            data = await asyncio.to_thread(blob.download_as_bytes)
+        except NotFound:
+            return None
+        except Exception as e:
+            self.metrics["errors"] += 1
+            logger.error(f"❌ GCS image download failed for {key}: {e}")
+            return None
+        self.metrics["reads"] += 1
+        return data
+
+    async def delete(self, key: str) -> bool:
+        if not KEY_PATTERN.match(key):
+            return False
+        return await self.service.delete_image(f"{self.prefix}{key}")
+
+
+def create_image_storage(backend: str = "auto") -> ImageStorageBackend:
+    """
+    Build a storage backend
+
+    Args:
+        backend: "gcs", "local", or "auto" (GCS if its library is installed)
+
+    Returns:
+        Configured backend
+    """
+    if backend == "auto":
+        backend = "gcs" if GCP_AVAILABLE else "local"
+    if backend == "gcs":
+        return GCSImageStorage(gcp_storage_service, concurrency=settings.IMAGE_STORAGE_CONCURRENCY)
+    if backend == "local":
+        return LocalImageStorage(
+            settings.LOCAL_IMAGE_STORAGE_PATH,
+            public_base_url=settings.IMAGE_PUBLIC_BASE_URL,
+            concurrency=settings.IMAGE_STORAGE_CONCURRENCY
+        )
+    raise ValueError(f"Unknown image storage backend: {backend!r}")
+
+
+# Global service instance
+image_storage = create_image_storage(settings.IMAGE_STORAGE_BACKEND)
+
+
+# Convenience functions
+async def store_camera_image(
+    data: bytes,
+    camera_id: str,
+    content_type: str = "image/jpeg",
+    captured_at: Optional[datetime] = None
+) -> Optional[StoredImage]:
+    """
+    Store a camera frame in the configured backend
+
+    Args:
+        data: Image bytes
+        camera_id: Camera identifier
+        content_type: MIME type
+        captured_at: Capture time (default now)
+
+    Returns:
+        StoredImage, or None if the write failed
+    """
+    return await image_storage.put(data, camera_id, content_type, captured_at)
+
+
+async def list_camera_frames(
+    camera_id: str,
+    start: datetime,
+    end: datetime,
+    limit: int = 100,
+    page_token: Optional[str] = None
+) -> FramePage:
+    """
+    One page of a camera's frames in [start, end), oldest first
+
+    Args:
+        camera_id: Camera identifier
+        start: Range start (inclusive)
+        end: Range end (exclusive)
+        limit: Page size
+        page_token: Token from the previous page
+
+    Returns:
+        FramePage with the next page token (None on the last page)
+    """
+    pages = image_storage.iter_frames(camera_id, start, end, limit, page_token)
+    try:
+        return await pages.__anext__()
+    finally:
+        await pages.aclose()
@@ -0,0 +1,425 @@
+"""
+Job Queue Service
+=================
+
+Durable background jobs backed by the `jobs` table.
+
+Jobs are enqueued in the same transaction as the rows they act on. Workers
+run in-process (JOB_WORKER_CONCURRENCY) or as separate processes
+(`python worker.py`). Each worker claims one job at a time with a single
+UPDATE ... WHERE id = (SELECT ... FOR UPDATE SKIP LOCKED) RETURNING statement.
+On SQLite the FOR UPDATE clause is dropped; the statement is still atomic
+because SQLite serializes writers.
+
+A claimed job holds a lease that its worker renews with heartbeats. Jobs
+whose lease expires, e.g. because the process died, are requeued by any
+pool. Failures are retried with exponential backoff up to max_attempts.
+Every handler opens its own database sessions; nothing request-scoped
+outlives the request.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import select, update, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from database import AsyncSessionLocal
+from models import Job
+from tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+# job_type -> async handler(ctx) returning a JSON-serializable result
+JOB_HANDLERS: Dict[str, Callable[["JobContext"], Awaitable[Optional[Dict[str, Any]]]]] = {}
+
+
+class PermanentJobError(Exception):
+    """Raise from a handler to fail a job without retrying"""
+
+
+def job_handler(job_type: str):
+    """Register an async handler for a job type"""
+    def decorator(func):
+        JOB_HANDLERS[job_type] = func
+        return func
+    return decorator
+
+
+@dataclass
+class JobContext:
+    """What a handler knows about the job it is running"""
+    job_id: int
+    job_type: str
+    payload: Dict[str, Any]
+    attempt: int
+    worker_id: str
+
+    async def report_progress(self, fraction: float, message: Optional[str] = None) -> None:
+        """Record progress (0.0-1.0); also renews the lease"""
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                update(Job)
+                .where(Job.id == self.job_id, Job.locked_by == self.worker_id)
+                .values(
+                    progress=max(0.0, min(fraction, 1.0)),
+                    progress_message=message[:200] if message else None,
+                    heartbeat_at=datetime.utcnow()
+                )
+            )
+            await session.commit()
+
+
+class JobQueue:
+    """Database operations on the jobs table"""
+
+    def __init__(self, lease_seconds: float = 120.0, retry_backoff_seconds: float = 30.0):
+        self.lease_seconds = lease_seconds
+        self.retry_backoff_seconds = retry_backoff_seconds
+
+    async def enqueue(
+        self,
+        db: AsyncSession,
+        job_type: str,
+        payload: Optional[Dict[str, Any]] = None,
+        priority: int = 0,
+        max_attempts: Optional[int] = None,
+        run_after: Optional[datetime] = None,
+        dedupe_key: Optional[str] = None
+    ) -> Job:
+        """
+        Add a job to the caller's transaction
+
+        The caller commits, so the job becomes visible atomically with the
+        rows it refers to. Call job_worker_pool.notify() after the commit
+        to wake idle in-process workers.
+
+        A job with an existing dedupe_key is not enqueued twice; the
+        existing job is returned instead.
+        """
+        if dedupe_key:
+            existing = await db.execute(select(Job).where(Job.dedupe_key == dedupe_key))
+            job = existing.scalar_one_or_none()
+            if job:
+                return job
+
+        job = Job(
+            job_type=job_type,
+            payload=payload or {},
+            priority=priority,
+            max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+            run_after=run_after or datetime.utcnow(),
+            dedupe_key=dedupe_key,
+            status=QUEUED,
+            attempts=0,
+            progress=0.0
+        )
+        try:
+            async with db.begin_nested():
+                db.add(job)
+        except IntegrityError:
+            # Lost a race with a concurrent enqueue of the same dedupe_key
+            existing = await db.execute(select(Job).where(Job.dedupe_key == dedupe_key))
+            return existing.scalar_one()
+        return job
+
+    async def claim(self, worker_id: str) -> Optional[Job]:
+        """Atomically claim the next runnable job, or None if there is none"""
+        now = datetime.utcnow()
+        next_job = (
+            select(Job.id)
+            .where(Job.status == QUEUED, Job.run_after <= now)
+            .order_by(Job.priority.desc(), Job.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                update(Job)
+                .where(Job.id == next_job, Job.status == QUEUED)
+                .values(
+                    status=RUNNING,
+                    locked_by=worker_id,
+                    locked_at=now,
+                    heartbeat_at=now,
+                    attempts=Job.attempts + 1,
+                    started_at=func.coalesce(Job.started_at, now)
+                )
+                .returning(Job)
+                .execution_options(synchronize_session=False)
+            )
+            job = result.scalar_one_or_none()
+            await session.commit()
+            return job
+
+    async def heartbeat(self, job_id: int, worker_id: str) -> bool:
+        """Renew a lease; False means the lease was lost (reaped)"""
+        return await self._update_owned(job_id, worker_id, heartbeat_at=datetime.utcnow())
+
+    async def complete(self, job_id: int, worker_id: str, result: Optional[Dict[str, Any]]) -> bool:
+        """Mark a job succeeded"""
+        return await self._update_owned(
+            job_id, worker_id,
+            status=SUCCEEDED,
+            result=result,
+            progress=1.0,
+            finished_at=datetime.utcnow(),
+            locked_by=None
+        )
+
+    async def fail(self, job: Job, worker_id: str, error: Exception, permanent: bool = False) -> bool:
+        """
+        Record a failed attempt
+
+        Returns:
+            True if the job was requeued for another attempt
+        """
+        retry = not permanent and job.attempts < job.max_attempts
+        now = datetime.utcnow()
+        values = {
+            "last_error": f"{type(error).__name__}: {error}"[:2000],
+            "locked_by": None
+        }
+        if retry:
+            backoff = self.retry_backoff_seconds * (2 ** max(job.attempts - 1, 0))
+            values.update(status=QUEUED, run_after=now + timedelta(seconds=backoff))
+        else:
+            values.update(status=FAILED, finished_at=now)
+
+        await self._update_owned(job.id, worker_id, **values)
+        return retry
+
+    async def release(self, job_id: int, worker_id: str) -> None:
+        """Hand a job back untouched (worker shutting down); the attempt is not counted"""
+        await self._update_owned(
+            job_id, worker_id,
+            status=QUEUED,
+            attempts=Job.attempts - 1,
+            locked_by=None,
+            run_after=datetime.utcnow()
+        )
+
+    async def retry(self, db: AsyncSession, job_id: int) -> bool:
+        """Requeue a failed job with a fresh attempt budget (caller commits)"""
+        result = await db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == FAILED)
+            .values(status=QUEUED, attempts=0, run_after=datetime.utcnow(), finished_at=None)
+        )
+        return result.rowcount == 1
+
+    async def reap_expired(self) -> Dict[str, int]:
+        """Requeue (or fail, when out of attempts) running jobs whose lease expired"""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.lease_seconds)
+        expired = (Job.status == RUNNING, Job.heartbeat_at < cutoff)
+        error = f"Lease expired (no heartbeat for {self.lease_seconds:.0f}s)"
+
+        async with AsyncSessionLocal() as session:
+            requeued = await session.execute(
+                update(Job)
+                .where(*expired, Job.attempts < Job.max_attempts)
+                .values(status=QUEUED, locked_by=None, last_error=error, run_after=datetime.utcnow())
+            )
+            failed = await session.execute(
+                update(Job)
+                .where(*expired, Job.attempts >= Job.max_attempts)
+                .values(status=FAILED, locked_by=None, last_error=error, finished_at=datetime.utcnow())
+            )
+            await session.commit()
+
+        counts = {"requeued": requeued.rowcount, "failed": failed.rowcount}
+        if any(counts.values()):
+            logger.warning(f"⚠️  Reaped expired jobs: {counts}")
+        return counts
+
+    async def _update_owned(self, job_id: int, worker_id: str, **values) -> bool:
+        """UPDATE a job only while worker_id still holds its lease"""
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == RUNNING, Job.locked_by == worker_id)
+                .values(**values)
+            )
+            await session.commit()
+            return result.rowcount == 1
+
+
+class JobWorkerPool:
+    """Async workers that claim and run jobs"""
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        concurrency: int = 2,
+        poll_interval: float = 2.0,
+        heartbeat_interval: float = 15.0
+    ):
+        self.queue = queue
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+
+        self.worker_prefix = f"{socket.gethostname()}:{os.getpid()}"
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+        self._stopped = asyncio.Event()
+        self._stopping = False
+        self.running = 0
+        self.metrics = {"claimed": 0, "succeeded": 0, "retried": 0, "failed": 0}
+
+    @property
+    def started(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self, concurrency: Optional[int] = None) -> None:
+        """Start worker and housekeeping tasks"""
+        if self._tasks:
+            return
+        if concurrency is not None:
+            self.concurrency = concurrency
+
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._stopped = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._worker_loop(f"{self.worker_prefix}:{index}"))
+            for index in range(self.concurrency)
+        ]
+        self._tasks.append(asyncio.create_task(self._housekeeping_loop()))
+        logger.info(f"✅ Job worker pool started ({self.concurrency} workers)")
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Stop claiming; give running jobs `timeout` seconds, then hand them back"""
+        if not self._tasks:
+            return
+
+        self._stopping = True
+        self._wakeup.set()
+        self._stopped.set()
+        done, pending = await asyncio.wait(self._tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+        self._tasks = []
+        logger.info("✅ Job worker pool stopped")
+
+    def notify(self) -> None:
+        """Wake idle workers (call after committing an enqueue)"""
+        self._wakeup.set()
+
+    def stats(self) -> Dict[str, Any]:
+        """Worker metrics for /health"""
+        return {
+            "workers": self.concurrency if self._tasks else 0,
+            "running": self.running,
+            **self.metrics
+        }
+
+    async def _worker_loop(self, worker_id: str) -> None:
+        while not self._stopping:
+            try:
+                job = await self.queue.claim(worker_id)
+            except Exception as e:
+                logger.error(f"❌ Job claim failed: {e}")
+                job = None
+
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+
+            await self._run(job, worker_id)
+
+    async def _run(self, job: Job, worker_id: str) -> None:
+        self.metrics["claimed"] += 1
+        self.running += 1
+        ctx = JobContext(
+            job_id=job.id,
+            job_type=job.job_type,
+            payload=job.payload or {},
+            attempt=job.attempts,
+            worker_id=worker_id
+        )
+        heartbeat = asyncio.create_task(self._heartbeat_loop(ctx))
+        logger.info(f"🚀 Job {job.id} ({job.job_type}) attempt {job.attempts}/{job.max_attempts} on {worker_id}")
+
+        try:
+            handler = JOB_HANDLERS.get(job.job_type)
+            if handler is None:
+                raise PermanentJobError(f"No handler registered for job type {job.job_type}")
+            # Stage timings land in /metrics as route "job:{job_type}"
+            with tracer.trace_job(job.job_type):
+                result = await handler(ctx)
+        except asyncio.CancelledError:
+            await self.queue.release(job.id, worker_id)
+            raise
+        except Exception as e:
+            retried = await self.queue.fail(job, worker_id, e, permanent=isinstance(e, PermanentJobError))
+            self.metrics["retried" if retried else "failed"] += 1
+            logger.error(f"❌ Job {job.id} failed ({'will retry' if retried else 'giving up'}): {e}", exc_info=True)
+        else:
+            await self.queue.complete(job.id, worker_id, result)
+            self.metrics["succeeded"] += 1
+            logger.info(f"✅ Job {job.id} ({job.job_type}) succeeded")
+        finally:
+            heartbeat.cancel()
+            self.running -= 1
+
+    async def _heartbeat_loop(self, ctx: JobContext) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                if not await self.queue.heartbeat(ctx.job_id, ctx.worker_id):
+                    logger.warning(f"⚠️  Job {ctx.job_id} lease lost by {ctx.worker_id}")
+                    return
+            except Exception as e:
+                logger.error(f"❌ Heartbeat failed for job {ctx.job_id}: {e}")
+
+    async def _housekeeping_loop(self) -> None:
+        interval = max(self.queue.lease_seconds / 2, self.poll_interval)
+        while not self._stopping:
+            try:
+                await self.queue.reap_expired()
+            except Exception as e:
+                logger.error(f"❌ Job reaper failed: {e}")
+            try:
+                await asyncio.wait_for(self._stopped.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+# Global service instances
+job_queue = JobQueue(
+    lease_seconds=settings.JOB_LEASE_SECONDS,
+    retry_backoff_seconds=settings.JOB_RETRY_BACKOFF_SECONDS
+)
+job_worker_pool = JobWorkerPool(
+    job_queue,
+    concurrency=settings.JOB_WORKER_CONCURRENCY,
+    poll_interval=settings.JOB_POLL_INTERVAL_SECONDS,
+    heartbeat_interval=settings.JOB_HEARTBEAT_SECONDS
+)
+
+
+# Convenience functions
+async def enqueue_job(db: AsyncSession, job_type: str, payload: Optional[Dict[str, Any]] = None, **kwargs) -> Job:
+    """Add a job to the caller's transaction (see JobQueue.enqueue)"""
+    return await job_queue.enqueue(db, job_type, payload, **kwargs)
@@ -0,0 +1,249 @@
+"""
+Response Cache Service
+======================
+
+In-process cache for hot read endpoints (dashboard polling).
+
+Entries are keyed on route path + sorted query string and grouped into
+namespaces ("cameras", "work_zones", ...). Write paths call invalidate()
+with the namespaces they touch. Concurrent misses for the same key are
+coalesced (single-flight), so a burst of dashboard polls costs one database
+round-trip.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """Per-route caching policy"""
+    ttl_seconds: float
+    namespaces: Tuple[str, ...]
+
+
+# Cached GET routes: path -> policy
+CACHE_POLICIES: Dict[str, CachePolicy] = {
+    "/api/cameras/": CachePolicy(60, ("cameras",)),
+    "/api/cameras/stats/summary": CachePolicy(60, ("cameras",)),
+    "/api/work-zones/active": CachePolicy(10, ("work_zones",)),
+    "/api/work-zones/stats/summary": CachePolicy(15, ("work_zones",)),
+    "/api/collection/stats/summary": CachePolicy(15, ("collection",)),
+    "/api/directions/stats/summary": CachePolicy(60, ("directions", "cameras")),
+    "/api/analysis/stats/summary": CachePolicy(15, ("work_zones",)),
+    "/api/stats": CachePolicy(15, ("cameras", "work_zones", "collection", "directions")),
+}
+
+
+@dataclass
+class CacheEntry:
+    """Cached value with expiry"""
+    value: Any
+    expires_at: float
+    namespaces: Tuple[str, ...]
+
+
+class ResponseCache:
+    """In-memory TTL cache with namespace invalidation and single-flight fills"""
+
+    _METRIC_FOR_STATE = {"hit": "hits", "miss": "misses", "stale": "stale", "coalesced": "coalesced"}
+
+    def __init__(self, enabled: bool = False, max_entries: int = 1000):
+        """
+        Initialize response cache
+
+        Args:
+            enabled: Serve and store entries (settings.ENABLE_CACHING)
+            max_entries: LRU capacity
+        """
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._generations: Dict[str, int] = {}
+        self.metrics = {
+            "hits": 0,
+            "misses": 0,
+            "stale": 0,
+            "coalesced": 0,
+            "invalidations": 0,
+            "evictions": 0
+        }
+
+    @staticmethod
+    def make_key(path: str, query_params: Iterable[Tuple[str, str]]) -> str:
+        """Build cache key from route path and query parameters"""
+        query = "&".join(f"{k}={v}" for k, v in sorted(query_params))
+        return f"{path}?{query}"
+
+    def get(self, key: str) -> Tuple[Optional[Any], str]:
+        """
+        Look up a fresh entry
+
+        Returns:
+            (value, state) where state is "hit", "stale" or "miss"
+        """
+        value, state = self._lookup(key)
+        self.metrics[self._METRIC_FOR_STATE[state]] += 1
+        return value, state
+
+    def set(self, key: str, value: Any, policy: CachePolicy) -> None:
+        """Store an entry, evicting the least recently used past capacity"""
+        self._entries[key] = CacheEntry(
+            value=value,
+            expires_at=time.monotonic() + policy.ttl_seconds,
+            namespaces=policy.namespaces
+        )
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.metrics["evictions"] += 1
+
+    async def get_or_compute(
+        self,
+        key: str,
+        policy: CachePolicy,
+        compute: Callable[[], Awaitable[Tuple[Any, bool]]]
+    ) -> Tuple[Any, str]:
+        """
+        Return cached value or compute it once for all concurrent callers
+
+        Args:
+            key: Cache key
+            policy: Route policy (TTL and namespaces)
+            compute: Coroutine returning (value, cacheable)
+
+        Returns:
+            (value, state) where state is "hit", "miss", "stale" or "coalesced"
+        """
+        value, state = self._lookup(key)
+        inflight = self._inflight.get(key)
+        if state != "hit" and inflight is not None:
+            state = "coalesced"
+
+        self.metrics[self._METRIC_FOR_STATE[state]] += 1
+        if state == "hit":
+            return value, state
+        if state == "coalesced":
+            try:
+                return await asyncio.shield(inflight), state
+            except asyncio.CancelledError:
+                if not inflight.cancelled() or asyncio.current_task().cancelling():
+                    raise
+                # The filling request was cancelled (e.g. its client went away)
+                return await self.get_or_compute(key, policy, compute)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        generations = self._snapshot(policy.namespaces)
+
+        try:
+            value, cacheable = await compute()
+        except asyncio.CancelledError:
+            # Waiters compute for themselves instead of failing with this cancellation
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Waiters re-raise; mark retrieved so an unawaited future doesn't warn
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            # Don't store a result computed across an invalidation
+            if cacheable and generations == self._snapshot(policy.namespaces):
+                self.set(key, value, policy)
+            return value, state
+        finally:
+            self._inflight.pop(key, None)
+
+    def invalidate(self, *namespaces: str) -> int:
+        """
+        Drop every entry belonging to any of the given namespaces
+
+        Called by write paths (create/update/resolve/delete, analysis runs).
+
+        Returns:
+            Number of entries removed
+        """
+        for namespace in namespaces:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+
+        if not self._entries:
+            return 0
+
+        targets = set(namespaces)
+        stale_keys = [
+            key for key, entry in self._entries.items()
+            if targets.intersection(entry.namespaces)
+        ]
+        for key in stale_keys:
+            del self._entries[key]
+
+        if stale_keys:
+            self.metrics["invalidations"] += len(stale_keys)
+            logger.debug(f"Cache invalidated {len(stale_keys)} entries for {namespaces}")
+
+        return len(stale_keys)
+
+    def clear(self) -> None:
+        """Drop all entries"""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache metrics for /health"""
+        lookups = sum(self.metrics[name] for name in self._METRIC_FOR_STATE.values())
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            **self.metrics,
+            # Coalesced requests were also served without their own DB work
+            "hit_rate": round(
+                (self.metrics["hits"] + self.metrics["coalesced"]) / lookups, 3
+            ) if lookups else 0.0
+        }
+
+    def _lookup(self, key: str) -> Tuple[Optional[Any], str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None, "miss"
+
+        if entry.expires_at <= time.monotonic():
+            del self._entries[key]
+            return None, "stale"
+
+        self._entries.move_to_end(key)
+        return entry.value, "hit"
+
+    def _snapshot(self, namespaces: Tuple[str, ...]) -> Tuple[int, ...]:
+        return tuple(self._generations.get(ns, 0) for ns in namespaces)
+
+
+# Global service instance
+response_cache = ResponseCache(
+    enabled=settings.ENABLE_CACHING,
+    max_entries=settings.CACHE_MAX_ENTRIES
+)
+
+
+# Convenience functions
+def invalidate_cache(*namespaces: str) -> int:
+    """
+    Convenience function to invalidate cached responses
+
+    Args:
+        namespaces: Namespaces touched by a write ("cameras", "work_zones", ...)
+
+    Returns:
+        Number of entries removed
+    """
+    return response_cache.invalidate(*namespaces)
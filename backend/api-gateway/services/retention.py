@@ -0,0 +1,460 @@
+"""
+Retention Service
+=================
+
+Keeps the hot tables small: without it `work_zones`, `collection_runs`,
+`jobs` and `sync_tombstones` only ever grow, and history/stats queries scan
+more every month.
+
+Each run, in batches of RETENTION_BATCH_SIZE rows, one short transaction
+per batch:
+
+1. Resolved/archived work zones last active more than RETENTION_WORK_ZONE_DAYS
+   ago move to `work_zones_archive`. Real ones are rolled up into per-camera
+   hourly and daily `work_zone_rollups` in the same transaction.
+2. Finished collection runs older than RETENTION_COLLECTION_RUN_DAYS move
+   to `collection_runs_archive`.
+3. Archived rows older than RETENTION_ARCHIVE_DAYS are purged. On
+   PostgreSQL the archives are partitioned by month and whole expired
+   partitions are dropped; on SQLite rows are deleted in batches.
+4. Hourly roll-ups older than RETENTION_HOURLY_ROLLUP_DAYS are purged
+   (daily roll-ups are kept).
+5. Finished jobs older than RETENTION_JOB_DAYS are purged.
+6. Tombstones older than RETENTION_TOMBSTONE_DAYS are pruned and
+   sync_state.pruned_through advanced, so older ?since= clients refetch.
+
+Active work zones are never moved. Archived work zones are not tombstoned:
+delta clients (`/active?since=`) only hold active zones, and saw these
+resolved long ago. Instead sync_state.pruned_through is advanced to their
+last change version, so only a client that synced before that refetches. Runs are scheduled as `retention.run`
+jobs every RETENTION_INTERVAL_HOURS (RETENTION_ENABLED), with one dedupe
+key per interval so several gateway instances enqueue one run.
+"""
+
+import asyncio
+import logging
+import re
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Table, case, delete, func, insert, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from database import AsyncSessionLocal, is_sqlite, naive_utc, upsert_insert
+from models import (
+    CollectionRun, Job, SyncState, SyncTombstone, WorkZone, WorkZoneRollup,
+    collection_runs_archive, work_zones_archive
+)
+from .analysis_service import ProgressCallback
+from .job_queue import JobContext, enqueue_job, job_handler, job_worker_pool
+
+logger = logging.getLogger(__name__)
+
+RETENTION_JOB_TYPE = "retention.run"
+
+ROLLUP_GRANULARITIES = ("hour", "day")
+HIGH_RISK_SCORE = 7
+
+# {archive table}_pYYYYMM
+PARTITION_NAME_PATTERN = re.compile(r"^(?P<table>\w+)_p(?P<year>\d{4})(?P<month>\d{2})$")
+
+
+def bucket_start(value: datetime, granularity: str) -> datetime:
+    """Start of the hour or day (UTC) containing a timestamp"""
+    value = naive_utc(value).replace(minute=0, second=0, microsecond=0)
+    return value.replace(hour=0) if granularity == "day" else value
+
+
+def month_start(value: datetime) -> datetime:
+    return naive_utc(value).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_month(value: datetime) -> datetime:
+    return (value.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def partition_name(table: str, month: datetime) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+
+def rollup_rows(rows: Sequence[Any]) -> List[Dict[str, Any]]:
+    """
+    Hourly and daily per-camera aggregates of work zone rows
+
+    Args:
+        rows: Rows with camera_id, detected_at, risk_score, detection_count
+
+    Returns:
+        work_zone_rollups rows (one per camera, granularity and bucket)
+    """
+    buckets: Dict[Tuple[int, str, datetime], Dict[str, Any]] = {}
+    for row in rows:
+        for granularity in ROLLUP_GRANULARITIES:
+            key = (row.camera_id, granularity, bucket_start(row.detected_at, granularity))
+            bucket = buckets.setdefault(key, {
+                "camera_id": key[0], "granularity": key[1], "bucket_start": key[2],
+                "work_zones": 0, "detections": 0, "high_risk": 0, "risk_score_sum": 0, "max_risk_score": 0
+            })
+            bucket["work_zones"] += 1
+            bucket["detections"] += row.detection_count or 1
+            bucket["high_risk"] += int(row.risk_score >= HIGH_RISK_SCORE)
+            bucket["risk_score_sum"] += row.risk_score
+            bucket["max_risk_score"] = max(bucket["max_risk_score"], row.risk_score)
+    return list(buckets.values())
+
+
+@dataclass
+class RetentionPolicy:
+    """How long each kind of row is kept (days)"""
+    work_zone_days: int = 90
+    collection_run_days: int = 365
+    archive_days: int = 730
+    hourly_rollup_days: int = 180
+    job_days: int = 14
+    tombstone_days: int = 7
+    batch_size: int = 1000
+
+
+class RetentionService:
+    """Archives, rolls up and purges old rows in batches"""
+
+    def __init__(self, policy: RetentionPolicy, interval_hours: float = 24.0):
+        self.policy = policy
+        self.interval_seconds = interval_hours * 3600
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+
+        self.running = False
+        self.phase: Optional[str] = None
+        self.last_run: Optional[Dict[str, Any]] = None
+        self.metrics = {
+            "runs": 0, "failed_runs": 0, "batches": 0,
+            "work_zones_archived": 0, "collection_runs_archived": 0, "rollup_buckets_written": 0,
+            "archive_rows_purged": 0, "partitions_dropped": 0, "hourly_rollups_purged": 0,
+            "jobs_purged": 0, "tombstones_pruned": 0
+        }
+
+    # Scheduling
+
+    async def start(self) -> None:
+        """Enqueue a retention run every interval"""
+        if self._task:
+            return
+        self._stopping = asyncio.Event()
+        self._task = asyncio.create_task(self._schedule_loop())
+        logger.info(f"✅ Retention scheduled every {self.interval_seconds / 3600:g}h")
+
+    async def stop(self) -> None:
+        if not self._task:
+            return
+        self._stopping.set()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _schedule_loop(self) -> None:
+        while not self._stopping.is_set():
+            # One run per wall-clock interval, whichever instance enqueues first
+            period = int(time.time() // self.interval_seconds)
+            try:
+                async with AsyncSessionLocal() as session:
+                    await enqueue_job(session, RETENTION_JOB_TYPE, {}, max_attempts=1, dedupe_key=f"retention:{period}")
+                    await session.commit()
+                job_worker_pool.notify()
+            except Exception as e:
+                logger.error(f"❌ Failed to schedule retention: {e}")
+
+            next_period = (period + 1) * self.interval_seconds
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=max(next_period - time.time(), 1.0))
+            except asyncio.TimeoutError:
+                pass
+
+    # Running
+
+    async def run(self, progress: Optional[ProgressCallback] = None, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Run every retention step once
+
+        Args:
+            progress: Optional callback invoked before each step
+            now: Reference time for cutoffs (default now, naive UTC)
+
+        Returns:
+            Rows moved/purged per step and the run duration
+        """
+        now = now or datetime.utcnow()
+        policy = self.policy
+        steps = [
+            ("work_zones_archived", self.archive_work_zones, policy.work_zone_days),
+            ("collection_runs_archived", self.archive_collection_runs, policy.collection_run_days),
+            ("archive_rows_purged", self.purge_archives, policy.archive_days),
+            ("hourly_rollups_purged", self.purge_hourly_rollups, policy.hourly_rollup_days),
+            ("jobs_purged", self.purge_jobs, policy.job_days),
+            ("tombstones_pruned", self.prune_tombstones, policy.tombstone_days),
+        ]
+
+        start = time.perf_counter()
+        self.running = True
+        summary: Dict[str, Any] = {}
+        try:
+            for index, (name, step, days) in enumerate(steps):
+                self.phase = name
+                if progress:
+                    await progress(index / len(steps), f"Retention: {name.replace('_', ' ')}")
+                summary[name] = await step(now - timedelta(days=days))
+                self.metrics[name] += summary[name]
+            self.metrics["runs"] += 1
+        except Exception:
+            self.metrics["failed_runs"] += 1
+            raise
+        finally:
+            self.running = False
+            self.phase = None
+
+        summary["duration_seconds"] = round(time.perf_counter() - start, 2)
+        summary["finished_at"] = datetime.utcnow().isoformat()
+        self.last_run = summary
+        logger.info(f"✅ Retention run complete: {summary}")
+        return summary
+
+    async def _batches(self, step) -> int:
+        """Run step(db) -> rows handled, one transaction each, until it returns fewer than a batch"""
+        total = 0
+        while True:
+            async with AsyncSessionLocal() as db:
+                count = await step(db)
+                await db.commit()
+            total += count
+            self.metrics["batches"] += 1
+            if count < self.policy.batch_size:
+                return total
+            # Let request traffic in between batches
+            await asyncio.sleep(0)
+
+    async def archive_work_zones(self, cutoff: datetime) -> int:
+        """Move inactive work zones last active before cutoff to the archive, rolling them up"""
+        last_active = func.coalesce(WorkZone.resolved_at, WorkZone.last_seen_at, WorkZone.detected_at)
+
+        async def step(db: AsyncSession) -> int:
+            rows = (await db.execute(
+                select(WorkZone.id, WorkZone.camera_id, WorkZone.detected_at, WorkZone.risk_score,
+                       WorkZone.detection_count, WorkZone.synthetic, WorkZone.change_version)
+                .where(
+                    WorkZone.status != "active",
+                    WorkZone.detected_at < cutoff,  # Index range; last_active >= detected_at
+                    last_active < cutoff
+                )
+                .order_by(WorkZone.detected_at)
+                .limit(self.policy.batch_size)
+                # Concurrent runs take different rows (no-op on SQLite)
+                .with_for_update(skip_locked=True)
+            )).all()
+            if not rows:
+                return 0
+
+            ids = [row.id for row in rows]
+            await self._move_rows(db, WorkZone.__table__, work_zones_archive, ids, [row.detected_at for row in rows])
+            await self._merge_rollups(db, [row for row in rows if not row.synthetic])
+            await self._advance_pruned_through(db, max(row.change_version for row in rows))
+            return len(ids)
+
+        return await self._batches(step)
+
+    async def archive_collection_runs(self, cutoff: datetime) -> int:
+        """Move finished collection runs started before cutoff to the archive"""
+        async def step(db: AsyncSession) -> int:
+            rows = (await db.execute(
+                select(CollectionRun.id, CollectionRun.started_at)
+                .where(
+                    CollectionRun.status.in_(("completed", "failed")),
+                    CollectionRun.started_at < cutoff
+                )
+                .order_by(CollectionRun.started_at)
+                .limit(self.policy.batch_size)
+                .with_for_update(skip_locked=True)
+            )).all()
+            if rows:
+                await self._move_rows(
+                    db, CollectionRun.__table__, collection_runs_archive,
+                    [row.id for row in rows], [row.started_at for row in rows]
+                )
+            return len(rows)
+
+        return await self._batches(step)
+
+    async def _move_rows(self, db: AsyncSession, source: Table, archive: Table, ids: List[int], times: List[datetime]) -> None:
+        """INSERT ... SELECT rows into the archive, then delete them from the hot table"""
+        await self._ensure_partitions(db, archive, times)
+        columns = [column.name for column in archive.columns]
+        await db.execute(
+            insert(archive).from_select(columns, select(*(source.c[name] for name in columns)).where(source.c.id.in_(ids)))
+        )
+        await db.execute(delete(source).where(source.c.id.in_(ids)))
+
+    async def _merge_rollups(self, db: AsyncSession, rows: Sequence[Any]) -> None:
+        """Add rows to their hourly/daily buckets (additive upsert)"""
+        buckets = rollup_rows(rows)
+        if not buckets:
+            return
+        table = WorkZoneRollup.__table__
+        stmt = upsert_insert(table).values(buckets)
+        excluded = stmt.excluded
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["camera_id", "granularity", "bucket_start"],
+            set_={
+                "work_zones": table.c.work_zones + excluded.work_zones,
+                "detections": table.c.detections + excluded.detections,
+                "high_risk": table.c.high_risk + excluded.high_risk,
+                "risk_score_sum": table.c.risk_score_sum + excluded.risk_score_sum,
+                "max_risk_score": case(
+                    (excluded.max_risk_score > table.c.max_risk_score, excluded.max_risk_score),
+                    else_=table.c.max_risk_score
+                )
+            }
+        )
+        await db.execute(stmt)
+        self.metrics["rollup_buckets_written"] += len(buckets)
+
+    async def _ensure_partitions(self, db: AsyncSession, archive: Table, times: List[datetime]) -> None:
+        """Create the monthly PostgreSQL partitions rows are about to land in"""
+        if is_sqlite:
+            return
+        for month in sorted({month_start(value) for value in times}):
+            # Bounds are formatted from datetimes, never user input
+            await db.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {partition_name(archive.name, month)} "
+                f"PARTITION OF {archive.name} "
+                f"FOR VALUES FROM ('{month:%Y-%m-%d} 00:00:00+00') TO ('{next_month(month):%Y-%m-%d} 00:00:00+00')"
+            ))
+
+    async def purge_archives(self, cutoff: datetime) -> int:
+        """Delete archived rows older than cutoff (drop whole partitions on PostgreSQL)"""
+        if not is_sqlite:
+            return await self._drop_partitions(cutoff)
+
+        total = 0
+        for archive, time_column in ((work_zones_archive, "detected_at"), (collection_runs_archive, "started_at")):
+            async def step(db: AsyncSession, archive=archive, time_column=time_column) -> int:
+                ids = (await db.execute(
+                    select(archive.c.id)
+                    .where(archive.c[time_column] < cutoff)
+                    .order_by(archive.c[time_column])
+                    .limit(self.policy.batch_size)
+                )).scalars().all()
+                if ids:
+                    await db.execute(delete(archive).where(archive.c.id.in_(ids), archive.c[time_column] < cutoff))
+                return len(ids)
+
+            total += await self._batches(step)
+        return total
+
+    async def _drop_partitions(self, cutoff: datetime) -> int:
+        """Drop monthly archive partitions that end before cutoff; returns rows dropped"""
+        async with AsyncSessionLocal() as db:
+            names = (await db.execute(text(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "WHERE parent.relname IN ('work_zones_archive', 'collection_runs_archive')"
+            ))).scalars().all()
+
+            rows = 0
+            for name in names:
+                match = PARTITION_NAME_PATTERN.match(name)
+                if not match:
+                    continue
+                month = datetime(int(match["year"]), int(match["month"]), 1)
+                if next_month(month) > cutoff:
+                    continue
+                rows += (await db.execute(text(f"SELECT count(*) FROM {name}"))).scalar()
+                await db.execute(text(f"DROP TABLE {name}"))
+                self.metrics["partitions_dropped"] += 1
+                logger.info(f"🗑️  Dropped archive partition {name}")
+            await db.commit()
+        return rows
+
+    async def purge_hourly_rollups(self, cutoff: datetime) -> int:
+        """Delete hourly roll-ups older than cutoff (daily ones remain)"""
+        async def step(db: AsyncSession) -> int:
+            ids = (await db.execute(
+                select(WorkZoneRollup.id)
+                .where(WorkZoneRollup.granularity == "hour", WorkZoneRollup.bucket_start < cutoff)
+                .limit(self.policy.batch_size)
+            )).scalars().all()
+            if ids:
+                await db.execute(delete(WorkZoneRollup.__table__).where(WorkZoneRollup.id.in_(ids)))
+            return len(ids)
+
+        return await self._batches(step)
+
+    async def purge_jobs(self, cutoff: datetime) -> int:
+        """Delete succeeded/failed jobs that finished before cutoff"""
+        async def step(db: AsyncSession) -> int:
+            ids = (await db.execute(
+                select(Job.id)
+                .where(Job.status.in_(("succeeded", "failed")), Job.finished_at < cutoff)
+                .limit(self.policy.batch_size)
+            )).scalars().all()
+            if ids:
+                await db.execute(delete(Job.__table__).where(Job.id.in_(ids)))
+            return len(ids)
+
+        return await self._batches(step)
+
+    async def prune_tombstones(self, cutoff: datetime) -> int:
+        """Delete tombstones older than cutoff and advance sync_state.pruned_through"""
+        async with AsyncSessionLocal() as db:
+            through = (await db.execute(
+                select(func.max(SyncTombstone.change_version)).where(SyncTombstone.deleted_at < cutoff)
+            )).scalar()
+            if through is None:
+                return 0
+            await self._advance_pruned_through(db, through)
+            result = await db.execute(delete(SyncTombstone.__table__).where(SyncTombstone.change_version <= through))
+            await db.commit()
+            return result.rowcount
+
+    @staticmethod
+    async def _advance_pruned_through(db: AsyncSession, version: int) -> None:
+        """Clients that synced before `version` may have missed a removal: they must refetch"""
+        await db.execute(
+            update(SyncState)
+            .where(SyncState.id == 1, SyncState.pruned_through < version)
+            .values(pruned_through=version)
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Retention metrics for /health"""
+        return {
+            "scheduled": self._task is not None,
+            "interval_hours": self.interval_seconds / 3600,
+            "running": self.running,
+            "phase": self.phase,
+            "last_run": self.last_run,
+            **self.metrics
+        }
+
+
+# Global service instance
+retention_service = RetentionService(
+    RetentionPolicy(
+        work_zone_days=settings.RETENTION_WORK_ZONE_DAYS,
+        collection_run_days=settings.RETENTION_COLLECTION_RUN_DAYS,
+        archive_days=settings.RETENTION_ARCHIVE_DAYS,
+        hourly_rollup_days=settings.RETENTION_HOURLY_ROLLUP_DAYS,
+        job_days=settings.RETENTION_JOB_DAYS,
+        tombstone_days=settings.RETENTION_TOMBSTONE_DAYS,
+        batch_size=settings.RETENTION_BATCH_SIZE
+    ),
+    interval_hours=settings.RETENTION_INTERVAL_HOURS
+)
+
+
+# Background job handler (run by services/job_queue.py workers)
+@job_handler(RETENTION_JOB_TYPE)
+async def run_retention_job(ctx: JobContext) -> Dict[str, Any]:
+    """Archive, roll up and purge old rows"""
+    return await retention_service.run(progress=ctx.report_progress)
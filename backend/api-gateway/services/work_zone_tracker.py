@@ -0,0 +1,299 @@
+"""
+Work Zone Tracker
+=================
+
+Tracks each physical work zone over time as one row, instead of inserting a
+new WorkZone every time a collection cycle sees the same closure.
+
+An analyzed camera image is an observation. For each observation, the
+camera's open (status 'active', non-synthetic) work zone for the same view
+is looked up:
+
+- Work zone detected, open zone last seen within WORK_ZONE_MATCH_WINDOW_MINUTES:
+  the open zone is updated (last_seen_at, risk score and trend, counts,
+  latest image) and its detection_count goes up.
+- Work zone detected, no open zone in the window: a new row is created; an
+  open zone last seen before the window is resolved.
+- No work zone (or below the risk threshold): the open zone's missed_cycles
+  goes up, and after WORK_ZONE_RESOLVE_AFTER_MISSES misses it is resolved.
+
+Cameras whose image could not be fetched are not observed, so an outage
+does not resolve their work zones. If a camera view has several open zones
+(rows from before tracking), the most recently seen one is kept and the
+others are resolved as duplicates.
+
+On PostgreSQL, concurrent runs observing the same camera are serialized by
+a transaction-scoped advisory lock per camera, taken before the open zones
+are read, so they cannot both create a zone for it. SQLite has no such lock;
+a duplicate created there by overlapping runs is resolved by the next one.
+
+The tracker only changes the session; callers commit, then publish
+TrackingResult events.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from config import settings
+from database import is_sqlite, naive_utc
+from models import Camera, WorkZone
+from .event_bus import publish_event
+
+logger = logging.getLogger(__name__)
+
+# First key of the per-camera advisory locks (pg_advisory_xact_lock(namespace, camera_id))
+TRACKER_LOCK_NAMESPACE = 0x575A
+TRACKER_LOCK_STATEMENT = text(
+    "SELECT pg_advisory_xact_lock(:namespace, id) "
+    "FROM unnest(CAST(:ids AS int[])) AS t(id) ORDER BY id"
+)
+
+# Analysis fields copied onto the tracked row on every detection
+ANALYSIS_FIELDS = (
+    "confidence", "workers", "vehicles", "equipment", "barriers",
+    "hazards", "violations", "recommendations", "mto_book_compliance"
+)
+
+
+def open_work_zones_query(camera_ids: List[int]) -> Select:
+    """Open tracked work zones of some cameras, most recently seen first"""
+    return (
+        select(WorkZone)
+        .where(
+            WorkZone.camera_id.in_(camera_ids),
+            WorkZone.status == "active",
+            WorkZone.synthetic.is_(False)
+        )
+        .order_by(WorkZone.last_seen_at.desc(), WorkZone.id.desc())
+    )
+
+
+def risk_trend(previous: int, current: int) -> str:
+    """Trend of a tracked work zone's risk score between two detections"""
+    if current > previous:
+        return "rising"
+    if current < previous:
+        return "falling"
+    return "steady"
+
+
+@dataclass
+class Observation:
+    """One analyzed camera image"""
+    camera: Camera
+    analysis: Dict[str, Any]
+    detected: bool  # Work zone seen at or above the risk threshold
+    image_urls: Dict[str, Optional[str]] = field(default_factory=dict)  # gcp_image_url, thumbnail_url, preview_url
+    collection_id: Optional[str] = None
+    view_id: Optional[int] = None
+
+
+@dataclass
+class TrackingResult:
+    """Work zones changed by one round of observations"""
+    created: List[WorkZone] = field(default_factory=list)
+    updated: List[WorkZone] = field(default_factory=list)
+    resolved: List[WorkZone] = field(default_factory=list)
+
+    def work_zone_for(self, camera_id: int, view_id: Optional[int] = None) -> Optional[WorkZone]:
+        """Created or updated work zone of a camera view, if any"""
+        for work_zone in self.created + self.updated:
+            if work_zone.camera_id == camera_id and work_zone.view_id == view_id:
+                return work_zone
+        return None
+
+    def publish_events(self) -> None:
+        """Publish created/updated/resolved events (after commit)"""
+        for work_zone in self.created:
+            publish_event("work_zone.created", work_zone.to_dict())
+        for work_zone in self.updated:
+            publish_event("work_zone.updated", work_zone.to_dict())
+        for work_zone in self.resolved:
+            publish_event("work_zone.resolved", {
+                "id": work_zone.id,
+                "status": work_zone.status,
+                "resolved_at": work_zone.resolved_at.isoformat()
+            })
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            "work_zones_created": len(self.created),
+            "work_zones_updated": len(self.updated),
+            "work_zones_resolved": len(self.resolved)
+        }
+
+
+class WorkZoneTracker:
+    """Matches detections to open work zones and auto-resolves vanished ones"""
+
+    def __init__(self, match_window_minutes: int = 180, resolve_after_misses: int = 3, enabled: bool = True):
+        self.match_window = timedelta(minutes=match_window_minutes)
+        self.resolve_after_misses = resolve_after_misses
+        self.enabled = enabled
+
+    async def _load_open(
+        self,
+        db: AsyncSession,
+        camera_ids: List[int]
+    ) -> Dict[Tuple[int, Optional[int]], List[WorkZone]]:
+        """Open work zones of the observed cameras by (camera_id, view_id), most recently seen first"""
+        if camera_ids and not is_sqlite:
+            # Held until commit, so a concurrent run for the same camera reads
+            # the zones this one creates. One statement for all cameras, taken
+            # in camera id order so overlapping runs cannot deadlock.
+            await db.execute(TRACKER_LOCK_STATEMENT, {"namespace": TRACKER_LOCK_NAMESPACE, "ids": camera_ids})
+        result = await db.execute(
+            # Row locks only cover existing zones; the advisory locks cover inserts
+            open_work_zones_query(camera_ids).with_for_update()
+        )
+        open_zones: Dict[Tuple[int, Optional[int]], List[WorkZone]] = {}
+        for work_zone in result.scalars():
+            open_zones.setdefault((work_zone.camera_id, work_zone.view_id), []).append(work_zone)
+        return open_zones
+
+    def _create(self, observation: Observation, seen_at: datetime) -> WorkZone:
+        analysis = observation.analysis
+        return WorkZone(
+            camera_id=observation.camera.id,
+            view_id=observation.view_id,
+            latitude=observation.camera.latitude,
+            longitude=observation.camera.longitude,
+            risk_score=analysis["risk_score"],
+            peak_risk_score=analysis["risk_score"],
+            risk_trend="new",
+            detection_count=1,
+            missed_cycles=0,
+            last_seen_at=seen_at,
+            collection_id=observation.collection_id,
+            model="gemini-2.0-flash-exp",
+            synthetic=False,
+            status="active",
+            **{name: analysis.get(name) for name in ANALYSIS_FIELDS if name in analysis},
+            **observation.image_urls
+        )
+
+    def _update(self, work_zone: WorkZone, observation: Observation, seen_at: datetime) -> None:
+        analysis = observation.analysis
+        work_zone.risk_trend = risk_trend(work_zone.risk_score, analysis["risk_score"])
+        work_zone.risk_score = analysis["risk_score"]
+        work_zone.peak_risk_score = max(work_zone.peak_risk_score or 0, analysis["risk_score"])
+        work_zone.detection_count = (work_zone.detection_count or 1) + 1
+        work_zone.missed_cycles = 0
+        work_zone.last_seen_at = seen_at
+        # Set here rather than by onupdate, which would leave it expired after flush
+        work_zone.updated_at = seen_at
+        for name in ANALYSIS_FIELDS:
+            if name in analysis:
+                setattr(work_zone, name, analysis[name])
+        # Latest image, and the collection it came from (for re-analysis)
+        for name, url in observation.image_urls.items():
+            if url:
+                setattr(work_zone, name, url)
+        if observation.collection_id:
+            work_zone.collection_id = observation.collection_id
+
+    @staticmethod
+    def _resolve(work_zone: WorkZone, seen_at: datetime, result: TrackingResult) -> None:
+        work_zone.status = "resolved"
+        work_zone.resolved_at = seen_at
+        work_zone.updated_at = seen_at
+        result.resolved.append(work_zone)
+
+    async def apply(
+        self,
+        db: AsyncSession,
+        observations: List[Observation],
+        seen_at: Optional[datetime] = None
+    ) -> TrackingResult:
+        """
+        Apply one round of observations to the work zones table
+
+        Args:
+            db: Database session (not committed here)
+            observations: Analyzed camera images, at most one per camera view
+            seen_at: Observation time (default now, naive UTC)
+
+        Returns:
+            Created, updated and resolved work zones
+        """
+        seen_at = seen_at or datetime.utcnow()
+        result = TrackingResult()
+
+        if not self.enabled:
+            for observation in observations:
+                if observation.detected:
+                    result.created.append(self._create(observation, seen_at))
+            db.add_all(result.created)
+            return result
+
+        open_zones = await self._load_open(db, sorted({obs.camera.id for obs in observations}))
+        cutoff = seen_at - self.match_window
+
+        for observation in observations:
+            candidates = open_zones.get((observation.camera.id, observation.view_id), [])
+            current, duplicates = (candidates[0], candidates[1:]) if candidates else (None, [])
+            for duplicate in duplicates:
+                self._resolve(duplicate, seen_at, result)
+
+            last_seen = current and (current.last_seen_at or current.detected_at)
+            if last_seen and naive_utc(last_seen) < cutoff:
+                # Not seen within the window: a new detection is a new work zone
+                self._resolve(current, seen_at, result)
+                current = None
+
+            if observation.detected:
+                if current:
+                    self._update(current, observation, seen_at)
+                    result.updated.append(current)
+                else:
+                    work_zone = self._create(observation, seen_at)
+                    db.add(work_zone)
+                    result.created.append(work_zone)
+            elif current:
+                current.missed_cycles = (current.missed_cycles or 0) + 1
+                current.updated_at = seen_at
+                if current.missed_cycles >= self.resolve_after_misses:
+                    self._resolve(current, seen_at, result)
+                    logger.info(
+                        f"✅ Work zone {current.id} auto-resolved: not seen for "
+                        f"{current.missed_cycles} cycles"
+                    )
+
+        if result.created or result.updated or result.resolved:
+            # Assign ids/change versions so callers can publish after commit
+            await db.flush()
+        return result
+
+
+# Global service instance
+work_zone_tracker = WorkZoneTracker(
+    match_window_minutes=settings.WORK_ZONE_MATCH_WINDOW_MINUTES,
+    resolve_after_misses=settings.WORK_ZONE_RESOLVE_AFTER_MISSES,
+    enabled=settings.WORK_ZONE_TRACKING_ENABLED
+)
+
+
+# Convenience functions
+async def track_work_zones(
+    db: AsyncSession,
+    observations: List[Observation],
+    seen_at: Optional[datetime] = None
+) -> TrackingResult:
+    """
+    Match observations to open work zones (see WorkZoneTracker.apply)
+
+    Args:
+        db: Database session (not committed here)
+        observations: Analyzed camera images
+        seen_at: Observation time (default now)
+
+    Returns:
+        Created, updated and resolved work zones
+    """
+    return await work_zone_tracker.apply(db, observations, seen_at)
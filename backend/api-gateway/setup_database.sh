@@ -62,7 +62,7 @@ echo "✅ Database schema created"
 # Step 3: Seed cameras
 echo ""
 echo "📷 Seeding camera data (46 QEW COMPASS cameras)..."
-echo "" | $PYTHON seed_cameras.py
+$PYTHON seed_cameras.py
 
 if [ $? -ne 0 ]; then
     echo "❌ Error: Failed to seed camera data"
@@ -72,7 +72,7 @@ fi
 # Step 4: Seed camera directions
 echo ""
 echo "🧭 Seeding camera direction data (48 direction records)..."
-echo "" | $PYTHON seed_directions.py
+$PYTHON seed_directions.py
 
 if [ $? -ne 0 ]; then
     echo "❌ Error: Failed to seed direction data"
@@ -0,0 +1,185 @@
+"""
+Spatial Indexing
+================
+
+Geohash cell index for models with latitude/longitude columns.
+
+Each indexed row stores a precision-9 geohash (~5m cell) in an indexed
+String column. A bounding box is covered by a few coarser geohash prefixes,
+and every prefix becomes an index range scan (`geohash >= p AND geohash < p~`).
+The same query works on SQLite and PostgreSQL, with no PostGIS needed.
+Candidates are then filtered exactly on latitude/longitude.
+"""
+
+import math
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import Select, and_, event, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_PRECISION = 9
+
+# Max geohash prefixes (index range scans) used to cover a bounding box
+MAX_COVER_CELLS = 16
+
+# k-nearest search starts at this radius and widens until k hits are found
+INITIAL_SEARCH_RADIUS_M = 2000.0
+MAX_SEARCH_RADIUS_M = 200000.0
+
+EARTH_RADIUS_M = 6371008.8
+METERS_PER_DEGREE_LAT = 111320.0
+
+
+def _grid_bits(precision: int) -> Tuple[int, int]:
+    """(latitude bits, longitude bits) of a geohash precision"""
+    bits = 5 * precision
+    return bits // 2, (bits + 1) // 2
+
+
+def _cell_index(value: float, low: float, high: float, bits: int) -> int:
+    cells = 1 << bits
+    index = int((value - low) / (high - low) * cells)
+    return min(max(index, 0), cells - 1)
+
+
+def _encode_cell(lat_index: int, lon_index: int, precision: int) -> str:
+    """Interleave cell indices (longitude first) into a geohash string"""
+    lat_bits, lon_bits = _grid_bits(precision)
+    value = 0
+    for i in range(5 * precision):
+        if i % 2 == 0:
+            bit = (lon_index >> (lon_bits - 1 - i // 2)) & 1
+        else:
+            bit = (lat_index >> (lat_bits - 1 - i // 2)) & 1
+        value = (value << 1) | bit
+
+    chars = []
+    for _ in range(precision):
+        chars.append(BASE32[value & 31])
+        value >>= 5
+    return "".join(reversed(chars))
+
+
+def encode_geohash(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    """Encode a coordinate as a geohash string"""
+    lat_bits, lon_bits = _grid_bits(precision)
+    return _encode_cell(
+        _cell_index(latitude, -90.0, 90.0, lat_bits),
+        _cell_index(longitude, -180.0, 180.0, lon_bits),
+        precision
+    )
+
+
+def covering_cells(
+    min_lat: float,
+    min_lon: float,
+    max_lat: float,
+    max_lon: float,
+    max_cells: int = MAX_COVER_CELLS
+) -> List[str]:
+    """
+    Geohash prefixes covering a bounding box
+
+    Uses the finest precision that needs at most max_cells prefixes.
+    """
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        lat_bits, lon_bits = _grid_bits(precision)
+        lat_lo = _cell_index(min_lat, -90.0, 90.0, lat_bits)
+        lat_hi = _cell_index(max_lat, -90.0, 90.0, lat_bits)
+        lon_lo = _cell_index(min_lon, -180.0, 180.0, lon_bits)
+        lon_hi = _cell_index(max_lon, -180.0, 180.0, lon_bits)
+
+        if (lat_hi - lat_lo + 1) * (lon_hi - lon_lo + 1) <= max_cells or precision == 1:
+            return sorted(
+                _encode_cell(lat_index, lon_index, precision)
+                for lat_index in range(lat_lo, lat_hi + 1)
+                for lon_index in range(lon_lo, lon_hi + 1)
+            )
+    return []
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in meters"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def bbox_around(latitude: float, longitude: float, radius_m: float) -> Tuple[float, float, float, float]:
+    """(min_lat, min_lon, max_lat, max_lon) enclosing a circle"""
+    dlat = radius_m / METERS_PER_DEGREE_LAT
+    dlon = radius_m / (METERS_PER_DEGREE_LAT * max(math.cos(math.radians(latitude)), 0.01))
+    return (
+        max(latitude - dlat, -90.0),
+        max(longitude - dlon, -180.0),
+        min(latitude + dlat, 90.0),
+        min(longitude + dlon, 180.0)
+    )
+
+
+def within_bbox(model, min_lat: float, min_lon: float, max_lat: float, max_lon: float):
+    """
+    WHERE clause selecting rows of model inside a bounding box
+
+    The geohash ranges drive the index; the coordinate bounds make it exact.
+    """
+    ranges = [
+        and_(model.geohash >= prefix, model.geohash < prefix + "~")
+        for prefix in covering_cells(min_lat, min_lon, max_lat, max_lon)
+    ]
+    return and_(
+        or_(*ranges),
+        model.latitude.between(min_lat, max_lat),
+        model.longitude.between(min_lon, max_lon)
+    )
+
+
+async def nearest(
+    db: AsyncSession,
+    query: Select,
+    model,
+    latitude: float,
+    longitude: float,
+    k: int,
+    radius_m: Optional[float] = None
+) -> Sequence[Tuple[object, float]]:
+    """
+    k-nearest rows of model to a point
+
+    With radius_m, searches that radius once. Otherwise the radius starts at
+    INITIAL_SEARCH_RADIUS_M and widens 4x until k rows are found or
+    MAX_SEARCH_RADIUS_M is reached.
+
+    Returns:
+        [(row, distance_m)] sorted by distance
+    """
+    radius = radius_m or INITIAL_SEARCH_RADIUS_M
+    while True:
+        result = await db.execute(
+            query.where(within_bbox(model, *bbox_around(latitude, longitude, radius)))
+        )
+        hits = []
+        for row in result.scalars().all():
+            distance = haversine_m(latitude, longitude, row.latitude, row.longitude)
+            if distance <= radius:
+                hits.append((row, distance))
+
+        if radius_m or len(hits) >= k or radius >= MAX_SEARCH_RADIUS_M:
+            hits.sort(key=lambda hit: hit[1])
+            return hits[:k]
+
+        radius = min(radius * 4, MAX_SEARCH_RADIUS_M)
+
+
+def track_geohash(model) -> None:
+    """Keep model.geohash in sync with latitude/longitude on ORM writes"""
+
+    def _set_geohash(mapper, connection, target):
+        if target.latitude is not None and target.longitude is not None:
+            target.geohash = encode_geohash(target.latitude, target.longitude)
+
+    event.listen(model, "before_insert", _set_geohash)
+    event.listen(model, "before_update", _set_geohash)
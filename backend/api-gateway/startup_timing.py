@@ -0,0 +1,50 @@
+"""
+Startup Timing
+==============
+
+Breakdown of where gateway startup time goes, logged once the app is ready
+to serve and reported under "startup" in /health.
+
+Import this module before anything heavy: the clock starts when it is
+imported, so interpreter start-up itself is not included. Each mark()
+records the time since the previous mark.
+"""
+
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTimer:
+    """Consecutive startup phases and their durations"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._last = self.started
+        self.phases: List[Tuple[str, float]] = []
+        self.ready_seconds: Optional[float] = None
+
+    def mark(self, phase: str) -> None:
+        """Close a phase that ran since the previous mark"""
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    def ready(self) -> None:
+        """Startup finished: log the breakdown"""
+        self.ready_seconds = time.perf_counter() - self.started
+        breakdown = ", ".join(f"{phase} {seconds * 1000:.0f} ms" for phase, seconds in self.phases)
+        logger.info(f"⏱️  Startup took {self.ready_seconds * 1000:.0f} ms ({breakdown})")
+
+    def summary(self) -> Dict[str, Any]:
+        """Startup breakdown for /health"""
+        return {
+            "total_ms": round(self.ready_seconds * 1000, 1) if self.ready_seconds is not None else None,
+            "phases_ms": {phase: round(seconds * 1000, 1) for phase, seconds in self.phases}
+        }
+
+
+# Global timer, started when main imports this module
+startup_timer = StartupTimer()
@@ -0,0 +1,316 @@
+"""
+Sync Seed Data
+==============
+
+Idempotent bulk sync of cameras and camera directions from the corridor
+source files:
+- public/camera_scraper/qew_cameras_with_images.json (cameras)
+- camera_scraper/camera_directions_analysis.csv (Corey's direction analysis)
+
+The source is diffed against the database and only the changes are applied,
+using multi-row upserts in a single transaction. Camera.heading is then
+back-filled from the primary direction with one set-based UPDATE. Running it
+twice leaves the second run with nothing to write.
+
+Usage:
+    python sync_seed_data.py [--cameras-only | --directions-only] [--dry-run]
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from sqlalchemy import select, update, delete, exists, func, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Add current directory to path
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from database import AsyncSessionLocal, upsert_insert
+from models import Camera, CameraDirection
+from config import settings
+from spatial import encode_geohash
+from change_tracking import allocate_change_version, record_tombstones
+from services.direction_import import UPSERT_COLUMNS, parse_direction_row, upsert_directions, load_camera_map
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+CAMERAS_JSON = PROJECT_ROOT / "public/camera_scraper/qew_cameras_with_images.json"
+DIRECTIONS_CSV = PROJECT_ROOT / "camera_scraper/camera_directions_analysis.csv"
+
+# Direction records owned by this sync (stale ones are removed)
+SEED_DIRECTION_MODEL = "camera_directions_analysis"
+SEED_ANALYSIS_METHOD = "corey_analysis"
+
+# Camera columns kept in sync with the JSON (active/direction are left alone
+# on existing cameras so soft deletes and direction analysis survive re-syncs)
+CAMERA_SYNC_COLUMNS = ("source", "location", "latitude", "longitude", "views", "geohash")
+
+# Confidence levels eligible to become a camera's primary heading
+PRIMARY_CONFIDENCE = ("high", "medium")
+
+
+def load_camera_records(json_path: Path = CAMERAS_JSON) -> List[Dict[str, Any]]:
+    """Camera rows from the COMPASS JSON (cameras without coordinates are skipped)"""
+    with open(json_path, "r") as f:
+        cameras_data = json.load(f)
+
+    records = []
+    for camera_data in cameras_data:
+        latitude = camera_data.get("Latitude")
+        longitude = camera_data.get("Longitude")
+        if not latitude or not longitude:
+            print(f"⚠️  Skipping camera C{camera_data.get('Id')}: Missing coordinates")
+            continue
+
+        direction = camera_data.get("Direction", "Unknown")
+        records.append({
+            "camera_id": f"C{camera_data['Id']}",  # e.g., C210
+            "source": camera_data.get("Source", "511ON"),
+            "location": camera_data.get("Location", ""),
+            "latitude": latitude,
+            "longitude": longitude,
+            # Core upserts bypass the ORM hook that maintains geohash
+            "geohash": encode_geohash(latitude, longitude),
+            "views": camera_data.get("Views", []),
+            "direction": direction if direction != "Unknown" else None,
+            "active": True
+        })
+    return records
+
+
+async def sync_cameras(session: AsyncSession, records: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Upsert cameras that are new or differ from the source"""
+    columns = [getattr(Camera, column) for column in CAMERA_SYNC_COLUMNS]
+    result = await session.execute(select(Camera.camera_id, *columns))
+    existing = {row.camera_id: tuple(row[1:]) for row in result.all()}
+
+    changed = []
+    inserted = 0
+    for record in records:
+        current = existing.get(record["camera_id"])
+        if current is None:
+            inserted += 1
+        elif current == tuple(record[column] for column in CAMERA_SYNC_COLUMNS):
+            continue
+        changed.append(record)
+
+    if changed:
+        version = await allocate_change_version(session)
+        stmt = upsert_insert(Camera.__table__).values([{**record, "change_version": version} for record in changed])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["camera_id"],
+            set_={
+                **{column: stmt.excluded[column] for column in CAMERA_SYNC_COLUMNS},
+                "updated_at": func.now(),
+                "change_version": version
+            }
+        )
+        await session.execute(stmt)
+
+    return {
+        "inserted": inserted,
+        "updated": len(changed) - inserted,
+        "unchanged": len(records) - len(changed),
+        "not_in_source": len(existing.keys() - {record["camera_id"] for record in records})
+    }
+
+
+def load_direction_records(camera_map: Dict[str, int], csv_path: Path = DIRECTIONS_CSV) -> List[Dict[str, Any]]:
+    """Direction rows from Corey's analysis CSV (n/a and unparseable rows are skipped)"""
+    records = []
+    with open(csv_path, "r", newline="") as f:
+        for row in csv.DictReader(f):
+            if row.get("confidence") == "n/a" or not row.get("suggested_heading"):
+                continue
+            try:
+                records.append(parse_direction_row(
+                    row, camera_map,
+                    model=SEED_DIRECTION_MODEL,
+                    analysis_method=SEED_ANALYSIS_METHOD
+                ))
+            except ValueError as e:
+                print(f"⚠️  Skipping direction for camera {row.get('camera_id')} view {row.get('view_id')}: {e}")
+    return records
+
+
+async def sync_directions(session: AsyncSession, records: List[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Upsert new/changed direction records and delete stale seeded ones
+
+    Only records created by this sync (analysis_method corey_analysis) are
+    updated or deleted; manual and API-created directions are never touched,
+    even when the source has a record for the same (camera_id, view_id).
+    """
+    columns = [getattr(CameraDirection, column) for column in UPSERT_COLUMNS]
+    result = await session.execute(
+        select(CameraDirection.id, CameraDirection.camera_id, CameraDirection.view_id, *columns)
+    )
+    existing = {(row.camera_id, row.view_id): row for row in result.all()}
+
+    source = {(record["camera_id"], record["view_id"]): record for record in records}
+    # Keys already holding a manual/API direction keep it
+    kept = {
+        key for key, row in existing.items()
+        if key in source and row.analysis_method != SEED_ANALYSIS_METHOD
+    }
+    source = {key: record for key, record in source.items() if key not in kept}
+    changed = [
+        record for key, record in source.items()
+        if key not in existing
+        or tuple(existing[key][3:]) != tuple(record[column] for column in UPSERT_COLUMNS)
+    ]
+    stale_ids = [
+        row.id for key, row in existing.items()
+        if key not in source and row.analysis_method == SEED_ANALYSIS_METHOD
+    ]
+
+    if changed:
+        await upsert_directions(session, changed)
+    if stale_ids:
+        await session.execute(delete(CameraDirection).where(CameraDirection.id.in_(stale_ids)))
+        await record_tombstones(session, CameraDirection, stale_ids, await allocate_change_version(session))
+
+    inserted = sum(1 for key in source if key not in existing)
+    return {
+        "inserted": inserted,
+        "updated": len(changed) - inserted,
+        "unchanged": len(source) - len(changed),
+        "deleted": len(stale_ids),
+        "kept_manual": len(kept)
+    }
+
+
+async def refresh_camera_headings(session: AsyncSession) -> int:
+    """
+    Back-fill Camera.heading/direction/direction_confidence in one UPDATE
+
+    Each camera takes its first high/medium confidence direction record
+    (camera-level record first, then by view_id). Cameras without one are
+    left as they are, and rows already up to date are not rewritten.
+
+    Returns:
+        Number of cameras updated
+    """
+    def primary(column):
+        return (
+            select(column)
+            .where(
+                CameraDirection.camera_id == Camera.id,
+                CameraDirection.confidence.in_(PRIMARY_CONFIDENCE)
+            )
+            .order_by(CameraDirection.view_id.nulls_first(), CameraDirection.id)
+            .limit(1)
+            .scalar_subquery()
+        )
+
+    heading = primary(CameraDirection.heading)
+    direction = primary(CameraDirection.direction)
+    confidence = primary(CameraDirection.confidence)
+
+    has_primary = exists().where(
+        CameraDirection.camera_id == Camera.id,
+        CameraDirection.confidence.in_(PRIMARY_CONFIDENCE)
+    )
+
+    stale = and_(
+        has_primary,
+        or_(
+            Camera.heading.is_distinct_from(heading),
+            Camera.direction.is_distinct_from(direction),
+            Camera.direction_confidence.is_distinct_from(confidence)
+        )
+    )
+
+    # Only take a change version when something will actually be written
+    if not (await session.execute(select(exists().where(stale)))).scalar():
+        return 0
+
+    version = await allocate_change_version(session)
+    result = await session.execute(
+        update(Camera.__table__)
+        .where(stale)
+        .values(heading=heading, direction=direction, direction_confidence=confidence, change_version=version)
+    )
+    return result.rowcount
+
+
+async def sync_seed_data(cameras: bool = True, directions: bool = True, dry_run: bool = False) -> Dict[str, Any]:
+    """
+    Sync cameras and/or directions in a single transaction
+
+    Args:
+        cameras: Sync cameras from the COMPASS JSON
+        directions: Sync directions from the analysis CSV and refresh headings
+        dry_run: Compute and report the diff, then roll back
+
+    Returns:
+        Per-table insert/update/unchanged counts
+    """
+    summary: Dict[str, Any] = {}
+
+    async with AsyncSessionLocal() as session:
+        if cameras:
+            if not CAMERAS_JSON.exists():
+                print(f"❌ Camera data file not found: {CAMERAS_JSON}")
+                return summary
+            print(f"📂 Reading camera data from: {CAMERAS_JSON}")
+            summary["cameras"] = await sync_cameras(session, load_camera_records())
+
+        if directions:
+            if not DIRECTIONS_CSV.exists():
+                print(f"❌ Direction data file not found: {DIRECTIONS_CSV}")
+                return summary
+            print(f"📂 Reading direction data from: {DIRECTIONS_CSV}")
+            camera_map = await load_camera_map(session)
+            summary["directions"] = await sync_directions(session, load_direction_records(camera_map))
+            summary["camera_headings_updated"] = await refresh_camera_headings(session)
+
+        if dry_run:
+            await session.rollback()
+        else:
+            await session.commit()
+
+    return summary
+
+
+def print_summary(summary: Dict[str, Any], elapsed: float, dry_run: bool) -> None:
+    """Print sync results"""
+    print("\n" + "=" * 60)
+    print(f"{'🔍 Dry run (nothing written)' if dry_run else '✅ Sync complete!'} in {elapsed:.3f}s")
+    for table in ("cameras", "directions"):
+        if table in summary:
+            counts = ", ".join(f"{key}: {value}" for key, value in summary[table].items())
+            print(f"📊 {table.capitalize()} - {counts}")
+    if "camera_headings_updated" in summary:
+        print(f"🧭 Camera headings updated: {summary['camera_headings_updated']}")
+    print("=" * 60)
+
+
+def main(cameras: bool = True, directions: bool = True, dry_run: bool = False) -> None:
+    print("🚀 Syncing seed data...")
+    print(f"📊 Database URL: {settings.DATABASE_URL}")
+    print()
+
+    started = time.perf_counter()
+    summary = asyncio.run(sync_seed_data(cameras=cameras, directions=directions, dry_run=dry_run))
+    print_summary(summary, time.perf_counter() - started, dry_run)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Idempotent bulk sync of cameras and directions")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--cameras-only", action="store_true", help="Only sync cameras")
+    group.add_argument("--directions-only", action="store_true", help="Only sync directions and headings")
+    parser.add_argument("--dry-run", action="store_true", help="Report changes without writing")
+    args = parser.parse_args()
+
+    main(
+        cameras=not args.directions_only,
+        directions=not args.cameras_only,
+        dry_run=args.dry_run
+    )
@@ -0,0 +1,83 @@
+"""
+Test fixtures
+=============
+
+Runs the gateway against a throwaway SQLite database. Settings are read at
+import time, so the environment is set before any application module loads.
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import httpx
+import pytest
+import pytest_asyncio
+
+_scratch = tempfile.mkdtemp(prefix="qew-gateway-tests-")
+os.environ.update({
+    "DATABASE_URL": f"sqlite+aiosqlite:///{_scratch}/test.db",
+    "IMAGE_STORAGE_BACKEND": "local",
+    "LOCAL_IMAGE_STORAGE_PATH": f"{_scratch}/images",
+    "ENABLE_CACHING": "false",
+    "ENABLE_RATE_LIMITING": "false",
+    "LOG_LEVEL": "WARNING"
+})
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+TEST_CAMERAS = 30
+TEST_WORK_ZONES = 120
+
+
+@pytest.fixture(scope="session")
+def scratch_dir() -> Path:
+    """Directory of the throwaway database, for tests that need their own"""
+    return Path(_scratch)
+
+
+@pytest_asyncio.fixture(scope="session")
+async def seeded_db():
+    """Cameras with two direction views each, and real work zones"""
+    from database import AsyncSessionLocal, init_db
+    from models import Camera, CameraDirection, WorkZone
+
+    await init_db()
+    async with AsyncSessionLocal() as db:
+        cameras = [
+            Camera(
+                camera_id=f"CAM_{i + 1}", location=f"Camera {i + 1}",
+                latitude=43.30 + i * 0.01, longitude=-79.80 + i * 0.01,
+                heading=(i * 15) % 360, active=True
+            )
+            for i in range(TEST_CAMERAS)
+        ]
+        db.add_all(cameras)
+        await db.flush()
+
+        now = datetime.utcnow()
+        for camera in cameras:
+            for view_id in (1, 2):
+                db.add(CameraDirection(
+                    camera_id=camera.id, view_id=view_id, heading=90 * view_id,
+                    direction="E" if view_id == 1 else "S", confidence="high"
+                ))
+        for i in range(TEST_WORK_ZONES):
+            camera = cameras[i % TEST_CAMERAS]
+            db.add(WorkZone(
+                camera_id=camera.id, latitude=camera.latitude, longitude=camera.longitude,
+                risk_score=i % 10 + 1, confidence=0.9, status="active", synthetic=False,
+                detected_at=now - timedelta(minutes=i * 5)
+            ))
+        await db.commit()
+    yield
+
+
+@pytest_asyncio.fixture
+async def client(seeded_db):
+    from main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
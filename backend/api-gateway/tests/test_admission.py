@@ -0,0 +1,52 @@
+"""
+Admission Control Tests
+=======================
+
+Rate limit keys must come from the hop the trusted proxy appended, not from
+X-Forwarded-For entries the client controls.
+"""
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from middleware.admission import AdmissionControlMiddleware
+from services.admission_control import AdmissionController
+
+
+async def accepted(request):
+    return JSONResponse({"accepted": True})
+
+
+def limited_client(controller: AdmissionController) -> httpx.AsyncClient:
+    app = Starlette(routes=[Route("/api/analysis/batch", accepted, methods=["POST"])])
+    app.add_middleware(AdmissionControlMiddleware, controller=controller, trusted_proxy_hops=1)
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+@pytest.mark.asyncio
+async def test_rotated_forwarded_prefix_is_still_rate_limited():
+    controller = AdmissionController(enabled=True, expensive_rate=1 / 60, expensive_burst=2)
+
+    async with limited_client(controller) as client:
+        statuses = []
+        for i in range(4):
+            # Spoofed first hop changes every request; Cloud Run's entry does not
+            headers = {"X-Forwarded-For": f"10.0.0.{i}, 203.0.113.7"}
+            response = await client.post("/api/analysis/batch", headers=headers)
+            statuses.append(response.status_code)
+
+    assert statuses == [200, 200, 429, 429]
+
+
+@pytest.mark.asyncio
+async def test_clients_behind_the_proxy_get_separate_buckets():
+    controller = AdmissionController(enabled=True, expensive_rate=1 / 60, expensive_burst=1)
+
+    async with limited_client(controller) as client:
+        first = await client.post("/api/analysis/batch", headers={"X-Forwarded-For": "203.0.113.7"})
+        second = await client.post("/api/analysis/batch", headers={"X-Forwarded-For": "198.51.100.2"})
+
+    assert (first.status_code, second.status_code) == (200, 200)
@@ -0,0 +1,45 @@
+"""
+Query Count Tests
+=================
+
+Guards list and import endpoints against N+1 regressions: each request
+runs the same number of SQL statements at every page size or file size.
+"""
+
+import pytest
+
+from middleware.query_stats import assert_max_queries
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("limit", [5, 100])
+async def test_analysis_history(client, limit):
+    async with assert_max_queries(1):
+        response = await client.get("/api/analysis/history", params={"limit": limit})
+    assert response.status_code == 200
+    assert len(response.json()) == limit
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("limit", [5, 30])
+async def test_cameras_with_directions(client, limit):
+    # ETag version lookup, cameras, then every camera's directions in one IN query
+    async with assert_max_queries(3):
+        response = await client.get("/api/directions/cameras", params={"limit": limit})
+    assert response.status_code == 200
+    assert len(response.json()) == limit
+    assert all(len(camera["direction_views"]) >= 2 for camera in response.json())
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("rows", [5, 60])
+async def test_import_directions_csv(client, rows):
+    lines = ["camera_id,view_id,heading,direction,confidence"]
+    lines += [f"CAM_{i % 30 + 1},{i // 30 + 3},180,S,medium" for i in range(rows)]
+    files = {"file": ("directions.csv", "\n".join(lines).encode("utf-8"), "text/csv")}
+
+    # Camera map, direction upsert, one change version, stamping it, camera headings
+    async with assert_max_queries(5):
+        response = await client.post("/api/directions/import-csv", files=files)
+    assert response.status_code == 200
+    assert response.json()["imported"] == rows
@@ -0,0 +1,148 @@
+"""
+Query Plan Tests
+================
+
+Seeds a large synthetic dataset into a scratch SQLite database and checks,
+through EXPLAIN QUERY PLAN, that every hot API query is served by its
+intended index instead of a full table scan.
+
+The queries are built by the same functions the endpoints use. Adding a
+filter that defeats an index therefore fails here.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, insert, select, text
+
+from database import Base
+from models import Camera, WorkZone, CollectionRun
+from spatial import encode_geohash, within_bbox
+from api.pagination import paginate, encode_cursor
+from api.work_zones import active_work_zones_query
+from api.analysis import analysis_history_query
+from services.work_zone_tracker import open_work_zones_query
+from services.history_export import EXPORT_DATASETS, export_query
+
+PLAN_CAMERAS = 300
+PLAN_WORK_ZONES = 100000
+
+# QEW corridor (Hamilton - Toronto)
+MIN_LAT, MAX_LAT = 43.20, 43.70
+MIN_LON, MAX_LON = -79.90, -79.30
+
+
+def seed(conn, n_cameras: int, n_work_zones: int) -> None:
+    """Insert synthetic cameras, collection runs and work zones"""
+    rng = random.Random(42)
+    now = datetime.utcnow()
+
+    cameras = []
+    for i in range(n_cameras):
+        lat, lon = rng.uniform(MIN_LAT, MAX_LAT), rng.uniform(MIN_LON, MAX_LON)
+        cameras.append({
+            "id": i + 1, "camera_id": f"CAM_{i}", "location": f"QEW camera {i}",
+            "latitude": lat, "longitude": lon, "geohash": encode_geohash(lat, lon),
+            "active": i % 10 != 0
+        })
+    conn.execute(insert(Camera.__table__), cameras)
+
+    n_runs = max(n_work_zones // 200, 1)
+    conn.execute(insert(CollectionRun.__table__), [
+        {"collection_id": f"COLLECT_{k:06d}", "status": "completed",
+         "started_at": now - timedelta(hours=n_runs - k)}
+        for k in range(n_runs)
+    ])
+
+    batch = []
+    for j in range(n_work_zones):
+        camera = cameras[rng.randrange(n_cameras)]
+        batch.append({
+            "camera_id": camera["id"],
+            "latitude": camera["latitude"], "longitude": camera["longitude"],
+            "geohash": camera["geohash"],
+            "risk_score": rng.randint(1, 10), "confidence": rng.random(),
+            # Most detections are resolved; a few percent are live
+            "status": "active" if rng.random() < 0.03 else "resolved",
+            "synthetic": rng.random() < 0.2,
+            # Manual/batch analyses have no collection run
+            "collection_id": f"COLLECT_{rng.randrange(n_runs):06d}" if rng.random() < 0.3 else None,
+            "detected_at": now - timedelta(seconds=j * 30)
+        })
+        if len(batch) == 5000:
+            conn.execute(insert(WorkZone.__table__), batch)
+            batch = []
+    if batch:
+        conn.execute(insert(WorkZone.__table__), batch)
+
+    conn.execute(text("ANALYZE"))
+
+
+def hot_queries():
+    """(name, statement, acceptable indexes) for each hot query"""
+    cursor = encode_cursor(datetime.utcnow() - timedelta(days=3), 10 ** 9)
+
+    return [
+        ("work-zones /active", active_work_zones_query(5), "ix_work_zones_status_risk_score"),
+        ("work-zones list (keyset)",
+         paginate(select(WorkZone), WorkZone.detected_at, WorkZone.id, 100, cursor),
+         ("ix_work_zones_detected_at_id", "ix_work_zones_detected_at")),
+        ("analysis /history",
+         paginate(analysis_history_query(), WorkZone.detected_at, WorkZone.id, 50),
+         "ix_work_zones_real_detected_at_id"),
+        ("analysis /history (cursor)",
+         paginate(analysis_history_query(), WorkZone.detected_at, WorkZone.id, 50, cursor),
+         "ix_work_zones_real_detected_at_id"),
+        ("work zone tracker (open zones)",
+         open_work_zones_query(list(range(1, 51))),
+         ("ix_work_zones_camera_id", "ix_work_zones_status_risk_score")),
+        ("reanalyze collection",
+         select(WorkZone).where(WorkZone.collection_id == "COLLECT_000042"),
+         "ix_work_zones_collection_id"),
+        ("history export (time range)",
+         export_query(EXPORT_DATASETS["work_zones"], WorkZone.__table__, datetime.utcnow() - timedelta(days=3)),
+         ("ix_work_zones_detected_at_id", "ix_work_zones_detected_at")),
+        ("collection /history (keyset)",
+         paginate(select(CollectionRun), CollectionRun.started_at, CollectionRun.id, 50, cursor),
+         ("ix_collection_runs_started_at_id", "ix_collection_runs_started_at")),
+        ("cameras /bbox",
+         select(Camera).where(within_bbox(Camera, 43.40, -79.70, 43.45, -79.60)),
+         "ix_cameras_geohash"),
+        ("work-zones /bbox",
+         select(WorkZone).where(within_bbox(WorkZone, 43.40, -79.70, 43.45, -79.60)),
+         "ix_work_zones_geohash"),
+    ]
+
+
+@pytest.fixture(scope="module")
+def plan_db(scratch_dir):
+    """Connection to a scratch database seeded with PLAN_WORK_ZONES work zones"""
+    engine = create_engine(f"sqlite:///{scratch_dir}/query_plans.db")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        seed(conn, PLAN_CAMERAS, PLAN_WORK_ZONES)
+
+    with engine.connect() as conn:
+        yield conn
+    engine.dispose()
+
+
+@pytest.mark.parametrize(
+    "statement, expected_indexes",
+    [pytest.param(statement, indexes, id=name) for name, statement, indexes in hot_queries()]
+)
+def test_hot_query_uses_index(plan_db, statement, expected_indexes):
+    sql = str(statement.compile(plan_db, compile_kwargs={"literal_binds": True}))
+    plan = [row[-1] for row in plan_db.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").fetchall()]
+    # The statement must also run, not just plan
+    plan_db.exec_driver_sql(sql).fetchall()
+
+    if isinstance(expected_indexes, str):
+        expected_indexes = (expected_indexes,)
+    full_scans = [
+        line for line in plan
+        if line.startswith("SCAN ") and "USING" not in line and "CONSTANT ROW" not in line
+    ]
+    assert not full_scans, "\n".join(plan)
+    assert any(index in line for line in plan for index in expected_indexes), "\n".join(plan)
@@ -0,0 +1,63 @@
+"""
+Response Cache Tests
+====================
+
+Single-flight fills: coalesced requests share the leader's result, but not
+its cancellation.
+"""
+
+import asyncio
+
+import pytest
+
+from services.response_cache import CachePolicy, ResponseCache
+
+POLICY = CachePolicy(60, ("work_zones",))
+
+
+@pytest.mark.asyncio
+async def test_cancelled_leader_does_not_fail_coalesced_waiter():
+    cache = ResponseCache(enabled=True)
+    leader_started = asyncio.Event()
+
+    async def slow_compute():
+        leader_started.set()
+        await asyncio.sleep(60)
+        return "leader", True
+
+    async def waiter_compute():
+        return "waiter", True
+
+    leader = asyncio.create_task(cache.get_or_compute("key", POLICY, slow_compute))
+    await leader_started.wait()
+    waiter = asyncio.create_task(cache.get_or_compute("key", POLICY, waiter_compute))
+    await asyncio.sleep(0)
+
+    # e.g. the filling request's client disconnected
+    leader.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+
+    value, state = await asyncio.wait_for(waiter, timeout=5)
+    assert (value, state) == ("waiter", "miss")
+    assert cache.get("key") == ("waiter", "hit")
+
+
+@pytest.mark.asyncio
+async def test_coalesced_waiter_shares_leader_result():
+    cache = ResponseCache(enabled=True)
+    release = asyncio.Event()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await release.wait()
+        return "value", True
+
+    tasks = [asyncio.create_task(cache.get_or_compute("key", POLICY, compute)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+
+    results = await asyncio.gather(*tasks)
+    assert [state for _, state in results] == ["miss", "coalesced", "coalesced"]
+    assert len(calls) == 1
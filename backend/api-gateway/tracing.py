@@ -0,0 +1,485 @@
+"""
+Request Tracing
+===============
+
+Per-request stage timing and slow-request profiling.
+
+Each request (and each background job) is a trace. Code that calls out of
+the gateway records its time against a stage of the current trace:
+
+    db       SQL statements (the query_stats cursor listeners)
+    compass  COMPASS camera image fetches (camera_service)
+    storage  image writes/reads (image_storage, gcp_storage_service)
+    gemini   Gemini Vision analysis (gemini_service)
+
+with span("stage") around a block, or the @traced("stage") decorator on an
+async function. Outside a trace, spans cost one ContextVar lookup. Nested
+spans of the same stage count once. Concurrent spans (a gathered batch of
+fetches) add up, so a stage can exceed the request's wall time.
+
+When a trace ends, each stage's total, and the whole request as "total",
+is observed into a histogram per (method, route, stage). GET /metrics
+renders them in the Prometheus text format, and each response carries a
+Server-Timing header with the same breakdown (middleware/tracing.py).
+
+Requests still running after SLOW_REQUEST_PROFILE_MS are sampled by a
+statistical profiler: a background thread records, every
+PROFILE_INTERVAL_MS, where the request's task is. That is the Python stack
+on the event loop if the task is running, or its chain of awaits if it is
+suspended (waiting on Gemini, a thread, the database). When the request
+ends, the samples are written to PROFILE_DIR in the collapsed-stack format
+read by flamegraph.pl and speedscope, with a .json summary next to them.
+Samples only cover the part of the request after the threshold.
+"""
+
+import asyncio
+import bisect
+import functools
+import json
+import logging
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Deque, Dict, FrozenSet, Iterator, List, Optional, Tuple, Union
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Histogram buckets (seconds), from cached reads to multi-minute collection runs
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+# Stage names (the db stage is recorded by middleware/query_stats.py)
+DB_STAGE = "db"
+TOTAL_STAGE = "total"
+
+# Concurrent slow requests sampled at once; beyond this, slow requests are only timed
+MAX_CONCURRENT_PROFILES = 4
+
+
+@dataclass
+class Trace:
+    """Stage timings of one request or job"""
+    method: str
+    route: str
+    started: float = field(default_factory=time.perf_counter)
+    stages: Dict[str, List[float]] = field(default_factory=dict)  # stage -> [seconds, calls]
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+    # Set while the profiler samples this trace
+    samples: Counter = field(default_factory=Counter, repr=False)
+    profile_deadline: Optional[float] = None
+    profile_started: Optional[float] = None
+    observed: bool = False
+
+    def record(self, stage: str, seconds: float) -> None:
+        timing = self.stages.setdefault(stage, [0.0, 0])
+        timing[0] += seconds
+        timing[1] += 1
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        """Server-Timing header value: each stage, then the total so far"""
+        entries = []
+        for stage, (seconds, calls) in self.stages.items():
+            entry = f"{stage};dur={seconds * 1000:.1f}"
+            if calls > 1:
+                unit = "queries" if stage == DB_STAGE else "calls"
+                entry += f';desc="{calls} {unit}"'
+            entries.append(entry)
+        entries.append(f"{TOTAL_STAGE};dur={self.elapsed * 1000:.1f}")
+        return ", ".join(entries)
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("trace", default=None)
+_active_stages: ContextVar[FrozenSet[str]] = ContextVar("trace_active_stages", default=frozenset())
+
+
+def current_trace() -> Optional[Trace]:
+    """Trace of the running request or job, if any"""
+    return _current_trace.get()
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    """Add time measured elsewhere (e.g. by a SQLAlchemy listener) to the current trace"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.record(stage, seconds)
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """
+    Time a block against a stage of the current trace
+
+    Usage:
+        with span("gemini"):
+            response = await asyncio.to_thread(model.generate_content, parts)
+    """
+    trace = _current_trace.get()
+    active = _active_stages.get()
+    if trace is None or stage in active:
+        yield
+        return
+
+    token = _active_stages.set(active | {stage})
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.record(stage, time.perf_counter() - start)
+        _active_stages.reset(token)
+
+
+def traced(stage: str):
+    """Decorator timing every call of an async function against a stage"""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with span(stage):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus layout"""
+
+    def __init__(self, buckets: Tuple[float, ...] = STAGE_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> Iterator[Tuple[str, int]]:
+        """(le, count of observations <= le) per bucket, ending with +Inf"""
+        running = 0
+        for bound, count in zip(list(self.buckets) + [None], self.counts):
+            running += count
+            yield ("+Inf" if bound is None else repr(bound)), running
+
+
+def _label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: str) -> str:
+    return ",".join(f'{name}="{_label_value(str(value))}"' for name, value in labels.items())
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}:{code.co_qualname}"
+
+
+def _await_chain(coro) -> List[str]:
+    """Frames of a suspended coroutine and everything it awaits, outermost first"""
+    chain = []
+    awaitable = coro
+    while awaitable is not None:
+        frame = (
+            getattr(awaitable, "cr_frame", None)
+            or getattr(awaitable, "gi_frame", None)
+            or getattr(awaitable, "ag_frame", None)
+        )
+        if frame is None:
+            # A Future (to_thread, a socket read, a lock) is parked on through its iterator
+            chain.append(f"[await {type(awaitable).__name__.removesuffix('Iter')}]")
+            break
+        if frame.f_globals.get("__name__") != __name__:
+            chain.append(_frame_label(frame))
+        awaitable = (
+            getattr(awaitable, "cr_await", None)
+            or getattr(awaitable, "gi_yieldfrom", None)
+            or getattr(awaitable, "ag_await", None)
+        )
+    return chain
+
+
+class SlowRequestProfiler:
+    """Sample the task of requests that run longer than a threshold"""
+
+    def __init__(self, directory: str, threshold_seconds: float, interval_seconds: float = 0.005, max_files: int = 100):
+        self.directory = Path(directory)
+        self.threshold_seconds = threshold_seconds
+        self.interval_seconds = interval_seconds
+        self.max_files = max_files
+        # Watched traces in deadline order (all share one threshold), and those being sampled
+        self._watching: Deque[Trace] = deque()
+        self._profiling: List[Trace] = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._loop_thread_id: Optional[int] = None
+        self.metrics = {"profiles_written": 0, "skipped": 0, "samples": 0, "errors": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold_seconds > 0
+
+    def watch(self, trace: Trace) -> None:
+        """
+        Start sampling trace if it is still running after the threshold
+
+        The deadline is kept by the sampler thread rather than the event
+        loop, so a request blocking the loop is still caught.
+        """
+        if not self.enabled or trace.task is None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        trace.profile_deadline = trace.started + self.threshold_seconds
+        with self._lock:
+            idle = not self._watching and not self._profiling
+            self._watching.append(trace)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="slow-request-profiler", daemon=True)
+                self._thread.start()
+            elif idle:
+                self._wakeup.set()
+
+    def cancel(self, trace: Trace) -> bool:
+        """Stop watching/sampling a trace; True if it has samples to write"""
+        with self._lock:
+            if trace in self._profiling:
+                self._profiling.remove(trace)
+                return bool(trace.samples)
+            if trace.profile_deadline is not None and trace in self._watching:
+                self._watching.remove(trace)
+        return False
+
+    def _run(self) -> None:
+        """Sampler thread: sleeps until the next deadline, then samples every interval"""
+        while True:
+            with self._lock:
+                now = time.perf_counter()
+                while self._watching and self._watching[0].profile_deadline <= now:
+                    trace = self._watching.popleft()
+                    if len(self._profiling) >= MAX_CONCURRENT_PROFILES:
+                        self.metrics["skipped"] += 1
+                    else:
+                        trace.profile_started = now
+                        self._profiling.append(trace)
+                profiling = list(self._profiling)
+                if profiling:
+                    timeout = self.interval_seconds
+                elif self._watching:
+                    timeout = self._watching[0].profile_deadline - now
+                else:
+                    timeout = None
+                self._wakeup.clear()
+
+            if profiling:
+                self._sample_all(profiling)
+            self._wakeup.wait(timeout)
+
+    def _sample_all(self, traces: List[Trace]) -> None:
+        try:
+            loop_frame = sys._current_frames().get(self._loop_thread_id)
+            for trace in traces:
+                stack = self._sample(trace, loop_frame)
+                if stack:
+                    trace.samples[stack] += 1
+                    self.metrics["samples"] += 1
+        except Exception as e:  # a racy read of a frame must not kill the sampler
+            self.metrics["errors"] += 1
+            logger.debug(f"Profiler sample failed: {e}")
+
+    def _sample(self, trace: Trace, loop_frame) -> Optional[str]:
+        """Collapsed stack of where the trace's task is right now"""
+        task = trace.task
+        if task.done():
+            return None
+        coro = task.get_coro()
+        root = getattr(coro, "cr_frame", None)
+
+        # Running: the event loop thread's stack, from the task's outermost frame down
+        if loop_frame is not None and root is not None:
+            frames = []
+            frame = loop_frame
+            while frame is not None:
+                frames.append(frame)
+                if frame is root:
+                    return ";".join(
+                        _frame_label(f) for f in reversed(frames) if f.f_globals.get("__name__") != __name__
+                    )
+                frame = frame.f_back
+
+        # Suspended: the chain of awaits it is parked on
+        return ";".join(_await_chain(coro)) or None
+
+    async def finish(self, trace: Trace, status: Optional[int] = None) -> None:
+        """Write the samples of a profiled trace, if any"""
+        if not self.cancel(trace):
+            return
+        try:
+            await asyncio.to_thread(self._write, trace, status)
+        except Exception as e:
+            self.metrics["errors"] += 1
+            logger.error(f"❌ Failed to write slow request profile: {e}")
+
+    def _write(self, trace: Trace, status: Optional[int]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        elapsed_ms = trace.elapsed * 1000
+        route = trace.route.strip("/").replace("/", "_").replace("{", "").replace("}", "") or "root"
+        stem = f"{datetime.utcnow():%Y%m%dT%H%M%S%f}_{trace.method}_{route}_{elapsed_ms:.0f}ms"
+
+        collapsed = self.directory / f"{stem}.collapsed"
+        collapsed.write_text("".join(f"{stack} {count}\n" for stack, count in trace.samples.most_common()))
+        (self.directory / f"{stem}.json").write_text(json.dumps({
+            "method": trace.method,
+            "route": trace.route,
+            "status": status,
+            "duration_ms": round(elapsed_ms, 1),
+            "sampled_ms": round((time.perf_counter() - trace.profile_started) * 1000, 1),
+            "interval_ms": self.interval_seconds * 1000,
+            "samples": sum(trace.samples.values()),
+            "stages_ms": {stage: round(seconds * 1000, 1) for stage, (seconds, _) in trace.stages.items()},
+            "profile": collapsed.name
+        }, indent=2))
+        self.metrics["profiles_written"] += 1
+        self._prune()
+
+        stages = ", ".join(f"{stage} {seconds * 1000:.0f} ms" for stage, (seconds, _) in trace.stages.items())
+        logger.warning(
+            f"🐢 Slow request {trace.method} {trace.route} took {elapsed_ms:.0f} ms "
+            f"({stages or 'no traced stages'}); profile: {collapsed}"
+        )
+
+    def _prune(self) -> None:
+        """Keep the newest max_files profiles"""
+        profiles = sorted(self.directory.glob("*.collapsed"))
+        for old in profiles[:max(len(profiles) - self.max_files, 0)]:
+            old.unlink(missing_ok=True)
+            old.with_suffix(".json").unlink(missing_ok=True)
+
+
+class Tracer:
+    """Per-route, per-stage timing histograms"""
+
+    def __init__(self, profiler: Optional[SlowRequestProfiler] = None, enabled: bool = True):
+        self.enabled = enabled
+        self.profiler = profiler
+        self.histograms: Dict[Tuple[str, str, str], Histogram] = {}
+        self.requests: Counter = Counter()  # (method, route, status) -> count
+        self.in_progress = 0
+
+    def start(self, method: str, route: str, profile: bool = False) -> Tuple[Trace, Any]:
+        """
+        Begin a trace in the current context
+
+        Returns:
+            (trace, token) to pass to finish()
+        """
+        trace = Trace(method=method, route=route, task=asyncio.current_task())
+        token = _current_trace.set(trace)
+        self.in_progress += 1
+        if profile and self.profiler is not None:
+            self.profiler.watch(trace)
+        return trace, token
+
+    async def finish(self, trace: Trace, token: Any, status: Optional[int] = None) -> None:
+        """End a trace: observe its stages, and write its profile if it was sampled"""
+        _current_trace.reset(token)
+        self.in_progress -= 1
+        if not trace.observed:
+            self.observe(trace, status)
+        if self.profiler is not None:
+            await self.profiler.finish(trace, status)
+
+    def observe(self, trace: Trace, status: Union[int, str, None] = None) -> None:
+        """Add a finished trace's stage totals to the histograms (once per trace)"""
+        trace.observed = True
+        for stage, (seconds, _) in list(trace.stages.items()) + [(TOTAL_STAGE, (trace.elapsed, 1))]:
+            key = (trace.method, trace.route, stage)
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(seconds)
+        self.requests[(trace.method, trace.route, "" if status is None else str(status))] += 1
+
+    @contextmanager
+    def trace_job(self, job_type: str) -> Iterator[Optional[Trace]]:
+        """Trace a background job as route "job:{job_type}" (histograms only, no profiling)"""
+        if not self.enabled:
+            yield None
+            return
+        trace = Trace(method="JOB", route=f"job:{job_type}")
+        token = _current_trace.set(trace)
+        status = "succeeded"
+        try:
+            yield trace
+        except BaseException:
+            status = "failed"
+            raise
+        finally:
+            _current_trace.reset(token)
+            self.observe(trace, status)
+
+    def render_metrics(self) -> str:
+        """Histograms and counters in the Prometheus text exposition format"""
+        lines = [
+            "# HELP qew_stage_duration_seconds Time per request or job spent in each stage (total = whole request)",
+            "# TYPE qew_stage_duration_seconds histogram"
+        ]
+        for (method, route, stage), histogram in sorted(self.histograms.items()):
+            labels = _labels(method=method, route=route, stage=stage)
+            for le, count in histogram.cumulative():
+                lines.append(f'qew_stage_duration_seconds_bucket{{{labels},le="{le}"}} {count}')
+            lines.append(f"qew_stage_duration_seconds_sum{{{labels}}} {histogram.sum!r}")
+            lines.append(f"qew_stage_duration_seconds_count{{{labels}}} {histogram.count}")
+
+        lines += ["# HELP qew_requests_total Finished requests and jobs", "# TYPE qew_requests_total counter"]
+        for (method, route, status), count in sorted(self.requests.items()):
+            lines.append(f"qew_requests_total{{{_labels(method=method, route=route, status=status)}}} {count}")
+
+        lines += [
+            "# HELP qew_requests_in_progress Requests currently traced",
+            "# TYPE qew_requests_in_progress gauge",
+            f"qew_requests_in_progress {self.in_progress}"
+        ]
+        if self.profiler is not None:
+            lines += [
+                "# HELP qew_slow_request_profiles_total Slow request profiles written to disk",
+                "# TYPE qew_slow_request_profiles_total counter",
+                f"qew_slow_request_profiles_total {self.profiler.metrics['profiles_written']}"
+            ]
+        return "\n".join(lines) + "\n"
+
+    def stats(self) -> Dict[str, Any]:
+        """Tracing metrics for /health"""
+        return {
+            "enabled": self.enabled,
+            "routes": len({(method, route) for method, route, _ in self.histograms}),
+            "requests": sum(self.requests.values()),
+            "in_progress": self.in_progress,
+            "profiling": {
+                "threshold_ms": self.profiler.threshold_seconds * 1000,
+                "directory": str(self.profiler.directory),
+                **self.profiler.metrics
+            } if self.profiler is not None and self.profiler.enabled else None
+        }
+
+
+# Global tracer
+tracer = Tracer(
+    SlowRequestProfiler(
+        settings.PROFILE_DIR,
+        threshold_seconds=settings.SLOW_REQUEST_PROFILE_MS / 1000,
+        interval_seconds=settings.PROFILE_INTERVAL_MS / 1000,
+        max_files=settings.PROFILE_MAX_FILES
+    ),
+    enabled=settings.ENABLE_TRACING
+)
@@ -0,0 +1,68 @@
+"""
+Background Job Worker
+=====================
+
+Runs a job worker pool outside the API process, so collection and
+analysis runs can be spread across machines. Any number of workers can
+share one PostgreSQL database; jobs are claimed with SKIP LOCKED.
+
+Usage:
+    python worker.py [--concurrency 4]
+
+Set JOB_WORKER_CONCURRENCY=0 on the API to leave all jobs to these workers.
+"""
+
+import argparse
+import asyncio
+import logging
+import signal
+import sys
+from pathlib import Path
+
+# Add current directory to path
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from config import settings
+from database import close_db
+from services import camera_health_monitor, image_derivative_service, job_worker_pool
+
+logging.basicConfig(
+    level=getattr(logging, settings.LOG_LEVEL),
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+async def run_worker(concurrency: int) -> None:
+    """Run the worker pool until SIGINT/SIGTERM"""
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    logger.info(f"🚀 Starting job worker ({concurrency} concurrent jobs)")
+    logger.info(f"📊 Database URL: {settings.DATABASE_URL.split('@')[-1]}")
+
+    await job_worker_pool.start(concurrency)
+    # Circuit breaker state is per process: probe from here too
+    if settings.CAMERA_HEALTH_ENABLED:
+        await camera_health_monitor.start()
+    await stop.wait()
+
+    logger.info("🛑 Stopping job worker...")
+    await camera_health_monitor.stop()
+    await job_worker_pool.stop(timeout=30.0)
+    await image_derivative_service.shutdown()
+    await close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Background job worker")
+    parser.add_argument(
+        "--concurrency", type=int,
+        default=max(settings.JOB_WORKER_CONCURRENCY, 1),
+        help="Jobs run concurrently by this process"
+    )
+    args = parser.parse_args()
+
+    asyncio.run(run_worker(args.concurrency))